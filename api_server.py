@@ -1,19 +1,16 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks, status
+from fastapi import FastAPI, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse, FileResponse
 from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
-import uuid
 import asyncio
-import threading
 import os
 import json
 from datetime import datetime
 from dotenv import load_dotenv
-import traceback
 
-# 导入原有的报告生成功能
-from generate_news_report_enhanced import IntelligentReportAgent, generate_news_report
+import config
+from job_store import QueueFullError, create_job_store
 
 # 加载环境变量
 load_dotenv()
@@ -35,8 +32,23 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# 全局任务存储
-tasks_storage = {}
+# 任务存储（报告在独立的工作进程中生成）
+job_store = create_job_store()
+worker_pool = None
+
+@app.on_event("startup")
+async def start_report_workers():
+    """内嵌模式下随API启动报告工作进程池"""
+    global worker_pool
+    if getattr(config, 'REPORT_WORKER_EMBEDDED', True):
+        from report_worker import WorkerPool
+        worker_pool = WorkerPool()
+        worker_pool.start()
+
+@app.on_event("shutdown")
+async def stop_report_workers():
+    if worker_pool is not None:
+        worker_pool.stop()
 
 class ReportRequest(BaseModel):
     """报告生成请求模型"""
@@ -62,71 +74,15 @@ class ReportResponse(BaseModel):
     message: str
     download_url: Optional[str] = None
 
-def update_task_status(task_id: str, status: str, progress: str = "", result: Dict = None, error: str = None):
-    """更新任务状态"""
-    if task_id in tasks_storage:
-        tasks_storage[task_id].update({
-            "status": status,
-            "progress": progress,
-            "completed_at": datetime.now().isoformat() if status in ["completed", "failed"] else None,
-            "result": result,
-            "error": error
-        })
-
-def generate_report_background(task_id: str, topic: str, companies: List[str] = None, days: int = 7, output_filename: str = None):
-    """后台任务：生成报告"""
-    try:
-        update_task_status(task_id, "running", "🚀 初始化智能分析代理...")
-        
-        # 创建智能代理
-        agent = IntelligentReportAgent()
-        
-        update_task_status(task_id, "running", "🧠 正在进行智能查询生成...")
-        
-        # 生成报告
-        report_data = agent.generate_comprehensive_report_with_thinking(topic, days, companies)
-        
-        update_task_status(task_id, "running", "📝 正在生成最终报告文件...")
-        
-        # 保存报告文件
-        if not output_filename:
-            date_str = datetime.now().strftime('%Y%m%d_%H%M%S')
-            safe_topic = "".join([c if c.isalnum() or c in [' ', '_', '-'] else '_' for c in topic])
-            safe_topic = safe_topic.replace(' ', '_')
-            output_filename = f"{safe_topic}_智能分析报告_{date_str}.md"
-        
-        # 确保reports目录存在
-        reports_dir = "reports"
-        os.makedirs(reports_dir, exist_ok=True)
-        
-        file_path = os.path.join(reports_dir, output_filename)
-        
-        # 保存文件
-        with open(file_path, "w", encoding="utf-8-sig") as f:
-            f.write(report_data["content"])
-        
-        # 更新任务完成状态
-        result = {
-            "file_path": file_path,
-            "filename": output_filename,
-            "content_preview": report_data["content"][:500] + "..." if len(report_data["content"]) > 500 else report_data["content"],
-            "data_summary": {
-                "breaking_news": len(report_data["data"].get("breaking_news", [])),
-                "innovation_news": len(report_data["data"].get("innovation_news", [])),
-                "investment_news": len(report_data["data"].get("investment_news", [])),
-                "policy_news": len(report_data["data"].get("policy_news", [])),
-                "trend_news": len(report_data["data"].get("trend_news", [])),
-                "company_news": len(report_data["data"].get("company_news", []))
-            },
-            "report_date": report_data["date"]
-        }
-        
-        update_task_status(task_id, "completed", "✅ 报告生成完成", result)
-        
-    except Exception as e:
-        error_msg = f"报告生成失败: {str(e)}\n{traceback.format_exc()}"
-        print(f"❌ 任务 {task_id} 失败: {error_msg}")
-        update_task_status(task_id, "failed", "❌ 报告生成失败", error=error_msg)
+def get_task_or_404(task_id: str) -> Dict[str, Any]:
+    """获取任务，不存在时返回404"""
+    task_info = job_store.get(task_id)
+    if task_info is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="任务不存在"
+        )
+    return task_info
 
 @app.get("/")
 async def root():
@@ -139,7 +95,7 @@ async def root():
     }
 
 @app.post("/api/generate-report", response_model=ReportResponse)
-async def generate_report_api(request: ReportRequest, background_tasks: BackgroundTasks):
+async def generate_report_api(request: ReportRequest):
     """
     生成智能行业分析报告
     
@@ -151,43 +107,27 @@ async def generate_report_api(request: ReportRequest, background_tasks: Backgrou
     5. 📝 综合报告生成
     """
     try:
-        # 生成任务ID
-        task_id = str(uuid.uuid4())
-        
-        # 初始化任务状态
-        tasks_storage[task_id] = {
-            "task_id": task_id,
-            "status": "pending",
-            "progress": "📋 任务已创建，等待开始...",
-            "created_at": datetime.now().isoformat(),
-            "completed_at": None,
-            "result": None,
-            "error": None,
-            "request_data": {
-                "topic": request.topic,
-                "companies": request.companies,
-                "days": request.days,
-                "output_filename": request.output_filename
-            }
-        }
-        
-        # 添加后台任务
-        background_tasks.add_task(
-            generate_report_background,
-            task_id=task_id,
-            topic=request.topic,
-            companies=request.companies,
-            days=request.days,
-            output_filename=request.output_filename
-        )
+        # 创建排队任务，由工作进程领取执行
+        task_info = await asyncio.to_thread(job_store.create, {
+            "topic": request.topic,
+            "companies": request.companies,
+            "days": request.days,
+            "output_filename": request.output_filename
+        })
+        task_id = task_info["task_id"]
         
         return ReportResponse(
             success=True,
             task_id=task_id,
-            message=f"报告生成任务已启动，主题: {request.topic}",
+            message=f"报告生成任务已加入队列，主题: {request.topic}",
             download_url=None
         )
         
+    except QueueFullError as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -197,39 +137,25 @@ async def generate_report_api(request: ReportRequest, background_tasks: Backgrou
 @app.get("/api/task/{task_id}", response_model=TaskStatus)
 async def get_task_status(task_id: str):
     """获取任务状态"""
-    if task_id not in tasks_storage:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="任务不存在"
-        )
-    
-    task_info = tasks_storage[task_id]
+    task_info = await asyncio.to_thread(get_task_or_404, task_id)
     return TaskStatus(**task_info)
 
 @app.get("/api/tasks")
-async def list_tasks(limit: int = 10):
-    """获取任务列表"""
-    # 按创建时间倒序排列
-    sorted_tasks = sorted(
-        tasks_storage.values(),
-        key=lambda x: x["created_at"],
-        reverse=True
-    )
+async def list_tasks(limit: int = 10, offset: int = 0, status: Optional[str] = None):
+    """获取任务列表（按创建时间倒序分页，可按状态过滤）"""
+    tasks = await asyncio.to_thread(job_store.list, limit, offset, status)
+    total = await asyncio.to_thread(job_store.count, status)
     return {
-        "tasks": sorted_tasks[:limit],
-        "total": len(tasks_storage)
+        "tasks": tasks,
+        "total": total,
+        "limit": limit,
+        "offset": offset
     }
 
 @app.get("/api/download/{task_id}")
 async def download_report(task_id: str):
     """下载生成的报告文件"""
-    if task_id not in tasks_storage:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="任务不存在"
-        )
-    
-    task_info = tasks_storage[task_id]
+    task_info = await asyncio.to_thread(get_task_or_404, task_id)
     
     if task_info["status"] != "completed":
         raise HTTPException(
@@ -264,13 +190,7 @@ async def download_report(task_id: str):
 @app.get("/api/preview/{task_id}")
 async def preview_report(task_id: str):
     """预览报告内容"""
-    if task_id not in tasks_storage:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="任务不存在"
-        )
-    
-    task_info = tasks_storage[task_id]
+    task_info = await asyncio.to_thread(get_task_or_404, task_id)
     
     if task_info["status"] != "completed":
         raise HTTPException(
@@ -303,13 +223,7 @@ async def preview_report(task_id: str):
 @app.delete("/api/task/{task_id}")
 async def delete_task(task_id: str):
     """删除任务和相关文件"""
-    if task_id not in tasks_storage:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="任务不存在"
-        )
-    
-    task_info = tasks_storage[task_id]
+    task_info = await asyncio.to_thread(get_task_or_404, task_id)
     
     # 删除文件（如果存在）
     if task_info.get("result") and task_info["result"].get("file_path"):
@@ -321,19 +235,23 @@ async def delete_task(task_id: str):
                 print(f"删除文件失败: {e}")
     
     # 删除任务记录
-    del tasks_storage[task_id]
+    await asyncio.to_thread(job_store.delete, task_id)
     
     return {"message": "任务已删除"}
 
 @app.get("/api/health")
 async def health_check():
     """健康检查接口"""
+    counts = await asyncio.to_thread(job_store.counts_by_status)
     return {
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
-        "active_tasks": len([t for t in tasks_storage.values() if t["status"] in ["pending", "running"]]),
-        "completed_tasks": len([t for t in tasks_storage.values() if t["status"] == "completed"]),
-        "failed_tasks": len([t for t in tasks_storage.values() if t["status"] == "failed"])
+        "active_tasks": counts["pending"] + counts["running"],
+        "pending_tasks": counts["pending"],
+        "running_tasks": counts["running"],
+        "completed_tasks": counts["completed"],
+        "failed_tasks": counts["failed"],
+        "workers_alive": worker_pool.is_alive() if worker_pool is not None else None
     }
 
 if __name__ == "__main__":
@@ -1,5 +1,27 @@
-from .arxiv_collector import ArxivCollector
-from .news_collector import NewsCollector
-from .tavily_collector import TavilyCollector
-from .google_search_collector import GoogleSearchCollector
-from .brave_search_collector import BraveSearchCollector 
\ No newline at end of file
+"""
+数据收集器包
+
+各收集器依赖较多（feedparser、requests、arxiv等），导入 collectors 包下的任意模块都会先执行本文件，
+因此这里不直接导入收集器，而是在首次访问 collectors.ArxivCollector 等名称时才导入对应模块。
+"""
+
+import importlib
+
+_LAZY_EXPORTS = {
+    "ArxivCollector": ".arxiv_collector",
+    "NewsCollector": ".news_collector",
+    "TavilyCollector": ".tavily_collector",
+    "GoogleSearchCollector": ".google_search_collector",
+    "BraveSearchCollector": ".brave_search_collector",
+}
+
+__all__ = list(_LAZY_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
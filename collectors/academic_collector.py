@@ -1,11 +1,60 @@
 import datetime
 import json
 import requests
-import time
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from tqdm import tqdm
 import config
 from urllib.parse import quote_plus
-from collectors.llm_processor import LLMProcessor
+from collectors.service_registry import get_llm_processor
+from collectors.term_store import term_store, ENGLISH
+from collectors.rate_limiter import RateLimiter
+from collectors.usage_ledger import submit_in_context
+
+class PaperIndex:
+    """
+    论文增量去重索引：按规范化的DOI和URL去重，合并时无需每次重建已有URL集合
+    """
+    def __init__(self):
+        self.papers = []
+        self._dois = set()
+        self._urls = set()
+
+    @staticmethod
+    def _normalize_doi(doi):
+        doi = (doi or '').strip().lower()
+        for prefix in ('https://doi.org/', 'http://doi.org/', 'https://dx.doi.org/', 'http://dx.doi.org/', 'doi:'):
+            if doi.startswith(prefix):
+                doi = doi[len(prefix):]
+        # "No DOI"、"无DOI"等占位值不参与去重
+        return doi if doi.startswith('10.') else None
+
+    @staticmethod
+    def _normalize_url(url):
+        url = (url or '').strip()
+        return url.rstrip('/') if url and url != '#' else None
+
+    def __len__(self):
+        return len(self.papers)
+
+    def add(self, paper):
+        """论文未出现过时加入索引并返回True"""
+        doi = self._normalize_doi(paper.get('doi'))
+        url = self._normalize_url(paper.get('url'))
+        if (doi and doi in self._dois) or (url and url in self._urls):
+            return False
+        if doi:
+            self._dois.add(doi)
+        if url:
+            self._urls.add(url)
+        self.papers.append(paper)
+        return True
+
+    def add_all(self, papers):
+        """加入一批论文，返回其中不重复的论文"""
+        return [paper for paper in papers if self.add(paper)]
+
 
 class AcademicCollector:
     """
@@ -28,46 +77,17 @@ class AcademicCollector:
         
         # 初始化LLM处理器用于翻译
         try:
-            self.llm_processor = LLMProcessor()
+            self.llm_processor = get_llm_processor()
             self.has_llm = True
         except Exception as e:
             print(f"初始化LLM处理器失败: {str(e)}")
             self.has_llm = False
             
-        # 常见学术领域中英文对照字典，用于直接翻译常见术语
-        self.topic_translations = {
-            "人工智能": "artificial intelligence",
-            "机器学习": "machine learning",
-            "深度学习": "deep learning",
-            "自然语言处理": "natural language processing",
-            "计算机视觉": "computer vision",
-            "区块链": "blockchain",
-            "元宇宙": "metaverse",
-            "虚拟现实": "virtual reality",
-            "增强现实": "augmented reality",
-            "量子计算": "quantum computing",
-            "物联网": "internet of things",
-            "大数据": "big data",
-            "云计算": "cloud computing",
-            "边缘计算": "edge computing",
-            "5G": "5G",
-            "6G": "6G",
-            "半导体": "semiconductor",
-            "芯片": "chip technology",
-            "数据科学": "data science",
-            "强化学习": "reinforcement learning",
-            "生成式对抗网络": "generative adversarial networks",
-            "自动驾驶": "autonomous driving",
-            "脑机接口": "brain-computer interface",
-            "智能机器人": "intelligent robotics",
-            "生物信息学": "bioinformatics",
-            "基因编辑": "gene editing",
-            "生物技术": "biotechnology",
-            "新能源": "new energy",
-            "可再生能源": "renewable energy",
-            "网络安全": "cybersecurity",
-            "金融科技": "fintech"
-        }
+        # 常见术语的中英文对照由共享术语库提供（collectors.term_store）
+        
+        # 各来源的速率限制器，代替每次请求后固定休眠
+        self._rate_limiters = {}
+        self._rate_limiter_lock = threading.Lock()
         
         # print(f"学术收集器已初始化，可用API: {[k for k, v in self.available_apis.items() if v]}")  # MCP需要静默
 
@@ -85,13 +105,13 @@ class AcademicCollector:
         if not any('\u4e00' <= char <= '\u9fff' for char in text):
             return text
             
-        # 检查是否在预定义术语中
-        if text in self.topic_translations:
-            translated = self.topic_translations[text]
+        # 检查是否在共享术语库中（预定义术语和之前翻译过的文本）
+        translated = term_store.lookup(text, ENGLISH)
+        if translated:
             print(f"直接翻译术语: '{text}' → '{translated}'")
             return translated
             
-        # 使用LLM处理器进行翻译
+        # 使用LLM处理器进行翻译（结果会写入术语库）
         if self.has_llm:
             try:
                 translated_text = self.llm_processor.translate_text(text, "English")
@@ -101,9 +121,7 @@ class AcademicCollector:
                 print(f"LLM翻译失败: {str(e)}")
                 
         # 如果LLM翻译失败，使用简单词汇替换
-        for zh, en in self.topic_translations.items():
-            if zh in text:
-                text = text.replace(zh, en)
+        text = term_store.replace_known_terms(text, ENGLISH)
                 
         print(f"使用简单替换翻译: '{text}'")
         return text
@@ -583,86 +601,127 @@ class AcademicCollector:
             print(f"CrossRef API错误: {str(e)}")
             return []
             
-    def get_papers_by_topic(self, topic, subtopics=None, days_back=7):
+    def _get_sources(self):
+        """学术来源列表 - 将CORE放在前面，以确保它会被调用"""
+        return [
+            ('CORE', self.search_core),  # 先调用CORE
+            ('CrossRef', self.search_crossref),  # CrossRef不需要API密钥，也放前面
+            ('IEEE Xplore', self.search_ieee),
+            ('Semantic Scholar', self.search_semantic_scholar),
+            ('Springer', self.search_springer),
+        ]
+
+    def _get_rate_limiter(self, source_name):
+        """获取来源的速率限制器（同一收集器实例的所有调用共享）"""
+        with self._rate_limiter_lock:
+            limiter = self._rate_limiters.get(source_name)
+            if limiter is None:
+                rates = getattr(config, 'ACADEMIC_SOURCE_RATE_LIMITS', {})
+                rate = rates.get(source_name, getattr(config, 'ACADEMIC_DEFAULT_RATE_LIMIT', 1.0))
+                limiter = self._rate_limiters[source_name] = RateLimiter(rate)
+            return limiter
+
+    def _build_queries(self, topic, subtopics):
+        """生成 (查询词, 子主题) 列表：主题本身，以及主题与各子主题的组合"""
+        english_topic = self._translate_to_english(topic)
+        queries = [(english_topic, None)]
+        for subtopic in subtopics or []:
+            # 将子主题翻译为英文
+            english_subtopic = self._translate_to_english(subtopic)
+            queries.append((f"{english_topic} {english_subtopic}", subtopic))
+        return queries
+
+    def _fetch_source(self, source_name, search_func, queries, days_back, results_queue):
+        """单个来源的工作线程：依次执行全部查询，每完成一个查询就把结果放入队列"""
+        limiter = self._get_rate_limiter(source_name)
+        for query, subtopic in queries:
+            limiter.acquire()
+            try:
+                results_queue.put((source_name, subtopic, search_func(query, days_back), None))
+            except Exception as e:
+                results_queue.put((source_name, subtopic, [], e))
+
+    def iter_papers_by_topic(self, topic, subtopics=None, days_back=7, paper_index=None):
+        """
+        并发从多个学术来源获取论文，每个来源一个工作线程，哪个来源的查询先完成就先返回哪个
+
+        Args:
+            topic (str): 主题
+            subtopics (list): 子主题列表
+            days_back (int): 搜索多少天内的论文
+            paper_index (PaperIndex, optional): 去重索引，默认新建
+
+        Yields:
+            tuple: (来源名称, 子主题或None, 本次新增的不重复论文列表)
+        """
+        paper_index = paper_index if paper_index is not None else PaperIndex()
+        queries = self._build_queries(topic, subtopics)
+        sources = self._get_sources()
+        results_queue = queue.Queue()
+
+        with ThreadPoolExecutor(max_workers=len(sources)) as executor:
+            for source_name, search_func in sources:
+                submit_in_context(executor, self._fetch_source, source_name, search_func,
+                                  queries, days_back, results_queue)
+
+            for _ in range(len(sources) * len(queries)):
+                source_name, subtopic, source_results, error = results_queue.get()
+                if error is not None:
+                    if subtopic:
+                        print(f"搜索子主题'{subtopic}'从{source_name}获取论文时出错: {str(error)}")
+                    else:
+                        print(f"从{source_name}获取论文时出错: {str(error)}")
+                    continue
+                yield source_name, subtopic, paper_index.add_all(source_results)
+
+    def get_papers_by_topic(self, topic, subtopics=None, days_back=7, concurrent=True):
         """
         从多个来源获取与主题相关的论文
-        
+
         Args:
             topic (str): 主题
             subtopics (list): 子主题列表
             days_back (int): 搜索多少天内的论文
-            
+            concurrent (bool): 是否并发请求各来源，False时按来源依次请求
+
         Returns:
             list: 论文列表
         """
         print(f"从多个学术来源搜索{topic}相关论文...")
-        
-        # 将主题翻译为英文
-        english_topic = self._translate_to_english(topic)
-        all_results = []
-        
-        # 从各个来源获取论文 - 将CORE放在前面，以确保它会被调用
-        all_sources = [
-            ('CORE', self.search_core),  # 先调用CORE
-            ('CrossRef', self.search_crossref),  # CrossRef不需要API密钥，也放前面
-            ('IEEE Xplore', self.search_ieee),
-            ('Semantic Scholar', self.search_semantic_scholar),
-            ('Springer', self.search_springer),
-        ]
-        
+
         # 打印出可用的API配置状态
         print(f"当前API状态: {', '.join([f'{k}={v}' for k, v in self.api_status.items()])}")
-        
-        # 对每个来源进行搜索
-        for source_name, search_func in all_sources:
-            try:
-                print(f"开始从{source_name}获取数据...")
-                source_results = search_func(english_topic, days_back)
-                
-                # 添加唯一结果
-                existing_urls = {paper['url'] for paper in all_results}
-                for paper in source_results:
-                    if paper['url'] not in existing_urls:
-                        all_results.append(paper)
-                        existing_urls.add(paper['url'])
-                        
-                print(f"从{source_name}添加了{len(source_results)}篇不重复论文")
-                
-                # 防止API速率限制
-                time.sleep(1)
-            except Exception as e:
-                print(f"从{source_name}获取论文时出错: {str(e)}")
-                import traceback
-                print(traceback.format_exc())  # 打印完整的异常堆栈跟踪
-                
-        # 如果有子主题，也搜索子主题
-        if subtopics:
-            for subtopic in subtopics:
-                # 将子主题翻译为英文
-                english_subtopic = self._translate_to_english(subtopic)
-                combined_query = f"{english_topic} {english_subtopic}"
-                
+
+        paper_index = PaperIndex()
+
+        if concurrent:
+            for source_name, subtopic, added in self.iter_papers_by_topic(topic, subtopics, days_back, paper_index):
+                if subtopic is None:
+                    print(f"从{source_name}添加了{len(added)}篇不重复论文")
+                elif added:
+                    print(f"子主题'{subtopic}'从{source_name}添加了{len(added)}篇不重复论文")
+        else:
+            for query, subtopic in self._build_queries(topic, subtopics):
                 # 对每个来源进行搜索
-                for source_name, search_func in all_sources:
+                for source_name, search_func in self._get_sources():
                     try:
-                        source_results = search_func(combined_query, days_back)
-                        
-                        # 添加唯一结果
-                        existing_urls = {paper['url'] for paper in all_results}
-                        added = 0
-                        for paper in source_results:
-                            if paper['url'] not in existing_urls:
-                                all_results.append(paper)
-                                existing_urls.add(paper['url'])
-                                added += 1
-                                
-                        if added > 0:
-                            print(f"子主题'{subtopic}'从{source_name}添加了{added}篇不重复论文")
-                            
+                        if subtopic is None:
+                            print(f"开始从{source_name}获取数据...")
                         # 防止API速率限制
-                        time.sleep(1)
+                        self._get_rate_limiter(source_name).acquire()
+                        added = paper_index.add_all(search_func(query, days_back))
+                        if subtopic is None:
+                            print(f"从{source_name}添加了{len(added)}篇不重复论文")
+                        elif added:
+                            print(f"子主题'{subtopic}'从{source_name}添加了{len(added)}篇不重复论文")
                     except Exception as e:
-                        print(f"搜索子主题'{subtopic}'从{source_name}获取论文时出错: {str(e)}")
-                        
+                        if subtopic:
+                            print(f"搜索子主题'{subtopic}'从{source_name}获取论文时出错: {str(e)}")
+                        else:
+                            print(f"从{source_name}获取论文时出错: {str(e)}")
+                            import traceback
+                            print(traceback.format_exc())  # 打印完整的异常堆栈跟踪
+
+        all_results = paper_index.papers
         print(f"总共收集到 {len(all_results)} 篇学术论文")
         return all_results 
\ No newline at end of file
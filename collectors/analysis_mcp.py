@@ -2,7 +2,7 @@ import json
 from typing import List, Dict, Optional, Union, Any
 from dataclasses import dataclass, asdict
 from pydantic import BaseModel
-from collectors.llm_processor import LLMProcessor
+from collectors.service_registry import get_llm_processor
 from collectors.search_mcp_old import Document
 
 
@@ -71,7 +71,7 @@ class AnalysisMcp:
     def __init__(self):
         """初始化AnalysisMcp"""
         try:
-            self.llm_processor = LLMProcessor()
+            self.llm_processor = get_llm_processor()
             self.has_llm = True
             print("✅ AnalysisMcp初始化完成")
         except Exception as e:
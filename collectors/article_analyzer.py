@@ -1,6 +1,8 @@
 from typing import List, Dict, Any
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import threading
+from .usage_ledger import submit_in_context
+from .llm_governor import batch_priority
 
 
 class ArticleAnalyzer:
@@ -97,6 +99,7 @@ class ArticleAnalyzer:
 **链接**: [{item['url']}]({item['url']})
 """
     
+    @batch_priority
     def analyze_articles_parallel(self, analysis_items: List[Dict], topic: str) -> List[str]:
         """并行分析文章列表"""
         print(f"开始并行分析 {len(analysis_items)} 篇文章...")
@@ -106,7 +109,7 @@ class ArticleAnalyzer:
         with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
             # 提交所有文章分析任务
             future_to_item = {
-                executor.submit(self.analyze_single_article, item, topic): item 
+                submit_in_context(executor, self.analyze_single_article, item, topic): item 
                 for item in analysis_items
             }
             
@@ -1,55 +1,28 @@
 import arxiv
 import datetime
+import re
 from dateutil import parser
 from tqdm import tqdm
 import config
-from collectors.llm_processor import LLMProcessor  # 使用LLM替代googletrans
+from collectors.service_registry import get_llm_processor  # 使用LLM替代googletrans
+from collectors.term_store import term_store, ENGLISH
+from collectors.arxiv_mirror import arxiv_mirror
 
 class ArxivCollector:
-    def __init__(self):
+    def __init__(self, mirror=None):
         self.client = arxiv.Client()
+        # 本地元数据镜像（未导入快照时为None，所有查询都请求arXiv API）
+        mirror = mirror or arxiv_mirror
+        self.mirror = mirror if config.ARXIV_MIRROR_ENABLED and mirror.available() else None
         # 初始化LLM处理器用于翻译
         try:
-            self.llm_processor = LLMProcessor()
+            self.llm_processor = get_llm_processor()
             self.has_llm = True
         except Exception as e:
             print(f"初始化LLM处理器失败: {str(e)}")
             self.has_llm = False
         
-        # 常见学术领域中英文对照字典，用于直接翻译常见术语
-        self.topic_translations = {
-            "人工智能": "artificial intelligence",
-            "机器学习": "machine learning",
-            "深度学习": "deep learning",
-            "自然语言处理": "natural language processing",
-            "计算机视觉": "computer vision",
-            "区块链": "blockchain",
-            "元宇宙": "metaverse",
-            "虚拟现实": "virtual reality",
-            "增强现实": "augmented reality",
-            "量子计算": "quantum computing",
-            "物联网": "internet of things",
-            "大数据": "big data",
-            "云计算": "cloud computing",
-            "边缘计算": "edge computing",
-            "5G": "5G",
-            "6G": "6G",
-            "半导体": "semiconductor",
-            "芯片": "chip technology",
-            "数据科学": "data science",
-            "强化学习": "reinforcement learning",
-            "生成式对抗网络": "generative adversarial networks",
-            "自动驾驶": "autonomous driving",
-            "脑机接口": "brain-computer interface",
-            "智能机器人": "intelligent robotics",
-            "生物信息学": "bioinformatics",
-            "基因编辑": "gene editing",
-            "生物技术": "biotechnology",
-            "新能源": "new energy",
-            "可再生能源": "renewable energy",
-            "网络安全": "cybersecurity",
-            "金融科技": "fintech"
-        }
+        # 常见术语的中英文对照由共享术语库提供（collectors.term_store）
         
     def _translate_to_english(self, text):
         """
@@ -65,13 +38,13 @@ class ArxivCollector:
         if not any('\u4e00' <= char <= '\u9fff' for char in text):
             return text
             
-        # 检查是否在预定义术语中
-        if text in self.topic_translations:
-            translated = self.topic_translations[text]
+        # 检查是否在共享术语库中（预定义术语和之前翻译过的文本）
+        translated = term_store.lookup(text, ENGLISH)
+        if translated:
             print(f"直接翻译术语: '{text}' → '{translated}'")
             return translated
             
-        # 使用LLM处理器进行翻译
+        # 使用LLM处理器进行翻译（结果会写入术语库）
         if self.has_llm:
             try:
                 translated_text = self.llm_processor.translate_text(text, "English")
@@ -81,9 +54,7 @@ class ArxivCollector:
                 print(f"LLM翻译失败: {str(e)}")
                 
         # 如果LLM翻译失败，使用简单词汇替换
-        for zh, en in self.topic_translations.items():
-            if zh in text:
-                text = text.replace(zh, en)
+        text = term_store.replace_known_terms(text, ENGLISH)
                 
         print(f"使用简单替换翻译: '{text}'")
         return text
@@ -106,6 +77,70 @@ class ArxivCollector:
         end_date = datetime.datetime.now()
         start_date = end_date - datetime.timedelta(days=days_back)
         
+        coverage = self.mirror.coverage() if self.mirror else None
+        if not coverage or coverage[1] < start_date.timestamp():
+            return self._search_live(english_query, start_date, end_date)
+        
+        # 快照截止日期之前的论文从本地镜像检索，之后的最新几天再请求arXiv API
+        mirror_results = self.mirror.search(
+            english_query, start_date, end_date,
+            limit=config.ARXIV_MAX_RESULTS,
+            sort_by=config.ARXIV_SORT_BY,
+            descending=config.ARXIV_SORT_ORDER.lower() == "descending"
+        )
+        print(f"📚 在本地arXiv镜像中找到 {len(mirror_results)} 篇论文")
+        
+        live_results = []
+        if config.ARXIV_MIRROR_LIVE_FALLBACK:
+            # 快照最后一天可能不完整，从该日开始请求，重复的论文合并时去掉
+            live_start = max(start_date, datetime.datetime.fromtimestamp(coverage[1]))
+            live_results = self._search_live(english_query, live_start, end_date)
+        
+        return self._merge_results(mirror_results, live_results)
+    
+    @staticmethod
+    def _paper_id(paper):
+        """论文的arXiv ID（去掉版本号），用于合并镜像和API的结果"""
+        arxiv_id = paper.get('url', '').split('/abs/')[-1]
+        return re.sub(r'v\d+$', '', arxiv_id)
+    
+    def _merge_results(self, mirror_results, live_results):
+        """
+        合并镜像和API的结果，按arXiv ID去重（重复时保留镜像中的记录），按配置的排序方式排序后截断
+        
+        按相关性排序时，镜像的BM25得分和arXiv API的相关性排名无法直接比较，
+        因此两边的结果交替合并：各自保持原有的相关性顺序，截断时最新几天的论文也能保留一半名额。
+        """
+        mirror_ids = {self._paper_id(paper) for paper in mirror_results}
+        fresh_results = []
+        for paper in live_results:
+            paper_id = self._paper_id(paper)
+            if paper_id in mirror_ids:
+                continue
+            mirror_ids.add(paper_id)
+            fresh_results.append(paper)
+        
+        if config.ARXIV_SORT_BY == "relevance":
+            merged = []
+            for index in range(max(len(mirror_results), len(fresh_results))):
+                merged.extend(results[index] for results in (mirror_results, fresh_results) if index < len(results))
+        else:
+            merged = mirror_results + fresh_results
+            merged.sort(key=lambda paper: paper['published'], reverse=config.ARXIV_SORT_ORDER.lower() == "descending")
+        return merged[:config.ARXIV_MAX_RESULTS]
+    
+    def _search_live(self, english_query, start_date, end_date):
+        """
+        通过arXiv API检索指定提交时间范围内的论文
+        
+        Args:
+            english_query (str): 英文查询
+            start_date (datetime): 最早提交时间
+            end_date (datetime): 最晚提交时间
+            
+        Returns:
+            list: List of dictionaries containing paper information
+        """
         # Format the query with date range
         date_query = f"submittedDate:[{start_date.strftime('%Y%m%d')} TO {end_date.strftime('%Y%m%d')}]"
         full_query = f"{english_query} AND {date_query}"
@@ -0,0 +1,452 @@
+"""
+arXiv元数据本地镜像
+
+ArxivCollector 原先每个查询都请求arXiv API，get_papers_by_topic 还会为LLM生成的学术术语和每个子主题
+追加查询，而 arxiv.Client 在请求之间有固定的礼貌等待，学术报告的大部分搜索时间都花在等待上。
+ArxivMirror 把arXiv公开的元数据快照（arxiv-metadata-oai-snapshot.json，每行一个JSON对象）导入本地SQLite：
+1. papers 表只保存检索和展示需要的字段，按首版提交时间建索引
+2. paper_categories 表按 (分类, 提交时间) 建索引，支持按分类检索
+3. 标题和摘要建FTS5全文索引（外部内容表，不重复保存正文），检索结果按BM25排序，标题权重更高
+镜像只覆盖快照截止日期之前的论文，更新的论文仍由 ArxivCollector 请求arXiv API。
+
+用法:
+    python -m collectors.arxiv_mirror ingest arxiv-metadata-oai-snapshot.json --categories cs stat.ML
+    python -m collectors.arxiv_mirror stats
+"""
+
+import argparse
+import gzip
+import json
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import config
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS papers (
+    id INTEGER PRIMARY KEY,
+    arxiv_id TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL,
+    abstract TEXT,
+    authors TEXT,
+    categories TEXT,
+    submitted REAL NOT NULL,
+    updated TEXT,
+    doi TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_papers_submitted ON papers (submitted);
+CREATE TABLE IF NOT EXISTS paper_categories (
+    category TEXT NOT NULL,
+    submitted REAL NOT NULL,
+    paper_id INTEGER NOT NULL,
+    PRIMARY KEY (category, submitted, paper_id)
+) WITHOUT ROWID;
+CREATE TRIGGER IF NOT EXISTS papers_categories_ai AFTER INSERT ON papers BEGIN
+    INSERT OR IGNORE INTO paper_categories (category, submitted, paper_id)
+        SELECT value, new.submitted, new.id FROM json_each(new.categories);
+END;
+CREATE TRIGGER IF NOT EXISTS papers_categories_ad AFTER DELETE ON papers BEGIN
+    DELETE FROM paper_categories WHERE paper_id = old.id AND submitted = old.submitted
+        AND category IN (SELECT value FROM json_each(old.categories));
+END;
+CREATE TRIGGER IF NOT EXISTS papers_categories_au AFTER UPDATE ON papers BEGIN
+    DELETE FROM paper_categories WHERE paper_id = old.id AND submitted = old.submitted
+        AND category IN (SELECT value FROM json_each(old.categories));
+    INSERT OR IGNORE INTO paper_categories (category, submitted, paper_id)
+        SELECT value, new.submitted, new.id FROM json_each(new.categories);
+END;
+"""
+
+# porter词干化：model/models/modeling 视为同一个词，与arXiv API的检索行为接近
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS papers_fts USING fts5(
+    title, abstract, content='papers', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS papers_fts_ai AFTER INSERT ON papers BEGIN
+    INSERT INTO papers_fts(rowid, title, abstract) VALUES (new.id, new.title, new.abstract);
+END;
+CREATE TRIGGER IF NOT EXISTS papers_fts_ad AFTER DELETE ON papers BEGIN
+    INSERT INTO papers_fts(papers_fts, rowid, title, abstract) VALUES ('delete', old.id, old.title, old.abstract);
+END;
+CREATE TRIGGER IF NOT EXISTS papers_fts_au AFTER UPDATE ON papers BEGIN
+    INSERT INTO papers_fts(papers_fts, rowid, title, abstract) VALUES ('delete', old.id, old.title, old.abstract);
+    INSERT INTO papers_fts(rowid, title, abstract) VALUES (new.id, new.title, new.abstract);
+END;
+"""
+
+# BM25列权重：标题, 摘要
+_BM25_WEIGHTS = (10.0, 1.0)
+
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "into", "is", "it", "not",
+    "of", "on", "or", "the", "to", "with", "via", "its", "their", "this", "that", "using",
+}
+
+_ORDER_BY = {
+    "relevance": "rank",
+    "submittedDate": "p.submitted",
+    "lastUpdatedDate": "p.updated",
+}
+
+
+def _normalize_space(text: Optional[str]) -> str:
+    return " ".join((text or "").split())
+
+
+def _parse_submitted(record: Dict[str, Any]) -> Optional[float]:
+    """首版提交时间（UTC时间戳），没有版本信息时退化为update_date"""
+    versions = record.get('versions') or []
+    if versions and versions[0].get('created'):
+        try:
+            return parsedate_to_datetime(versions[0]['created']).timestamp()
+        except (TypeError, ValueError):
+            pass
+    if record.get('update_date'):
+        try:
+            return datetime.strptime(record['update_date'], '%Y-%m-%d').replace(tzinfo=timezone.utc).timestamp()
+        except ValueError:
+            pass
+    return None
+
+
+def _parse_authors(record: Dict[str, Any]) -> List[str]:
+    parsed = record.get('authors_parsed')
+    if parsed:
+        # authors_parsed 每项为 [姓, 名, 后缀]
+        return [_normalize_space(" ".join(part for part in (item[1:2] + item[0:1] + item[2:3]) if part))
+                for item in parsed if item]
+    authors = _normalize_space(record.get('authors'))
+    return [name.strip() for name in re.split(r",|\band\b", authors) if name.strip()]
+
+
+def parse_snapshot_record(record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """把快照中的一条记录转换为待入库的论文（缺少ID、标题或提交时间的记录跳过）"""
+    arxiv_id = (record.get('id') or "").strip()
+    title = _normalize_space(record.get('title'))
+    submitted = _parse_submitted(record)
+    if not arxiv_id or not title or submitted is None:
+        return None
+    return {
+        'arxiv_id': arxiv_id,
+        'title': title,
+        'abstract': _normalize_space(record.get('abstract')),
+        'authors': json.dumps(_parse_authors(record), ensure_ascii=False),
+        'categories': json.dumps((record.get('categories') or "").split()),
+        'submitted': submitted,
+        'updated': record.get('update_date'),
+        'doi': record.get('doi'),
+    }
+
+
+def category_matches(categories: Iterable[str], wanted: Optional[Iterable[str]]) -> bool:
+    """分类是否在筛选范围内；筛选项可以是完整分类（cs.CL）或顶级学科（cs）"""
+    if not wanted:
+        return True
+    for category in categories:
+        for prefix in wanted:
+            if category == prefix or category.startswith(prefix + "."):
+                return True
+    return False
+
+
+def build_match_query(query: str, match_all: bool = True) -> Optional[str]:
+    """
+    把arXiv风格的查询转换为FTS5 MATCH表达式
+
+    查询按大写AND切分为多组（ArxivCollector的子主题查询形如 "topic AND subtopic"），各组之间都要命中；
+    组内的词在 match_all 为True时都要命中，否则命中任意一个即可。
+    """
+    groups = []
+    for group in re.split(r"\s+AND\s+", query):
+        terms = [term for term in re.findall(r"[a-z0-9]+", group.lower()) if term not in _STOPWORDS]
+        if not terms:
+            continue
+        terms = list(dict.fromkeys(terms))
+        joiner = " AND " if match_all else " OR "
+        groups.append("(" + joiner.join(f'"{term}"' for term in terms) + ")")
+    return " AND ".join(groups) if groups else None
+
+
+def _open_snapshot(path: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+def _iter_snapshot(path: str) -> Iterator[Dict[str, Any]]:
+    with _open_snapshot(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+class ArxivMirror:
+    """线程安全的arXiv元数据镜像（单个SQLite连接，读写由锁串行化）"""
+
+    def __init__(self, path: str = ":memory:", categories: Optional[Iterable[str]] = None):
+        """
+        初始化镜像
+
+        Args:
+            path: SQLite数据库文件路径，":memory:"表示只保存在内存中
+            categories: 导入时保留的分类（完整分类或顶级学科），None表示全部导入
+        """
+        self.path = path
+        self.categories = [c for c in (categories or []) if c]
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.fts_enabled = False
+
+    @classmethod
+    def from_config(cls) -> 'ArxivMirror':
+        """根据config创建镜像"""
+        categories = getattr(config, 'ARXIV_MIRROR_CATEGORIES', "")
+        return cls(
+            path=getattr(config, 'ARXIV_MIRROR_PATH', None) or ":memory:",
+            categories=[c.strip() for c in categories.split(",")] if categories else None
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        """首次使用时打开数据库并建表（调用方需持有锁）"""
+        if self._conn is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.executescript(_SCHEMA)
+            try:
+                conn.executescript(_FTS_SCHEMA)
+                self.fts_enabled = True
+            except sqlite3.OperationalError as e:
+                print(f"⚠️ SQLite不支持FTS5，arXiv镜像不可用: {e}")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def available(self) -> bool:
+        """镜像是否可以检索（数据库文件已存在、支持全文索引且已导入论文）"""
+        # 数据库文件不存在时不打开，避免创建空库
+        if self._conn is None and (self.path == ":memory:" or not os.path.exists(self.path)):
+            return False
+        return self.coverage() is not None and self.fts_enabled
+
+    def ingest(self, records: Iterable[Dict[str, Any]], batch_size: int = 5000) -> Dict[str, int]:
+        """
+        导入快照记录
+
+        Args:
+            records: 快照中的原始记录
+            batch_size: 每个事务写入的记录数
+
+        Returns:
+            dict: 读取、写入（新增或更新）、跳过的记录数
+        """
+        stats = {'read': 0, 'ingested': 0, 'skipped': 0}
+        batch = []
+        batches = 0
+        filtered = 0
+        for record in records:
+            stats['read'] += 1
+            paper = parse_snapshot_record(record)
+            if paper is None:
+                stats['skipped'] += 1
+                continue
+            if not category_matches((record.get('categories') or "").split(), self.categories):
+                stats['skipped'] += 1
+                filtered += 1
+                continue
+            batch.append(paper)
+            if len(batch) >= batch_size:
+                stats['ingested'] += self._write_batch(batch)
+                batch = []
+                batches += 1
+                if batches % 20 == 0:
+                    print(f"📥 已读取 {stats['read']} 条记录，写入 {stats['ingested']} 篇论文")
+        if batch:
+            stats['ingested'] += self._write_batch(batch)
+        if filtered:
+            # 镜像只覆盖这些分类，其他分类的论文在快照截止日期之前检索不到
+            print(f"ℹ️ 按分类筛选（{','.join(self.categories)}）跳过 {filtered} 条记录，"
+                  f"镜像只包含这些分类的论文（见ARXIV_MIRROR_CATEGORIES）")
+        return stats
+
+    def _write_batch(self, papers: List[Dict[str, Any]]) -> int:
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                cursor = conn.executemany(
+                    "INSERT INTO papers (arxiv_id, title, abstract, authors, categories, submitted, updated, doi) "
+                    "VALUES (:arxiv_id, :title, :abstract, :authors, :categories, :submitted, :updated, :doi) "
+                    "ON CONFLICT(arxiv_id) DO UPDATE SET title = excluded.title, abstract = excluded.abstract, "
+                    "authors = excluded.authors, categories = excluded.categories, submitted = excluded.submitted, "
+                    "updated = excluded.updated, doi = excluded.doi "
+                    "WHERE updated IS NOT excluded.updated OR title IS NOT excluded.title",
+                    papers
+                )
+                return max(cursor.rowcount, 0)
+
+    def ingest_snapshot(self, path: str, batch_size: int = 5000) -> Dict[str, int]:
+        """导入快照文件（JSON Lines，支持.gz压缩），完成后合并全文索引"""
+        print(f"📥 开始导入arXiv元数据快照: {path}")
+        stats = self.ingest(_iter_snapshot(path), batch_size=batch_size)
+        self.optimize()
+        print(f"✅ arXiv快照导入完成: 读取{stats['read']}条，写入{stats['ingested']}篇，跳过{stats['skipped']}条")
+        return stats
+
+    def optimize(self):
+        """合并全文索引的分段，减小索引体积并加快检索"""
+        with self._lock:
+            conn = self._connect()
+            if self.fts_enabled:
+                with conn:
+                    conn.execute("INSERT INTO papers_fts(papers_fts) VALUES ('optimize')")
+
+    def coverage(self) -> Optional[Tuple[float, float]]:
+        """镜像覆盖的提交时间范围 (最早, 最晚) 时间戳，镜像为空时返回None"""
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT MIN(submitted), MAX(submitted) FROM papers").fetchone()
+        if row[0] is None:
+            return None
+        return row[0], row[1]
+
+    def search(self, query: str, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None,
+               categories: Optional[Iterable[str]] = None, limit: int = 50,
+               sort_by: str = "relevance", descending: bool = True) -> List[Dict[str, Any]]:
+        """
+        在镜像中检索论文
+
+        先要求查询词全部命中，没有结果时放宽为命中任意一个查询词。
+
+        Args:
+            query: arXiv风格的英文查询
+            start_date: 最早提交时间，None表示不限
+            end_date: 最晚提交时间，None表示不限
+            categories: 只检索这些分类，None表示全部
+            limit: 最多返回的论文数
+            sort_by: 排序方式，relevance（BM25）、submittedDate 或 lastUpdatedDate
+            descending: 是否降序
+
+        Returns:
+            list: 与 ArxivCollector.search 格式一致的论文列表
+        """
+        with self._lock:
+            self._connect()
+        if not self.fts_enabled:
+            return []
+
+        for match_all in (True, False):
+            match = build_match_query(query, match_all)
+            if match is None:
+                return []
+            rows = self._query(match, start_date, end_date, categories, limit, sort_by, descending)
+            if rows:
+                break
+        return [self._to_paper(row) for row in rows]
+
+    def _query(self, match: str, start_date: Optional[datetime], end_date: Optional[datetime],
+               categories: Optional[Iterable[str]], limit: int, sort_by: str, descending: bool) -> List[sqlite3.Row]:
+        rank_sql = f"bm25(papers_fts, {_BM25_WEIGHTS[0]}, {_BM25_WEIGHTS[1]})"
+        sql = (f"SELECT p.*, {rank_sql} AS rank FROM papers_fts JOIN papers p ON p.id = papers_fts.rowid "
+               "WHERE papers_fts MATCH ?")
+        params: List[Any] = [match]
+        if start_date is not None:
+            sql += " AND p.submitted >= ?"
+            params.append(start_date.timestamp())
+        if end_date is not None:
+            sql += " AND p.submitted <= ?"
+            params.append(end_date.timestamp())
+        if categories:
+            categories = list(categories)
+            sql += (f" AND p.id IN (SELECT paper_id FROM paper_categories WHERE category IN "
+                    f"({','.join('?' * len(categories))}))")
+            params.extend(categories)
+
+        order = _ORDER_BY.get(sort_by, "p.submitted")
+        # bm25()越小越相关
+        if order == "rank":
+            direction = "ASC" if descending else "DESC"
+        else:
+            direction = "DESC" if descending else "ASC"
+        sql += f" ORDER BY {order} {direction} LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            conn = self._connect()
+            return conn.execute(sql, params).fetchall()
+
+    @staticmethod
+    def _to_paper(row: sqlite3.Row) -> Dict[str, Any]:
+        arxiv_id = row['arxiv_id']
+        return {
+            'title': row['title'],
+            'authors': json.loads(row['authors'] or "[]"),
+            'summary': row['abstract'],
+            'published': datetime.fromtimestamp(row['submitted'], timezone.utc).strftime('%Y-%m-%d'),
+            'url': f"https://arxiv.org/abs/{arxiv_id}",
+            'pdf_url': f"https://arxiv.org/pdf/{arxiv_id}",
+            'categories': json.loads(row['categories'] or "[]"),
+            'source': 'arxiv'
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取镜像统计信息"""
+        coverage = self.coverage()
+        with self._lock:
+            conn = self._connect()
+            stats = {
+                "papers": conn.execute("SELECT COUNT(*) FROM papers").fetchone()[0],
+                "categories": conn.execute("SELECT COUNT(DISTINCT category) FROM paper_categories").fetchone()[0],
+                "fts_enabled": self.fts_enabled,
+            }
+        if coverage:
+            stats["coverage"] = [datetime.fromtimestamp(ts, timezone.utc).strftime('%Y-%m-%d') for ts in coverage]
+        return stats
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# 进程内共享的arXiv镜像实例（首次使用时才打开数据库）
+arxiv_mirror = ArxivMirror.from_config()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="arXiv元数据本地镜像")
+    parser.add_argument("--db", default=None, help="镜像数据库路径，默认使用config.ARXIV_MIRROR_PATH")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    ingest_parser = subparsers.add_parser("ingest", help="导入arXiv元数据快照（JSON Lines，支持.gz）")
+    ingest_parser.add_argument("snapshot", help="快照文件路径")
+    ingest_parser.add_argument("--categories", nargs="*", default=None,
+                               help="只导入这些分类（如 cs stat.ML），默认使用config.ARXIV_MIRROR_CATEGORIES")
+    ingest_parser.add_argument("--batch-size", type=int, default=5000, help="每个事务写入的记录数")
+    subparsers.add_parser("stats", help="查看镜像统计信息")
+    args = parser.parse_args()
+
+    mirror = ArxivMirror.from_config()
+    if args.db:
+        mirror.path = args.db
+    if args.command == "ingest":
+        if args.categories is not None:
+            mirror.categories = args.categories
+        mirror.ingest_snapshot(args.snapshot, batch_size=args.batch_size)
+    print(json.dumps(mirror.get_stats(), ensure_ascii=False, indent=2))
+    mirror.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,21 @@
 import requests
 import json
+import threading
 import time
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 import config
-from collectors.llm_processor import LLMProcessor
+from collectors.service_registry import get_llm_processor
 from urllib3.util.retry import Retry
 from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from collectors.rate_limiter import RateLimiter
+from collectors.concurrent_fetch import fetch_concurrently
+from collectors.usage_ledger import submit_in_context
+
+# Brave Search API的速率限制器，所有收集器实例共享
+_brave_rate_limiter = RateLimiter(getattr(config, 'BRAVE_SEARCH_QPS', 2))
 
 
 class BraveSearchCollector:
@@ -50,9 +59,15 @@ class BraveSearchCollector:
         self.session.mount("https://", adapter)
         self.session.mount("http://", adapter)
         
+        # 并发请求数不超过连接池大小；速率由所有实例共享的限制器控制。
+        # 综合研究的类别、查询两层并发会叠加，实际请求统一经过实例级信号量（见_get）
+        self.max_workers = getattr(config, 'SEARCH_FETCH_MAX_WORKERS', 4)
+        self._request_slots = threading.BoundedSemaphore(self.max_workers)
+        self.rate_limiter = _brave_rate_limiter
+        
         # 初始化LLM处理器用于内容处理
         try:
-            self.llm_processor = LLMProcessor()
+            self.llm_processor = get_llm_processor()
             self.has_llm = True
         except Exception as e:
             print(f"初始化LLM处理器失败: {str(e)}")
@@ -63,6 +78,12 @@ class BraveSearchCollector:
         else:
             pass  # print("✅ Brave搜索收集器已初始化")  # MCP需要静默
     
+    def _get(self, url: str, **kwargs) -> requests.Response:
+        """发起一次API请求：先占用实例的并发名额，再等待共享速率限制器（代替固定休眠）"""
+        with self._request_slots:
+            self.rate_limiter.acquire()
+            return self.session.get(url, **kwargs)
+
     def _get_headers(self):
         """
         根据官方文档构建请求头
@@ -120,8 +141,8 @@ class BraveSearchCollector:
         try:
             print(f"Brave搜索: {query}")
             
-            # 使用配置好的session进行请求
-            response = self.session.get(
+            # 使用配置好的session进行请求（受共享速率限制器和实例并发上限约束）
+            response = self._get(
                 self.base_url, 
                 params=params, 
                 headers=self._get_headers(),
@@ -154,9 +175,6 @@ class BraveSearchCollector:
                 
                 results.append(result)
             
-            # API速率限制
-            time.sleep(0.2)  # 增加间隔避免过快请求
-            
             print(f"✅ Brave搜索成功: {query}, 获得{len(results)}条结果")
             return results
             
@@ -184,6 +202,28 @@ class BraveSearchCollector:
             print(f"❌ Brave搜索未知错误: {query} - {str(e)}")
             return []
     
+    def search_pages(self, query: str, max_results: int = 40, page_size: int = 20, **search_kwargs) -> List[Dict]:
+        """
+        并发分页搜索：各页（offset为页序号，Brave最多支持10页）同时请求，按页序合并去重，
+        某页结果不足一页时视为最后一页，结果数达到max_results后停止发起新的请求
+        
+        Args:
+            query (str): 搜索查询
+            max_results (int): 最大结果数量
+            page_size (int): 每页结果数 (1-20)
+            **search_kwargs: 传给search的其他参数（freshness、country等）
+            
+        Returns:
+            List[Dict]: 搜索结果列表
+        """
+        page_size = max(1, min(page_size, 20))
+        num_pages = min(10, (max_results + page_size - 1) // page_size)
+        return fetch_concurrently(
+            (partial(self.search, query, count=page_size, offset=page, **search_kwargs) for page in range(num_pages)),
+            max_workers=self.max_workers, max_results=max_results,
+            is_last=lambda page_results: len(page_results) < page_size
+        )
+    
     def _fallback_search(self, query: str, count: int) -> List[Dict]:
         """
         参数错误时的降级搜索
@@ -195,7 +235,7 @@ class BraveSearchCollector:
                 'count': min(count, 10)
             }
             
-            response = self.session.get(
+            response = self._get(
                 self.base_url,
                 params=simple_params,
                 headers=self._get_headers(),
@@ -241,32 +281,15 @@ class BraveSearchCollector:
             f"{topic} industry news 2025"
         ]
         
-        all_results = []
-        seen_urls = set()
-        
-        for query in news_queries:
-            try:
-                results = self.search(
-                    query, 
-                    count=max_results//len(news_queries) + 2,
-                    freshness='pw' if days_back <= 7 else 'pm'
-                )
-                
-                for result in results:
-                    if result['url'] not in seen_urls:
-                        seen_urls.add(result['url'])
-                        all_results.append(result)
-                
-                if len(all_results) >= max_results:
-                    break
-                    
-                time.sleep(0.3)  # 增加间隔
-                
-            except Exception as e:
-                print(f"搜索新闻时出错: {query} - {str(e)}")
-                continue
-        
-        return all_results[:max_results]
+        # 各查询并发执行，按查询顺序合并去重，结果数足够后停止发起新的查询
+        return fetch_concurrently(
+            (
+                partial(self.search, query, count=max_results//len(news_queries) + 2,
+                        freshness='pw' if days_back <= 7 else 'pm')
+                for query in news_queries
+            ),
+            max_workers=self.max_workers, max_results=max_results
+        )
     
     def search_research_content(self, topic: str, days_back: int = 30, max_results: int = 10) -> List[Dict]:
         """
@@ -282,32 +305,14 @@ class BraveSearchCollector:
             f"{topic} white paper recent"
         ]
         
-        all_results = []
-        seen_urls = set()
-        
-        for query in research_queries:
-            try:
-                results = self.search(
-                    query, 
-                    count=max_results//len(research_queries) + 2,
-                    freshness='pm' if days_back <= 30 else None
-                )
-                
-                for result in results:
-                    if result['url'] not in seen_urls:
-                        seen_urls.add(result['url'])
-                        all_results.append(result)
-                
-                if len(all_results) >= max_results:
-                    break
-                    
-                time.sleep(0.3)
-                
-            except Exception as e:
-                print(f"搜索研究内容时出错: {query} - {str(e)}")
-                continue
-        
-        return all_results[:max_results]
+        return fetch_concurrently(
+            (
+                partial(self.search, query, count=max_results//len(research_queries) + 2,
+                        freshness='pm' if days_back <= 30 else None)
+                for query in research_queries
+            ),
+            max_workers=self.max_workers, max_results=max_results
+        )
     
     def search_industry_insights(self, topic: str, days_back: int = 90, max_results: int = 10) -> List[Dict]:
         """
@@ -323,31 +328,10 @@ class BraveSearchCollector:
             f"{topic} business intelligence report"
         ]
         
-        all_results = []
-        seen_urls = set()
-        
-        for query in insight_queries:
-            try:
-                results = self.search(
-                    query, 
-                    count=max_results//len(insight_queries) + 2
-                )
-                
-                for result in results:
-                    if result['url'] not in seen_urls:
-                        seen_urls.add(result['url'])
-                        all_results.append(result)
-                
-                if len(all_results) >= max_results:
-                    break
-                    
-                time.sleep(0.3)
-                
-            except Exception as e:
-                print(f"搜索行业洞察时出错: {query} - {str(e)}")
-                continue
-        
-        return all_results[:max_results]
+        return fetch_concurrently(
+            (partial(self.search, query, count=max_results//len(insight_queries) + 2) for query in insight_queries),
+            max_workers=self.max_workers, max_results=max_results
+        )
     
     def get_comprehensive_research(self, topic: str, days_back: int = 7) -> Dict:
         """
@@ -400,32 +384,20 @@ class BraveSearchCollector:
             ]
         }
         
-        # 为每个类别搜索
-        for category, queries in search_categories.items():
-            category_results = []
-            seen_urls = set()
-            
-            for query in queries:
-                try:
-                    results = self.search(
-                        query, 
-                        count=3,  # 每个查询获取少量结果避免重复
-                        freshness='pw' if days_back <= 7 else 'pm'
-                    )
-                    
-                    for result in results:
-                        if result['url'] not in seen_urls:
-                            seen_urls.add(result['url'])
-                            category_results.append(result)
-                    
-                    time.sleep(0.4)  # 适当延迟避免限流
-                    
-                except Exception as e:
-                    print(f"{category}搜索出错: {query} - {str(e)}")
-                    continue
-            
-            research_data[category] = category_results[:10]  # 每类最多10条
-            print(f"{category}: 获得{len(research_data[category])}条结果")
+        # 各类别并发搜索，类别内的查询也并发执行（所有请求共享同一个速率限制器）
+        freshness = 'pw' if days_back <= 7 else 'pm'
+        with ThreadPoolExecutor(max_workers=len(search_categories)) as executor:
+            futures = {
+                category: submit_in_context(
+                    executor, fetch_concurrently,
+                    [partial(self.search, query, count=3, freshness=freshness) for query in queries],  # 每个查询获取少量结果避免重复
+                    max_workers=self.max_workers, max_results=10  # 每类最多10条
+                )
+                for category, queries in search_categories.items()
+            }
+            for category, future in futures.items():
+                research_data[category] = future.result()
+                print(f"{category}: 获得{len(research_data[category])}条结果")
         
         # 计算总数
         research_data["total_count"] = sum(
@@ -481,23 +453,15 @@ class BraveSearchCollector:
         """
         站点特定搜索 - 优化版
         """
-        all_results = []
-        
-        for site in sites:
-            try:
-                site_query = f"site:{site} {topic} recent {days_back} days"
-                results = self.search(
-                    site_query, 
-                    count=5,
-                    freshness='pw' if days_back <= 7 else 'pm'
-                )
-                all_results.extend(results)
-                time.sleep(0.5)  # 增加间隔
-            except Exception as e:
-                print(f"站点搜索出错 {site}: {str(e)}")
-                continue
-        
-        return all_results
+        # 各站点并发搜索，按站点顺序合并
+        return fetch_concurrently(
+            (
+                partial(self.search, f"site:{site} {topic} recent {days_back} days", count=5,
+                        freshness='pw' if days_back <= 7 else 'pm')
+                for site in sites
+            ),
+            max_workers=self.max_workers, dedup_key=None
+        )
     
     def __del__(self):
         """
@@ -0,0 +1,88 @@
+"""
+并发分页获取
+
+搜索收集器原先逐页、逐个查询变体、逐个站点串行请求，并在每次请求之间固定休眠。
+fetch_concurrently 在有限的并发窗口内执行这些请求（速率由各API自己的RateLimiter控制），
+并严格按任务顺序合并、去重，因此结果与串行执行完全一致；
+按顺序合并的结果数达到 max_results 后立即停止提交新请求，并取消尚未开始的请求。
+"""
+
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from collectors.usage_ledger import submit_in_context
+
+
+def fetch_concurrently(tasks: Iterable[Callable[[], List[Dict[str, Any]]]], max_workers: int = 4,
+                       max_results: Optional[int] = None, dedup_key: Optional[str] = 'url',
+                       is_last: Optional[Callable[[List[Dict[str, Any]]], bool]] = None) -> List[Dict[str, Any]]:
+    """
+    并发执行一组返回结果列表的请求，按任务顺序合并
+
+    Args:
+        tasks: 请求函数序列（可以是惰性生成器，未提交的任务不会被创建）
+        max_workers: 同时在途的请求数
+        max_results: 合并后的结果数达到该值即停止，None表示不限制
+        dedup_key: 按该字段去重，None表示不去重
+        is_last: 判断某个任务的结果是否为最后一页（如返回条数不足一页），是则不再合并之后的任务
+
+    Returns:
+        合并后的结果列表（不超过max_results条）
+    """
+    task_iter = iter(tasks)
+    merged: List[Dict[str, Any]] = []
+    seen = set()
+    completed: Dict[int, List[Dict[str, Any]]] = {}
+    next_index = 0      # 下一个要提交的任务序号
+    merge_index = 0     # 下一个要合并的任务序号
+    finished = False
+    pending = {}
+
+    def merge(results: List[Dict[str, Any]]):
+        for item in results:
+            key = item.get(dedup_key) if dedup_key else None
+            if key:
+                if key in seen:
+                    continue
+                seen.add(key)
+            merged.append(item)
+
+    max_workers = max(1, max_workers)
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        while True:
+            # 填满并发窗口
+            while not finished and len(pending) < max_workers:
+                task = next(task_iter, None)
+                if task is None:
+                    break
+                pending[submit_in_context(executor, task)] = next_index
+                next_index += 1
+
+            if not pending:
+                break
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = pending.pop(future)
+                try:
+                    completed[index] = future.result() or []
+                except Exception as e:
+                    print(f"⚠️ 并发请求出错: {str(e)}")
+                    completed[index] = []
+
+            # 按任务顺序合并已经连续完成的部分
+            while not finished and merge_index in completed:
+                results = completed.pop(merge_index)
+                merge(results)
+                merge_index += 1
+                if (max_results is not None and len(merged) >= max_results) or (is_last and is_last(results)):
+                    finished = True
+
+            if finished:
+                break
+    finally:
+        # 取消尚未开始的请求；已在途的请求在后台结束，结果直接丢弃
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return merged[:max_results] if max_results is not None else merged
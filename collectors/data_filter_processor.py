@@ -5,6 +5,7 @@
 用于对收集的资料进行质量评估和筛选
 """
 
+import hashlib
 import json
 import re
 from datetime import datetime, timedelta
@@ -14,6 +15,8 @@ from urllib.parse import urlparse
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import threading
 
+from collectors.evidence_ranker import EvidenceRanker
+
 
 @dataclass
 class DataSource:
@@ -89,6 +92,8 @@ class DataFilterProcessor:
     def __init__(self, llm_processor=None):
         self.llm_processor = llm_processor
         self.lock = threading.Lock()
+        # 回退相关性得分缓存：(数据源指纹, 主题, 章节) -> 得分
+        self._fallback_relevance: Dict[Tuple[str, str, str], float] = {}
         
         # 权威域名列表
         self.authoritative_domains = {
@@ -124,6 +129,7 @@ class DataFilterProcessor:
             筛选后的数据列表
         """
         print(f"🚀 开始并行筛选数据，共 {len(data_sources)} 个数据源")
+        self._prepare_relevance_fallback(data_sources, topic, section_title)
         
         # 按数据源类型分组
         grouped_sources = self._group_sources_by_type(data_sources)
@@ -276,6 +282,7 @@ class DataFilterProcessor:
         串行筛选和评分数据源（原始实现）
         """
         print(f"🔍 开始串行筛选数据，共 {len(data_sources)} 个数据源")
+        self._prepare_relevance_fallback(data_sources, topic, section_title)
         
         filtered_data = []
         
@@ -513,25 +520,39 @@ class DataFilterProcessor:
                 pass
         return 0.7
     
+    @staticmethod
+    def _source_key(source: DataSource) -> str:
+        """数据源的缓存键：由URL、标题和正文计算，对象被回收后id可能复用，不能作为键"""
+        text = f"{source.url}\n{source.title}\n{source.content}"
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
+    
     def _evaluate_relevance_fallback(self, source: DataSource, topic: str, section_title: str) -> float:
-        """回退的相关性评估"""
-        content_lower = source.content.lower()
-        title_lower = source.title.lower()
-        topic_lower = topic.lower()
-        section_lower = section_title.lower()
-        
-        # 关键词匹配评分
-        topic_keywords = topic_lower.split()
-        section_keywords = section_lower.split()
-        
-        matches = 0
-        total_keywords = len(topic_keywords) + len(section_keywords)
-        
-        for keyword in topic_keywords + section_keywords:
-            if keyword in content_lower or keyword in title_lower:
-                matches += 1
-        
-        return min(matches / total_keywords * 2, 1.0)
+        """回退的相关性评估（中文按相邻两字分词，按idf加权的查询词覆盖率）"""
+        key = (self._source_key(source), topic, section_title)
+        with self.lock:
+            cached = self._fallback_relevance.get(key)
+        if cached is not None:
+            return cached
+        return self._batch_relevance_fallback([source], topic, section_title)[0]
+    
+    def _batch_relevance_fallback(self, sources: List[DataSource], topic: str, section_title: str) -> List[float]:
+        """对一批数据源建立一次证据排序矩阵，批量计算回退相关性并缓存"""
+        if not sources:
+            return []
+        ranker = EvidenceRanker([f"{source.title} {source.content}" for source in sources])
+        coverage = ranker.coverage(f"{topic} {section_title}")
+        scores = [min(float(value) * 2, 1.0) for value in coverage]
+        with self.lock:
+            for source, score in zip(sources, scores):
+                self._fallback_relevance[(self._source_key(source), topic, section_title)] = score
+        return scores
+    
+    def _prepare_relevance_fallback(self, data_sources: List[DataSource], topic: str, section_title: str):
+        """未配置LLM时，筛选前先为全部数据源批量计算回退相关性"""
+        with self.lock:
+            self._fallback_relevance.clear()
+        if not self.llm_processor:
+            self._batch_relevance_fallback(data_sources, topic, section_title)
     
     def _evaluate_practicality_fallback(self, source: DataSource) -> float:
         """回退的实用性评估"""
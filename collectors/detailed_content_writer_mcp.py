@@ -1,13 +1,17 @@
 import asyncio
 import json
+from functools import partial
 from typing import List, Dict, Any, Optional, Union
 from dataclasses import dataclass
-from collectors.llm_processor import LLMProcessor
+from collectors.llm_processor import is_rate_limit_error
+from collectors.service_registry import get_llm_processor
+import config
 import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'search_mcp', 'src'))
 from collectors.search_mcp_old import Document
 from collectors.outline_writer_mcp import OutlineNode
+from collectors.section_scheduler import SectionScheduler
 
 
 @dataclass
@@ -43,7 +47,7 @@ class DetailedContentWriterMcp:
     def __init__(self, llm_processor=None):
         """初始化DetailedContentWriterMcp"""
         try:
-            self.llm_processor = llm_processor or LLMProcessor()
+            self.llm_processor = llm_processor or get_llm_processor()
             self.has_llm = True
             print("✅ DetailedContentWriterMcp初始化完成")
         except Exception as e:
@@ -363,9 +367,51 @@ class DetailedContentWriterMcp:
         print("✅ 引言生成完毕。")
         return f"# {topic}：深度分析报告\n\n## 1. 引言\n\n{introduction}\n\n"
 
-    async def _generate_body(self, topic: str, outline: Dict) -> str:
+    async def _generate_key_point(self, topic: str, chapter_title: str, point: str,
+                                  semaphore: asyncio.Semaphore) -> str:
+        """
+        生成单个要点的内容。
+        
+        重试由call_llm_api负责，仍然失败时返回占位说明，不会中断整份报告。
+        """
+        prompt = f"""
+        你是一位顶级的行业分析师，你需要为一个关于“{topic}”的深度报告撰写其中一个要点。
+
+        章节标题: "{chapter_title}"
+        当前要点: "{point}"
+
+        **写作指令**:
+        1.  **结构化阐述**: 你的分析必须包含以下三个明确的部分，并使用Markdown的H4标题（####）进行标记：
+            -   `#### 背景与现状`: 解释该要点提出的背景、当前的发展状况以及其重要性。
+            -   `#### 关键技术与应用案例`: 深入剖析与该要点相关的核心技术、解决方案，并提供1-2个具体的真实世界应用案例进行佐证。
+            -   `#### 挑战与未来展望`: 探讨当前面临的挑战、潜在的风险，并对未来的发展趋势和前景进行预测。
+        2.  **深度与篇幅要求**:
+            -   **硬性要求**: 整个要点的总字符数必须在 **3500到4000字符** 之间。这是一个严格的指标，必须达到。
+            -   **内容详尽**: 每个结构化部分（背景、技术、挑战）都必须内容充实，论述充分，避免泛泛而谈。
+        3.  **专业性与数据支撑**:
+            -   使用专业术语和分析框架。
+            -   如果可能，引用假设性数据或行业趋势来增强说服力。
+        4.  **内容风格要求 (至关重要)**:
+            -   **绝对禁止元评论**: 严禁在文本中包含任何关于内容本身的评论、评估或注释。这包括但不限于：“自我评估”、“字符数统计”、“专业度验证”、“结构完整性”、“以下是对...的分析”、“本文严格遵循了...指令”或任何类似的AI自我反思性语句。尤其禁止在末尾添加关于字符数是否达标的注释，例如 `（注：实际字符数约XXXX，符合要求）` 这种格式是完全不允许的。
+            -   **直接呈现，无需开场白**: 你是一个行业专家，直接撰写正文即可。不要有任何介绍性的段落来解释你将要写什么。
+            -   **专业、自然的语言**: 语言风格必须像一个资深的人类专家，自然、流畅、专业，避免使用模板化或机械的句子。
+
+        请严格按照以上指令，生成关于要点“{point}”的详细、深入、结构化的分析内容。
+        """
+
+        try:
+            async with semaphore:
+                print(f"    - 正在阐述要点: {point}")
+                return await asyncio.to_thread(self.llm_processor.call_llm_api, prompt, max_tokens=5000, temperature=0.7)
+        except Exception as e:
+            print(f"    ⚠️ 要点'{point}'生成失败: {str(e)}")
+            return "*该要点内容暂时无法生成，请稍后重试。*"
+
+    async def _generate_body(self, topic: str, outline: Dict, max_concurrency: Optional[int] = None) -> str:
         """
         生成报告主体。
+        
+        所有章节的所有要点在信号量限制下并发生成，按大纲顺序组装。
         """
         print("正在生成报告主体...")
         
@@ -374,40 +420,21 @@ class DetailedContentWriterMcp:
             print(f"错误：outline格式不正确，类型: {type(outline)}")
             return f"## 报告主体\n\n由于大纲格式错误，无法生成详细内容。\n\n错误信息：outline类型为{type(outline)}，期望为dict类型。"
         
+        semaphore = asyncio.Semaphore(max(1, int(max_concurrency or getattr(config, 'KEY_POINT_MAX_CONCURRENCY', 6))))
+        
+        point_tasks = []
+        for chapter in outline['body']:
+            print(f"  - 正在生成章节: {chapter['title']}")
+            point_tasks.append(asyncio.gather(*[
+                self._generate_key_point(topic, chapter['title'], point, semaphore)
+                for point in chapter['key_points']
+            ]))
+        chapter_points = await asyncio.gather(*point_tasks)
+        
         body_content = []
-        for i, chapter in enumerate(outline['body']):
-            chapter_title = chapter['title']
-            print(f"  - 正在生成章节: {chapter_title}")
-            chapter_content = [f"## {i+2}. {chapter_title}\n"]
-            for point in chapter['key_points']:
-                print(f"    - 正在阐述要点: {point}")
-                
-                prompt = f"""
-                你是一位顶级的行业分析师，你需要为一个关于“{topic}”的深度报告撰写其中一个要点。
-
-                章节标题: "{chapter_title}"
-                当前要点: "{point}"
-
-                **写作指令**:
-                1.  **结构化阐述**: 你的分析必须包含以下三个明确的部分，并使用Markdown的H4标题（####）进行标记：
-                    -   `#### 背景与现状`: 解释该要点提出的背景、当前的发展状况以及其重要性。
-                    -   `#### 关键技术与应用案例`: 深入剖析与该要点相关的核心技术、解决方案，并提供1-2个具体的真实世界应用案例进行佐证。
-                    -   `#### 挑战与未来展望`: 探讨当前面临的挑战、潜在的风险，并对未来的发展趋势和前景进行预测。
-                2.  **深度与篇幅要求**:
-                    -   **硬性要求**: 整个要点的总字符数必须在 **3500到4000字符** 之间。这是一个严格的指标，必须达到。
-                    -   **内容详尽**: 每个结构化部分（背景、技术、挑战）都必须内容充实，论述充分，避免泛泛而谈。
-                3.  **专业性与数据支撑**:
-                    -   使用专业术语和分析框架。
-                    -   如果可能，引用假设性数据或行业趋势来增强说服力。
-                4.  **内容风格要求 (至关重要)**:
-                    -   **绝对禁止元评论**: 严禁在文本中包含任何关于内容本身的评论、评估或注释。这包括但不限于：“自我评估”、“字符数统计”、“专业度验证”、“结构完整性”、“以下是对...的分析”、“本文严格遵循了...指令”或任何类似的AI自我反思性语句。尤其禁止在末尾添加关于字符数是否达标的注释，例如 `（注：实际字符数约XXXX，符合要求）` 这种格式是完全不允许的。
-                    -   **直接呈现，无需开场白**: 你是一个行业专家，直接撰写正文即可。不要有任何介绍性的段落来解释你将要写什么。
-                    -   **专业、自然的语言**: 语言风格必须像一个资深的人类专家，自然、流畅、专业，避免使用模板化或机械的句子。
-
-                请严格按照以上指令，生成关于要点“{point}”的详细、深入、结构化的分析内容。
-                """
-                
-                point_content = await asyncio.get_event_loop().run_in_executor(None, lambda: self.llm_processor.call_llm_api(prompt, max_tokens=5000, temperature=0.7))
+        for i, (chapter, point_contents) in enumerate(zip(outline['body'], chapter_points)):
+            chapter_content = [f"## {i+2}. {chapter['title']}\n"]
+            for point, point_content in zip(chapter['key_points'], point_contents):
                 chapter_content.append(f"### {point}\n\n{point_content}\n")
             
             body_content.append("\n".join(chapter_content))
@@ -461,11 +488,11 @@ class DetailedContentWriterMcp:
             print(f"大纲生成错误: {e}")
             return f"# {topic}\n\n报告生成失败：大纲生成异常 - {str(e)}"
         
-        # 2. 生成引言
-        introduction = await self._generate_introduction(topic, outline)
-        
-        # 3. 生成主体
-        body = await self._generate_body(topic, outline)
+        # 2-3. 引言与主体互不依赖，并发生成
+        introduction, body = await asyncio.gather(
+            self._generate_introduction(topic, outline),
+            self._generate_body(topic, outline)
+        )
         
         # 组装初步报告用于生成结论
         temp_report = introduction + body
@@ -567,6 +594,9 @@ class DetailedContentWriterMcp:
             return processed_content
             
         except Exception as e:
+            # 限流交给章节调度器退避重试，不用备用内容掩盖
+            if is_rate_limit_error(e):
+                raise
             print(f"❌ 章节'{section_title}'撰写失败: {str(e)}")
             return self._fallback_content_generation(section_title, content_data)
     
@@ -1219,14 +1249,16 @@ class DetailedContentWriterMcp:
     def write_multiple_sections(self,
                                sections: List[Dict[str, any]],
                                overall_context: str,
-                               config: ContentWritingConfig = None) -> Dict[str, str]:
+                               config: ContentWritingConfig = None,
+                               max_concurrency: int = None) -> Dict[str, str]:
         """
-        批量撰写多个章节
+        批量撰写多个章节（并发执行，结果保持原章节顺序）
         
         Args:
             sections: 章节信息列表，每个包含 title, content_data 等
             overall_context: 整体上下文
             config: 写作配置
+            max_concurrency: 最大并发章节数，默认使用SectionScheduler的配置
             
         Returns:
             Dict[str, str]: 章节标题到内容的映射
@@ -1234,11 +1266,9 @@ class DetailedContentWriterMcp:
         if config is None:
             config = ContentWritingConfig()
         
-        results = {}
-        
-        for i, section_info in enumerate(sections):
+        def write_one(i: int, section_info: Dict[str, any]) -> str:
+            section_title = section_info.get("title", f"章节{i+1}")
             try:
-                section_title = section_info.get("title", f"章节{i+1}")
                 content_data = section_info.get("content_data", [])
                 
                 # 为该章节创建特定配置
@@ -1254,12 +1284,23 @@ class DetailedContentWriterMcp:
                     config=section_config
                 )
                 
-                results[section_title] = content
                 print(f"  ✅ [{i+1}/{len(sections)}] '{section_title}' 完成")
+                return content
                 
             except Exception as e:
+                if is_rate_limit_error(e):
+                    raise
                 print(f"  ❌ [{i+1}/{len(sections)}] '{section_title}' 失败: {str(e)}")
-                results[section_title] = f"章节内容生成失败: {str(e)}"
+                return f"章节内容生成失败: {str(e)}"
+        
+        scheduler = SectionScheduler(max_concurrency=max_concurrency)
+        contents = scheduler.run([
+            partial(write_one, i, section_info) for i, section_info in enumerate(sections)
+        ])
+        
+        results = {}
+        for i, (section_info, content) in enumerate(zip(sections, contents)):
+            results[section_info.get("title", f"章节{i+1}")] = content
         
         return results
     
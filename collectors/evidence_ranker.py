@@ -0,0 +1,159 @@
+"""
+证据排序器
+
+对一批搜索结果建立一次BM25稀疏矩阵（中文按相邻两字分词），
+之后可以把多个查询（如报告的全部章节标题）一次性批量打分并取各自的top-k，
+代替逐章节、逐条结果的子串匹配。
+
+稀疏矩阵以COO数组（行、列、权重）保存；打分时只取出查询涉及的列拼成小的稠密矩阵，
+与查询词频矩阵做一次矩阵乘法得到全部 查询 × 文档 的得分。
+"""
+
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# 与近似重复检测共用同一个分词器，排序和去重对同一段文本切出的词始终一致
+from collectors.tokenizer import tokenize
+
+
+class EvidenceRanker:
+    """基于BM25的批量证据排序器"""
+
+    def __init__(self, documents: Sequence[str], k1: float = 1.5, b: float = 0.75):
+        """
+        对文档集合建立BM25矩阵
+
+        Args:
+            documents: 文档文本列表
+            k1: 词频饱和参数
+            b: 文档长度归一化参数
+        """
+        self.size = len(documents)
+        self.vocabulary: Dict[str, int] = {}
+
+        rows, cols, tfs = [], [], []
+        lengths = np.zeros(self.size, dtype=np.float64)
+        for row, text in enumerate(documents):
+            counts = Counter(tokenize(text))
+            lengths[row] = sum(counts.values())
+            for term, tf in counts.items():
+                rows.append(row)
+                cols.append(self.vocabulary.setdefault(term, len(self.vocabulary)))
+                tfs.append(tf)
+
+        self._rows = np.array(rows, dtype=np.int64)
+        self._cols = np.array(cols, dtype=np.int64)
+        tf = np.array(tfs, dtype=np.float64)
+
+        # IDF（BM25+风格，始终为正）
+        df = np.bincount(self._cols, minlength=len(self.vocabulary)).astype(np.float64)
+        self.idf = np.log(1.0 + (self.size - df + 0.5) / (df + 0.5))
+
+        # 文档侧权重：idf * tf(k1+1) / (tf + k1(1-b+b*dl/avgdl))
+        avg_length = lengths.mean() if self.size and lengths.mean() > 0 else 1.0
+        norm = k1 * (1.0 - b + b * lengths[self._rows] / avg_length) if self.size else np.zeros(0)
+        self._weights = self.idf[self._cols] * tf * (k1 + 1.0) / (tf + norm) if len(tf) else tf
+
+    @classmethod
+    def from_results(cls, results: Sequence[Dict[str, Any]], content_chars: int = 3000,
+                     **kwargs) -> 'EvidenceRanker':
+        """由搜索结果字典建立排序器，标题计两次以提高其权重"""
+        documents = []
+        for item in results:
+            title = item.get('title', '') or ''
+            content = (item.get('content', '') or '')[:content_chars]
+            documents.append(f"{title} {title} {content}")
+        return cls(documents, **kwargs)
+
+    def score(self, queries: Sequence[str]) -> np.ndarray:
+        """
+        批量打分
+
+        Returns:
+            形状为 (查询数, 文档数) 的BM25得分矩阵
+        """
+        query_counts = [Counter(t for t in tokenize(q) if t in self.vocabulary) for q in queries]
+        columns = sorted({self.vocabulary[t] for counts in query_counts for t in counts})
+        if not columns or not self.size:
+            return np.zeros((len(queries), self.size))
+
+        # 只取查询涉及的列，拼成 文档数 × 查询词数 的稠密矩阵
+        column_index = {col: i for i, col in enumerate(columns)}
+        mask = np.isin(self._cols, columns)
+        doc_matrix = np.zeros((self.size, len(columns)))
+        sub_cols = np.fromiter((column_index[c] for c in self._cols[mask]), dtype=np.int64,
+                               count=int(mask.sum()))
+        np.add.at(doc_matrix, (self._rows[mask], sub_cols), self._weights[mask])
+
+        query_matrix = np.zeros((len(columns), len(queries)))
+        for q, counts in enumerate(query_counts):
+            for term, count in counts.items():
+                query_matrix[column_index[self.vocabulary[term]], q] = count
+
+        return (doc_matrix @ query_matrix).T
+
+    def top_k(self, queries: Sequence[str], k: int = 8,
+              min_results: int = 0) -> List[List[Tuple[int, float]]]:
+        """
+        为每个查询返回得分最高的k个文档 (序号, 得分)，只包含得分大于0的文档
+
+        Args:
+            queries: 查询列表
+            k: 每个查询最多返回的文档数
+            min_results: 正分文档不足时，按原始顺序补足到该数量（得分为0）
+        """
+        scores = self.score(queries)
+        ranked = []
+        for row in scores:
+            # 得分相同时保持原始顺序
+            order = np.argsort(-row, kind='stable')[:k]
+            hits = [(int(i), float(row[i])) for i in order if row[i] > 0]
+            if len(hits) < min_results:
+                chosen = {i for i, _ in hits}
+                for i in range(self.size):
+                    if len(hits) >= min(min_results, k):
+                        break
+                    if i not in chosen:
+                        hits.append((i, 0.0))
+            ranked.append(hits)
+        return ranked
+
+    def coverage(self, query: str) -> np.ndarray:
+        """
+        查询词覆盖率：每个文档包含的查询词（去重、按idf加权）占全部查询词的比例
+
+        Returns:
+            长度为文档数的数组，取值0-1
+        """
+        terms = set(tokenize(query))
+        if not terms or not self.size:
+            return np.zeros(self.size)
+
+        # 未出现在任何文档中的词按df=0计算idf，计入分母
+        missing_idf = np.log(1.0 + (self.size + 0.5) / 0.5)
+        known = np.array(sorted(self.vocabulary[t] for t in terms if t in self.vocabulary), dtype=np.int64)
+        total = self.idf[known].sum() + missing_idf * (len(terms) - len(known))
+
+        mask = np.isin(self._cols, known)
+        covered = np.bincount(self._rows[mask], weights=self.idf[self._cols[mask]], minlength=self.size)
+        return covered / total
+
+    def normalized_scores(self, query: str) -> np.ndarray:
+        """单个查询的得分，按最高分归一化到0-1"""
+        row = self.score([query])[0]
+        top = row.max() if len(row) else 0.0
+        return row / top if top > 0 else row
+
+
+def rank_evidence(queries: Sequence[str], results: Sequence[Dict[str, Any]], k: int = 8,
+                  min_results: int = 3, ranker: Optional[EvidenceRanker] = None) -> List[List[Dict[str, Any]]]:
+    """为每个查询从搜索结果中挑选最相关的k条，返回与queries一一对应的结果列表"""
+    if not results:
+        return [[] for _ in queries]
+    ranker = ranker or EvidenceRanker.from_results(results)
+    return [
+        [results[i] for i, _ in hits]
+        for hits in ranker.top_k(queries, k=k, min_results=min_results)
+    ]
@@ -0,0 +1,394 @@
+"""
+RSS源本地存储
+
+NewsCollector 原先每次查询都串行下载并解析全部RSS源，再对条目做子串匹配，
+同一份报告的多个子主题会把同样的源重复下载十几遍。FeedStore 把抓取和查询分开：
+1. refresh 并发轮询RSS源，使用 ETag/Last-Modified 条件请求，未更新的源只返回304；
+   在刷新间隔内轮询过的源直接跳过
+2. 条目写入SQLite（发布时间建索引，可用时附带FTS5 trigram全文索引），过期条目定期清理
+3. search 在本地按发布时间和查询词检索，评分规则与原来的逐条匹配一致
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+import feedparser
+import requests
+from bs4 import BeautifulSoup
+from dateutil import parser
+
+import config
+from collectors.usage_ledger import submit_in_context
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS feeds (
+    url TEXT PRIMARY KEY,
+    title TEXT,
+    etag TEXT,
+    modified TEXT,
+    last_polled REAL,
+    last_status INTEGER
+);
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    feed_url TEXT NOT NULL,
+    entry_key TEXT NOT NULL,
+    title TEXT,
+    summary TEXT,
+    content TEXT,
+    author TEXT,
+    url TEXT,
+    published REAL NOT NULL,
+    search_text TEXT,
+    UNIQUE (feed_url, entry_key)
+);
+CREATE INDEX IF NOT EXISTS idx_entries_published ON entries (published);
+CREATE INDEX IF NOT EXISTS idx_entries_feed_published ON entries (feed_url, published);
+"""
+
+# trigram分词支持中英文任意子串匹配（SQLite 3.34+），不可用时退化为按发布时间索引扫描
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(
+    search_text, content='entries', content_rowid='id', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS entries_ai AFTER INSERT ON entries BEGIN
+    INSERT INTO entries_fts(rowid, search_text) VALUES (new.id, new.search_text);
+END;
+CREATE TRIGGER IF NOT EXISTS entries_ad AFTER DELETE ON entries BEGIN
+    INSERT INTO entries_fts(entries_fts, rowid, search_text) VALUES ('delete', old.id, old.search_text);
+END;
+CREATE TRIGGER IF NOT EXISTS entries_au AFTER UPDATE ON entries BEGIN
+    INSERT INTO entries_fts(entries_fts, rowid, search_text) VALUES ('delete', old.id, old.search_text);
+    INSERT INTO entries_fts(rowid, search_text) VALUES (new.id, new.search_text);
+END;
+"""
+
+# trigram索引只能匹配不少于3个字符的查询词
+_FTS_MIN_TERM_LENGTH = 3
+
+
+def time_score(age_hours: float) -> float:
+    """计算时效性分数，越新的文章分数越高"""
+    if age_hours <= 6:
+        return 1.0  # 6小时内的文章获得满分
+    elif age_hours <= 12:
+        return 0.9
+    elif age_hours <= 24:
+        return 0.8
+    elif age_hours <= 48:
+        return 0.7
+    elif age_hours <= 72:
+        return 0.6
+    return 0.5
+
+
+def _parse_published(entry) -> Optional[float]:
+    """解析条目发布时间为时间戳；不带时区的时间按本地时间处理"""
+    published = entry.get('published')
+    if not published:
+        return None
+    try:
+        return parser.parse(published).timestamp()
+    except (ValueError, OverflowError, TypeError):
+        return None
+
+
+def _clean_html(html: str) -> str:
+    try:
+        return BeautifulSoup(html, 'html.parser').get_text()
+    except Exception:
+        return html
+
+
+def parse_entries(parsed_feed) -> List[Dict[str, Any]]:
+    """把feedparser解析结果转换为待入库的条目（没有发布时间的条目跳过）"""
+    entries = []
+    for entry in parsed_feed.entries:
+        published = _parse_published(entry)
+        if published is None:
+            continue
+        title = entry.get('title', "")
+        summary = entry.get('summary', "")
+        # 提取更完整的正文内容
+        content = entry.get('content')
+        clean_content = _clean_html(content[0].value) if content else summary
+        entries.append({
+            'entry_key': entry.get('id') or entry.get('link') or title,
+            'title': title,
+            'summary': summary,
+            'content': clean_content,
+            'author': entry.get('author'),
+            'url': entry.get('link', ""),
+            'published': published,
+            'search_text': (title + " " + summary).lower(),
+        })
+    return entries
+
+
+class FeedStore:
+    """线程安全的RSS条目存储（单个SQLite连接，读写由锁串行化）"""
+
+    def __init__(self, path: str = ":memory:", refresh_interval: float = 900,
+                 retention_days: float = 30, max_workers: int = 8, timeout: float = 15):
+        """
+        初始化存储
+
+        Args:
+            path: SQLite数据库文件路径，":memory:"表示只保存在内存中
+            refresh_interval: 刷新间隔（秒），间隔内轮询过的源不再请求
+            retention_days: 条目保留天数，更早发布的条目在刷新时清理
+            max_workers: 同时轮询的RSS源数
+            timeout: 单个RSS源的请求超时（秒）
+        """
+        self.path = path
+        self.refresh_interval = refresh_interval
+        self.retention_days = retention_days
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update({'User-Agent': 'Mozilla/5.0 (compatible; ReportFeedReader/1.0)'})
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.fts_enabled = False
+
+    @classmethod
+    def from_config(cls) -> 'FeedStore':
+        """根据config创建存储"""
+        return cls(
+            path=getattr(config, 'RSS_STORE_PATH', None) or ":memory:",
+            refresh_interval=getattr(config, 'RSS_REFRESH_INTERVAL', 900),
+            retention_days=getattr(config, 'RSS_RETENTION_DAYS', 30),
+            max_workers=getattr(config, 'RSS_FETCH_MAX_WORKERS', 8),
+            timeout=getattr(config, 'RSS_FETCH_TIMEOUT', 15)
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        """首次使用时打开数据库并建表（调用方需持有锁）"""
+        if self._conn is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.executescript(_SCHEMA)
+            try:
+                conn.executescript(_FTS_SCHEMA)
+                self.fts_enabled = True
+            except sqlite3.OperationalError as e:
+                print(f"⚠️ SQLite不支持FTS5 trigram，RSS检索改用发布时间索引扫描: {e}")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _fetch_feed(self, url: str, etag: Optional[str], modified: Optional[str]) -> Dict[str, Any]:
+        """条件请求单个RSS源，未更新时返回status 304且不含条目"""
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if modified:
+            headers['If-Modified-Since'] = modified
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        if response.status_code == 304:
+            return {'status': 304}
+        response.raise_for_status()
+        parsed = feedparser.parse(response.content)
+        return {
+            'status': response.status_code,
+            'title': parsed.feed.get('title', url),
+            'etag': response.headers.get('ETag'),
+            'modified': response.headers.get('Last-Modified'),
+            'entries': parse_entries(parsed),
+        }
+
+    def ingest(self, feed_url: str, entries: List[Dict[str, Any]], title: Optional[str] = None,
+               etag: Optional[str] = None, modified: Optional[str] = None, status: int = 200) -> int:
+        """写入一个RSS源的条目并记录轮询状态，返回新增或更新的条目数"""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "INSERT INTO feeds (url, title, etag, modified, last_polled, last_status) VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(url) DO UPDATE SET title = COALESCE(excluded.title, title), etag = excluded.etag, "
+                    "modified = excluded.modified, last_polled = excluded.last_polled, last_status = excluded.last_status",
+                    (feed_url, title, etag, modified, time.time(), status)
+                )
+                cursor = conn.executemany(
+                    "INSERT INTO entries (feed_url, entry_key, title, summary, content, author, url, published, search_text) "
+                    "VALUES (:feed_url, :entry_key, :title, :summary, :content, :author, :url, :published, :search_text) "
+                    "ON CONFLICT(feed_url, entry_key) DO UPDATE SET title = excluded.title, summary = excluded.summary, "
+                    "content = excluded.content, author = excluded.author, url = excluded.url, "
+                    "published = excluded.published, search_text = excluded.search_text "
+                    "WHERE search_text IS NOT excluded.search_text OR content IS NOT excluded.content",
+                    [dict(entry, feed_url=feed_url) for entry in entries]
+                )
+                return max(cursor.rowcount, 0)
+
+    def _mark_polled(self, feed_url: str, status: int):
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "INSERT INTO feeds (url, last_polled, last_status) VALUES (?, ?, ?) "
+                    "ON CONFLICT(url) DO UPDATE SET last_polled = excluded.last_polled, last_status = excluded.last_status",
+                    (feed_url, time.time(), status)
+                )
+
+    def refresh(self, feeds: Iterable[str], force: bool = False) -> Dict[str, int]:
+        """
+        并发轮询RSS源并把新条目写入存储
+
+        Args:
+            feeds: RSS源URL列表
+            force: 为True时忽略刷新间隔，所有源都发出（条件）请求
+
+        Returns:
+            dict: 各类结果的源数量及新增条目数
+        """
+        feeds = list(dict.fromkeys(feeds))
+        stats = {'fetched': 0, 'not_modified': 0, 'skipped': 0, 'failed': 0, 'entries': 0}
+        if not feeds:
+            return stats
+
+        with self._lock:
+            conn = self._connect()
+            placeholders = ",".join("?" * len(feeds))
+            states = {
+                row['url']: row for row in
+                conn.execute(f"SELECT url, etag, modified, last_polled FROM feeds WHERE url IN ({placeholders})", feeds)
+            }
+
+        now = time.time()
+        stale = []
+        for url in feeds:
+            state = states.get(url)
+            if not force and state is not None and state['last_polled'] and now - state['last_polled'] < self.refresh_interval:
+                stats['skipped'] += 1
+            else:
+                stale.append((url, state['etag'] if state else None, state['modified'] if state else None))
+
+        if stale:
+            with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(stale)))) as executor:
+                futures = {submit_in_context(executor, self._fetch_feed, *item): item for item in stale}
+                for future, (url, etag, modified) in futures.items():
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        print(f"处理Feed {url}时出错: {str(e)}")
+                        stats['failed'] += 1
+                        continue
+                    if result['status'] == 304:
+                        stats['not_modified'] += 1
+                        self._mark_polled(url, 304)
+                        continue
+                    stats['fetched'] += 1
+                    stats['entries'] += self.ingest(
+                        url, result['entries'], title=result['title'],
+                        etag=result['etag'], modified=result['modified'], status=result['status']
+                    )
+            self.prune()
+
+        print(f"📡 RSS源刷新: 下载{stats['fetched']}个，未更新{stats['not_modified']}个，"
+              f"跳过{stats['skipped']}个，失败{stats['failed']}个，新增/更新条目{stats['entries']}条")
+        return stats
+
+    def prune(self) -> int:
+        """删除超过保留天数的条目，返回删除数"""
+        if not self.retention_days or self.retention_days <= 0:
+            return 0
+        cutoff = time.time() - self.retention_days * 86400
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                return conn.execute("DELETE FROM entries WHERE published < ?", (cutoff,)).rowcount
+
+    def search(self, query: str, days_back: int = 7, feeds: Optional[Iterable[str]] = None,
+               min_relevance: float = 0.3, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        在本地存储中检索新闻
+
+        相关性为查询词（按空格切分，不区分大小写）在标题和摘要中出现的比例，
+        综合分数 = 时效性分数*0.6 + 相关性*0.4，与原先逐条匹配RSS条目的规则一致。
+
+        Args:
+            query: 搜索查询
+            days_back: 向前搜索的天数
+            feeds: 只检索这些RSS源，None表示全部
+            min_relevance: 相关性阈值
+            limit: 最多返回的文章数
+
+        Returns:
+            list: 按综合分数降序排列的文章列表
+        """
+        terms = query.lower().split()
+        if not terms:
+            return []
+        now = time.time()
+
+        relevance_sql = "(" + " + ".join(["(instr(e.search_text, ?) > 0)"] * len(terms)) + f") * 1.0 / {len(terms)}"
+        sql = (f"SELECT e.*, COALESCE(f.title, e.feed_url) AS feed_title, {relevance_sql} AS relevance "
+               "FROM entries e LEFT JOIN feeds f ON f.url = e.feed_url WHERE e.published >= ?")
+        params: List[Any] = list(terms) + [now - days_back * 86400]
+
+        if feeds is not None:
+            feeds = list(feeds)
+            if not feeds:
+                return []
+            sql += f" AND e.feed_url IN ({','.join('?' * len(feeds))})"
+            params.extend(feeds)
+
+        with self._lock:
+            conn = self._connect()
+            # 每篇命中文章至少包含一个查询词，查询词都足够长时可以先用全文索引缩小范围
+            if self.fts_enabled and all(len(term) >= _FTS_MIN_TERM_LENGTH for term in terms):
+                sql += " AND e.id IN (SELECT rowid FROM entries_fts WHERE entries_fts MATCH ?)"
+                params.append(" OR ".join('"' + term.replace('"', '""') + '"' for term in terms))
+            sql = f"SELECT * FROM ({sql}) WHERE relevance >= ?"
+            params.append(min_relevance)
+            rows = conn.execute(sql, params).fetchall()
+
+        results = []
+        for row in rows:
+            age_hours = (now - row['published']) / 3600
+            score = time_score(age_hours)
+            relevance = row['relevance']
+            results.append({
+                'title': row['title'],
+                'authors': [row['author']] if row['author'] else ['Unknown'],
+                'summary': row['summary'],
+                'published': datetime.fromtimestamp(row['published']).strftime('%Y-%m-%d %H:%M:%S'),
+                'url': row['url'],
+                'source': row['feed_title'],
+                'content': row['content'],
+                'time_score': score,
+                'relevance_score': relevance,
+                'final_score': score * 0.6 + relevance * 0.4
+            })
+
+        # 按综合分数排序，优先展示最新最相关的新闻
+        results.sort(key=lambda x: x['final_score'], reverse=True)
+        return results[:limit] if limit else results
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取存储统计信息"""
+        with self._lock:
+            conn = self._connect()
+            return {
+                "feeds": conn.execute("SELECT COUNT(*) FROM feeds").fetchone()[0],
+                "entries": conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0],
+                "fts_enabled": self.fts_enabled,
+            }
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# 进程内共享的RSS存储实例（首次使用时才打开数据库）
+feed_store = FeedStore.from_config()
@@ -1,17 +1,25 @@
 import requests
 import json
-import time
+import threading
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 import config
-from collectors.llm_processor import LLMProcessor
+from collectors.service_registry import get_llm_processor
 import urllib3
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from collectors.rate_limiter import RateLimiter
+from collectors.concurrent_fetch import fetch_concurrently
+from collectors.usage_ledger import submit_in_context
 
 # 禁用SSL警告
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+# Google Custom Search API的速率限制器，所有收集器实例共享
+_google_rate_limiter = RateLimiter(getattr(config, 'GOOGLE_SEARCH_QPS', 5))
+
 class GoogleSearchCollector:
     """
     Google Custom Search API收集器
@@ -47,9 +55,16 @@ class GoogleSearchCollector:
         self.session.mount("https://", adapter)
         self.session.mount("http://", adapter)
         
+        # 并发请求数不超过连接池大小；速率由所有实例共享的限制器控制。
+        # 综合研究、批量查询和分页会嵌套使用fetch_concurrently，各层线程池叠加后可能远超max_workers，
+        # 因此实际的HTTP请求再经过一个实例级信号量，同时在途的请求数始终不超过max_workers
+        self.max_workers = getattr(config, 'SEARCH_FETCH_MAX_WORKERS', 4)
+        self._request_slots = threading.BoundedSemaphore(self.max_workers)
+        self.rate_limiter = _google_rate_limiter
+        
         # 初始化LLM处理器用于内容处理
         try:
-            self.llm_processor = LLMProcessor()
+            self.llm_processor = get_llm_processor()
             self.has_llm = True
         except Exception as e:
             print(f"初始化LLM处理器失败: {str(e)}")
@@ -79,123 +94,135 @@ class GoogleSearchCollector:
             print("Google Search API未配置，无法执行搜索")
             return []
         
-        results = []
         num_pages = (max_results // 10) + (1 if max_results % 10 > 0 else 0)
         
-        for page in range(num_pages):
-            start_index = page * 10 + 1
-            page_results = min(10, max_results - len(results))
-            
-            if page_results <= 0:
-                break
-                
+        # 各页并发请求，按页序合并；某页没有结果或出错时不再合并之后的页
+        page_tasks = (
+            partial(self._search_page, query, page, min(10, max_results - page * 10),
+                    days_back, site_search, file_type)
+            for page in range(num_pages)
+        )
+        results = fetch_concurrently(page_tasks, max_workers=self.max_workers, max_results=max_results,
+                                     dedup_key=None, is_last=lambda page_results: not page_results)
+        
+        print(f"Google搜索完成: {query}, 共获得{len(results)}条结果")
+        return results
+    
+    def _get(self, url: str, **kwargs) -> requests.Response:
+        """发起一次API请求：先占用实例的并发名额，再等待共享速率限制器"""
+        with self._request_slots:
+            self.rate_limiter.acquire()
+            return self.session.get(url, **kwargs)
+
+    def _search_page(self, query: str, page: int, page_results: int, days_back: int,
+                     site_search: str = None, file_type: str = None) -> List[Dict]:
+        """
+        请求一页Google搜索结果（共享会话连接池，受Google API速率限制器约束）
+        
+        Returns:
+            List[Dict]: 该页的搜索结果，没有结果时返回空列表
+        """
+        # 构建搜索参数
+        params = {
+            'key': self.api_key,
+            'cx': self.cx,
+            'q': query,
+            'start': page * 10 + 1,
+            'num': page_results,
+            'dateRestrict': f'd{days_back}' if days_back > 0 else None,
+            'safe': 'active',  # 安全搜索
+            'lr': 'lang_zh-CN|lang_en',  # 支持中英文
+        }
+        
+        # 添加可选参数
+        if site_search:
+            params['siteSearch'] = site_search
+        if file_type:
+            params['fileType'] = file_type
+        
+        # 移除None值
+        params = {k: v for k, v in params.items() if v is not None}
+        
+        try:
+            print(f"Google搜索第{page + 1}页: {query}")
+            response = self._get(self.base_url, params=params, timeout=30)
+            response.raise_for_status()
+            ssl_retried = False
+        except requests.exceptions.RequestException as e:
+            print(f"Google搜索API请求错误: {str(e)}")
+            # 如果是SSL错误，尝试不验证SSL
+            if "SSL" not in str(e) and "ssl" not in str(e).lower():
+                return []
             try:
-                # 构建搜索参数
-                params = {
-                    'key': self.api_key,
-                    'cx': self.cx,
-                    'q': query,
-                    'start': start_index,
-                    'num': page_results,
-                    'dateRestrict': f'd{days_back}' if days_back > 0 else None,
-                    'safe': 'active',  # 安全搜索
-                    'lr': 'lang_zh-CN|lang_en',  # 支持中英文
-                }
-                
-                # 添加可选参数
-                if site_search:
-                    params['siteSearch'] = site_search
-                if file_type:
-                    params['fileType'] = file_type
-                
-                # 移除None值
-                params = {k: v for k, v in params.items() if v is not None}
-                
-                print(f"Google搜索第{page + 1}页: {query}")
-                response = self.session.get(self.base_url, params=params, timeout=30)
+                print("尝试跳过SSL验证重新请求...")
+                response = self._get(self.base_url, params=params, timeout=30, verify=False)
                 response.raise_for_status()
-                
-                data = response.json()
-                
-                if 'items' not in data:
-                    print(f"第{page + 1}页没有搜索结果")
-                    break
-                
-                # 处理搜索结果
-                for item in data['items']:
-                    result = {
-                        'title': item.get('title', ''),
-                        'content': item.get('snippet', ''),
-                        'url': item.get('link', ''),
-                        'source': self._extract_domain(item.get('link', '')),
-                        'published_date': self._extract_date(item),
-                        'search_engine': 'Google',
-                        'query': query
-                    }
-                    
-                    # 添加额外信息
-                    if 'pagemap' in item:
-                        pagemap = item['pagemap']
-                        if 'metatags' in pagemap:
-                            metatags = pagemap['metatags'][0] if pagemap['metatags'] else {}
-                            result['description'] = metatags.get('og:description', result['content'])
-                            result['image'] = metatags.get('og:image', '')
-                    
-                    results.append(result)
-                
-                # API速率限制：避免过快请求
-                time.sleep(0.1)
-                
-            except requests.exceptions.RequestException as e:
-                print(f"Google搜索API请求错误: {str(e)}")
-                # 如果是SSL错误，尝试不验证SSL
-                if "SSL" in str(e) or "ssl" in str(e).lower():
-                    try:
-                        print("尝试跳过SSL验证重新请求...")
-                        response = self.session.get(self.base_url, params=params, timeout=30, verify=False)
-                        response.raise_for_status()
-                        data = response.json()
-                        
-                        if 'items' not in data:
-                            print(f"第{page + 1}页没有搜索结果")
-                            break
-                        
-                        # 处理搜索结果
-                        for item in data['items']:
-                            result = {
-                                'title': item.get('title', ''),
-                                'content': item.get('snippet', ''),
-                                'url': item.get('link', ''),
-                                'source': self._extract_domain(item.get('link', '')),
-                                'published_date': self._extract_date(item),
-                                'search_engine': 'Google',
-                                'query': query
-                            }
-                            
-                            # 添加额外信息
-                            if 'pagemap' in item:
-                                pagemap = item['pagemap']
-                                if 'metatags' in pagemap:
-                                    metatags = pagemap['metatags'][0] if pagemap['metatags'] else {}
-                                    result['description'] = metatags.get('og:description', result['content'])
-                                    result['image'] = metatags.get('og:image', '')
-                            
-                            results.append(result)
-                        
-                        print(f"✅ Google搜索SSL重试成功: 第{page + 1}页")
-                        time.sleep(0.1)
-                        continue
-                        
-                    except Exception as ssl_retry_error:
-                        print(f"SSL重试也失败: {str(ssl_retry_error)}")
-                        break
-                else:
-                    break
-            except Exception as e:
-                print(f"处理Google搜索结果时出错: {str(e)}")
-                break
+                ssl_retried = True
+            except Exception as ssl_retry_error:
+                print(f"SSL重试也失败: {str(ssl_retry_error)}")
+                return []
         
-        print(f"Google搜索完成: {query}, 共获得{len(results)}条结果")
+        try:
+            data = response.json()
+            
+            if 'items' not in data:
+                print(f"第{page + 1}页没有搜索结果")
+                return []
+            
+            # 处理搜索结果
+            results = [self._parse_item(item, query) for item in data['items']]
+            if ssl_retried:
+                print(f"✅ Google搜索SSL重试成功: 第{page + 1}页")
+            return results
+        except Exception as e:
+            print(f"处理Google搜索结果时出错: {str(e)}")
+            return []
+    
+    def _parse_item(self, item: Dict, query: str) -> Dict:
+        """把Google API返回的条目转换为统一的结果格式"""
+        result = {
+            'title': item.get('title', ''),
+            'content': item.get('snippet', ''),
+            'url': item.get('link', ''),
+            'source': self._extract_domain(item.get('link', '')),
+            'published_date': self._extract_date(item),
+            'search_engine': 'Google',
+            'query': query
+        }
+        
+        # 添加额外信息
+        if 'pagemap' in item:
+            pagemap = item['pagemap']
+            if 'metatags' in pagemap:
+                metatags = pagemap['metatags'][0] if pagemap['metatags'] else {}
+                result['description'] = metatags.get('og:description', result['content'])
+                result['image'] = metatags.get('og:image', '')
+        
+        return result
+    
+    def search_many(self, queries: List[Dict], max_results: int = None, content_type: str = None,
+                    topic: str = None) -> List[Dict]:
+        """
+        并发执行多个查询，按查询顺序合并并按URL去重，结果数达到max_results后停止发起新的查询
+        
+        Args:
+            queries (List[Dict]): 每个查询的search参数，如 {'query': ..., 'days_back': ..., 'max_results': ...}
+            max_results (int): 最大结果数量，None表示不限制
+            content_type (str): 为结果添加的内容类型标签
+            topic (str): 为结果添加的主题标签
+            
+        Returns:
+            List[Dict]: 合并后的搜索结果
+        """
+        results = fetch_concurrently(
+            (partial(self.search, **search_kwargs) for search_kwargs in queries),
+            max_workers=self.max_workers, max_results=max_results
+        )
+        for result in results:
+            if content_type:
+                result['content_type'] = content_type
+            if topic:
+                result['topic'] = topic
         return results
     
     def search_news(self, topic: str, days_back: int = 7, max_results: int = 10) -> List[Dict]:
@@ -218,37 +245,13 @@ class GoogleSearchCollector:
             f"{topic} breakthrough announcement"
         ]
         
-        all_results = []
         results_per_query = max_results // len(news_queries) + 1
         
-        for query in news_queries:
-            try:
-                # 优先搜索新闻网站
-                results = self.search(
-                    query=query,
-                    days_back=days_back,
-                    max_results=results_per_query,
-                    site_search=None  # 可以添加特定新闻网站
-                )
-                
-                # 为结果添加新闻标签
-                for result in results:
-                    result['content_type'] = 'news'
-                    result['topic'] = topic
-                
-                # 去重添加
-                existing_urls = {r['url'] for r in all_results}
-                for result in results:
-                    if result['url'] not in existing_urls:
-                        all_results.append(result)
-                        existing_urls.add(result['url'])
-                
-            except Exception as e:
-                print(f"搜索新闻时出错 ({query}): {str(e)}")
-                continue
-        
-        # 限制最终结果数量
-        return all_results[:max_results]
+        # 各查询并发执行（可以在queries中添加特定新闻网站的site_search），结果数足够后停止
+        return self.search_many(
+            [{'query': query, 'days_back': days_back, 'max_results': results_per_query} for query in news_queries],
+            max_results=max_results, content_type='news', topic=topic
+        )
     
     def search_research_papers(self, topic: str, days_back: int = 30, max_results: int = 10) -> List[Dict]:
         """
@@ -270,36 +273,21 @@ class GoogleSearchCollector:
             f"{topic} 研究 论文"
         ]
         
-        all_results = []
         results_per_query = max_results // len(academic_queries) + 1
         
-        for query in academic_queries:
-            try:
-                # 搜索学术网站和PDF文件
-                results = self.search(
-                    query=query,
-                    days_back=days_back,
-                    max_results=results_per_query,
-                    file_type='pdf' if 'filetype:pdf' in query else None
-                )
-                
-                # 为结果添加学术标签
-                for result in results:
-                    result['content_type'] = 'academic'
-                    result['topic'] = topic
-                
-                # 去重添加
-                existing_urls = {r['url'] for r in all_results}
-                for result in results:
-                    if result['url'] not in existing_urls:
-                        all_results.append(result)
-                        existing_urls.add(result['url'])
-                
-            except Exception as e:
-                print(f"搜索学术论文时出错 ({query}): {str(e)}")
-                continue
-        
-        return all_results[:max_results]
+        # 搜索学术网站和PDF文件，各查询并发执行
+        return self.search_many(
+            [
+                {
+                    'query': query,
+                    'days_back': days_back,
+                    'max_results': results_per_query,
+                    'file_type': 'pdf' if 'filetype:pdf' in query else None
+                }
+                for query in academic_queries
+            ],
+            max_results=max_results, content_type='academic', topic=topic
+        )
     
     def search_industry_reports(self, topic: str, days_back: int = 90, max_results: int = 10) -> List[Dict]:
         """
@@ -322,34 +310,12 @@ class GoogleSearchCollector:
             f"{topic} industry outlook trends"
         ]
         
-        all_results = []
         results_per_query = max_results // len(report_queries) + 1
         
-        for query in report_queries:
-            try:
-                results = self.search(
-                    query=query,
-                    days_back=days_back,
-                    max_results=results_per_query
-                )
-                
-                # 为结果添加报告标签
-                for result in results:
-                    result['content_type'] = 'industry_report'
-                    result['topic'] = topic
-                
-                # 去重添加
-                existing_urls = {r['url'] for r in all_results}
-                for result in results:
-                    if result['url'] not in existing_urls:
-                        all_results.append(result)
-                        existing_urls.add(result['url'])
-                
-            except Exception as e:
-                print(f"搜索行业报告时出错 ({query}): {str(e)}")
-                continue
-        
-        return all_results[:max_results]
+        return self.search_many(
+            [{'query': query, 'days_back': days_back, 'max_results': results_per_query} for query in report_queries],
+            max_results=max_results, content_type='industry_report', topic=topic
+        )
     
     def get_comprehensive_research(self, topic: str, days_back: int = 7) -> Dict:
         """
@@ -373,13 +339,15 @@ class GoogleSearchCollector:
                 'total_count': 0
             }
         
-        # 并行搜索不同类型的内容
-        results = {
-            'news': self.search_news(topic, days_back=days_back, max_results=8),
-            'academic': self.search_research_papers(topic, days_back=days_back*4, max_results=6),
-            'industry_reports': self.search_industry_reports(topic, days_back=days_back*12, max_results=5),
-            'general': self.search(topic, days_back=days_back, max_results=10)
-        }
+        # 并行搜索不同类型的内容（各API请求共享同一个速率限制器）
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = {
+                'news': submit_in_context(executor, self.search_news, topic, days_back=days_back, max_results=8),
+                'academic': submit_in_context(executor, self.search_research_papers, topic, days_back=days_back*4, max_results=6),
+                'industry_reports': submit_in_context(executor, self.search_industry_reports, topic, days_back=days_back*12, max_results=5),
+                'general': submit_in_context(executor, self.search, topic, days_back=days_back, max_results=10)
+            }
+            results = {key: future.result() for key, future in futures.items()}
         
         # 添加总数统计
         total_count = sum(len(v) for v in results.values())
@@ -618,25 +586,21 @@ class GoogleSearchCollector:
         Returns:
             List[Dict]: 搜索结果
         """
-        all_results = []
-        
-        for site in sites:
-            try:
-                results = self.search(
-                    query=topic,
-                    days_back=days_back,
-                    max_results=5,
-                    site_search=site
-                )
-                
-                # 为结果添加网站信息
-                for result in results:
-                    result['target_site'] = site
-                
-                all_results.extend(results)
-                
-            except Exception as e:
-                print(f"在{site}搜索时出错: {str(e)}")
-                continue
-        
-        return all_results 
\ No newline at end of file
+        def search_site(site):
+            results = self.search(
+                query=topic,
+                days_back=days_back,
+                max_results=5,
+                site_search=site
+            )
+            
+            # 为结果添加网站信息
+            for result in results:
+                result['target_site'] = site
+            return results
+        
+        # 各站点并发搜索，按站点顺序合并
+        return fetch_concurrently(
+            (partial(search_site, site) for site in sites),
+            max_workers=self.max_workers, dedup_key=None
+        ) 
\ No newline at end of file
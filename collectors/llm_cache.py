@@ -0,0 +1,235 @@
+"""
+LLM响应缓存
+
+按 (模型, 系统消息, 提示词, 温度, max_tokens) 的内容哈希缓存LLM响应。
+翻译主题名、生成检索关键词、对同一批论文做相关性评分等调用在不同报告、
+不同运行之间反复出现，且低温度下输出基本确定，命中缓存即可省去一次LLM调用。
+
+内存层使用 OrderedDict 实现 LRU 淘汰；配置 db_path 后额外写入 SQLite 磁盘层，
+服务重启后仍可命中。两层都支持TTL过期和条目数上限。
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import config
+
+
+def make_llm_cache_key(model: str, system_message: Optional[str], prompt: str,
+                       temperature: float, max_tokens: int) -> str:
+    """根据调用参数生成内容寻址的缓存键"""
+    payload = json.dumps(
+        [model, system_message or "", prompt, round(float(temperature), 3), int(max_tokens)],
+        ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    LLM响应缓存
+
+    每个条目保存响应文本和生成它时消耗的token数，命中时累计节省的token。
+    """
+
+    def __init__(self, max_size: int = 2000, ttl: int = 7 * 24 * 3600,
+                 db_path: Optional[str] = None, max_disk_entries: int = 50000,
+                 max_temperature: float = 0.2):
+        """
+        初始化响应缓存
+
+        Args:
+            max_size: 内存层最多保存的条目数
+            ttl: 条目有效期（秒），<=0表示永不过期
+            db_path: SQLite数据库路径，为None时不启用磁盘层
+            max_disk_entries: 磁盘层最多保存的条目数，超出时淘汰最早写入的条目
+            max_temperature: 温度不高于该值的调用默认可缓存
+        """
+        self.max_size = max(1, int(max_size))
+        self.ttl = int(ttl)
+        self.db_path = db_path
+        self.max_disk_entries = max(1, int(max_disk_entries))
+        self.max_temperature = float(max_temperature)
+        self._memory: "OrderedDict[str, Tuple[float, str, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.saved_tokens = 0
+
+        if db_path:
+            self._init_disk(db_path)
+
+    @classmethod
+    def from_config(cls) -> Optional['LLMResponseCache']:
+        """根据config创建缓存，未启用缓存时返回None"""
+        if not getattr(config, 'LLM_CACHE_ENABLED', False):
+            return None
+        return cls(
+            max_size=getattr(config, 'LLM_CACHE_SIZE', 2000),
+            ttl=getattr(config, 'LLM_CACHE_TTL', 7 * 24 * 3600),
+            db_path=getattr(config, 'LLM_CACHE_DB_PATH', None),
+            max_disk_entries=getattr(config, 'LLM_CACHE_MAX_DISK_ENTRIES', 50000),
+            max_temperature=getattr(config, 'LLM_CACHE_MAX_TEMPERATURE', 0.2)
+        )
+
+    def _init_disk(self, db_path: str):
+        """初始化SQLite磁盘层"""
+        path = Path(db_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            " cache_key TEXT PRIMARY KEY,"
+            " response TEXT NOT NULL,"
+            " tokens INTEGER NOT NULL DEFAULT 0,"
+            " created_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_llm_cache_created ON llm_cache(created_at)"
+        )
+        self._conn.commit()
+
+    def _is_expired(self, created_at: float, now: float) -> bool:
+        return self.ttl > 0 and now - created_at > self.ttl
+
+    def should_cache(self, temperature: float, cache: Optional[bool] = None) -> bool:
+        """判断本次调用是否走缓存：cache显式指定时以其为准，否则低温度调用默认缓存"""
+        if cache is not None:
+            return cache
+        return temperature <= self.max_temperature
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        读取缓存
+
+        Returns:
+            命中时返回响应文本，未命中或已过期时返回None
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                created_at, response, tokens = entry
+                if not self._is_expired(created_at, now):
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    self.saved_tokens += tokens
+                    return response
+                del self._memory[key]
+
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT response, tokens, created_at FROM llm_cache WHERE cache_key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    response, tokens, created_at = row
+                    if not self._is_expired(created_at, now):
+                        self._put_memory(key, created_at, response, tokens)
+                        self.hits += 1
+                        self.disk_hits += 1
+                        self.saved_tokens += tokens
+                        return response
+                    self._conn.execute("DELETE FROM llm_cache WHERE cache_key = ?", (key,))
+                    self._conn.commit()
+
+            self.misses += 1
+            return None
+
+    def set(self, key: str, response: str, tokens: int = 0):
+        """写入缓存，tokens为生成该响应消耗的token数"""
+        if not response:
+            return
+        created_at = time.time()
+        tokens = int(tokens or 0)
+        with self._lock:
+            self._put_memory(key, created_at, response, tokens)
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache (cache_key, response, tokens, created_at) VALUES (?, ?, ?, ?)",
+                    (key, response, tokens, created_at)
+                )
+                # 超出条目上限时淘汰最早写入的条目
+                self._conn.execute(
+                    "DELETE FROM llm_cache WHERE cache_key IN ("
+                    " SELECT cache_key FROM llm_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_disk_entries,)
+                )
+                self._conn.commit()
+
+    def invalidate(self, key: str):
+        """删除某个条目（如响应无法解析时）"""
+        with self._lock:
+            self._memory.pop(key, None)
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM llm_cache WHERE cache_key = ?", (key,))
+                self._conn.commit()
+
+    def _put_memory(self, key: str, created_at: float, response: str, tokens: int):
+        """写入内存层并按LRU淘汰（调用方需持有锁）"""
+        self._memory[key] = (created_at, response, tokens)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_size:
+            self._memory.popitem(last=False)
+
+    def purge_expired(self) -> int:
+        """清理已过期的条目，返回清理数量"""
+        if self.ttl <= 0:
+            return 0
+        now = time.time()
+        removed = 0
+        with self._lock:
+            expired = [k for k, (created_at, _, _) in self._memory.items() if self._is_expired(created_at, now)]
+            for k in expired:
+                del self._memory[k]
+            removed += len(expired)
+            if self._conn is not None:
+                cursor = self._conn.execute(
+                    "DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl,)
+                )
+                self._conn.commit()
+                removed += cursor.rowcount
+        return removed
+
+    def clear(self):
+        """清空缓存（包括磁盘层）"""
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM llm_cache")
+                self._conn.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "disk_hits": self.disk_hits,
+                "hit_rate": self.hits / total if total else 0.0,
+                "saved_tokens": self.saved_tokens,
+                "memory_entries": len(self._memory),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "disk_enabled": self._conn is not None,
+            }
+
+    def close(self):
+        """关闭磁盘连接"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# 进程内共享的响应缓存实例，未启用时为None
+llm_cache = LLMResponseCache.from_config()
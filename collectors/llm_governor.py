@@ -0,0 +1,249 @@
+"""
+进程级LLM并发调控器
+
+各分析器（新闻分析器、文章分析器、论文相关性分析器等）各自设置线程池大小，
+互相并不知道对方的存在，嵌套之后实际在途请求数会远超上游配额。
+调控器在LLMProcessor内部统一把关所有LLM调用：
+1. 全局并发上限：同时在途的请求数不超过max_concurrency
+2. 每分钟请求数（RPM）和每分钟token数（TPM）两个令牌桶
+3. 优先通道：交互式调用（MCP工具直接发起的调用）排在批量分析任务之前
+4. 排队等待指标：按通道统计请求数、平均/最大排队时间
+
+优先级通过contextvars传递，分析器在入口处用batch_priority标记为批量任务，
+通过submit_in_context提交的线程任务会继承该标记。
+"""
+
+import asyncio
+import contextvars
+import functools
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+import config
+
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+_LANE_ORDER = {INTERACTIVE: 0, BATCH: 1}
+
+_current_lane: contextvars.ContextVar[str] = contextvars.ContextVar(
+    "llm_priority_lane", default=INTERACTIVE
+)
+
+
+def estimate_tokens(*texts: Optional[str]) -> int:
+    """粗略估算文本的token数（中英文混合按每2个字符1个token估算）"""
+    return max(1, sum(len(text) for text in texts if text) // 2)
+
+
+class TokenBucket:
+    """按分钟补充的令牌桶，rate_per_minute<=0表示不限制（非线程安全，由调控器加锁）"""
+
+    def __init__(self, rate_per_minute: float):
+        self.capacity = float(rate_per_minute)
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.capacity / 60.0)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """取出amount个令牌还需等待的秒数，0表示可以立即取出"""
+        if not self.enabled:
+            return 0.0
+        self._refill()
+        # 超过桶容量的请求只要桶满即可放行，避免永远等待
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) * 60.0 / self.capacity
+
+    def take(self, amount: float):
+        if self.enabled:
+            self._refill()
+            self.tokens -= min(amount, self.capacity)
+
+    def adjust(self, delta: float):
+        """按实际用量修正：delta>0表示多扣，delta<0表示返还"""
+        if self.enabled:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens - delta)
+
+
+class LLMTicket:
+    """一次获准的LLM调用，释放时按实际token用量修正令牌桶"""
+
+    __slots__ = ("lane", "estimated_tokens", "used_tokens", "queue_wait")
+
+    def __init__(self, lane: str, estimated_tokens: int, queue_wait: float):
+        self.lane = lane
+        self.estimated_tokens = estimated_tokens
+        self.used_tokens: Optional[int] = None
+        self.queue_wait = queue_wait
+
+
+class LLMGovernor:
+    """线程安全的进程级LLM调控器"""
+
+    def __init__(self, max_concurrency: Optional[int] = None,
+                 requests_per_minute: Optional[float] = None,
+                 tokens_per_minute: Optional[float] = None):
+        """
+        初始化调控器
+
+        Args:
+            max_concurrency: 全局在途请求上限，默认读取config.LLM_MAX_CONCURRENCY
+            requests_per_minute: 每分钟请求数上限，<=0表示不限制，默认读取config.LLM_REQUESTS_PER_MINUTE
+            tokens_per_minute: 每分钟token数上限，<=0表示不限制，默认读取config.LLM_TOKENS_PER_MINUTE
+        """
+        if max_concurrency is None:
+            max_concurrency = getattr(config, 'LLM_MAX_CONCURRENCY', 8)
+        if requests_per_minute is None:
+            requests_per_minute = getattr(config, 'LLM_REQUESTS_PER_MINUTE', 0)
+        if tokens_per_minute is None:
+            tokens_per_minute = getattr(config, 'LLM_TOKENS_PER_MINUTE', 0)
+
+        self.max_concurrency = max(1, int(max_concurrency))
+        self._cond = threading.Condition()
+        self._request_bucket = TokenBucket(requests_per_minute)
+        self._token_bucket = TokenBucket(tokens_per_minute)
+        self._waiters = []
+        self._sequence = itertools.count()
+        self._in_flight = 0
+        self._peak_in_flight = 0
+        self._throttled = 0
+        self._lane_stats = {lane: self._empty_lane_stats() for lane in _LANE_ORDER}
+
+    @staticmethod
+    def _empty_lane_stats() -> Dict[str, float]:
+        return {"requests": 0, "total_wait": 0.0, "max_wait": 0.0}
+
+    def acquire(self, estimated_tokens: int = 0, lane: Optional[str] = None) -> LLMTicket:
+        """阻塞直到获准发起一次LLM调用"""
+        lane = lane or _current_lane.get()
+        entry = (_LANE_ORDER.get(lane, _LANE_ORDER[BATCH]), next(self._sequence))
+        enqueued = time.perf_counter()
+        throttled = False
+
+        with self._cond:
+            heapq.heappush(self._waiters, entry)
+            try:
+                while True:
+                    if self._waiters[0] == entry and self._in_flight < self.max_concurrency:
+                        wait = max(self._request_bucket.wait_time(1),
+                                   self._token_bucket.wait_time(estimated_tokens))
+                        if wait <= 0:
+                            break
+                        throttled = True
+                        self._cond.wait(wait)
+                    else:
+                        self._cond.wait()
+            except BaseException:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                self._cond.notify_all()
+                raise
+
+            heapq.heappop(self._waiters)
+            self._request_bucket.take(1)
+            self._token_bucket.take(estimated_tokens)
+            self._in_flight += 1
+            self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+
+            queue_wait = time.perf_counter() - enqueued
+            stats = self._lane_stats.setdefault(lane, self._empty_lane_stats())
+            stats["requests"] += 1
+            stats["total_wait"] += queue_wait
+            stats["max_wait"] = max(stats["max_wait"], queue_wait)
+            if throttled:
+                self._throttled += 1
+            # 队首已出队，唤醒下一个等待者
+            self._cond.notify_all()
+
+        return LLMTicket(lane, estimated_tokens, queue_wait)
+
+    def release(self, ticket: LLMTicket):
+        """调用结束，归还并发名额并按实际用量修正TPM令牌桶"""
+        with self._cond:
+            self._in_flight -= 1
+            if ticket.used_tokens is not None:
+                self._token_bucket.adjust(ticket.used_tokens - min(ticket.estimated_tokens, self._token_bucket.capacity))
+            self._cond.notify_all()
+
+    async def aacquire(self, estimated_tokens: int = 0, lane: Optional[str] = None) -> LLMTicket:
+        """acquire的异步版本，在线程中排队，不阻塞事件循环"""
+        lane = lane or _current_lane.get()
+        task = asyncio.ensure_future(asyncio.to_thread(self.acquire, estimated_tokens, lane))
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            # 排队期间被取消：拿到名额后立即归还
+            task.add_done_callback(
+                lambda t: self.release(t.result()) if not t.cancelled() and t.exception() is None else None
+            )
+            raise
+
+    @contextmanager
+    def slot(self, estimated_tokens: int = 0, lane: Optional[str] = None) -> Iterator[LLMTicket]:
+        """在调控器许可下执行一次LLM调用"""
+        ticket = self.acquire(estimated_tokens, lane)
+        try:
+            yield ticket
+        finally:
+            self.release(ticket)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取调控器指标：在途/排队请求数、限流次数、各通道的排队时间"""
+        with self._cond:
+            lanes = {}
+            for lane, stats in self._lane_stats.items():
+                lanes[lane] = {
+                    **stats,
+                    "avg_wait": stats["total_wait"] / stats["requests"] if stats["requests"] else 0.0,
+                }
+            return {
+                "max_concurrency": self.max_concurrency,
+                "in_flight": self._in_flight,
+                "peak_in_flight": self._peak_in_flight,
+                "waiting": len(self._waiters),
+                "throttled": self._throttled,
+                "lanes": lanes,
+            }
+
+
+# 进程内共享的调控器实例
+llm_governor = LLMGovernor()
+
+
+def get_priority() -> str:
+    """获取当前上下文的优先通道"""
+    return _current_lane.get()
+
+
+@contextmanager
+def llm_priority(lane: str) -> Iterator[str]:
+    """临时切换LLM调用的优先通道（INTERACTIVE或BATCH），退出时恢复"""
+    token = _current_lane.set(lane)
+    try:
+        yield lane
+    finally:
+        _current_lane.reset(token)
+
+
+def batch_priority(func: Callable) -> Callable:
+    """装饰器：把函数内（含通过submit_in_context提交的线程任务）的LLM调用标记为批量任务"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with llm_priority(BATCH):
+            return func(*args, **kwargs)
+    return wrapper
@@ -1,17 +1,70 @@
 import requests
 import json
+import asyncio
+import threading
+import time
+import weakref
 from typing import List, Dict, Any, Optional
 import config
 import re
 from tenacity import retry, stop_after_attempt, wait_exponential
 import traceback
 
+from collectors.usage_ledger import usage_ledger
+from collectors.llm_governor import llm_governor, estimate_tokens
+from collectors.llm_cache import llm_cache, make_llm_cache_key
+from collectors.term_store import term_store
+
+
+# 进程级共享的HTTP客户端池
+# 所有LLMProcessor实例按 (api_key, base_url, 连接池参数) 共享同一个客户端，
+# 避免每次调用都重新建立TLS连接。OpenAI同步客户端和requests.Session都是线程安全的；
+# 异步客户端绑定事件循环，因此按事件循环分别缓存。
+_client_lock = threading.Lock()
+_sync_clients: Dict[tuple, Any] = {}
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[tuple, Any]]" = weakref.WeakKeyDictionary()
+_http_sessions: Dict[tuple, requests.Session] = {}
+
+# 进程级上游限流计数，调度器据此感知限流并降低并发
+_rate_limit_lock = threading.Lock()
+_rate_limit_hits = 0
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """判断异常是否由上游限流（HTTP 429）引起，支持tenacity包装后的RetryError"""
+    last_attempt = getattr(error, 'last_attempt', None)
+    if last_attempt is not None and last_attempt.failed:
+        error = last_attempt.exception()
+    if type(error).__name__ == 'RateLimitError':
+        return True
+    status_code = getattr(error, 'status_code', None)
+    if status_code is None:
+        status_code = getattr(getattr(error, 'response', None), 'status_code', None)
+    if status_code == 429:
+        return True
+    message = str(error).lower()
+    return 'rate limit' in message or 'too many requests' in message
+
+
+def get_rate_limit_hits() -> int:
+    """获取进程启动以来上游限流的累计次数"""
+    return _rate_limit_hits
+
+
+def _note_rate_limit(error: BaseException):
+    global _rate_limit_hits
+    if is_rate_limit_error(error):
+        with _rate_limit_lock:
+            _rate_limit_hits += 1
+
+
 class LLMProcessor:
     """
     使用大模型处理和总结搜索结果，生成结构化的报告内容
     """
     
-    def __init__(self, api_key=None, model=None, reporter=None):
+    def __init__(self, api_key=None, model=None, reporter=None,
+                 pool_size: Optional[int] = None, keepalive_expiry: Optional[float] = None):
         """
         初始化LLM处理器
         
@@ -19,6 +72,8 @@ class LLMProcessor:
             api_key (str, optional): API密钥，默认从config获取
             model (str, optional): 使用的模型名称，默认从config获取
             reporter (StreamingProgressReporter, optional): 进度报告器
+            pool_size (int, optional): HTTP连接池最大连接数，默认从config获取
+            keepalive_expiry (float, optional): 空闲连接保活时间（秒），默认从config获取
         """
         # 配置API密钥和URL
         self.api_key = api_key or getattr(config, "OPENAI_API_KEY", None)
@@ -38,15 +93,179 @@ class LLMProcessor:
         # 使用 dashscope API
         self.model = "deepseek-v3"
         
+        # 连接池配置
+        self.pool_size = pool_size or getattr(config, "LLM_POOL_MAX_CONNECTIONS", 32)
+        self.keepalive_expiry = keepalive_expiry or getattr(config, "LLM_POOL_KEEPALIVE_EXPIRY", 60.0)
+        self.request_timeout = getattr(config, "LLM_REQUEST_TIMEOUT", 60.0)
+        
         # 用量跟踪
         self.last_usage = None
         self.reporter = reporter
             
         # print(f"LLM处理器已初始化，使用的模型: {self.model}, API URL: {self.base_url}")  # MCP需要静默
         
+    def _client_key(self) -> tuple:
+        """共享客户端的缓存键"""
+        return (self.api_key, self.base_url, self.pool_size, self.keepalive_expiry, self.request_timeout)
+    
+    def _http_limits(self):
+        """构建httpx连接池限制"""
+        import httpx
+        return httpx.Limits(
+            max_connections=self.pool_size,
+            max_keepalive_connections=self.pool_size,
+            keepalive_expiry=self.keepalive_expiry
+        )
+    
+    def get_client(self):
+        """
+        获取进程内共享的OpenAI同步客户端（线程安全）
+        
+        Raises:
+            ImportError: 未安装openai库时抛出
+        """
+        key = self._client_key()
+        client = _sync_clients.get(key)
+        if client is not None:
+            return client
+        
+        from openai import OpenAI
+        import httpx
+        
+        with _client_lock:
+            client = _sync_clients.get(key)
+            if client is None:
+                client = OpenAI(
+                    api_key=self.api_key,
+                    base_url=self.base_url,
+                    timeout=self.request_timeout,
+                    max_retries=3,  # 内置重试3次
+                    http_client=httpx.Client(limits=self._http_limits(), timeout=self.request_timeout)
+                )
+                _sync_clients[key] = client
+        return client
+    
+    def get_async_client(self):
+        """
+        获取当前事件循环共享的OpenAI异步客户端
+        
+        Raises:
+            ImportError: 未安装openai库时抛出
+            RuntimeError: 不在事件循环中调用时抛出
+        """
+        loop = asyncio.get_running_loop()
+        key = self._client_key()
+        
+        from openai import AsyncOpenAI
+        import httpx
+        
+        with _client_lock:
+            clients = _async_clients.get(loop)
+            if clients is None:
+                clients = {}
+                _async_clients[loop] = clients
+            client = clients.get(key)
+            if client is None:
+                client = AsyncOpenAI(
+                    api_key=self.api_key,
+                    base_url=self.base_url,
+                    timeout=self.request_timeout,
+                    max_retries=3,
+                    http_client=httpx.AsyncClient(limits=self._http_limits(), timeout=self.request_timeout)
+                )
+                clients[key] = client
+        return client
+    
+    def _get_http_session(self) -> requests.Session:
+        """获取未安装openai库时使用的共享requests会话"""
+        key = self._client_key()
+        session = _http_sessions.get(key)
+        if session is None:
+            with _client_lock:
+                session = _http_sessions.get(key)
+                if session is None:
+                    session = requests.Session()
+                    adapter = requests.adapters.HTTPAdapter(
+                        pool_connections=1,
+                        pool_maxsize=self.pool_size
+                    )
+                    session.mount("http://", adapter)
+                    session.mount("https://", adapter)
+                    _http_sessions[key] = session
+        return session
+    
+    @classmethod
+    def close_clients(cls):
+        """关闭所有共享的同步客户端和会话（异步客户端随事件循环释放）"""
+        with _client_lock:
+            for client in _sync_clients.values():
+                try:
+                    client.close()
+                except Exception:
+                    pass
+            _sync_clients.clear()
+            for session in _http_sessions.values():
+                session.close()
+            _http_sessions.clear()
+    
+    def _build_messages(self, prompt: str, system_message: Optional[str] = None) -> List[Dict[str, str]]:
+        """构建对话消息"""
+        messages = []
+        if system_message:
+            messages.append({"role": "system", "content": system_message})
+        messages.append({"role": "user", "content": prompt})
+        return messages
+    
+    def _record_usage(self, input_tokens: int, output_tokens: int, total_tokens: int,
+                      latency: float = 0.0, ticket=None):
+        """记录本次调用的用量，写入用量账本并上报给进度报告器"""
+        # 把实际用量交给调控器，用于修正TPM令牌桶
+        if ticket is not None:
+            ticket.used_tokens = int(total_tokens or 0) or int(input_tokens or 0) + int(output_tokens or 0)
+        
+        self.last_usage = {
+            'provider': 'openai',
+            'model': self.model,
+            'input_tokens': input_tokens,
+            'output_tokens': output_tokens,
+            'total_tokens': total_tokens,
+            'latency': latency
+        }
+        
+        # 按当前请求上下文和流水线阶段累计（线程/协程安全）
+        usage_ledger.record('openai', self.model, input_tokens, output_tokens, total_tokens, latency)
+        
+        # 报告模型用量给StreamingProgressReporter
+        if self.reporter:
+            self.reporter.report_model_usage(
+                model_provider='openai',
+                model_name=self.model,
+                input_tokens=input_tokens,
+                output_tokens=output_tokens,
+                cost_estimate=self._calculate_cost(self.last_usage)
+            )
+    
+    def _response_cache_key(self, prompt: str, system_message: Optional[str], temperature: float,
+                            max_tokens: int, cache: Optional[bool]) -> Optional[str]:
+        """本次调用需要走响应缓存时返回缓存键，否则返回None"""
+        if llm_cache is None or not llm_cache.should_cache(temperature, cache):
+            return None
+        return make_llm_cache_key(self.model, system_message, prompt, temperature, max_tokens)
+    
+    def _store_response(self, cache_key: Optional[str], result: str, ticket):
+        """把响应写入缓存，同时记录生成它消耗的token数"""
+        if cache_key is not None:
+            llm_cache.set(cache_key, result, ticket.used_tokens or 0)
+    
+    def _check_truncation(self, result: str, max_tokens: int):
+        """检查结果是否可能被截断"""
+        if result.endswith("...") or (len(result) > 100 and len(result) >= 0.95 * max_tokens):
+            print(f"警告: 生成的内容可能被截断 (长度:{len(result)})。考虑增加max_tokens值。")
+    
     @retry(stop=stop_after_attempt(5), wait=wait_exponential(multiplier=2, min=4, max=20))
     def call_llm_api(self, prompt: str, system_message: Optional[str] = None, 
-                  temperature: float = 0.3, max_tokens: int = 8192) -> str:
+                  temperature: float = 0.3, max_tokens: int = 8192,
+                  cache: Optional[bool] = None) -> str:
         """
         调用LLM API进行内容生成
         
@@ -55,6 +274,7 @@ class LLMProcessor:
             system_message (str, optional): 系统消息
             temperature (float): 温度参数，控制创造性
             max_tokens (int): 最大生成token数
+            cache (bool, optional): 是否使用响应缓存，None时低温度调用默认缓存，False跳过缓存
             
         Returns:
             str: 生成的内容
@@ -62,31 +282,30 @@ class LLMProcessor:
         # 每次调用前清空上次用量，防止上游未返回usage时复用旧值
         self.last_usage = None
         
+        cache_key = self._response_cache_key(prompt, system_message, temperature, max_tokens, cache)
+        if cache_key is not None:
+            cached = llm_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
         if not self.api_key:
             raise ValueError("API密钥未提供，无法调用LLM API")
         
+        # 经进程级调控器排队（全局并发、RPM/TPM、优先通道）
+        ticket = llm_governor.acquire(estimate_tokens(prompt, system_message))
+        start_time = time.perf_counter()
         try:
             # 构建消息
-            messages = []
-            if system_message:
-                messages.append({"role": "system", "content": system_message})
-            messages.append({"role": "user", "content": prompt})
+            messages = self._build_messages(prompt, system_message)
             
             # 使用较大的max_tokens确保完整输出
             if max_tokens < 4000:
                 # print(f"警告: max_tokens值 {max_tokens} 较小，可能导致输出截断。建议设置更大的值。")  # MCP静默
                 pass
             
-            # 尝试使用OpenAI Python库
+            # 尝试使用OpenAI Python库（共享连接池客户端）
             try:
-                from openai import OpenAI
-                
-                client = OpenAI(
-                    api_key=self.api_key, 
-                    base_url=self.base_url,
-                    timeout=60.0,  # 设置60秒超时
-                    max_retries=3  # 内置重试3次
-                )
+                client = self.get_client()
                 response = client.chat.completions.create(
                     model=self.model,
                     messages=messages,
@@ -100,33 +319,22 @@ class LLMProcessor:
                     # 跟踪用量信息（仅在上游提供时设置）
                     if hasattr(response, 'usage'):
                         usage = response.usage
-                        self.last_usage = {
-                            'provider': 'openai',
-                            'model': self.model,
-                            'input_tokens': getattr(usage, 'prompt_tokens', 0),
-                            'output_tokens': getattr(usage, 'completion_tokens', 0),
-                            'total_tokens': getattr(usage, 'total_tokens', 0)
-                        }
-                        
-                        # 报告模型用量给StreamingProgressReporter
-                        if self.reporter:
-                            self.reporter.report_model_usage(
-                                model_provider='openai',
-                                model_name=self.model,
-                                input_tokens=self.last_usage['input_tokens'],
-                                output_tokens=self.last_usage['output_tokens'],
-                                cost_estimate=self._calculate_cost(self.last_usage)
-                            )
+                        self._record_usage(
+                            getattr(usage, 'prompt_tokens', 0),
+                            getattr(usage, 'completion_tokens', 0),
+                            getattr(usage, 'total_tokens', 0),
+                            time.perf_counter() - start_time,
+                            ticket=ticket
+                        )
                     
-                    # 检查结果是否可能被截断
-                    if result.endswith("...") or (len(result) > 100 and len(result) >= 0.95 * max_tokens):
-                        print(f"警告: 生成的内容可能被截断 (长度:{len(result)})。考虑增加max_tokens值。")
+                    self._check_truncation(result, max_tokens)
+                    self._store_response(cache_key, result, ticket)
                     return result
                 else:
                     raise ValueError(f"API返回无效响应: {response}")
                     
             except ImportError:
-                # 如果没有OpenAI库，使用requests直接调用API
+                # 如果没有OpenAI库，使用共享的requests会话直接调用API
                 # print("OpenAI库未安装，使用HTTP请求调用API")  # MCP静默
                 
                 headers = {
@@ -142,7 +350,7 @@ class LLMProcessor:
                     "max_tokens": max_tokens
                 }
                 
-                response = requests.post(endpoint, headers=headers, json=data, timeout=60)
+                response = self._get_http_session().post(endpoint, headers=headers, json=data, timeout=self.request_timeout)
                 response.raise_for_status()
                 
                 result = response.json()
@@ -152,25 +360,98 @@ class LLMProcessor:
                     # 跟踪用量信息（仅在上游提供时设置）
                     if "usage" in result:
                         usage = result["usage"]
-                        self.last_usage = {
-                            'provider': 'openai',
-                            'model': self.model,
-                            'input_tokens': usage.get('prompt_tokens', 0),
-                            'output_tokens': usage.get('completion_tokens', 0),
-                            'total_tokens': usage.get('total_tokens', 0)
-                        }
+                        self._record_usage(
+                            usage.get('prompt_tokens', 0),
+                            usage.get('completion_tokens', 0),
+                            usage.get('total_tokens', 0),
+                            time.perf_counter() - start_time,
+                            ticket=ticket
+                        )
                     
-                    # 检查结果是否可能被截断
-                    if content.endswith("...") or (len(content) > 100 and len(content) >= 0.95 * max_tokens):
-                        print(f"警告: 生成的内容可能被截断 (长度:{len(content)})。考虑增加max_tokens值。")
+                    self._check_truncation(content, max_tokens)
+                    self._store_response(cache_key, content, ticket)
                     return content
                 else:
                     raise ValueError(f"API返回无效JSON: {result}")
                     
         except Exception as e:
+            _note_rate_limit(e)
             print(f"调用LLM API时出错: {str(e)}")
             print(traceback.format_exc())
             raise
+        finally:
+            llm_governor.release(ticket)
+    
+    @retry(stop=stop_after_attempt(5), wait=wait_exponential(multiplier=2, min=4, max=20))
+    async def acall_llm_api(self, prompt: str, system_message: Optional[str] = None, 
+                         temperature: float = 0.3, max_tokens: int = 8192,
+                         cache: Optional[bool] = None) -> str:
+        """
+        call_llm_api的异步版本，使用当前事件循环共享的异步客户端
+        
+        Args:
+            prompt (str): 用户提示
+            system_message (str, optional): 系统消息
+            temperature (float): 温度参数，控制创造性
+            max_tokens (int): 最大生成token数
+            cache (bool, optional): 是否使用响应缓存，None时低温度调用默认缓存，False跳过缓存
+            
+        Returns:
+            str: 生成的内容
+        """
+        self.last_usage = None
+        
+        cache_key = self._response_cache_key(prompt, system_message, temperature, max_tokens, cache)
+        if cache_key is not None:
+            cached = llm_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        if not self.api_key:
+            raise ValueError("API密钥未提供，无法调用LLM API")
+        
+        try:
+            client = self.get_async_client()
+        except ImportError:
+            # 没有OpenAI库时退回到线程中执行同步调用
+            return await asyncio.to_thread(self.call_llm_api, prompt, system_message, temperature, max_tokens, cache)
+        
+        ticket = await llm_governor.aacquire(estimate_tokens(prompt, system_message))
+        start_time = time.perf_counter()
+        try:
+            response = await client.chat.completions.create(
+                model=self.model,
+                messages=self._build_messages(prompt, system_message),
+                temperature=temperature,
+                max_tokens=max_tokens
+            )
+            
+            if hasattr(response, 'choices') and len(response.choices) > 0:
+                result = response.choices[0].message.content
+                
+                if hasattr(response, 'usage'):
+                    usage = response.usage
+                    self._record_usage(
+                        getattr(usage, 'prompt_tokens', 0),
+                        getattr(usage, 'completion_tokens', 0),
+                        getattr(usage, 'total_tokens', 0),
+                        time.perf_counter() - start_time,
+                        ticket=ticket
+                    )
+                
+                self._check_truncation(result, max_tokens)
+                self._store_response(cache_key, result, ticket)
+                return result
+            else:
+                raise ValueError(f"API返回无效响应: {response}")
+                
+        except Exception as e:
+            _note_rate_limit(e)
+            print(f"调用LLM API时出错: {str(e)}")
+            print(traceback.format_exc())
+            raise
+        finally:
+            llm_governor.release(ticket)
             
     def summarize_content(self, content: str, topic: str, 
                          max_length: int = 1000, focus: Optional[str] = None) -> str:
@@ -426,6 +707,16 @@ class LLMProcessor:
                 print("文本主要是中文，无需翻译")
                 return text
         
+        try:
+            # 经共享术语库翻译：已翻译过的文本直接返回，新的翻译结果写入术语库
+            return term_store.translate(text, target_language,
+                                        lambda source: self._translate_with_llm(source, target_language))
+        except Exception as e:
+            print(f"翻译文本时出错: {str(e)}")
+            return text  # 失败时返回原文 
+
+    def _translate_with_llm(self, text: str, target_language: str) -> str:
+        """调用LLM翻译文本，失败时抛出异常"""
         system_message = f"""你是一位专业的翻译专家，请将以下文本翻译成{target_language}。
 翻译应准确传达原文含义，同时符合目标语言的表达习惯。
 减少括号的使用，使文本更加自然流畅，保留原文Markdown格式。
@@ -433,23 +724,18 @@ class LLMProcessor:
 
         prompt = f"请将以下文本翻译成{target_language}：\n\n{text}"
         
-        try:
-            result = self.call_llm_api(prompt, system_message, temperature=0.1, max_tokens=6000)
-            
-            # 清理翻译结果中可能的元说明
-            patterns = [
-                "翻译:", "翻译：", "以下是翻译:", "以下是翻译：",
-                "翻译结果:", "翻译结果：", "译文:", "译文："
-            ]
-            for pattern in patterns:
-                if result.startswith(pattern):
-                    result = result[len(pattern):].strip()
-                    
-            return result
-            
-        except Exception as e:
-            print(f"翻译文本时出错: {str(e)}")
-            return text  # 失败时返回原文 
+        result = self.call_llm_api(prompt, system_message, temperature=0.1, max_tokens=6000)
+        
+        # 清理翻译结果中可能的元说明
+        patterns = [
+            "翻译:", "翻译：", "以下是翻译:", "以下是翻译：",
+            "翻译结果:", "翻译结果：", "译文:", "译文："
+        ]
+        for pattern in patterns:
+            if result.startswith(pattern):
+                result = result[len(pattern):].strip()
+                
+        return result
 
     def process_json_response(self, response_text: str) -> dict:
         """
@@ -503,7 +789,8 @@ class LLMProcessor:
     
     @retry(stop=stop_after_attempt(5), wait=wait_exponential(multiplier=2, min=4, max=20))
     def call_llm_api_json(self, prompt: str, system_message: Optional[str] = None, 
-                       temperature: float = 0.2, max_tokens: int = 8192) -> dict:
+                       temperature: float = 0.2, max_tokens: int = 8192,
+                       cache: Optional[bool] = None) -> dict:
         """
         调用LLM API进行JSON格式的内容生成
         
@@ -512,6 +799,7 @@ class LLMProcessor:
             system_message (str, optional): 系统消息
             temperature (float): 温度参数，控制创造性
             max_tokens (int): 最大生成token数
+            cache (bool, optional): 是否使用响应缓存，None时低温度调用默认缓存，False跳过缓存
             
         Returns:
             dict: 解析后的JSON结果
@@ -526,7 +814,14 @@ class LLMProcessor:
             system_message += "\n务必只返回有效的JSON格式，不要包含代码块标记(```)或其他额外文本。"
             
         # 调用API获取响应
-        response_text = self.call_llm_api(prompt, system_message, temperature, max_tokens)
+        response_text = self.call_llm_api(prompt, system_message, temperature, max_tokens, cache=cache)
         
         # 处理并解析响应为JSON
-        return self.process_json_response(response_text)
\ No newline at end of file
+        try:
+            return self.process_json_response(response_text)
+        except ValueError:
+            # 无法解析的响应不能留在缓存中，否则重试时会再次命中
+            cache_key = self._response_cache_key(prompt, system_message, temperature, max_tokens, cache)
+            if cache_key is not None:
+                llm_cache.invalidate(cache_key)
+            raise
\ No newline at end of file
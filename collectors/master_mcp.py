@@ -5,15 +5,14 @@ from enum import Enum
 import time
 from datetime import datetime
 
-# 导入所有MCP组件
-from collectors.search_mcp_old import SearchMcp, Document
-from collectors.query_generation_mcp import QueryGenerationMcp
-from collectors.analysis_mcp import AnalysisMcp, AnalysisResult
-from collectors.summary_writer_mcp import SummaryWriterMcp, SummaryConfig
-from collectors.outline_writer_mcp import OutlineWriterMcp, OutlineNode
-from collectors.detailed_content_writer_mcp import DetailedContentWriterMcp, ContentWritingConfig
+# 子MCP实例由服务注册表按需构造，这里只导入数据类型
+from collectors.search_mcp_old import Document
+from collectors.analysis_mcp import AnalysisResult
+from collectors.summary_writer_mcp import SummaryConfig
+from collectors.outline_writer_mcp import OutlineNode
+from collectors.detailed_content_writer_mcp import ContentWritingConfig
 from collectors.user_interaction_mcp import UserInteractionMcp
-from collectors.llm_processor import LLMProcessor
+from collectors.service_registry import get_llm_processor, get_service
 
 
 class TaskType(Enum):
@@ -86,12 +85,12 @@ class MasterMcp:
         print("🚀 初始化MasterMcp统一管理系统...")
         
         # 初始化所有子MCP组件
-        self.search_mcp = SearchMcp()
-        self.query_mcp = QueryGenerationMcp()
-        self.analysis_mcp = AnalysisMcp()
-        self.summary_mcp = SummaryWriterMcp()
-        self.outline_mcp = OutlineWriterMcp()
-        self.content_mcp = DetailedContentWriterMcp()
+        self.search_mcp = get_service("search_mcp")
+        self.query_mcp = get_service("query_generation_mcp")
+        self.analysis_mcp = get_service("analysis_mcp")
+        self.summary_mcp = get_service("summary_writer_mcp")
+        self.outline_mcp = get_service("outline_writer_mcp")
+        self.content_mcp = get_service("detailed_content_writer_mcp")
         
         # 用户交互组件（可选）
         if enable_user_interaction:
@@ -101,7 +100,7 @@ class MasterMcp:
         
         # LLM处理器用于意图理解
         try:
-            self.llm_processor = LLMProcessor()
+            self.llm_processor = get_llm_processor()
             self.has_llm = True
         except:
             self.has_llm = False
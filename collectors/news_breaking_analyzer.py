@@ -8,6 +8,8 @@ from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import threading
+from .usage_ledger import submit_in_context
+from .llm_governor import batch_priority
 
 class BreakingNewsAnalyzer:
     """重大新闻分析器 - 并行版本"""
@@ -24,6 +26,7 @@ class BreakingNewsAnalyzer:
         self.max_workers = max_workers
         self.analysis_lock = threading.Lock()
         
+    @batch_priority
     def analyze_breaking_news_parallel(self, topic: str, breaking_news: List[Dict], days: int = 7) -> str:
         """
         并行分析重大新闻
@@ -46,14 +49,14 @@ class BreakingNewsAnalyzer:
             # 步骤1：并行生成事件摘要和深度分析
             with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
                 # 任务1：生成重大事件摘要
-                summary_future = executor.submit(
-                    self._generate_major_events_summary,
+                summary_future = submit_in_context(
+                    executor, self._generate_major_events_summary,
                     topic, breaking_news, days
                 )
                 
                 # 任务2：生成深度分析
-                analysis_future = executor.submit(
-                    self._generate_depth_analysis,
+                analysis_future = submit_in_context(
+                    executor, self._generate_depth_analysis,
                     topic, breaking_news, days
                 )
                 
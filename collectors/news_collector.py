@@ -1,13 +1,10 @@
 import requests
-import feedparser
 from datetime import datetime, timedelta
-from dateutil import parser
-from tqdm import tqdm
 import config
 import re
-from bs4 import BeautifulSoup
 import random
 import time
+from collectors.feed_store import feed_store
 
 class NewsCollector:
     def __init__(self, api_key=None):
@@ -35,6 +32,9 @@ class NewsCollector:
             "https://www.technologyreview.com/topnews.rss",    # MIT Technology Review
         ])
         
+        # 本地RSS存储（进程内共享，避免每次查询重新下载所有RSS源）
+        self.feed_store = feed_store
+        
     def search_news_api(self, query, days_back=7):
         """
         Search for news articles related to a query from NewsAPI
@@ -189,6 +189,8 @@ class NewsCollector:
         """
         从RSS源搜索新闻
         
+        先刷新本地RSS存储（并发条件请求，刷新间隔内轮询过的源直接跳过），再在本地按发布时间和查询词检索
+        
         Args:
             feeds (list): RSS源URL列表
             query (str): 搜索查询
@@ -197,95 +199,12 @@ class NewsCollector:
         Returns:
             list: 包含文章信息的字典列表
         """
-        results = []
-        current_date = datetime.now()
-        cutoff_date = current_date - timedelta(days=days_back)
-        
-        for feed_url in tqdm(feeds, desc="搜索RSS源"):
-            try:
-                feed = feedparser.parse(feed_url)
-                feed_title = feed.feed.title if hasattr(feed.feed, 'title') else feed_url
-                
-                for entry in feed.entries:
-                    # 跳过没有发布日期的条目
-                    if not hasattr(entry, 'published'):
-                        continue
-                        
-                    try:
-                        pub_date = parser.parse(entry.published)
-                        # 计算文章年龄（小时）
-                        age_hours = (current_date - pub_date).total_seconds() / 3600
-                        
-                        # 根据时间过滤和评分
-                        if age_hours > days_back * 24:  # 超过指定天数
-                            continue
-                            
-                        # 计算时效性分数
-                        if age_hours <= 6:
-                            time_score = 1.0  # 6小时内的文章获得满分
-                        elif age_hours <= 12:
-                            time_score = 0.9
-                        elif age_hours <= 24:
-                            time_score = 0.8
-                        elif age_hours <= 48:
-                            time_score = 0.7
-                        elif age_hours <= 72:
-                            time_score = 0.6
-                        else:
-                            time_score = 0.5
-                            
-                        # 检查中英文查询词是否在标题或摘要中
-                        title = entry.title if hasattr(entry, 'title') else ""
-                        summary = entry.summary if hasattr(entry, 'summary') else ""
-                        content = entry.content[0].value if hasattr(entry, 'content') and len(entry.content) > 0 else summary
-                        
-                        # 更灵活的匹配方式，支持中英文关键词
-                        combined_text = (title + " " + summary).lower()
-                        query_terms = query.lower().split()
-                        
-                        # 计算相关性分数
-                        relevance_score = sum(term in combined_text for term in query_terms) / len(query_terms)
-                        
-                        # 只保留相关性超过阈值的文章
-                        if relevance_score < 0.3:  # 相关性阈值
-                            continue
-                            
-                        # 提取更完整的正文内容
-                        if hasattr(entry, 'content') and len(entry.content) > 0:
-                            full_content = entry.content[0].value
-                            try:
-                                soup = BeautifulSoup(full_content, 'html.parser')
-                                clean_content = soup.get_text()
-                            except:
-                                clean_content = full_content
-                        else:
-                            clean_content = summary
-                            
-                        # 计算综合分数（时效性权重更高）
-                        final_score = time_score * 0.6 + relevance_score * 0.4
-                        
-                        article_info = {
-                            'title': title,
-                            'authors': [entry.author] if hasattr(entry, 'author') else ['Unknown'],
-                            'summary': summary,
-                            'published': pub_date.strftime('%Y-%m-%d %H:%M:%S'),  # 保存更精确的时间
-                            'url': entry.link if hasattr(entry, 'link') else "",
-                            'source': feed_title,
-                            'content': clean_content,
-                            'time_score': time_score,
-                            'relevance_score': relevance_score,
-                            'final_score': final_score
-                        }
-                        results.append(article_info)
-                        
-                    except Exception:
-                        continue
-                        
-            except Exception as e:
-                print(f"处理Feed {feed_url}时出错: {str(e)}")
-                
-        # 按综合分数排序，优先展示最新最相关的新闻
-        results.sort(key=lambda x: x['final_score'], reverse=True)
+        try:
+            self.feed_store.refresh(feeds)
+            results = self.feed_store.search(query, days_back, feeds=feeds)
+        except Exception as e:
+            print(f"搜索RSS源时出错: {str(e)}")
+            results = []
         
         print(f"从RSS源找到 {len(results)} 篇文章")
         return results
@@ -6,6 +6,7 @@
 import time
 from typing import List, Dict, Any, Optional
 import threading
+from .llm_governor import batch_priority
 
 class InnovationNewsAnalyzer:
     """技术创新新闻分析器 - 并行版本"""
@@ -22,6 +23,7 @@ class InnovationNewsAnalyzer:
         self.max_workers = max_workers
         self.analysis_lock = threading.Lock()
         
+    @batch_priority
     def analyze_innovation_news_parallel(self, topic: str, innovation_news: List[Dict]) -> str:
         """
         并行分析技术创新新闻
@@ -6,6 +6,7 @@
 import time
 from typing import List, Dict, Any, Optional
 import threading
+from .llm_governor import batch_priority
 
 class InvestmentNewsAnalyzer:
     """投资动态新闻分析器 - 并行版本"""
@@ -22,6 +23,7 @@ class InvestmentNewsAnalyzer:
         self.max_workers = max_workers
         self.analysis_lock = threading.Lock()
         
+    @batch_priority
     def analyze_investment_news_parallel(self, topic: str, investment_news: List[Dict]) -> str:
         """
         并行分析投资动态新闻
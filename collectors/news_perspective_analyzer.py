@@ -6,6 +6,7 @@
 import time
 from typing import List, Dict, Any, Optional
 import threading
+from .llm_governor import batch_priority
 
 class PerspectiveAnalyzer:
     """观点对比分析器 - 并行版本"""
@@ -22,6 +23,7 @@ class PerspectiveAnalyzer:
         self.max_workers = max_workers
         self.analysis_lock = threading.Lock()
         
+    @batch_priority
     def analyze_perspective_parallel(self, topic: str, perspective_data: List[Dict]) -> str:
         """
         并行分析观点对比
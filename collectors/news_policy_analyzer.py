@@ -6,6 +6,7 @@
 import time
 from typing import List, Dict, Any, Optional
 import threading
+from .llm_governor import batch_priority
 
 class PolicyNewsAnalyzer:
     """政策监管新闻分析器 - 并行版本"""
@@ -22,6 +23,7 @@ class PolicyNewsAnalyzer:
         self.max_workers = max_workers
         self.analysis_lock = threading.Lock()
         
+    @batch_priority
     def analyze_policy_news_parallel(self, topic: str, policy_news: List[Dict]) -> str:
         """
         并行分析政策监管新闻
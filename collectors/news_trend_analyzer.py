@@ -7,6 +7,7 @@ import time
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 import threading
+from .llm_governor import batch_priority
 
 class TrendNewsAnalyzer:
     """行业趋势新闻分析器 - 并行版本"""
@@ -23,6 +24,7 @@ class TrendNewsAnalyzer:
         self.max_workers = max_workers
         self.analysis_lock = threading.Lock()
         
+    @batch_priority
     def analyze_trend_news_parallel(self, topic: str, trend_news: List[Dict], days: int = 7) -> str:
         """
         并行分析行业趋势新闻
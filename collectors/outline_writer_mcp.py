@@ -1,7 +1,7 @@
 import json
 from typing import List, Dict, Optional, Union
 from dataclasses import dataclass
-from collectors.llm_processor import LLMProcessor
+from collectors.service_registry import get_llm_processor
 from collectors.search_mcp_old import Document
 
 
@@ -54,7 +54,7 @@ class OutlineWriterMcp:
     def __init__(self):
         """初始化OutlineWriterMcp"""
         try:
-            self.llm_processor = LLMProcessor()
+            self.llm_processor = get_llm_processor()
             self.has_llm = True
             print("✅ OutlineWriterMcp初始化完成")
         except Exception as e:
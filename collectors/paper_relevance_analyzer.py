@@ -3,6 +3,8 @@ import re
 from typing import List, Dict, Any
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import threading
+from .usage_ledger import submit_in_context
+from .llm_governor import batch_priority
 
 
 class PaperRelevanceAnalyzer:
@@ -53,7 +55,8 @@ class PaperRelevanceAnalyzer:
 }}"""
 
         try:
-            response = self.llm_processor.call_llm_api(prompt, system_prompt)
+            # 同一批论文的相关性评分在多次运行间重复出现，走响应缓存
+            response = self.llm_processor.call_llm_api(prompt, system_prompt, cache=True)
             
             # 解析JSON响应
             json_match = re.search(r'\{[\s\S]*\}', response)
@@ -82,6 +85,7 @@ class PaperRelevanceAnalyzer:
             print(f"评估批次出错: {str(e)}")
             return batch
     
+    @batch_priority
     def preprocess_research_items(self, research_items: List[Dict], topic: str) -> List[Dict]:
         """
         预处理学术论文，评估与主题的相关性，并筛选出最相关的论文
@@ -108,7 +112,7 @@ class PaperRelevanceAnalyzer:
         with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
             # 提交所有批次任务
             future_to_batch = {
-                executor.submit(self.analyze_batch_relevance, batch, topic, english_topic): batch 
+                submit_in_context(executor, self.analyze_batch_relevance, batch, topic, english_topic): batch 
                 for batch in batches
             }
             
@@ -6,6 +6,8 @@ import re
 from .paper_relevance_analyzer import PaperRelevanceAnalyzer
 from .article_analyzer import ArticleAnalyzer
 from .research_direction_analyzer import ResearchDirectionAnalyzer
+from .usage_ledger import submit_in_context
+from .llm_governor import batch_priority
 
 
 class ParallelLLMProcessor:
@@ -39,6 +41,7 @@ class ParallelLLMProcessor:
             max_workers=self.config['direction_analyzer']['max_workers']
         )
     
+    @batch_priority
     def process_research_data_parallel(self, research_items: List[Dict], topic: str) -> Dict[str, Any]:
         """
         并行处理研究数据的完整流程
@@ -71,19 +74,19 @@ class ParallelLLMProcessor:
         
         with ThreadPoolExecutor(max_workers=3) as executor:
             # 提交三个主要任务
-            future_directions_trends = executor.submit(
-                self.direction_analyzer.analyze_directions_and_trends_parallel,
+            future_directions_trends = submit_in_context(
+                executor, self.direction_analyzer.analyze_directions_and_trends_parallel,
                 research_text_with_refs, url_reference_list, topic
             )
             
-            future_articles = executor.submit(
-                self.article_analyzer.analyze_articles_parallel,
+            future_articles = submit_in_context(
+                executor, self.article_analyzer.analyze_articles_parallel,
                 analysis_items, topic
             )
             
             # 如果需要生成搜索关键词，也可以并行执行
-            future_keywords = executor.submit(
-                self._generate_search_keywords, topic
+            future_keywords = submit_in_context(
+                executor, self._generate_search_keywords, topic
             )
             
             # 收集结果
@@ -15,6 +15,8 @@ from .news_investment_analyzer import InvestmentNewsAnalyzer
 from .news_policy_analyzer import PolicyNewsAnalyzer
 from .news_trend_analyzer import TrendNewsAnalyzer
 from .news_perspective_analyzer import PerspectiveAnalyzer
+from .usage_ledger import submit_in_context
+from .llm_governor import batch_priority, llm_governor
 
 class ParallelNewsProcessor:
     """
@@ -67,6 +69,7 @@ class ParallelNewsProcessor:
         
         print(f"🚀 [并行新闻处理器] 已初始化，配置: {self.config.get('mode', 'balanced')}")
     
+    @batch_priority
     def process_news_report_parallel(self, topic: str, all_news_data: Dict[str, List], 
                                    companies: Optional[List[str]] = None, 
                                    days: int = 7) -> Tuple[str, Dict[str, Any]]:
@@ -116,33 +119,33 @@ class ParallelNewsProcessor:
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
             # 提交所有分析任务
             future_to_analysis = {
-                executor.submit(
-                    self.breaking_analyzer.analyze_breaking_news_parallel,
+                submit_in_context(
+                    executor, self.breaking_analyzer.analyze_breaking_news_parallel,
                     topic, all_news_data.get("breaking_news", []), days
                 ): "breaking_news",
                 
-                executor.submit(
-                    self.innovation_analyzer.analyze_innovation_news_parallel,
+                submit_in_context(
+                    executor, self.innovation_analyzer.analyze_innovation_news_parallel,
                     topic, all_news_data.get("innovation_news", [])
                 ): "innovation_news",
                 
-                executor.submit(
-                    self.investment_analyzer.analyze_investment_news_parallel,
+                submit_in_context(
+                    executor, self.investment_analyzer.analyze_investment_news_parallel,
                     topic, all_news_data.get("investment_news", [])
                 ): "investment_news",
                 
-                executor.submit(
-                    self.policy_analyzer.analyze_policy_news_parallel,
+                submit_in_context(
+                    executor, self.policy_analyzer.analyze_policy_news_parallel,
                     topic, all_news_data.get("policy_news", [])
                 ): "policy_news",
                 
-                executor.submit(
-                    self.trend_analyzer.analyze_trend_news_parallel,
+                submit_in_context(
+                    executor, self.trend_analyzer.analyze_trend_news_parallel,
                     topic, all_news_data.get("trend_news", []), days
                 ): "trend_news",
                 
-                executor.submit(
-                    self.perspective_analyzer.analyze_perspective_parallel,
+                submit_in_context(
+                    executor, self.perspective_analyzer.analyze_perspective_parallel,
                     topic, all_news_data.get("perspective_analysis", [])
                 ): "perspective_analysis"
             }
@@ -389,5 +392,6 @@ class ParallelNewsProcessor:
                 "PerspectiveAnalyzer"
             ],
             "parallel_stages": 3,
-            "estimated_speedup": "60-70% time reduction"
+            "estimated_speedup": "60-70% time reduction",
+            "llm_governor": llm_governor.get_stats()
         } 
\ No newline at end of file
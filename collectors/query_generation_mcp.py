@@ -1,7 +1,7 @@
 import json
 from typing import List, Dict, Optional
 from dataclasses import dataclass
-from collectors.llm_processor import LLMProcessor
+from collectors.service_registry import get_llm_processor
 
 
 @dataclass
@@ -40,7 +40,7 @@ class QueryGenerationMcp:
     def __init__(self):
         """初始化QueryGenerationMcp"""
         try:
-            self.llm_processor = LLMProcessor()
+            self.llm_processor = get_llm_processor()
             self.has_llm = True
             print("✅ QueryGenerationMcp初始化完成")
         except Exception as e:
@@ -0,0 +1,64 @@
+"""
+请求速率限制器
+
+各外部API（学术数据库、搜索引擎）都有自己的速率上限，原先在每次请求后固定 time.sleep(1)，
+既浪费并发时间，也无法跨线程生效。RateLimiter 按每秒请求数给请求分配时间槽，
+线程安全，多个线程共享同一个限制器时总速率仍不超过上限。
+"""
+
+import threading
+import time
+from typing import Dict
+
+
+class RateLimiter:
+    """线程安全的请求速率限制器（按最小间隔排队，先到先得）"""
+
+    def __init__(self, rate_per_second: float, burst: int = 1):
+        """
+        初始化限制器
+
+        Args:
+            rate_per_second: 每秒请求数上限，<=0表示不限制
+            burst: 空闲后允许连续发出的请求数
+        """
+        self.rate_per_second = float(rate_per_second)
+        self.interval = 1.0 / self.rate_per_second if self.rate_per_second > 0 else 0.0
+        self.burst = max(1, int(burst))
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+        self.total_wait = 0.0
+        self.requests = 0
+
+    def acquire(self) -> float:
+        """阻塞直到可以发出下一个请求，返回等待的秒数"""
+        if self.interval <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            # 空闲期间最多积累burst个请求的额度
+            slot = max(self._next_slot, now - (self.burst - 1) * self.interval)
+            self._next_slot = slot + self.interval
+            wait = max(0.0, slot - now)
+            self.total_wait += wait
+            self.requests += 1
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def get_stats(self) -> Dict[str, float]:
+        """获取限制器统计信息"""
+        with self._lock:
+            return {
+                "rate_per_second": self.rate_per_second,
+                "requests": self.requests,
+                "total_wait": self.total_wait,
+            }
+
@@ -1,6 +1,8 @@
 from typing import List, Dict, Any, Tuple
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import threading
+from .usage_ledger import submit_in_context
+from .llm_governor import batch_priority
 
 
 class ResearchDirectionAnalyzer:
@@ -112,6 +114,7 @@ class ResearchDirectionAnalyzer:
                 print(f"生成未来展望时出错: {str(e)}")
             return "暂无未来展望分析。"
     
+    @batch_priority
     def analyze_directions_and_trends_parallel(self, research_text_with_refs: str, url_reference_list: str, topic: str) -> Tuple[str, str]:
         """并行分析研究方向和未来趋势"""
         print("开始并行分析研究方向和未来趋势...")
@@ -121,8 +124,8 @@ class ResearchDirectionAnalyzer:
         
         with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
             # 提交两个分析任务
-            future_directions = executor.submit(self.identify_research_directions, research_text_with_refs, url_reference_list, topic)
-            future_trends = executor.submit(self.analyze_future_trends, research_text_with_refs, url_reference_list, topic)
+            future_directions = submit_in_context(executor, self.identify_research_directions, research_text_with_refs, url_reference_list, topic)
+            future_trends = submit_in_context(executor, self.analyze_future_trends, research_text_with_refs, url_reference_list, topic)
             
             # 收集结果
             for future in as_completed([future_directions, future_trends]):
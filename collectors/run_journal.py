@@ -0,0 +1,197 @@
+"""
+编排运行日志
+
+orchestrator_mcp 的一次完整运行要经过 意图→大纲→查询→搜索→质量迭代→摘要→章节→组装 多个阶段，
+耗时10-20分钟且大量调用LLM，原先任何一步失败都要从头再来。RunJournal 在每个阶段完成后
+把该阶段的输出写入 <RUN_JOURNAL_DIR>/<run_id>/ 目录：
+1. meta.json 记录任务参数和已完成的阶段
+2. <stage>.json 保存各阶段输出（大纲结构、查询列表、去重后的搜索语料、执行摘要等）
+3. sections/<序号>.json 保存每个章节的内容，章节完成即写入，中途失败时已完成的章节不会丢失
+恢复运行时跳过已完成的阶段和章节；也可以基于缓存的搜索语料单独重写某个章节。
+所有文件先写临时文件再替换，进程中断不会留下半个文件。
+"""
+
+import json
+import os
+import re
+import threading
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import config
+
+# run_id 来自客户端请求，会直接拼进日志目录，只允许字母、数字、下划线和短横线
+_RUN_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+
+def _json_safe(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """只保留可以JSON序列化的参数"""
+    safe = {}
+    for key, value in kwargs.items():
+        try:
+            json.dumps(value, ensure_ascii=False)
+        except (TypeError, ValueError):
+            continue
+        safe[key] = value
+    return safe
+
+
+def _write_json(path: Path, data: Any):
+    tmp_path = path.with_suffix(path.suffix + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _read_json(path: Path) -> Any:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class RunJournal:
+    """单次编排运行的阶段日志"""
+
+    def __init__(self, run_id: str, root: Optional[str] = None):
+        """
+        Args:
+            run_id: 运行ID，只能包含字母、数字、下划线和短横线（最长64个字符）
+            root: 日志根目录，默认使用config.RUN_JOURNAL_DIR
+
+        Raises:
+            ValueError: run_id格式不合法或日志目录超出根目录
+        """
+        if not isinstance(run_id, str) or not _RUN_ID_PATTERN.match(run_id):
+            raise ValueError(f"无效的运行ID: {run_id!r}")
+        self.run_id = run_id
+        self.root = Path(root or getattr(config, 'RUN_JOURNAL_DIR', os.path.join("data", "runs")))
+        self.path = self.root / run_id
+        if self.root.resolve() not in self.path.resolve().parents:
+            raise ValueError(f"运行日志目录超出根目录: {run_id!r}")
+        self._lock = threading.Lock()
+        self._meta: Dict[str, Any] = {}
+
+    @staticmethod
+    def enabled() -> bool:
+        """是否默认为每次运行创建日志"""
+        return getattr(config, 'RUN_JOURNAL_ENABLED', True)
+
+    @classmethod
+    def create(cls, task: str, task_type: str, kwargs: Dict[str, Any], run_id: Optional[str] = None,
+               root: Optional[str] = None) -> 'RunJournal':
+        """为新的运行创建日志"""
+        run_id = run_id or f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        journal = cls(run_id, root)
+        (journal.path / "sections").mkdir(parents=True, exist_ok=True)
+        now = datetime.now().isoformat()
+        journal._meta = {
+            "run_id": run_id,
+            "task": task,
+            "task_type": task_type,
+            "kwargs": _json_safe(kwargs),
+            "created_at": now,
+            "updated_at": now,
+            "completed_stages": [],
+            "status": "running",
+        }
+        journal._save_meta()
+        return journal
+
+    @classmethod
+    def load(cls, run_id: str, root: Optional[str] = None) -> 'RunJournal':
+        """加载已有的运行日志，不存在时抛出FileNotFoundError"""
+        journal = cls(run_id, root)
+        meta_path = journal.path / "meta.json"
+        if not meta_path.exists():
+            raise FileNotFoundError(f"运行日志不存在: {run_id}")
+        journal._meta = _read_json(meta_path)
+        (journal.path / "sections").mkdir(parents=True, exist_ok=True)
+        return journal
+
+    @classmethod
+    def list_runs(cls, root: Optional[str] = None) -> List[Dict[str, Any]]:
+        """列出全部运行（按创建时间倒序）"""
+        root_path = Path(root or getattr(config, 'RUN_JOURNAL_DIR', os.path.join("data", "runs")))
+        if not root_path.exists():
+            return []
+        runs = []
+        for meta_path in root_path.glob("*/meta.json"):
+            try:
+                runs.append(_read_json(meta_path))
+            except (OSError, ValueError):
+                continue
+        return sorted(runs, key=lambda meta: meta.get("created_at", ""), reverse=True)
+
+    @property
+    def meta(self) -> Dict[str, Any]:
+        return dict(self._meta)
+
+    @property
+    def task(self) -> str:
+        return self._meta.get("task", "")
+
+    @property
+    def task_type(self) -> str:
+        return self._meta.get("task_type", "auto")
+
+    @property
+    def kwargs(self) -> Dict[str, Any]:
+        return dict(self._meta.get("kwargs", {}))
+
+    def _save_meta(self):
+        self._meta["updated_at"] = datetime.now().isoformat()
+        _write_json(self.path / "meta.json", self._meta)
+
+    def has(self, stage: str) -> bool:
+        """阶段是否已完成"""
+        return stage in self._meta.get("completed_stages", [])
+
+    def load_stage(self, stage: str) -> Any:
+        """读取已完成阶段的输出"""
+        return _read_json(self.path / f"{stage}.json")
+
+    def save_stage(self, stage: str, data: Any):
+        """保存阶段输出并标记为已完成"""
+        with self._lock:
+            _write_json(self.path / f"{stage}.json", data)
+            if stage not in self._meta["completed_stages"]:
+                self._meta["completed_stages"].append(stage)
+            self._save_meta()
+
+    def invalidate(self, *stages: str):
+        """把阶段标记为未完成（如重写章节后需要重新组装报告）"""
+        with self._lock:
+            self._meta["completed_stages"] = [s for s in self._meta["completed_stages"] if s not in stages]
+            self._save_meta()
+
+    def save_section(self, index: int, title: str, content: str):
+        """保存单个章节的内容"""
+        _write_json(self.path / "sections" / f"{index:03d}.json", {
+            "index": index,
+            "title": title,
+            "content": content,
+            "saved_at": datetime.now().isoformat(),
+        })
+
+    def load_sections(self, section_titles: List[str]) -> Dict[int, str]:
+        """读取已完成的章节，返回 {章节序号: 内容}，标题与当前大纲不一致的章节忽略"""
+        sections = {}
+        for index, title in enumerate(section_titles):
+            section_path = self.path / "sections" / f"{index:03d}.json"
+            if not section_path.exists():
+                continue
+            try:
+                data = _read_json(section_path)
+            except (OSError, ValueError):
+                continue
+            if data.get("title") == title:
+                sections[index] = data.get("content", "")
+        return sections
+
+    def finish(self, status: str = "completed", error: Optional[str] = None):
+        """记录运行结束状态"""
+        with self._lock:
+            self._meta["status"] = status
+            self._meta["error"] = error
+            self._save_meta()
@@ -8,13 +8,8 @@ from dataclasses import dataclass, asdict
 from urllib.parse import urlparse
 import threading
 
-# 导入现有的收集器
-from collectors.tavily_collector import TavilyCollector
-from collectors.brave_search_collector import BraveSearchCollector
-from collectors.google_search_collector import GoogleSearchCollector
-from collectors.arxiv_collector import ArxivCollector
-from collectors.academic_collector import AcademicCollector
-from collectors.news_collector import NewsCollector
+# 现有的收集器由共享服务注册表提供，进程内只构造一次
+from collectors.service_registry import get_service
 
 
 @dataclass
@@ -91,7 +86,7 @@ class SearchMcp:
         """初始化所有收集器"""
         # Web搜索收集器
         try:
-            tavily = TavilyCollector()
+            tavily = get_service("tavily_collector")
             if tavily.has_api_key:
                 self.collectors['tavily'] = tavily
                 print("✅ Tavily收集器已启用")
@@ -99,7 +94,7 @@ class SearchMcp:
             print(f"⚠️ Tavily收集器初始化失败: {str(e)}")
         
         try:
-            brave = BraveSearchCollector()
+            brave = get_service("brave_search_collector")
             if brave.has_api_key:
                 self.collectors['brave'] = brave
                 print("✅ Brave收集器已启用")
@@ -107,7 +102,7 @@ class SearchMcp:
             print(f"⚠️ Brave收集器初始化失败: {str(e)}")
         
         try:
-            google = GoogleSearchCollector()
+            google = get_service("google_search_collector")
             if google.has_api_key:
                 self.collectors['google'] = google
                 print("✅ Google收集器已启用")
@@ -116,14 +111,14 @@ class SearchMcp:
         
         # 学术搜索收集器
         try:
-            arxiv = ArxivCollector()
+            arxiv = get_service("arxiv_collector")
             self.collectors['arxiv'] = arxiv
             print("✅ ArXiv收集器已启用")
         except Exception as e:
             print(f"⚠️ ArXiv收集器初始化失败: {str(e)}")
         
         try:
-            academic = AcademicCollector()
+            academic = get_service("academic_collector")
             self.collectors['academic'] = academic
             print("✅ Academic收集器已启用")
         except Exception as e:
@@ -131,7 +126,7 @@ class SearchMcp:
         
         # 新闻收集器
         try:
-            news = NewsCollector()
+            news = get_service("news_collector")
             self.collectors['news'] = news
             print("✅ News收集器已启用")
         except Exception as e:
@@ -0,0 +1,110 @@
+"""
+章节并发调度器
+
+报告的各个章节只依赖执行摘要和搜索结果，彼此独立，可以并发生成。
+调度器在有界线程池中执行章节任务，并按提交顺序产出结果（提前完成的章节先缓存）；
+同时感知上游LLM限流：一旦出现限流就把并发上限减半，之后每完成一个任务恢复1个并发。
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+import config
+from collectors.llm_processor import get_rate_limit_hits, is_rate_limit_error
+from collectors.usage_ledger import submit_in_context
+
+
+class SectionScheduler:
+    """按大纲顺序输出的章节并发调度器"""
+
+    def __init__(self, max_concurrency: Optional[int] = None, max_retries: int = 2,
+                 backoff: Optional[float] = None):
+        """
+        初始化调度器
+
+        Args:
+            max_concurrency: 最大并发章节数，默认读取config.SECTION_MAX_CONCURRENCY
+            max_retries: 任务因限流失败时的最大重试次数
+            backoff: 限流重试的退避基数（秒），第n次重试等待 backoff * n 秒
+        """
+        self.max_concurrency = max(1, int(max_concurrency or getattr(config, 'SECTION_MAX_CONCURRENCY', 3)))
+        self.max_retries = max_retries
+        self.backoff = backoff if backoff is not None else getattr(config, 'SECTION_RATE_LIMIT_BACKOFF', 5.0)
+
+        self._cond = threading.Condition()
+        self._limit = self.max_concurrency
+        self._active = 0
+        self._seen_rate_limit_hits = get_rate_limit_hits()
+        self.throttle_events = 0
+
+    @property
+    def current_limit(self) -> int:
+        """当前生效的并发上限"""
+        with self._cond:
+            return self._limit
+
+    def _acquire(self):
+        with self._cond:
+            while self._active >= self._limit:
+                self._cond.wait()
+            self._active += 1
+
+    def _release(self, rate_limited: bool):
+        with self._cond:
+            self._active -= 1
+            hits = get_rate_limit_hits()
+            if rate_limited or hits > self._seen_rate_limit_hits:
+                # 乘性减：出现限流后并发上限减半
+                self._seen_rate_limit_hits = hits
+                self._limit = max(1, self._limit // 2)
+                self.throttle_events += 1
+                print(f"⚠️ [章节调度] 检测到LLM限流，并发上限降为 {self._limit}")
+            elif self._limit < self.max_concurrency:
+                # 加性增：任务顺利完成后逐步恢复并发
+                self._limit += 1
+            self._cond.notify_all()
+
+    def _run_task(self, task: Callable[[], Any]) -> Any:
+        attempt = 0
+        while True:
+            self._acquire()
+            rate_limited = False
+            try:
+                return task()
+            except Exception as e:
+                if not is_rate_limit_error(e) or attempt >= self.max_retries:
+                    raise
+                rate_limited = True
+            finally:
+                self._release(rate_limited)
+            attempt += 1
+            time.sleep(self.backoff * attempt)
+
+    def iter_ordered(self, tasks: List[Callable[[], Any]]) -> Iterator[Tuple[int, Any]]:
+        """
+        并发执行任务，按提交顺序逐个产出 (序号, 结果)
+
+        某个任务抛出异常时，在轮到它的位置重新抛出。
+        """
+        if not tasks:
+            return
+
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(tasks))) as executor:
+            future_to_index = {
+                submit_in_context(executor, self._run_task, task): index
+                for index, task in enumerate(tasks)
+            }
+
+            completed = {}
+            next_index = 0
+            for future in as_completed(future_to_index):
+                completed[future_to_index[future]] = future
+                while next_index in completed:
+                    yield next_index, completed.pop(next_index).result()
+                    next_index += 1
+
+    def run(self, tasks: List[Callable[[], Any]]) -> List[Any]:
+        """并发执行任务，返回按提交顺序排列的结果列表"""
+        return [result for _, result in self.iter_ordered(tasks)]
@@ -0,0 +1,176 @@
+"""
+共享服务注册表
+
+MasterMcp 会新建 QueryGenerationMcp、AnalysisMcp 等子MCP，而子MCP、各收集器以及 main.py 中的多个函数
+又各自新建 LLMProcessor，同一进程里同样的组件被重复构造了十几次。
+注册表按名称登记组件的构造函数，首次获取时才构造，之后整个进程共享同一个实例：
+1. 线程安全，并发获取同一服务时只构造一次（每个服务一把锁，构造较慢的服务不会阻塞其他服务）
+2. 构造失败不缓存，异常抛给调用方，下次获取时重试
+3. 构造函数在内部导入依赖，导入注册表本身不会加载任何收集器
+"""
+
+import threading
+from typing import Any, Callable, Dict, List
+
+
+class ServiceRegistry:
+    """惰性初始化的进程级单例注册表"""
+
+    def __init__(self):
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, factory: Callable[[], Any], replace: bool = False):
+        """
+        登记服务的构造函数
+
+        Args:
+            name: 服务名称
+            factory: 无参构造函数
+            replace: 是否覆盖已登记的同名服务（同时丢弃已构造的实例）
+        """
+        with self._lock:
+            if name in self._factories and not replace:
+                raise ValueError(f"服务已登记: {name}")
+            self._factories[name] = factory
+            self._locks.setdefault(name, threading.Lock())
+            self._instances.pop(name, None)
+
+    def get(self, name: str) -> Any:
+        """获取共享实例，首次获取时构造"""
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+
+        with self._lock:
+            factory = self._factories.get(name)
+            lock = self._locks.get(name)
+        if factory is None:
+            raise KeyError(f"未登记的服务: {name}")
+
+        with lock:
+            instance = self._instances.get(name)
+            if instance is None:
+                instance = factory()
+                with self._lock:
+                    self._instances[name] = instance
+        return instance
+
+    def set(self, name: str, instance: Any):
+        """直接指定服务实例（如测试中替换为假对象）"""
+        with self._lock:
+            if name not in self._factories:
+                raise KeyError(f"未登记的服务: {name}")
+            self._instances[name] = instance
+
+    def reset(self, name: str = None):
+        """丢弃已构造的实例，下次获取时重新构造；不指定名称时丢弃全部"""
+        with self._lock:
+            if name is None:
+                self._instances.clear()
+            else:
+                self._instances.pop(name, None)
+
+    def is_initialized(self, name: str) -> bool:
+        """服务是否已构造"""
+        return name in self._instances
+
+    def names(self) -> List[str]:
+        """全部已登记的服务名称"""
+        with self._lock:
+            return list(self._factories)
+
+
+registry = ServiceRegistry()
+
+
+def get_service(name: str) -> Any:
+    """从进程级注册表获取共享实例"""
+    return registry.get(name)
+
+
+def get_llm_processor():
+    """进程内共享的LLMProcessor"""
+    return registry.get("llm_processor")
+
+
+def _llm_processor():
+    from collectors.llm_processor import LLMProcessor
+    return LLMProcessor()
+
+
+def _query_generation_mcp():
+    from collectors.query_generation_mcp import QueryGenerationMcp
+    return QueryGenerationMcp()
+
+
+def _analysis_mcp():
+    from collectors.analysis_mcp import AnalysisMcp
+    return AnalysisMcp()
+
+
+def _summary_writer_mcp():
+    from collectors.summary_writer_mcp import SummaryWriterMcp
+    return SummaryWriterMcp()
+
+
+def _outline_writer_mcp():
+    from collectors.outline_writer_mcp import OutlineWriterMcp
+    return OutlineWriterMcp()
+
+
+def _detailed_content_writer_mcp():
+    from collectors.detailed_content_writer_mcp import DetailedContentWriterMcp
+    return DetailedContentWriterMcp()
+
+
+def _search_mcp():
+    from collectors.search_mcp_old import SearchMcp
+    return SearchMcp()
+
+
+def _tavily_collector():
+    from collectors.tavily_collector import TavilyCollector
+    return TavilyCollector()
+
+
+def _brave_search_collector():
+    from collectors.brave_search_collector import BraveSearchCollector
+    return BraveSearchCollector()
+
+
+def _google_search_collector():
+    from collectors.google_search_collector import GoogleSearchCollector
+    return GoogleSearchCollector()
+
+
+def _arxiv_collector():
+    from collectors.arxiv_collector import ArxivCollector
+    return ArxivCollector()
+
+
+def _academic_collector():
+    from collectors.academic_collector import AcademicCollector
+    return AcademicCollector()
+
+
+def _news_collector():
+    from collectors.news_collector import NewsCollector
+    return NewsCollector()
+
+
+registry.register("llm_processor", _llm_processor)
+registry.register("query_generation_mcp", _query_generation_mcp)
+registry.register("analysis_mcp", _analysis_mcp)
+registry.register("summary_writer_mcp", _summary_writer_mcp)
+registry.register("outline_writer_mcp", _outline_writer_mcp)
+registry.register("detailed_content_writer_mcp", _detailed_content_writer_mcp)
+registry.register("search_mcp", _search_mcp)
+registry.register("tavily_collector", _tavily_collector)
+registry.register("brave_search_collector", _brave_search_collector)
+registry.register("google_search_collector", _google_search_collector)
+registry.register("arxiv_collector", _arxiv_collector)
+registry.register("academic_collector", _academic_collector)
+registry.register("news_collector", _news_collector)
@@ -1,6 +1,6 @@
 from typing import List, Dict, Optional, Union
 from dataclasses import dataclass
-from collectors.llm_processor import LLMProcessor
+from collectors.service_registry import get_llm_processor
 from collectors.search_mcp_old import Document
 
 
@@ -37,7 +37,7 @@ class SummaryWriterMcp:
     def __init__(self):
         """初始化SummaryWriterMcp"""
         try:
-            self.llm_processor = LLMProcessor()
+            self.llm_processor = get_llm_processor()
             self.has_llm = True
             print("✅ SummaryWriterMcp初始化完成")
         except Exception as e:
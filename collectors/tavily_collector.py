@@ -1,12 +1,13 @@
 import requests
-import json
 from datetime import datetime, timedelta
 from tqdm import tqdm
 import config
 import re
 import os
 from tenacity import retry, stop_after_attempt, wait_exponential
-from collectors.llm_processor import LLMProcessor
+from collectors.service_registry import get_llm_processor
+from collectors.usage_ledger import submit_in_context
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import time
 
 class TavilyCollector:
@@ -29,7 +30,7 @@ class TavilyCollector:
             # Check if we have OpenAI API key in config
             openai_key = getattr(config, "OPENAI_API_KEY", None)
             if openai_key:
-                self.llm_processor = LLMProcessor()
+                self.llm_processor = get_llm_processor()
                 print("LLM Processor initialized for advanced content generation")
             else:
                 print("OpenAI API key not found, LLM processing unavailable")
@@ -1439,7 +1440,11 @@ class TavilyCollector:
             
         return filtered_items
 
-    def evaluate_content_relevance(self, items, topic, criteria=None, llm_processor=None):
+    # 批量相关性评分的评分维度
+    RELEVANCE_CRITERIA = ("主题相关性", "时效性", "信息质量", "来源可靠性")
+
+    def evaluate_content_relevance(self, items, topic, criteria=None, llm_processor=None,
+                                   batch_size=None, max_workers=None):
         """
         评估内容与主题的相关性，并返回按相关性排序的结果
         
@@ -1448,6 +1453,8 @@ class TavilyCollector:
             topic (str): 主题
             criteria (dict, optional): 评估标准，包含权重
             llm_processor: LLM处理器实例，用于高级评分
+            batch_size (int, optional): 每次LLM调用评估的内容条数，默认读取config.RELEVANCE_BATCH_SIZE
+            max_workers (int, optional): 同时进行的批次数，默认读取config.RELEVANCE_MAX_WORKERS
             
         Returns:
             list: 按相关性得分排序的内容项列表
@@ -1464,134 +1471,47 @@ class TavilyCollector:
         }
         
         criteria = criteria or default_criteria
-        scored_items = []
         
         print(f"正在评估{len(items)}条内容与'{topic}'的相关性...")
         
-        # 使用LLM处理器进行高级相关性评分
+        # 使用LLM处理器进行高级相关性评分：多条内容打包为一次调用，各批次并发执行
         if llm_processor:
             try:
-                for item in items:
-                    # 确保内容字段的存在
-                    title = item.get('title', '')
-                    content = item.get('content', '')
-                    if not content and not title:
-                        continue
-                        
-                    # 创建评估提示
-                    prompt = f"""
-                    请评估以下内容与'{topic}'主题的相关性和信息质量，根据以下标准给出1-10分的评分：
-                    
-                    标题: {title}
-                    内容: {content[:500]}...
-                    
-                    评分标准:
-                    1. 主题相关性 (1-10分): 内容与'{topic}'主题的直接相关程度
-                    2. 时效性 (1-10分): 内容的新鲜度和时效性
-                    3. 信息质量 (1-10分): 内容的完整性、深度和信息量
-                    4. 来源可靠性 (1-10分): 来源的权威性和可信度
-                    
-                    请以JSON格式返回评分，只包含以下字段:
-                    {{
-                        "主题相关性": 分数,
-                        "时效性": 分数,
-                        "信息质量": 分数,
-                        "来源可靠性": 分数,
-                        "总分": 加权总分
-                    }}
-                    """
-                    
-                    try:
-                        # 使用专门的JSON API调用方法
-                        system_message = "你是一位专业的内容评估专家，擅长评估内容的相关性、质量和时效性。你的回答必须是严格的JSON格式，不包含任何其他文本。"
-                        
+                scored_items = [item for item in items if item.get('title') or item.get('content')]
+                batch_size = max(1, batch_size or getattr(config, 'RELEVANCE_BATCH_SIZE', 10))
+                max_workers = max(1, max_workers or getattr(config, 'RELEVANCE_MAX_WORKERS', 4))
+                numbered = list(enumerate(scored_items))
+                batches = [numbered[i:i + batch_size] for i in range(0, len(numbered), batch_size)]
+                
+                llm_scores = {}
+                with ThreadPoolExecutor(max_workers=min(max_workers, len(batches) or 1)) as executor:
+                    futures = {
+                        submit_in_context(executor, self._score_relevance_batch, batch, topic, llm_processor): batch
+                        for batch in batches
+                    }
+                    for future in as_completed(futures):
                         try:
-                            # 尝试使用新的JSON专用API调用
-                            scores = llm_processor.call_llm_api_json(prompt, system_message)
-                            
-                            # 计算加权得分
-                            weighted_score = 0
-                            for criterion, weight in criteria.items():
-                                if criterion in scores:
-                                    weighted_score += scores[criterion] * weight
-                                    
-                            # 如果JSON中没有提供总分，使用计算的加权分数
-                            final_score = scores.get("总分", weighted_score)
-                            
-                            # 将分数存储到内容项中
-                            item["relevance_score"] = final_score
-                            item["detailed_scores"] = scores
-                            
-                        except AttributeError:
-                            # 如果llm_processor没有call_llm_api_json方法，使用标准调用并处理结果
-                            result = llm_processor.call_llm_api(prompt, system_message)
-                            
-                            # 尝试解析JSON
-                            try:
-                                # 清理可能的Markdown代码块标记
-                                cleaned_result = result
-                                
-                                # 移除可能的代码块标记
-                                if "```" in cleaned_result:
-                                    import re
-                                    code_block_match = re.search(r'```(?:json)?\s*([\s\S]*?)\s*```', cleaned_result)
-                                    if code_block_match:
-                                        cleaned_result = code_block_match.group(1).strip()
-                                
-                                # 提取JSON部分
-                                json_start = cleaned_result.find('{')
-                                json_end = cleaned_result.rfind('}') + 1
-                                
-                                if json_start >= 0 and json_end > json_start:
-                                    json_text = cleaned_result[json_start:json_end]
-                                    scores = json.loads(json_text)
-                                else:
-                                    scores = json.loads(cleaned_result)
-                                
-                                # 计算加权得分
-                                weighted_score = 0
-                                for criterion, weight in criteria.items():
-                                    if criterion in scores:
-                                        weighted_score += scores[criterion] * weight
-                                        
-                                # 使用计算的加权分数
-                                final_score = scores.get("总分", weighted_score)
-                                
-                                # 将分数存储到内容项中
-                                item["relevance_score"] = final_score
-                                item["detailed_scores"] = scores
-                                
-                            except (json.JSONDecodeError, ValueError) as json_err:
-                                print(f"无法解析评分结果: {result}")
-                                print(f"JSON错误: {str(json_err)}")
-                                # 失败时给默认分数
-                                item["relevance_score"] = 5.0
-                                item["detailed_scores"] = {
-                                    "主题相关性": 5.0,
-                                    "时效性": 5.0,
-                                    "信息质量": 5.0,
-                                    "来源可靠性": 5.0,
-                                    "总分": 5.0
-                                }
-                        
-                    except Exception as e:
-                        print(f"评估内容时出错: {str(e)}")
-                        # 出错时给予默认分数
-                        item["relevance_score"] = 5.0
-                        item["detailed_scores"] = {
-                            "主题相关性": 5.0,
-                            "时效性": 5.0,
-                            "信息质量": 5.0,
-                            "来源可靠性": 5.0,
-                            "总分": 5.0
-                        }
-                        
-                    scored_items.append(item)
-                    
+                            llm_scores.update(future.result())
+                        except Exception as e:
+                            print(f"批量评估内容时出错: {str(e)}，该批次使用备用评估方法")
+                
+                # 响应中缺失的内容使用启发式评分
+                missing = 0
+                for index, item in enumerate(scored_items):
+                    scores = llm_scores.get(index)
+                    if scores is None:
+                        missing += 1
+                        weighted_score, scores = self._heuristic_relevance_scores(item, topic, criteria)
+                    else:
+                        weighted_score = self._weighted_relevance_score(scores, criteria)
+                        scores = {**scores, "总分": weighted_score}
+                    item["relevance_score"] = weighted_score
+                    item["detailed_scores"] = scores
+                
                 # 按相关性得分排序
                 scored_items.sort(key=lambda x: x.get("relevance_score", 0), reverse=True)
                 
-                print(f"使用LLM完成相关性评分，共评估{len(scored_items)}项")
+                print(f"使用LLM完成相关性评分，共评估{len(scored_items)}项（{len(batches)}次调用，{missing}项使用备用评分）")
                 return scored_items
                 
             except Exception as e:
@@ -1599,93 +1519,162 @@ class TavilyCollector:
                 # 失败时回退到简单评估方法
         
         # 如果没有LLM处理器或LLM评估失败，使用简单评估方法
+        scored_items = []
         for item in items:
-            score = 0
-            title = item.get('title', '').lower()
-            content = item.get('content', '').lower()
-            source = item.get('source', '').lower()
-            topic_lower = topic.lower()
-            
-            # 简单的关键词匹配评分
-            # 1. 主题相关性评分
-            topic_relevance = 0
-            if topic_lower in title:
-                topic_relevance += 3  # 标题中包含主题加3分
-            if topic_lower in content:
-                # 计算主题在内容中出现的次数，最多加4分
-                occurrences = content.count(topic_lower)
-                topic_relevance += min(4, occurrences)
-            
-            # 2. 时效性评分 (基于文章发布日期或收录日期)
-            recency_score = 5
-            if "published_date" in item:
-                published_date = item.get("published_date")
-                try:
-                    if isinstance(published_date, str):
-                        # 尝试解析日期
-                        from datetime import datetime, timedelta
-                        pub_date = datetime.strptime(published_date, "%Y-%m-%d")
-                        today = datetime.now()
-                        hours_old = (today - pub_date).total_seconds() / 3600
-                        
-                        # 使用更细粒度的时效性评分
-                        if hours_old <= 6:
-                            recency_score = 10  # 6小时内
-                        elif hours_old <= 12:
-                            recency_score = 9.5  # 12小时内
-                        elif hours_old <= 24:
-                            recency_score = 9  # 1天内
-                        elif hours_old <= 48:
-                            recency_score = 8  # 2天内
-                        elif hours_old <= 72:
-                            recency_score = 7  # 3天内
-                        elif hours_old <= 120:
-                            recency_score = 6  # 5天内
-                        else:
-                            recency_score = 5  # 5天以上
-                except:
-                    # 解析日期失败，使用默认分数
-                    pass
-            
-            # 3. 信息质量评分 (基于内容长度和完整性)
-            quality_score = 0
-            content_length = len(content)
-            if content_length > 2000:
-                quality_score = 8  # 长内容通常信息量更大
-            elif content_length > 1000:
-                quality_score = 7
-            elif content_length > 500:
-                quality_score = 6
-            elif content_length > 200:
-                quality_score = 5
-            else:
-                quality_score = 4
-                
-            # 4. 来源可靠性评分
-            reliability_score = 5  # 默认中等可靠性
-            
-            # 计算加权总分
-            weighted_score = (
-                topic_relevance * criteria.get("主题相关性", 0.4) * 10 / 7 +  # 归一化到10分制
-                recency_score * criteria.get("时效性", 0.3) +
-                quality_score * criteria.get("信息质量", 0.2) +
-                reliability_score * criteria.get("来源可靠性", 0.1)
-            )
-            
-            # 保存评分到内容项
+            weighted_score, detailed_scores = self._heuristic_relevance_scores(item, topic, criteria)
             item["relevance_score"] = weighted_score
-            item["detailed_scores"] = {
-                "主题相关性": topic_relevance * 10 / 7,  # 归一化到10分制
-                "时效性": recency_score,
-                "信息质量": quality_score,
-                "来源可靠性": reliability_score,
-                "总分": weighted_score
-            }
-            
+            item["detailed_scores"] = detailed_scores
             scored_items.append(item)
         
         # 按相关性得分排序
         scored_items.sort(key=lambda x: x.get("relevance_score", 0), reverse=True)
         
         print(f"完成内容相关性评分，共评估{len(scored_items)}项")
-        return scored_items
\ No newline at end of file
+        return scored_items
+
+    def _score_relevance_batch(self, batch, topic, llm_processor):
+        """
+        一次LLM调用评估一批内容
+        
+        Args:
+            batch (list): (编号, 内容项) 列表，编号在整次评估内唯一
+            topic (str): 主题
+            llm_processor: LLM处理器实例
+            
+        Returns:
+            dict: 编号 -> 各维度评分（1-10分），只包含通过校验的条目
+        """
+        blocks = []
+        for index, item in batch:
+            blocks.append(
+                f"[编号 {index}]\n标题: {item.get('title', '')}\n内容: {item.get('content', '')[:500]}..."
+            )
+        items_text = "\n\n".join(blocks)
+        
+        prompt = f"""
+        请评估以下{len(batch)}条内容与'{topic}'主题的相关性和信息质量，根据以下标准为每条内容给出1-10分的评分：
+        
+        {items_text}
+        
+        评分标准:
+        1. 主题相关性 (1-10分): 内容与'{topic}'主题的直接相关程度
+        2. 时效性 (1-10分): 内容的新鲜度和时效性
+        3. 信息质量 (1-10分): 内容的完整性、深度和信息量
+        4. 来源可靠性 (1-10分): 来源的权威性和可信度
+        
+        请以JSON格式返回评分，每条内容一项，"编号"与上文一致:
+        {{
+            "items": [
+                {{"编号": 编号, "主题相关性": 分数, "时效性": 分数, "信息质量": 分数, "来源可靠性": 分数}}
+            ]
+        }}
+        """
+        system_message = "你是一位专业的内容评估专家，擅长评估内容的相关性、质量和时效性。你的回答必须是严格的JSON格式，不包含任何其他文本。"
+        
+        response = llm_processor.call_llm_api_json(prompt, system_message, max_tokens=60 * len(batch) + 200, cache=True)
+        entries = response.get("items", []) if isinstance(response, dict) else response
+        
+        # 校验：编号必须属于本批次，各维度必须是数字，分数限制在1-10
+        batch_ids = {index for index, _ in batch}
+        scores = {}
+        for entry in entries if isinstance(entries, list) else []:
+            if not isinstance(entry, dict):
+                continue
+            try:
+                index = int(entry.get("编号", entry.get("id")))
+                values = {name: min(10.0, max(1.0, float(entry[name]))) for name in self.RELEVANCE_CRITERIA}
+            except (KeyError, TypeError, ValueError):
+                continue
+            if index in batch_ids and index not in scores:
+                scores[index] = values
+        return scores
+
+    @staticmethod
+    def _weighted_relevance_score(scores, criteria):
+        """按评估标准的权重计算加权得分"""
+        return sum(scores[criterion] * weight for criterion, weight in criteria.items() if criterion in scores)
+
+    def _heuristic_relevance_scores(self, item, topic, criteria):
+        """
+        基于关键词、发布日期和内容长度的启发式评分
+        
+        Returns:
+            tuple: (加权总分, 各维度评分)
+        """
+        title = item.get('title', '').lower()
+        content = item.get('content', '').lower()
+        topic_lower = topic.lower()
+        
+        # 简单的关键词匹配评分
+        # 1. 主题相关性评分
+        topic_relevance = 0
+        if topic_lower in title:
+            topic_relevance += 3  # 标题中包含主题加3分
+        if topic_lower in content:
+            # 计算主题在内容中出现的次数，最多加4分
+            occurrences = content.count(topic_lower)
+            topic_relevance += min(4, occurrences)
+        
+        # 2. 时效性评分 (基于文章发布日期或收录日期)
+        recency_score = 5
+        if "published_date" in item:
+            published_date = item.get("published_date")
+            try:
+                if isinstance(published_date, str):
+                    # 尝试解析日期
+                    pub_date = datetime.strptime(published_date, "%Y-%m-%d")
+                    today = datetime.now()
+                    hours_old = (today - pub_date).total_seconds() / 3600
+                    
+                    # 使用更细粒度的时效性评分
+                    if hours_old <= 6:
+                        recency_score = 10  # 6小时内
+                    elif hours_old <= 12:
+                        recency_score = 9.5  # 12小时内
+                    elif hours_old <= 24:
+                        recency_score = 9  # 1天内
+                    elif hours_old <= 48:
+                        recency_score = 8  # 2天内
+                    elif hours_old <= 72:
+                        recency_score = 7  # 3天内
+                    elif hours_old <= 120:
+                        recency_score = 6  # 5天内
+                    else:
+                        recency_score = 5  # 5天以上
+            except:
+                # 解析日期失败，使用默认分数
+                pass
+        
+        # 3. 信息质量评分 (基于内容长度和完整性)
+        quality_score = 0
+        content_length = len(content)
+        if content_length > 2000:
+            quality_score = 8  # 长内容通常信息量更大
+        elif content_length > 1000:
+            quality_score = 7
+        elif content_length > 500:
+            quality_score = 6
+        elif content_length > 200:
+            quality_score = 5
+        else:
+            quality_score = 4
+            
+        # 4. 来源可靠性评分
+        reliability_score = 5  # 默认中等可靠性
+        
+        # 计算加权总分
+        weighted_score = (
+            topic_relevance * criteria.get("主题相关性", 0.4) * 10 / 7 +  # 归一化到10分制
+            recency_score * criteria.get("时效性", 0.3) +
+            quality_score * criteria.get("信息质量", 0.2) +
+            reliability_score * criteria.get("来源可靠性", 0.1)
+        )
+        
+        detailed_scores = {
+            "主题相关性": topic_relevance * 10 / 7,  # 归一化到10分制
+            "时效性": recency_score,
+            "信息质量": quality_score,
+            "来源可靠性": reliability_score,
+            "总分": weighted_score
+        }
+        return weighted_score, detailed_scores
@@ -0,0 +1,305 @@
+"""
+共享中英文术语库
+
+各收集器原先各自维护一份中英文术语字典，字典未命中时调用LLM翻译，但不会记住结果，
+同一份报告里同一个主题会被反复翻译。术语库统一管理这些翻译：
+1. 以原有的术语字典为种子，中英文双向可查
+2. LLM翻译的结果写入术语库，下次直接命中
+3. 较短的术语持久化到JSON文件，进程重启后仍可命中；写入延迟合并，一段时间内学到的术语只写一次文件
+4. 较长的文本（整段摘要、章节）只保存在容量有限的LRU缓存中，长时间运行的进程内存不会无限增长
+5. 线程安全；多个线程同时翻译同一文本时只有一个线程调用LLM，其余线程等待其结果
+"""
+
+import atexit
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+import config
+
+
+ENGLISH = "English"
+CHINESE = "中文"
+
+_LANGUAGE_ALIASES = {
+    "english": ENGLISH, "en": ENGLISH, "英文": ENGLISH, "英语": ENGLISH,
+    "中文": CHINESE, "chinese": CHINESE, "zh": CHINESE, "汉语": CHINESE,
+}
+
+# 常见学术领域中英文对照字典，用于直接翻译常见术语
+SEED_TRANSLATIONS = {
+    "人工智能": "artificial intelligence",
+    "机器学习": "machine learning",
+    "深度学习": "deep learning",
+    "自然语言处理": "natural language processing",
+    "计算机视觉": "computer vision",
+    "区块链": "blockchain",
+    "元宇宙": "metaverse",
+    "虚拟现实": "virtual reality",
+    "增强现实": "augmented reality",
+    "量子计算": "quantum computing",
+    "物联网": "internet of things",
+    "大数据": "big data",
+    "云计算": "cloud computing",
+    "边缘计算": "edge computing",
+    "5G": "5G",
+    "6G": "6G",
+    "半导体": "semiconductor",
+    "芯片": "chip technology",
+    "数据科学": "data science",
+    "强化学习": "reinforcement learning",
+    "生成式对抗网络": "generative adversarial networks",
+    "自动驾驶": "autonomous driving",
+    "脑机接口": "brain-computer interface",
+    "智能机器人": "intelligent robotics",
+    "生物信息学": "bioinformatics",
+    "基因编辑": "gene editing",
+    "生物技术": "biotechnology",
+    "新能源": "new energy",
+    "可再生能源": "renewable energy",
+    "网络安全": "cybersecurity",
+    "金融科技": "fintech"
+}
+
+
+def normalize_language(language: str) -> str:
+    """统一目标语言名称（English/英文 → English，中文/Chinese → 中文）"""
+    return _LANGUAGE_ALIASES.get((language or "").strip().lower(), language)
+
+
+def contains_chinese(text: str) -> bool:
+    """文本是否包含中文字符"""
+    return any('一' <= char <= '鿿' for char in text or "")
+
+
+class TermStore:
+    """线程安全的中英文术语库"""
+
+    def __init__(self, path: Optional[str] = None, max_term_length: int = 100,
+                 seed: Optional[Dict[str, str]] = None, max_long_texts: int = 256,
+                 save_delay: float = 2.0):
+        """
+        初始化术语库
+
+        Args:
+            path: JSON持久化文件路径，为None时只保存在内存中
+            max_term_length: 不超过该长度的文本才会持久化并登记反向翻译，更长的文本（如整段摘要）只在本进程内记住
+            seed: 中文 → 英文 的种子术语，默认使用SEED_TRANSLATIONS
+            max_long_texts: 进程内最多记住的长文本翻译数，超出时淘汰最久未使用的
+            save_delay: 学到新术语后延迟多少秒写入文件，期间学到的术语合并为一次写入；<=0时立即写入
+        """
+        self.path = Path(path) if path else None
+        self.max_term_length = max_term_length
+        self.max_long_texts = max(0, max_long_texts)
+        self.save_delay = save_delay
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._terms: Dict[str, Dict[str, str]] = {ENGLISH: {}, CHINESE: {}}
+        self._long_texts: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self._learned: Dict[str, Dict[str, str]] = {}
+        self._pending: Dict[Tuple[str, str], threading.Event] = {}
+        self._dirty = False
+        self._save_timer: Optional[threading.Timer] = None
+
+        self.hits = 0
+        self.misses = 0
+        self.learned = 0
+
+        for chinese, english in (SEED_TRANSLATIONS if seed is None else seed).items():
+            self._put(chinese, english, ENGLISH)
+        if self.path is not None:
+            self._load()
+            # 进程退出时写入尚未落盘的术语
+            atexit.register(self.flush)
+
+    @classmethod
+    def from_config(cls) -> 'TermStore':
+        """根据config创建术语库"""
+        return cls(
+            path=getattr(config, 'TERM_STORE_PATH', None) or None,
+            max_term_length=getattr(config, 'TERM_STORE_MAX_TERM_LENGTH', 100),
+            max_long_texts=getattr(config, 'TERM_STORE_MAX_LONG_TEXTS', 256),
+            save_delay=getattr(config, 'TERM_STORE_SAVE_DELAY', 2.0)
+        )
+
+    def _put(self, text: str, translation: str, language: str):
+        """登记一条翻译，短术语同时登记反向翻译（调用方需持有锁或处于初始化阶段）"""
+        if len(text) > self.max_term_length:
+            # 长文本放入LRU缓存，不进入术语表
+            self._long_texts[(language, text)] = translation
+            self._long_texts.move_to_end((language, text))
+            while len(self._long_texts) > self.max_long_texts:
+                self._long_texts.popitem(last=False)
+            return
+        self._terms.setdefault(language, {})[text] = translation
+        if len(translation) <= self.max_term_length:
+            reverse = CHINESE if language == ENGLISH else ENGLISH
+            self._terms.setdefault(reverse, {}).setdefault(translation.lower() if reverse == CHINESE else translation, text)
+
+    def _load(self):
+        """从JSON文件加载已学到的术语"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"⚠️ 术语库文件读取失败，忽略: {e}")
+            return
+        for language, terms in data.items():
+            if isinstance(terms, dict):
+                for text, translation in terms.items():
+                    self._learned.setdefault(language, {})[text] = translation
+                    self._put(text, translation, language)
+
+    def _schedule_save(self) -> bool:
+        """
+        标记有术语待写入并安排延迟写入（调用方需持有锁）
+
+        Returns:
+            是否需要调用方在释放锁后立即写入
+        """
+        if self.path is None:
+            return False
+        self._dirty = True
+        if self.save_delay <= 0:
+            return True
+        if self._save_timer is None:
+            self._save_timer = threading.Timer(self.save_delay, self.flush)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+        return False
+
+    def flush(self):
+        """把尚未落盘的术语写入JSON文件（先写临时文件再替换）"""
+        with self._lock:
+            self._save_timer = None
+            if self.path is None or not self._dirty:
+                return
+            self._dirty = False
+            data = json.dumps(self._learned, ensure_ascii=False, indent=2)
+        # 写文件时不占用术语库的锁，查询和翻译不受影响
+        with self._save_lock:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.path.with_suffix(self.path.suffix + '.tmp')
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(data)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                print(f"⚠️ 术语库文件写入失败: {e}")
+
+    def _get(self, key: str, language: str) -> Optional[str]:
+        """查询术语表和长文本缓存（调用方需持有锁）"""
+        translation = self._terms.get(language, {}).get(key)
+        if translation is None and len(key) > self.max_term_length:
+            translation = self._long_texts.get((language, key))
+            if translation is not None:
+                self._long_texts.move_to_end((language, key))
+        return translation
+
+    @staticmethod
+    def _key(text: str, language: str) -> str:
+        # 译为中文时原文是英文，不区分大小写
+        return text if language == ENGLISH else text.lower()
+
+    def lookup(self, text: str, target_language: str) -> Optional[str]:
+        """查询已知翻译，未知时返回None"""
+        language = normalize_language(target_language)
+        text = (text or "").strip()
+        with self._lock:
+            return self._get(self._key(text, language), language)
+
+    def learn(self, text: str, translation: str, target_language: str):
+        """登记一条翻译"""
+        language = normalize_language(target_language)
+        text, translation = (text or "").strip(), (translation or "").strip()
+        if not text or not translation:
+            return
+        key = self._key(text, language)
+        save_now = False
+        with self._lock:
+            if self._get(key, language) == translation:
+                return
+            self._put(key, translation, language)
+            self.learned += 1
+            if len(key) <= self.max_term_length:
+                self._learned.setdefault(language, {})[key] = translation
+                save_now = self._schedule_save()
+        if save_now:
+            self.flush()
+
+    def translate(self, text: str, target_language: str, translator: Callable[[str], str]) -> str:
+        """
+        翻译文本：已知时直接返回，否则调用translator并记住结果
+
+        多个线程同时翻译同一文本时只有一个线程调用translator；translator抛出异常时不记录，
+        异常向调用方抛出，等待中的线程随后会自行重试。
+
+        Args:
+            text: 原文
+            target_language: 目标语言
+            translator: 实际执行翻译的函数，接收原文返回译文
+        """
+        language = normalize_language(target_language)
+        stripped = (text or "").strip()
+        if not stripped:
+            return text
+        key = (language, self._key(stripped, language))
+
+        while True:
+            with self._lock:
+                translation = self._get(key[1], language)
+                if translation is not None:
+                    self.hits += 1
+                    return translation
+                event = self._pending.get(key)
+                if event is None:
+                    event = self._pending[key] = threading.Event()
+                    self.misses += 1
+                    break
+            # 其他线程正在翻译同一文本，等待其完成后重新查询
+            event.wait()
+
+        try:
+            translation = translator(stripped)
+            if translation and translation.strip():
+                self.learn(stripped, translation, language)
+            return translation
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+            event.set()
+
+    def replace_known_terms(self, text: str, target_language: str = ENGLISH) -> str:
+        """用已知术语做简单的词汇替换（LLM不可用时的备用翻译）"""
+        language = normalize_language(target_language)
+        with self._lock:
+            terms = [
+                (source, translation) for source, translation in self._terms.get(language, {}).items()
+                if len(source) <= self.max_term_length
+            ]
+        # 先替换较长的术语，避免被其中包含的短术语拆开
+        for source, translation in sorted(terms, key=lambda item: len(item[0]), reverse=True):
+            if source in text:
+                text = text.replace(source, translation)
+        return text
+
+    def get_stats(self) -> Dict[str, int]:
+        """获取术语库统计信息"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "learned": self.learned,
+                "terms": sum(len(terms) for terms in self._terms.values()),
+                "long_texts": len(self._long_texts),
+                "persisted": sum(len(terms) for terms in self._learned.values()),
+            }
+
+
+# 进程内共享的术语库实例
+term_store = TermStore.from_config()
@@ -0,0 +1,26 @@
+"""
+中英文混合分词
+
+英文和数字按单词切分，连续中文按相邻两字（bigram）切分。证据排序（BM25）和
+search_mcp的近似重复检测共用这一个分词器；本模块只依赖标准库，导入代价可以忽略。
+"""
+
+import re
+from typing import List
+
+_TOKEN_PATTERN = re.compile(r'[a-z0-9]+|[㐀-䶿一-鿿豈-﫿]+')
+_CJK_PATTERN = re.compile(r'[㐀-䶿一-鿿豈-﫿]')
+
+
+def tokenize(text: str) -> List[str]:
+    """中英文混合分词：英文和数字按单词切分，连续中文按相邻两字切分（单字保留为一个词）"""
+    tokens = []
+    for match in _TOKEN_PATTERN.findall((text or '').lower()):
+        if _CJK_PATTERN.match(match):
+            if len(match) == 1:
+                tokens.append(match)
+            else:
+                tokens.extend(match[i:i + 2] for i in range(len(match) - 1))
+        else:
+            tokens.append(match)
+    return tokens
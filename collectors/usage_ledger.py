@@ -0,0 +1,176 @@
+"""
+LLM用量账本
+
+按请求上下文（报告/任务ID）累计每次LLM调用的token用量和延迟，并按流水线阶段汇总。
+当前上下文和阶段通过contextvars传递，因此同一个LLMProcessor被多个线程或协程
+共享时，各请求的用量互不干扰。
+
+注意：ThreadPoolExecutor不会自动传递contextvars，提交任务时请使用submit_in_context。
+"""
+
+import contextvars
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+
+# 当前请求上下文ID和流水线阶段
+_current_context: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "llm_usage_context", default=None
+)
+_current_stage: contextvars.ContextVar[str] = contextvars.ContextVar(
+    "llm_usage_stage", default="default"
+)
+
+
+def _empty_totals() -> Dict[str, Any]:
+    return {
+        "calls": 0,
+        "input_tokens": 0,
+        "output_tokens": 0,
+        "total_tokens": 0,
+        "latency": 0.0,
+    }
+
+
+class UsageLedger:
+    """线程安全的LLM用量账本"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._contexts: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, provider: str, model: str, input_tokens: int, output_tokens: int,
+               total_tokens: int, latency: float = 0.0,
+               context_id: Optional[str] = None, stage: Optional[str] = None):
+        """
+        记录一次LLM调用
+
+        Args:
+            provider: 模型提供商
+            model: 模型名称
+            input_tokens: 输入token数
+            output_tokens: 输出token数
+            total_tokens: 总token数
+            latency: 调用耗时（秒）
+            context_id: 上下文ID，默认使用当前上下文；无上下文时不记录
+            stage: 流水线阶段，默认使用当前阶段
+        """
+        context_id = context_id or _current_context.get()
+        if context_id is None:
+            return
+        stage = stage or _current_stage.get()
+        input_tokens = int(input_tokens or 0)
+        output_tokens = int(output_tokens or 0)
+        total_tokens = int(total_tokens or 0) or input_tokens + output_tokens
+
+        with self._lock:
+            entry = self._contexts.setdefault(context_id, {
+                "started_at": time.time(),
+                "totals": _empty_totals(),
+                "stages": {},
+                "models": {},
+            })
+            stage_totals = entry["stages"].setdefault(stage, _empty_totals())
+            for totals in (entry["totals"], stage_totals):
+                totals["calls"] += 1
+                totals["input_tokens"] += input_tokens
+                totals["output_tokens"] += output_tokens
+                totals["total_tokens"] += total_tokens
+                totals["latency"] += latency
+            entry["models"][f"{provider}/{model}"] = {"provider": provider, "model": model}
+
+    def get_summary(self, context_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        获取某个上下文的用量汇总
+
+        Returns:
+            包含总量（input_tokens/output_tokens/total_tokens/calls/latency）、
+            各阶段明细stages以及用到的模型列表models的字典
+        """
+        context_id = context_id or _current_context.get()
+        with self._lock:
+            entry = self._contexts.get(context_id)
+            if entry is None:
+                summary = {"context_id": context_id, **_empty_totals(), "stages": {}, "models": []}
+            else:
+                summary = {
+                    "context_id": context_id,
+                    **entry["totals"],
+                    "stages": {name: dict(totals) for name, totals in entry["stages"].items()},
+                    "models": list(entry["models"].values()),
+                }
+
+        for totals in [summary, *summary["stages"].values()]:
+            totals["avg_latency"] = totals["latency"] / totals["calls"] if totals["calls"] else 0.0
+        return summary
+
+    def pop(self, context_id: Optional[str] = None) -> Dict[str, Any]:
+        """获取汇总并从账本中移除该上下文"""
+        context_id = context_id or _current_context.get()
+        summary = self.get_summary(context_id)
+        with self._lock:
+            self._contexts.pop(context_id, None)
+        return summary
+
+    def reset(self):
+        """清空所有上下文"""
+        with self._lock:
+            self._contexts.clear()
+
+
+# 进程内共享的账本实例
+usage_ledger = UsageLedger()
+
+
+def get_current_context() -> Optional[str]:
+    """获取当前请求上下文ID"""
+    return _current_context.get()
+
+
+def get_current_stage() -> str:
+    """获取当前流水线阶段"""
+    return _current_stage.get()
+
+
+def set_stage(stage: str):
+    """设置当前流水线阶段，之后的LLM调用都计入该阶段"""
+    _current_stage.set(stage)
+
+
+@contextmanager
+def usage_context(context_id: Optional[str] = None, stage: Optional[str] = None) -> Iterator[str]:
+    """
+    进入一个用量上下文，块内（含通过submit_in_context提交的线程任务）的LLM调用都计入该上下文
+
+    Args:
+        context_id: 上下文ID（如报告ID、任务ID），为None时自动生成
+        stage: 初始阶段名称
+    """
+    context_id = context_id or uuid.uuid4().hex
+    context_token = _current_context.set(context_id)
+    stage_token = _current_stage.set(stage) if stage else None
+    try:
+        yield context_id
+    finally:
+        if stage_token is not None:
+            _current_stage.reset(stage_token)
+        _current_context.reset(context_token)
+
+
+@contextmanager
+def usage_stage(stage: str) -> Iterator[str]:
+    """临时切换到指定流水线阶段，退出时恢复原阶段"""
+    token = _current_stage.set(stage)
+    try:
+        yield stage
+    finally:
+        _current_stage.reset(token)
+
+
+def submit_in_context(executor, fn: Callable, *args, **kwargs):
+    """向线程池提交任务，并把当前的用量上下文和阶段带到工作线程中"""
+    ctx = contextvars.copy_context()
+    return executor.submit(ctx.run, fn, *args, **kwargs)
@@ -26,6 +26,12 @@ ARXIV_MAX_RESULTS = 50
 ARXIV_SORT_BY = "submittedDate"
 ARXIV_SORT_ORDER = "descending"
 
+# arXiv元数据本地镜像设置（python -m collectors.arxiv_mirror ingest 导入公开元数据快照）
+ARXIV_MIRROR_ENABLED = os.getenv("ARXIV_MIRROR_ENABLED", "true").lower() == "true"  # 镜像数据库存在时是否优先从镜像检索
+ARXIV_MIRROR_PATH = os.getenv("ARXIV_MIRROR_PATH", os.path.join("data", "arxiv_mirror.db"))  # 镜像SQLite数据库文件
+ARXIV_MIRROR_CATEGORIES = os.getenv("ARXIV_MIRROR_CATEGORIES", "")  # 导入时保留的分类，逗号分隔（如 cs,stat.ML），为空时全部导入
+ARXIV_MIRROR_LIVE_FALLBACK = os.getenv("ARXIV_MIRROR_LIVE_FALLBACK", "true").lower() == "true"  # 快照截止日期之后的论文是否请求arXiv API
+
 # 学术论文搜索设置
 ACADEMIC_SEARCH_ENABLED = True  # 是否启用其他学术源搜索
 ACADEMIC_MIN_PAPERS = 5         # 最少需要的学术论文数量
@@ -83,6 +89,85 @@ LLM_MODEL = "deepseek-v3"  # 默认使用 dashscope 的 deepseek-v3 模型
 MAX_TOKENS = 8192
 TEMPERATURE = 0.3
 
+# LLM HTTP连接池设置（所有LLMProcessor实例共享）
+LLM_POOL_MAX_CONNECTIONS = int(os.getenv("LLM_POOL_MAX_CONNECTIONS", "32"))  # 最大连接数
+LLM_POOL_KEEPALIVE_EXPIRY = float(os.getenv("LLM_POOL_KEEPALIVE_EXPIRY", "60"))  # 空闲连接保活时间（秒）
+LLM_REQUEST_TIMEOUT = float(os.getenv("LLM_REQUEST_TIMEOUT", "60"))  # 单次请求超时（秒）
+
+# 章节并发生成设置
+SECTION_MAX_CONCURRENCY = int(os.getenv("SECTION_MAX_CONCURRENCY", "3"))  # 同时生成的章节数上限
+SECTION_RATE_LIMIT_BACKOFF = float(os.getenv("SECTION_RATE_LIMIT_BACKOFF", "5"))  # 触发限流后的退避基数（秒）
+KEY_POINT_MAX_CONCURRENCY = int(os.getenv("KEY_POINT_MAX_CONCURRENCY", "6"))  # 深度报告同时生成的要点数上限
+
+# 进程级LLM调控器设置（所有LLM调用共享，<=0表示不限制）
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))  # 全局同时在途的LLM请求数上限
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "300"))  # 每分钟请求数上限
+LLM_TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", "500000"))  # 每分钟token数上限
+
+# LLM响应缓存设置（按模型、系统消息、提示词、温度、max_tokens的内容哈希缓存）
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"  # 是否启用响应缓存
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "2000"))  # 内存层最多缓存的响应数
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))  # 缓存有效期（秒）
+LLM_CACHE_DB_PATH = os.getenv("LLM_CACHE_DB_PATH")  # 设置后启用SQLite磁盘缓存，重启后仍可命中
+LLM_CACHE_MAX_DISK_ENTRIES = int(os.getenv("LLM_CACHE_MAX_DISK_ENTRIES", "50000"))  # 磁盘层最多缓存的响应数
+LLM_CACHE_MAX_TEMPERATURE = float(os.getenv("LLM_CACHE_MAX_TEMPERATURE", "0.2"))  # 温度不高于该值的调用默认缓存
+
+# 搜索结果相关性批量评分设置
+RELEVANCE_BATCH_SIZE = int(os.getenv("RELEVANCE_BATCH_SIZE", "10"))  # 每次LLM调用评估的内容条数
+RELEVANCE_MAX_WORKERS = int(os.getenv("RELEVANCE_MAX_WORKERS", "4"))  # 同时进行的评分批次数
+
+# 报告文章批量分类设置
+CATEGORIZE_BATCH_SIZE = int(os.getenv("CATEGORIZE_BATCH_SIZE", "20"))  # 每次LLM请求分类的文章数
+CATEGORIZE_MAX_WORKERS = int(os.getenv("CATEGORIZE_MAX_WORKERS", "4"))  # 同时进行的分类请求数
+CATEGORIZE_MIN_COVERAGE = float(os.getenv("CATEGORIZE_MIN_COVERAGE", "0.6"))  # 关键词预分类直接归类所需的类别词覆盖率
+
+# 共享中英文术语库设置（LLM翻译结果在各收集器间共享并持久化）
+TERM_STORE_PATH = os.getenv("TERM_STORE_PATH", os.path.join("data", "term_translations.json"))  # 术语库JSON文件，设为空字符串时只保存在内存中
+TERM_STORE_MAX_TERM_LENGTH = int(os.getenv("TERM_STORE_MAX_TERM_LENGTH", "100"))  # 不超过该长度的文本才持久化
+TERM_STORE_MAX_LONG_TEXTS = int(os.getenv("TERM_STORE_MAX_LONG_TEXTS", "256"))  # 进程内最多记住的长文本翻译数（LRU淘汰）
+TERM_STORE_SAVE_DELAY = float(os.getenv("TERM_STORE_SAVE_DELAY", "2"))  # 学到新术语后延迟写入文件的秒数，期间的术语合并写入
+
+# 学术来源并发请求设置（每秒请求数，<=0表示不限制）
+ACADEMIC_DEFAULT_RATE_LIMIT = float(os.getenv("ACADEMIC_DEFAULT_RATE_LIMIT", "1"))  # 未单独配置的来源
+ACADEMIC_SOURCE_RATE_LIMITS = {
+    "CORE": float(os.getenv("CORE_RATE_LIMIT", "1")),
+    "CrossRef": float(os.getenv("CROSSREF_RATE_LIMIT", "2")),
+    "IEEE Xplore": float(os.getenv("IEEE_RATE_LIMIT", "1")),
+    "Semantic Scholar": float(os.getenv("SEMANTICSCHOLAR_RATE_LIMIT", "1")),
+    "Springer": float(os.getenv("SPRINGER_RATE_LIMIT", "1")),
+}
+
+# 搜索引擎并发请求设置
+SEARCH_FETCH_MAX_WORKERS = int(os.getenv("SEARCH_FETCH_MAX_WORKERS", "4"))  # 每个收集器同时在途的搜索请求数
+GOOGLE_SEARCH_QPS = float(os.getenv("GOOGLE_SEARCH_QPS", "5"))  # Google Custom Search API每秒请求数上限
+BRAVE_SEARCH_QPS = float(os.getenv("BRAVE_SEARCH_QPS", "2"))  # Brave Search API每秒请求数上限
+
+# RSS源本地存储设置（条件请求并发轮询，检索在本地SQLite中进行）
+RSS_STORE_PATH = os.getenv("RSS_STORE_PATH", os.path.join("data", "rss_feeds.db"))  # SQLite数据库文件，设为空字符串时只保存在内存中
+RSS_REFRESH_INTERVAL = int(os.getenv("RSS_REFRESH_INTERVAL", "900"))  # 刷新间隔（秒），间隔内轮询过的源不再请求
+RSS_RETENTION_DAYS = int(os.getenv("RSS_RETENTION_DAYS", "30"))  # 条目保留天数
+RSS_FETCH_MAX_WORKERS = int(os.getenv("RSS_FETCH_MAX_WORKERS", "8"))  # 同时轮询的RSS源数
+RSS_FETCH_TIMEOUT = int(os.getenv("RSS_FETCH_TIMEOUT", "15"))  # 单个RSS源的请求超时（秒）
+
+# 报告任务队列设置（api_server 的任务存储与工作进程池）
+JOB_STORE_BACKEND = os.getenv("JOB_STORE_BACKEND", "sqlite")  # 任务后端，目前支持sqlite
+JOB_STORE_PATH = os.getenv("JOB_STORE_PATH", os.path.join("data", "report_jobs.db"))  # SQLite任务库文件
+REPORT_MAX_CONCURRENT = int(os.getenv("REPORT_MAX_CONCURRENT", "2"))  # 同时生成的报告数（即工作进程数）
+REPORT_MAX_QUEUE_DEPTH = int(os.getenv("REPORT_MAX_QUEUE_DEPTH", "20"))  # 排队任务数上限，超过时拒绝新任务
+REPORT_WORKER_EMBEDDED = os.getenv("REPORT_WORKER_EMBEDDED", "true").lower() == "true"  # 是否随API启动工作进程池，单独运行report_worker.py时设为false
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1"))  # 空闲工作进程轮询间隔（秒）
+JOB_HEARTBEAT_INTERVAL = float(os.getenv("JOB_HEARTBEAT_INTERVAL", "10"))  # 运行中任务的心跳间隔（秒）
+JOB_STALE_TIMEOUT = float(os.getenv("JOB_STALE_TIMEOUT", "120"))  # 心跳超时（秒），超时的任务重新排队
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "2"))  # 每个任务最多执行次数
+
+# 编排运行日志设置（orchestrator_mcp各阶段输出持久化，支持中断后恢复）
+RUN_JOURNAL_ENABLED = os.getenv("RUN_JOURNAL_ENABLED", "true").lower() == "true"  # 是否为每次运行创建日志
+RUN_JOURNAL_DIR = os.getenv("RUN_JOURNAL_DIR", os.path.join("data", "runs"))  # 运行日志根目录
+
+# MCP服务启动设置（main.py的后端组件在首次使用时才初始化）
+MCP_WARM_UP_ON_START = os.getenv("MCP_WARM_UP_ON_START", "true").lower() == "true"  # 启动服务时是否提前初始化搜索、LLM和流式处理组件
+MAIN_IMPORT_TIME_BUDGET_MS = int(os.getenv("MAIN_IMPORT_TIME_BUDGET_MS", "3000"))  # 导入main.py的耗时预算（毫秒），导入耗时测试超出时失败
+
 # CORE API settings
 CORE_API_KEY = os.getenv("CORE_API_KEY")
 CORE_API_URL = "https://api.core.ac.uk/v3"
@@ -9,11 +9,13 @@ import logging
 
 # 添加项目根目录到Python路径
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "search_mcp", "src"))
 
 from collectors.tavily_collector import TavilyCollector
 from collectors.google_search_collector import GoogleSearchCollector
 from collectors.brave_search_collector import BraveSearchCollector
 from generators.report_generator import ReportGenerator
+from search_mcp.dedup import NearDuplicateIndex, shingle_set, jaccard_similarity
 import config
 
 # 关闭HTTP请求日志，减少干扰
@@ -613,23 +615,13 @@ class IntelligentReportAgent:
         return additional_data
     
     def _calculate_text_similarity(self, text1, text2):
-        """计算两个文本的相似度（简单版本）"""
-        if not text1 or not text2:
+        """计算两个文本的Jaccard相似度（中文按相邻两字分词）"""
+        shingles1 = shingle_set(text1)
+        shingles2 = shingle_set(text2)
+        if not shingles1 or not shingles2:
             return 0.0
         
-        # 转换为小写并分词
-        words1 = set(text1.lower().split())
-        words2 = set(text2.lower().split())
-        
-        # 计算交集和并集
-        intersection = words1.intersection(words2)
-        union = words1.union(words2)
-        
-        # 计算Jaccard相似度
-        if len(union) == 0:
-            return 0.0
-        
-        return len(intersection) / len(union)
+        return jaccard_similarity(shingles1, shingles2)
     
     def _is_content_similar(self, item1, item2, similarity_threshold=0.6):
         """判断两个新闻项目是否内容相似"""
@@ -662,12 +654,16 @@ class IntelligentReportAgent:
         
         deduplicated = []
         removed_count = 0
+        # 判定重复要求标题相似度至少0.4，因此只需与标题落入同一LSH桶的已有项目比较
+        title_index = NearDuplicateIndex(threshold=0.4, bands=20, rows=2)
         
         for item in items:
             is_duplicate = False
+            title_shingles = shingle_set(item.get('title', ''))
             
             # 检查是否与已有项目相似
-            for existing_item in deduplicated:
+            for candidate in title_index.candidates(title_shingles):
+                existing_item = deduplicated[candidate]
                 if self._is_content_similar(item, existing_item):
                     is_duplicate = True
                     removed_count += 1
@@ -675,6 +671,7 @@ class IntelligentReportAgent:
                     break
             
             if not is_duplicate:
+                title_index.add(len(deduplicated), title_shingles)
                 deduplicated.append(item)
         
         if removed_count > 0:
@@ -695,11 +692,14 @@ class IntelligentReportAgent:
             if category not in merged_data:
                 merged_data[category] = []
             
-            # 获取现有数据的URL集合，用于基础去重
+            # 获取现有数据的URL和标题集合，用于基础去重
             existing_urls = set()
+            existing_titles = set()
             for item in merged_data[category]:
                 if item.get('url'):
                     existing_urls.add(item['url'])
+                if item.get('title'):
+                    existing_titles.add(item['title'])
             
             # 基于URL的基础去重
             url_filtered_items = []
@@ -709,9 +709,9 @@ class IntelligentReportAgent:
                     existing_urls.add(new_item['url'])
                 elif not new_item.get('url'):  # 如果没有URL，基于标题去重
                     title = new_item.get('title', '')
-                    existing_titles = [item.get('title', '') for item in merged_data[category]]
                     if title and title not in existing_titles:
                         url_filtered_items.append(new_item)
+                        existing_titles.add(title)
             
             # 直接添加去重后的新数据
             if url_filtered_items:
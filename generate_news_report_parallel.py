@@ -933,11 +933,14 @@ class IntelligentReportAgentParallel:
             if category not in merged_data:
                 merged_data[category] = []
             
-            # 获取现有数据的URL集合，用于基础去重
+            # 获取现有数据的URL和标题集合，用于基础去重
             existing_urls = set()
+            existing_titles = set()
             for item in merged_data[category]:
                 if item.get('url'):
                     existing_urls.add(item['url'])
+                if item.get('title'):
+                    existing_titles.add(item['title'])
             
             # 基于URL的基础去重
             url_filtered_items = []
@@ -947,9 +950,9 @@ class IntelligentReportAgentParallel:
                     existing_urls.add(new_item['url'])
                 elif not new_item.get('url'):  # 如果没有URL，基于标题去重
                     title = new_item.get('title', '')
-                    existing_titles = [item.get('title', '') for item in merged_data[category]]
                     if title and title not in existing_titles:
                         url_filtered_items.append(new_item)
+                        existing_titles.add(title)
             
             # 直接添加去重后的新数据
             if url_filtered_items:
@@ -1,10 +1,17 @@
 import os
 import json
 import datetime
+import time
 from openai import OpenAI
 import config
 import pandas as pd
+import numpy as np
 from tqdm import tqdm
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from collectors.evidence_ranker import EvidenceRanker
+from collectors.term_store import term_store
+from collectors.llm_governor import batch_priority, estimate_tokens, llm_governor
+from collectors.usage_ledger import submit_in_context, usage_ledger
 
 class ReportGenerator:
     def __init__(self, api_key=None, base_url=None):
@@ -47,17 +54,7 @@ class ReportGenerator:
         for model in models:
             try:
                 if purpose == "chat":
-                    kwargs = {
-                        "model": model,
-                        "messages": messages
-                    }
-                    if max_tokens:
-                        kwargs["max_tokens"] = max_tokens
-                    if temperature is not None:
-                        kwargs["temperature"] = temperature
-                    
-                    response = self.client.chat.completions.create(**kwargs)
-                    return response.choices[0].message.content.strip()
+                    return self._create_chat_completion(model, messages, max_tokens, temperature)
                     
             except Exception as e:
                 last_error = str(e)
@@ -77,52 +74,209 @@ class ReportGenerator:
         print(fallback_msg)
         return fallback_msg
         
-    def categorize_content(self, articles, categories):
+    def _create_chat_completion(self, model, messages, max_tokens=None, temperature=None):
+        """用指定模型调用一次聊天接口，经过进程级并发调控器并计入用量账本；失败时抛出异常"""
+        kwargs = {
+            "model": model,
+            "messages": messages
+        }
+        if max_tokens:
+            kwargs["max_tokens"] = max_tokens
+        if temperature is not None:
+            kwargs["temperature"] = temperature
+        
+        # 与LLMProcessor共用进程级并发调控器和用量账本
+        prompt_text = " ".join(str(message.get("content", "")) for message in messages)
+        with llm_governor.slot(estimate_tokens(prompt_text)) as ticket:
+            start = time.time()
+            response = self.client.chat.completions.create(**kwargs)
+            usage = getattr(response, "usage", None)
+            if usage is not None:
+                ticket.used_tokens = usage.total_tokens
+                usage_ledger.record("openai", model, usage.prompt_tokens, usage.completion_tokens,
+                                    usage.total_tokens, time.time() - start)
+        return response.choices[0].message.content.strip()
+        
+    @batch_priority
+    def categorize_content(self, articles, categories, batched=True, batch_size=None, max_workers=None):
         """
         使用GPT将文章分类到预定义的类别中
         
+        批量模式下先用关键词预分类，命中单一类别且置信度高的文章不再调用LLM；
+        其余文章每批多篇打包为一次请求，各批次并发执行。
+        
         Args:
             articles (list): 文章字典列表
             categories (list): 类别名称列表
+            batched (bool): 是否使用批量分类，False时逐篇调用LLM
+            batch_size (int, optional): 每次请求分类的文章数，默认读取config.CATEGORIZE_BATCH_SIZE
+            max_workers (int, optional): 同时进行的请求数，默认读取config.CATEGORIZE_MAX_WORKERS
             
         Returns:
             dict: 将类别映射到文章列表的字典
         """
         categorized = {category: [] for category in categories}
         
-        for article in tqdm(articles, desc="正在分类文章"):
-            # 创建分类提示
-            prompt = f"""
-            请将以下文章分配到这个列表中最相关的类别：{', '.join(categories)}。
+        if not batched:
+            for article in tqdm(articles, desc="正在分类文章"):
+                categorized[self._categorize_single(article, categories)].append(article)
+            self.categorization_stats = {
+                "articles": len(articles), "preclassified": 0,
+                "llm_calls": len(articles), "calls_saved": 0
+            }
+            return categorized
+        
+        batch_size = max(1, batch_size or getattr(config, 'CATEGORIZE_BATCH_SIZE', 20))
+        max_workers = max(1, max_workers or getattr(config, 'CATEGORIZE_MAX_WORKERS', 4))
+        
+        # 1. 关键词预分类
+        assigned = self._preclassify_articles(articles, categories)
+        preclassified = len(assigned)
+        
+        # 2. 剩余文章批量分类
+        pending = [index for index in range(len(articles)) if index not in assigned]
+        batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+        llm_calls = len(batches)
+        missing = []
+        
+        if batches:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(batches))) as executor:
+                futures = {
+                    submit_in_context(
+                        executor, self._categorize_batch, [(index, articles[index]) for index in batch], categories
+                    ): batch
+                    for batch in batches
+                }
+                for future in tqdm(as_completed(futures), total=len(futures), desc="正在批量分类文章"):
+                    batch = futures[future]
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        print(f"批量分类出错，该批{len(batch)}篇改为逐篇分类: {str(e)}")
+                        result = {}
+                    assigned.update(result)
+                    missing.extend(index for index in batch if index not in result)
+        
+        # 3. 响应中缺失的文章和失败批次中的文章逐篇分类
+        for index in missing:
+            assigned[index] = self._categorize_single(articles[index], categories)
+        llm_calls += len(missing)
+        
+        for index, article in enumerate(articles):
+            categorized[assigned[index]].append(article)
+        
+        self.categorization_stats = {
+            "articles": len(articles),
+            "preclassified": preclassified,
+            "llm_calls": llm_calls,
+            "calls_saved": len(articles) - llm_calls
+        }
+        print(f"文章分类完成: {len(articles)}篇，关键词预分类{preclassified}篇，"
+              f"LLM调用{llm_calls}次，节省{len(articles) - llm_calls}次")
+        return categorized
+    
+    def _preclassify_articles(self, articles, categories):
+        """
+        关键词预分类：类别名称的词在文章标题和摘要中的覆盖率（按idf加权）
+        只有最佳类别覆盖率足够高、且明显高于其他类别时才直接归类
+        
+        Returns:
+            dict: 文章序号 -> 类别
+        """
+        if not articles or len(categories) < 2:
+            return {index: categories[0] for index in range(len(articles))} if categories else {}
+        
+        min_coverage = getattr(config, 'CATEGORIZE_MIN_COVERAGE', 0.6)
+        ranker = EvidenceRanker([f"{article.get('title', '')} {article.get('summary', '')}" for article in articles])
+        coverage = np.vstack([ranker.coverage(category) for category in categories])
+        
+        order = np.argsort(-coverage, axis=0)
+        best, second = order[0], order[1]
+        columns = np.arange(len(articles))
+        best_coverage = coverage[best, columns]
+        confident = (best_coverage >= min_coverage) & (coverage[second, columns] <= best_coverage / 2)
+        return {int(index): categories[best[index]] for index in np.nonzero(confident)[0]}
+    
+    def _categorize_batch(self, batch, categories):
+        """
+        一次请求分类多篇文章
+        
+        Args:
+            batch (list): (序号, 文章) 列表
+            categories (list): 类别名称列表
             
-            文章标题：{article['title']}
-            文章摘要：{article['summary']}
+        Returns:
+            dict: 序号 -> 类别，只包含返回了有效类别的文章
+        """
+        articles_text = "\n\n".join(
+            f"[编号 {index}]\n文章标题：{article['title']}\n文章摘要：{str(article.get('summary', ''))[:500]}"
+            for index, article in batch
+        )
+        prompt = f"""
+        请将以下每篇文章分配到这个列表中最相关的类别：{', '.join(categories)}。
+        
+        {articles_text}
+        
+        以JSON对象返回结果，键为文章编号，值为类别名称，例如：{{"{batch[0][0]}": "{categories[0]}"}}。
+        只返回JSON，不要返回其他内容。
+        """
+        
+        response = self.call_openai_with_fallback(
+            messages=[
+                {"role": "system", "content": "您是一位能够准确分类内容的助手。"},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=30 * len(batch) + 50,
+            temperature=0.3
+        )
+        
+        json_start, json_end = response.find('{'), response.rfind('}') + 1
+        if json_start < 0 or json_end <= json_start:
+            raise ValueError(f"无法解析分类结果: {response[:100]}")
+        mapping = json.loads(response[json_start:json_end])
+        
+        batch_ids = {index for index, _ in batch}
+        result = {}
+        for key, category in mapping.items():
+            try:
+                index = int(key)
+            except (TypeError, ValueError):
+                continue
+            if index in batch_ids and category in categories:
+                result[index] = category
+        return result
+    
+    def _categorize_single(self, article, categories):
+        """逐篇分类单篇文章，返回类别名称"""
+        # 创建分类提示
+        prompt = f"""
+        请将以下文章分配到这个列表中最相关的类别：{', '.join(categories)}。
+        
+        文章标题：{article['title']}
+        文章摘要：{article['summary']}
+        
+        只返回类别名称，不要返回其他内容。
+        """
+        
+        try:
+            category = self.call_openai_with_fallback(
+                messages=[
+                    {"role": "system", "content": "您是一位能够准确分类内容的助手。"},
+                    {"role": "user", "content": prompt}
+                ],
+                max_tokens=50,
+                temperature=0.3
+            )
             
-            只返回类别名称，不要返回其他内容。
-            """
+            # 如果响应不是有效类别，则放入第一个类别
+            if category not in categories:
+                category = categories[0]
+            return category
             
-            try:
-                category = self.call_openai_with_fallback(
-                    messages=[
-                        {"role": "system", "content": "您是一位能够准确分类内容的助手。"},
-                        {"role": "user", "content": prompt}
-                    ],
-                    max_tokens=50,
-                    temperature=0.3
-                )
-                
-                # 如果响应不是有效类别，则放入第一个类别
-                if category not in categories:
-                    category = categories[0]
-                    
-                categorized[category].append(article)
-                
-            except Exception as e:
-                print(f"文章 {article['title']} 分类出错: {str(e)}")
-                # 错误时默认为第一个类别
-                categorized[categories[0]].append(article)
-                
-        return categorized
+        except Exception as e:
+            print(f"文章 {article['title']} 分类出错: {str(e)}")
+            # 错误时默认为第一个类别
+            return categories[0]
         
     def generate_article_summary(self, article):
         """
@@ -284,42 +438,11 @@ class ReportGenerator:
                 
             print("检测到英文内容，尝试翻译...")
             
-            # 获取当前配置的模型列表
-            models_to_try = self.default_models["chat"]
-            print(f"将使用配置的模型进行翻译: {models_to_try}")
-            
-            # 配置翻译提示
-            system_content = "你是一位专业翻译，请将非中文内容翻译成流畅、准确的中文。保留专业术语和技术细节。"
-            user_content = f"将以下非中文内容翻译成中文:\n\n{text}"
-            
-            # 尝试翻译
             try:
-                for model_name in models_to_try:
-                    try:
-                        # 调用API翻译
-                        response = self.client.chat.completions.create(
-                            model=model_name,
-                            messages=[
-                                {"role": "system", "content": system_content},
-                                {"role": "user", "content": user_content}
-                            ],
-                            temperature=0.3,
-                            max_tokens=1500
-                        )
-                        
-                        translated_text = response.choices[0].message.content.strip()
-                        print(f"使用模型{model_name}翻译完成")
-                        return translated_text
-                    except Exception as model_error:
-                        print(f"模型{model_name}翻译失败: {str(model_error)}")
-                        continue
-                
-                # 如果所有模型都失败，使用自带翻译方法
-                print("所有配置的模型翻译失败，使用备用翻译方法")
-                return self._basic_translate(text)
-                
+                # 经共享术语库翻译：已翻译过的文本直接返回，新的翻译结果写入术语库
+                return term_store.translate(text, "中文", self._translate_with_models)
             except Exception as api_error:
-                print(f"API翻译初始化失败: {str(api_error)}")
+                print(f"所有配置的模型翻译失败，使用备用翻译方法: {str(api_error)}")
                 return self._basic_translate(text)
                 
         except Exception as general_error:
@@ -327,6 +450,37 @@ class ReportGenerator:
             # 出现任何错误，直接返回原文
             return text
             
+    def _translate_with_models(self, text):
+        """依次尝试配置的模型翻译文本，全部失败时抛出异常"""
+        # 获取当前配置的模型列表
+        models_to_try = self.default_models["chat"]
+        print(f"将使用配置的模型进行翻译: {models_to_try}")
+        
+        # 配置翻译提示
+        system_content = "你是一位专业翻译，请将非中文内容翻译成流畅、准确的中文。保留专业术语和技术细节。"
+        user_content = f"将以下非中文内容翻译成中文:\n\n{text}"
+        
+        last_error = None
+        for model_name in models_to_try:
+            try:
+                # 调用API翻译（与其他调用一样经过调控器并计入用量账本）
+                translated_text = self._create_chat_completion(
+                    model_name,
+                    [
+                        {"role": "system", "content": system_content},
+                        {"role": "user", "content": user_content}
+                    ],
+                    max_tokens=1500,
+                    temperature=0.3
+                )
+                print(f"使用模型{model_name}翻译完成")
+                return translated_text
+            except Exception as model_error:
+                print(f"模型{model_name}翻译失败: {str(model_error)}")
+                last_error = model_error
+        
+        raise RuntimeError(f"所有模型翻译失败: {last_error}")
+            
     def _basic_translate(self, text):
         """
         当API翻译失败时，使用基本的关键词替换进行简单翻译
@@ -17,10 +17,12 @@ import logging
 
 # 添加项目根目录到Python路径
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "search_mcp", "src"))
 
 from collectors.tavily_collector import TavilyCollector
 from collectors.google_search_collector import GoogleSearchCollector
 from collectors.brave_search_collector import BraveSearchCollector
+from search_mcp.dedup import DocumentDeduplicator
 
 # 关闭HTTP请求日志
 logging.getLogger("httpx").setLevel(logging.WARNING)
@@ -289,23 +291,16 @@ class IntentSearchAgent:
             return []
     
     def _deduplicate_results(self, results):
-        """结果去重"""
-        seen_urls = set()
+        """结果去重：URL相同或标题近似重复（不同搜索引擎转载的同一篇文章）只保留一条"""
+        deduplicator = DocumentDeduplicator()
         unique_results = []
         
         for result in results:
-            url = result.get('url', '')
-            title = result.get('title', '')
-            
-            # 基于URL去重
-            if url and url not in seen_urls:
-                seen_urls.add(url)
+            # 既没有URL也没有标题的结果无法判断，直接丢弃
+            if not result.get('url') and not result.get('title'):
+                continue
+            if deduplicator.add(result):
                 unique_results.append(result)
-            # 如果没有URL，基于标题去重
-            elif not url and title:
-                existing_titles = [r.get('title', '') for r in unique_results]
-                if title not in existing_titles:
-                    unique_results.append(result)
         
         return unique_results
     
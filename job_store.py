@@ -0,0 +1,326 @@
+"""
+报告任务存储
+
+api_server 原先把任务保存在进程内字典中，并用 BackgroundTasks 在Web进程里直接生成报告：
+重启后任务全部丢失，任务列表每次都要对整个字典排序，同时运行的报告数也没有上限。
+JobStore 定义任务后端接口，默认实现 SQLiteJobStore（WAL模式，可被API进程和工作进程同时访问）：
+1. 准入控制：排队任务数达到上限时拒绝新任务，运行中的任务数达到上限时工作进程不再领取
+2. 任务列表按创建时间/状态建索引，支持分页
+3. 工作进程定期写入心跳，心跳超时的任务（进程崩溃或重启）重新排队，超过重试次数则标记失败
+其他后端（如Redis）实现 JobStore 的抽象方法即可接入。
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import time
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import config
+
+
+PENDING = "pending"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+_JSON_FIELDS = ("result", "request_data")
+
+
+class QueueFullError(Exception):
+    """排队任务数已达上限"""
+
+
+class JobStore(ABC):
+    """报告任务后端接口"""
+
+    def __init__(self, max_queue_depth: int = 20, max_concurrent: int = 2,
+                 stale_timeout: float = 120, max_attempts: int = 2):
+        """
+        Args:
+            max_queue_depth: 排队（pending）任务数上限，<=0表示不限制
+            max_concurrent: 同时运行的任务数上限，<=0表示不限制
+            stale_timeout: 运行中任务的心跳超时（秒），超时视为工作进程已中断
+            max_attempts: 每个任务最多执行的次数
+        """
+        self.max_queue_depth = max_queue_depth
+        self.max_concurrent = max_concurrent
+        self.stale_timeout = stale_timeout
+        self.max_attempts = max_attempts
+
+    @abstractmethod
+    def create(self, request_data: Dict[str, Any], task_id: Optional[str] = None) -> Dict[str, Any]:
+        """创建排队任务，队列已满时抛出QueueFullError"""
+
+    @abstractmethod
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """获取任务，不存在时返回None"""
+
+    @abstractmethod
+    def update(self, task_id: str, status: str, progress: str = "", result: Dict = None,
+               error: str = None, worker_id: Optional[str] = None) -> bool:
+        """
+        更新任务状态，任务不存在时返回False
+
+        指定worker_id时只更新仍由该工作进程运行的任务：任务因心跳超时被重新排队、
+        又被其他工作进程领取后，原工作进程的更新返回False，不会覆盖新的执行
+        """
+
+    @abstractmethod
+    def progress(self, task_id: str, progress: str, worker_id: Optional[str] = None) -> bool:
+        """更新运行中任务的进度并刷新心跳，指定worker_id时只更新该工作进程运行的任务"""
+
+    @abstractmethod
+    def claim_next(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """领取最早的排队任务并标记为运行中，没有可领取的任务或已达并发上限时返回None"""
+
+    @abstractmethod
+    def heartbeat(self, task_id: str, worker_id: str) -> bool:
+        """刷新运行中任务的心跳，任务已不属于该工作进程时返回False"""
+
+    @abstractmethod
+    def requeue_stale(self) -> Dict[str, int]:
+        """把心跳超时的运行中任务重新排队（超过重试次数则标记失败）"""
+
+    @abstractmethod
+    def list(self, limit: int = 10, offset: int = 0, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        """按创建时间倒序分页列出任务"""
+
+    @abstractmethod
+    def count(self, status: Optional[str] = None) -> int:
+        """统计任务数"""
+
+    @abstractmethod
+    def delete(self, task_id: str) -> bool:
+        """删除任务记录"""
+
+    def counts_by_status(self) -> Dict[str, int]:
+        """各状态的任务数"""
+        return {name: self.count(name) for name in (PENDING, RUNNING, COMPLETED, FAILED)}
+
+
+class SQLiteJobStore(JobStore):
+    """基于SQLite的任务后端，每次操作使用独立连接，可跨进程使用"""
+
+    def __init__(self, path: str, **kwargs):
+        """
+        Args:
+            path: SQLite数据库文件路径
+            **kwargs: 传给JobStore的准入与重试设置
+        """
+        super().__init__(**kwargs)
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    task_id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    progress TEXT,
+                    created_at TEXT NOT NULL,
+                    started_at TEXT,
+                    completed_at TEXT,
+                    result TEXT,
+                    error TEXT,
+                    request_data TEXT,
+                    worker_id TEXT,
+                    heartbeat_at REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0
+                );
+                CREATE INDEX IF NOT EXISTS idx_jobs_created ON jobs (created_at);
+                CREATE INDEX IF NOT EXISTS idx_jobs_status_created ON jobs (status, created_at);
+            """)
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @staticmethod
+    def _to_dict(row: Optional[sqlite3.Row]) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        job = dict(row)
+        for field in _JSON_FIELDS:
+            job[field] = json.loads(job[field]) if job[field] else None
+        return job
+
+    def create(self, request_data: Dict[str, Any], task_id: Optional[str] = None) -> Dict[str, Any]:
+        task_id = task_id or str(uuid.uuid4())
+        conn = self._connect()
+        try:
+            # BEGIN IMMEDIATE 保证检查队列深度与插入之间没有其他写入
+            conn.execute("BEGIN IMMEDIATE")
+            if self.max_queue_depth > 0:
+                pending = conn.execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (PENDING,)).fetchone()[0]
+                if pending >= self.max_queue_depth:
+                    conn.execute("ROLLBACK")
+                    raise QueueFullError(f"排队任务已达上限 ({self.max_queue_depth})，请稍后再试")
+            conn.execute(
+                "INSERT INTO jobs (task_id, status, progress, created_at, request_data) VALUES (?, ?, ?, ?, ?)",
+                (task_id, PENDING, "📋 任务已创建，等待开始...", datetime.now().isoformat(),
+                 json.dumps(request_data, ensure_ascii=False))
+            )
+            conn.execute("COMMIT")
+            return self._to_dict(conn.execute("SELECT * FROM jobs WHERE task_id = ?", (task_id,)).fetchone())
+        finally:
+            conn.close()
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        conn = self._connect()
+        try:
+            return self._to_dict(conn.execute("SELECT * FROM jobs WHERE task_id = ?", (task_id,)).fetchone())
+        finally:
+            conn.close()
+
+    def update(self, task_id: str, status: str, progress: str = "", result: Dict = None,
+               error: str = None, worker_id: Optional[str] = None) -> bool:
+        completed_at = datetime.now().isoformat() if status in (COMPLETED, FAILED) else None
+        sql = ("UPDATE jobs SET status = ?, progress = ?, completed_at = ?, result = ?, error = ?, heartbeat_at = ? "
+               "WHERE task_id = ?")
+        params: List[Any] = [status, progress, completed_at,
+                             json.dumps(result, ensure_ascii=False) if result is not None else None,
+                             error, time.time(), task_id]
+        if worker_id is not None:
+            sql += " AND worker_id = ? AND status = ?"
+            params.extend([worker_id, RUNNING])
+        conn = self._connect()
+        try:
+            return conn.execute(sql, params).rowcount > 0
+        finally:
+            conn.close()
+
+    def progress(self, task_id: str, progress: str, worker_id: Optional[str] = None) -> bool:
+        sql = "UPDATE jobs SET progress = ?, heartbeat_at = ? WHERE task_id = ? AND status = ?"
+        params: List[Any] = [progress, time.time(), task_id, RUNNING]
+        if worker_id is not None:
+            sql += " AND worker_id = ?"
+            params.append(worker_id)
+        conn = self._connect()
+        try:
+            return conn.execute(sql, params).rowcount > 0
+        finally:
+            conn.close()
+
+    def claim_next(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            if self.max_concurrent > 0:
+                running = conn.execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (RUNNING,)).fetchone()[0]
+                if running >= self.max_concurrent:
+                    conn.execute("ROLLBACK")
+                    return None
+            row = conn.execute(
+                "SELECT task_id FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (PENDING,)
+            ).fetchone()
+            if row is None:
+                conn.execute("ROLLBACK")
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = ?, progress = ?, started_at = ?, worker_id = ?, heartbeat_at = ?, "
+                "attempts = attempts + 1 WHERE task_id = ?",
+                (RUNNING, "🚀 任务已开始...", datetime.now().isoformat(), worker_id, time.time(), row['task_id'])
+            )
+            conn.execute("COMMIT")
+            return self._to_dict(conn.execute("SELECT * FROM jobs WHERE task_id = ?", (row['task_id'],)).fetchone())
+        finally:
+            conn.close()
+
+    def heartbeat(self, task_id: str, worker_id: str) -> bool:
+        conn = self._connect()
+        try:
+            return conn.execute(
+                "UPDATE jobs SET heartbeat_at = ? WHERE task_id = ? AND worker_id = ? AND status = ?",
+                (time.time(), task_id, worker_id, RUNNING)
+            ).rowcount > 0
+        finally:
+            conn.close()
+
+    def requeue_stale(self) -> Dict[str, int]:
+        cutoff = time.time() - self.stale_timeout
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            failed = conn.execute(
+                "UPDATE jobs SET status = ?, progress = ?, completed_at = ?, error = ?, worker_id = NULL "
+                "WHERE status = ? AND heartbeat_at < ? AND attempts >= ?",
+                (FAILED, "❌ 报告生成失败", datetime.now().isoformat(),
+                 f"工作进程中断，已重试{self.max_attempts}次", RUNNING, cutoff, self.max_attempts)
+            ).rowcount
+            requeued = conn.execute(
+                "UPDATE jobs SET status = ?, progress = ?, worker_id = NULL "
+                "WHERE status = ? AND heartbeat_at < ?",
+                (PENDING, "🔁 工作进程中断，任务重新排队...", RUNNING, cutoff)
+            ).rowcount
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+        if requeued or failed:
+            print(f"🔁 心跳超时的任务: 重新排队{requeued}个，标记失败{failed}个")
+        return {"requeued": requeued, "failed": failed}
+
+    def list(self, limit: int = 10, offset: int = 0, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        sql = "SELECT * FROM jobs"
+        params: List[Any] = []
+        if status:
+            sql += " WHERE status = ?"
+            params.append(status)
+        sql += " ORDER BY created_at DESC LIMIT ? OFFSET ?"
+        params.extend([limit, offset])
+        conn = self._connect()
+        try:
+            return [self._to_dict(row) for row in conn.execute(sql, params)]
+        finally:
+            conn.close()
+
+    def count(self, status: Optional[str] = None) -> int:
+        conn = self._connect()
+        try:
+            if status:
+                return conn.execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (status,)).fetchone()[0]
+            return conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+        finally:
+            conn.close()
+
+    def counts_by_status(self) -> Dict[str, int]:
+        conn = self._connect()
+        try:
+            counts = dict(conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        finally:
+            conn.close()
+        return {name: counts.get(name, 0) for name in (PENDING, RUNNING, COMPLETED, FAILED)}
+
+    def delete(self, task_id: str) -> bool:
+        conn = self._connect()
+        try:
+            return conn.execute("DELETE FROM jobs WHERE task_id = ?", (task_id,)).rowcount > 0
+        finally:
+            conn.close()
+
+
+def make_worker_id(index: int = 0) -> str:
+    """生成工作进程标识（主机名:进程号:序号）"""
+    return f"{socket.gethostname()}:{os.getpid()}:{index}"
+
+
+def create_job_store() -> JobStore:
+    """根据config创建任务后端"""
+    backend = getattr(config, 'JOB_STORE_BACKEND', 'sqlite')
+    kwargs = dict(
+        max_queue_depth=getattr(config, 'REPORT_MAX_QUEUE_DEPTH', 20),
+        max_concurrent=getattr(config, 'REPORT_MAX_CONCURRENT', 2),
+        stale_timeout=getattr(config, 'JOB_STALE_TIMEOUT', 120),
+        max_attempts=getattr(config, 'JOB_MAX_ATTEMPTS', 2),
+    )
+    if backend == 'sqlite':
+        return SQLiteJobStore(getattr(config, 'JOB_STORE_PATH', os.path.join("data", "report_jobs.db")), **kwargs)
+    raise ValueError(f"不支持的任务后端: {backend}")
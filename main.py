@@ -2,10 +2,16 @@ from mcp.server.fastmcp import FastMCP
 import sys
 import os
 import json
+import re
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import List, Dict, Optional, Union, Any
+from typing import List, Dict, Optional, Union, Any, Iterator, Tuple
 from dataclasses import dataclass
 from datetime import datetime
+from functools import partial
 
 # 环境变量加载
 try:
@@ -32,133 +38,285 @@ collectors_path = Path(__file__).parent / "collectors"
 if str(collectors_path) not in sys.path:
     sys.path.insert(0, str(collectors_path))
 
-# 搜索组件初始化
-try:
-    # 确保正确的导入路径
+# 后端组件在首次使用时才初始化（导入main.py只做声明，MCP服务冷启动更快），
+# 服务启动时可调用 warm_up() 提前初始化
+from collectors.service_registry import get_llm_processor, get_service, registry
+
+
+def _create_search_orchestrator():
     print(f"🔍 尝试从路径导入: {search_mcp_path}")
-    print(f"🔍 search_mcp目录存在: {search_mcp_path.exists()}")
-    print(f"🔍 config.py文件存在: {(search_mcp_path / 'search_mcp' / 'config.py').exists()}")
-    
     from search_mcp.config import SearchConfig
     from search_mcp.generators import SearchOrchestrator
-    
+
     # 创建配置和搜索编排器
-    config = SearchConfig()
-    print(f"🔍 配置创建成功，API密钥状态: {config.get_api_keys()}")
-    
-    orchestrator = SearchOrchestrator(config)
-    search_available = True
-    print(f"✅ 搜索组件初始化成功，可用数据源: {config.get_enabled_sources()}")
-except Exception as e:
-    print(f"⚠️ 搜索组件初始化失败: {e}")
-    print(f"   错误类型: {type(e).__name__}")
-    print(f"   搜索组件路径: {search_mcp_path}")
-    print(f"   当前sys.path包含: {[p for p in sys.path if 'search_mcp' in p]}")
-    
-    # 尝试获取更多调试信息
+    search_config = SearchConfig()
+    print(f"🔍 配置创建成功，API密钥状态: {search_config.get_api_keys()}")
+    search_orchestrator = SearchOrchestrator(search_config)
+    print(f"✅ 搜索组件初始化成功，可用数据源: {search_config.get_enabled_sources()}")
+    return search_orchestrator
+
+
+def _create_streaming_orchestrator():
+    from streaming_orchestrator import StreamingOrchestrator
+    streaming_orchestrator = StreamingOrchestrator()
+    print("✅ 流式处理器初始化成功")
+    return streaming_orchestrator
+
+
+# 以 `python main.py` 启动时，streaming_orchestrator 的 `from main import ...` 会以模块名 main
+# 再执行一次本文件，此时服务已由 __main__ 登记，跳过重复登记
+for _name, _factory in (
+    ("search_orchestrator", _create_search_orchestrator),
+    ("streaming_orchestrator", _create_streaming_orchestrator),
+):
+    if _name not in registry.names():
+        registry.register(_name, _factory)
+
+
+def _get_search_orchestrator():
+    """搜索编排器，初始化失败时返回None（下次使用时重试）"""
     try:
-        import search_mcp
-        print(f"   search_mcp模块路径: {search_mcp.__file__}")
-    except:
-        print("   无法导入search_mcp模块")
-    
-    orchestrator = None
-    search_available = False
+        return get_service("search_orchestrator")
+    except Exception as e:
+        print(f"⚠️ 搜索组件初始化失败: {e}")
+        print(f"   错误类型: {type(e).__name__}")
+        print(f"   搜索组件路径: {search_mcp_path}")
+        print(f"   search_mcp目录存在: {search_mcp_path.exists()}")
+        print(f"   当前sys.path包含: {[p for p in sys.path if 'search_mcp' in p]}")
+        return None
 
-# LLM处理器初始化
-try:
-    from collectors.llm_processor import LLMProcessor
-    llm_processor = LLMProcessor()
-    llm_available = True
-    print("✅ LLM处理器初始化成功")
-except Exception as e:
-    print(f"⚠️ LLM处理器初始化失败: {str(e)}")
-    llm_processor = None
-    llm_available = False
+
+def _get_llm_processor():
+    """进程内共享的LLM处理器，初始化失败时返回None"""
+    try:
+        return get_llm_processor()
+    except Exception as e:
+        print(f"⚠️ LLM处理器初始化失败: {str(e)}")
+        return None
+
+
+def _is_rate_limit_error(error: BaseException) -> bool:
+    """判断异常是否为上游限流（按需导入LLM模块，不拖慢启动）"""
+    from collectors.llm_processor import is_rate_limit_error
+    return is_rate_limit_error(error)
+
+
+def _get_streaming_orchestrator():
+    """流式处理器，初始化失败时返回None"""
+    try:
+        return get_service("streaming_orchestrator")
+    except Exception as e:
+        print(f"⚠️ 流式处理器初始化失败: {e}")
+        return None
+
+
+def warm_up() -> Dict[str, bool]:
+    """提前初始化搜索、LLM和流式处理组件，返回各组件是否可用"""
+    status = {
+        "search": _get_search_orchestrator() is not None,
+        "llm": _get_llm_processor() is not None,
+        "streaming": _get_streaming_orchestrator() is not None,
+    }
+    print(f"🔥 后端组件预热完成: {status}")
+    return status
+
+
+# 兼容旧代码中的 `from main import llm_processor` 等用法，访问时才初始化对应组件
+_LAZY_ATTRIBUTES = {
+    "orchestrator": _get_search_orchestrator,
+    "search_available": lambda: _get_search_orchestrator() is not None,
+    "llm_processor": _get_llm_processor,
+    "llm_available": lambda: _get_llm_processor() is not None,
+    "streaming_orchestrator": _get_streaming_orchestrator,
+    "streaming_available": lambda: _get_streaming_orchestrator() is not None,
+}
+
+
+def __getattr__(name: str):
+    if name in _LAZY_ATTRIBUTES:
+        return _LAZY_ATTRIBUTES[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# LLM用量账本（按请求上下文和流水线阶段累计token用量）
+# 章节调度器（依赖LLM处理器）和证据排序器（依赖numpy）在使用时才导入
+from collectors.usage_ledger import get_current_stage, set_stage
+from collectors.run_journal import RunJournal
 
 # 创建MCP服务器
 mcp = FastMCP("Search Server")
 
+def _search_profile(search_type: str) -> tuple:
+    """根据搜索类型返回 (数据源列表, 时间范围)"""
+    if search_type == "academic":
+        # 学术搜索：优先使用学术数据源，延长时间范围
+        sources = ["arxiv", "academic", "google", "tavily"]  # 优先使用arxiv和academic
+        days_back = 365  # 学术研究通常需要更长的时间范围
+        print(f"🎓 使用学术搜索配置: sources={sources}, days_back={days_back}")
+    else:
+        # 通用搜索：使用默认配置
+        sources = ["tavily", "brave", "google"]
+        days_back = 30
+    return sources, days_back
+
+def _format_search_results(search_results: List[Any], max_results: int) -> List[Dict]:
+    """将Document对象或字典统一转换为搜索工具返回的结果格式"""
+    processed_results = []
+    for result in search_results[:max_results]:
+        # 处理Document对象
+        if hasattr(result, 'title'):
+            # 这是Document对象
+            processed_result = {
+                "title": getattr(result, 'title', ''),
+                "content": getattr(result, 'content', '')[:500],  # 限制内容长度
+                "url": getattr(result, 'url', ''),
+                "source": getattr(result, 'source', 'unknown'),
+                "relevance_score": getattr(result, 'relevance_score', 0.0),
+                "timestamp": getattr(result, 'timestamp', '')
+            }
+        else:
+            # 这是字典对象
+            processed_result = {
+                "title": result.get("title", ""),
+                "content": result.get("content", "")[:500],  # 限制内容长度
+                "url": result.get("url", ""),
+                "source": result.get("source", "unknown"),
+                "relevance_score": result.get("relevance_score", 0.0),
+                "timestamp": result.get("timestamp", "")
+            }
+        processed_results.append(processed_result)
+    return processed_results
+
+def _search_unavailable_response() -> str:
+    return json.dumps({
+        "status": "error",
+        "message": "搜索组件未初始化",
+        "results": []
+    }, ensure_ascii=False)
+
+def _search_success_response(query: str, search_results: List[Any], max_results: int) -> str:
+    processed_results = _format_search_results(search_results, max_results)
+    response = {
+        "status": "success",
+        "query": query,
+        "results": processed_results,
+        "total_found": len(processed_results),
+        "search_timestamp": datetime.now().isoformat()
+    }
+    
+    print(f"✅ 搜索完成，找到 {len(processed_results)} 条结果")
+    return json.dumps(response, ensure_ascii=False, indent=2)
+
+def _search_error_response(query: str, e: Exception) -> str:
+    error_response = {
+        "status": "error",
+        "query": query,
+        "message": f"搜索执行失败: {str(e)}",
+        "results": [],
+        "error_type": type(e).__name__
+    }
+    print(f"❌ 搜索失败: {str(e)}")
+    return json.dumps(error_response, ensure_ascii=False, indent=2)
+
 @mcp.tool()
-def search(query: str, max_results: int = 5, search_type: str = "general") -> str:
+async def search(query: str, max_results: int = 5, search_type: str = "general") -> str:
     """执行搜索查询并返回结果"""
     try:
-        if not search_available or not orchestrator:
-            return json.dumps({
-                "status": "error",
-                "message": "搜索组件未初始化",
-                "results": []
-            }, ensure_ascii=False)
+        # 首次使用时的初始化放到线程中执行
+        orchestrator = await asyncio.to_thread(_get_search_orchestrator)
+        if orchestrator is None:
+            return _search_unavailable_response()
         
         print(f"🔍 执行搜索查询: {query} (类型: {search_type})")
+        sources, days_back = _search_profile(search_type)
         
-        # 根据搜索类型调整搜索配置
-        if search_type == "academic":
-            # 学术搜索：优先使用学术数据源，延长时间范围
-            sources = ["arxiv", "academic", "google", "tavily"]  # 优先使用arxiv和academic
-            days_back = 365  # 学术研究通常需要更长的时间范围
-            print(f"🎓 使用学术搜索配置: sources={sources}, days_back={days_back}")
-        else:
-            # 通用搜索：使用默认配置
-            sources = ["tavily", "brave", "google"]
-            days_back = 30
+        # 使用异步搜索路径，不阻塞HTTP/MCP服务的事件循环
+        search_results = await orchestrator.async_parallel_search(
+            queries=[query],  # 传入查询列表
+            sources=sources,
+            max_results_per_query=max_results,
+            days_back=days_back,
+            max_workers=3
+        )
+        
+        return _search_success_response(query, search_results, max_results)
+        
+    except Exception as e:
+        return _search_error_response(query, e)
+
+def _search_sync(query: str, max_results: int = 5, search_type: str = "general") -> str:
+    """search工具的同步版本，供在工作线程中运行的编排流程调用"""
+    try:
+        orchestrator = _get_search_orchestrator()
+        if orchestrator is None:
+            return _search_unavailable_response()
+        
+        print(f"🔍 执行搜索查询: {query} (类型: {search_type})")
+        sources, days_back = _search_profile(search_type)
         
-        # 使用搜索编排器执行搜索
         search_results = orchestrator.parallel_search(
-            queries=[query],  # 传入查询列表
+            queries=[query],
             sources=sources,
             max_results_per_query=max_results,
             days_back=days_back,
             max_workers=3
         )
         
-        # 处理搜索结果 - Document对象转换为字典
-        processed_results = []
-        for result in search_results[:max_results]:
-            # 处理Document对象
-            if hasattr(result, 'title'):
-                # 这是Document对象
-                processed_result = {
-                    "title": getattr(result, 'title', ''),
-                    "content": getattr(result, 'content', '')[:500],  # 限制内容长度
-                    "url": getattr(result, 'url', ''),
-                    "source": getattr(result, 'source', 'unknown'),
-                    "relevance_score": getattr(result, 'relevance_score', 0.0),
-                    "timestamp": getattr(result, 'timestamp', '')
-                }
-            else:
-                # 这是字典对象
-                processed_result = {
-                    "title": result.get("title", ""),
-                    "content": result.get("content", "")[:500],  # 限制内容长度
-                    "url": result.get("url", ""),
-                    "source": result.get("source", "unknown"),
-                    "relevance_score": result.get("relevance_score", 0.0),
-                    "timestamp": result.get("timestamp", "")
-                }
-            processed_results.append(processed_result)
+        return _search_success_response(query, search_results, max_results)
         
-        response = {
-            "status": "success",
-            "query": query,
-            "results": processed_results,
-            "total_found": len(processed_results),
-            "search_timestamp": datetime.now().isoformat()
-        }
+    except Exception as e:
+        return _search_error_response(query, e)
+
+def _batch_search_response(queries: List[str], grouped_results: Dict[str, List[Any]], max_results: int) -> str:
+    processed_results = []
+    per_query_counts = {}
+    for query, query_results in grouped_results.items():
+        formatted = _format_search_results(query_results, max_results)
+        for item in formatted:
+            item["query"] = query
+        processed_results.extend(formatted)
+        per_query_counts[query] = len(formatted)
+    
+    response = {
+        "status": "success",
+        "queries": queries,
+        "results": processed_results,
+        "per_query": per_query_counts,
+        "total_found": len(processed_results),
+        "search_timestamp": datetime.now().isoformat()
+    }
+    
+    print(f"✅ 批量搜索完成: {len(grouped_results)}个查询，共 {len(processed_results)} 条去重结果")
+    return json.dumps(response, ensure_ascii=False, indent=2)
+
+def _batch_search_sync(queries: List[str], max_results: int = 5, search_type: str = "general",
+                       max_workers: int = None) -> str:
+    """批量搜索的同步版本：整个查询列表一次提交，结果全局去重，供编排流程调用"""
+    try:
+        orchestrator = _get_search_orchestrator()
+        if orchestrator is None:
+            return _search_unavailable_response()
+        
+        print(f"🔍 执行批量搜索: {len(queries)}个查询 (类型: {search_type})")
+        sources, days_back = _search_profile(search_type)
+        
+        grouped_results = orchestrator.batch_search(
+            queries=queries,
+            sources=sources,
+            max_results_per_query=max_results,
+            days_back=days_back,
+            max_workers=max_workers or orchestrator.config.max_workers
+        )
         
-        print(f"✅ 搜索完成，找到 {len(processed_results)} 条结果")
-        return json.dumps(response, ensure_ascii=False, indent=2)
+        return _batch_search_response(queries, grouped_results, max_results)
         
     except Exception as e:
-        error_response = {
-            "status": "error",
-            "query": query,
-            "message": f"搜索执行失败: {str(e)}",
-            "results": [],
-            "error_type": type(e).__name__
-        }
-        print(f"❌ 搜索失败: {str(e)}")
-        return json.dumps(error_response, ensure_ascii=False, indent=2)
+        return _search_error_response("; ".join(queries), e)
+
+@mcp.tool()
+async def batch_search(queries: List[str], max_results: int = 5, search_type: str = "general") -> str:
+    """批量执行多个搜索查询，所有查询并行执行并按URL全局去重"""
+    # 在线程中执行，不阻塞HTTP/MCP服务的事件循环
+    return await asyncio.to_thread(_batch_search_sync, queries, max_results, search_type)
 
 @mcp.tool()
 def analysis_mcp(analysis_type: str, data: str, topic: str = "", context: str = "", **kwargs) -> str:
@@ -177,7 +335,8 @@ def analysis_mcp(analysis_type: str, data: str, topic: str = "", context: str =
             return _analyze_gaps(topic, existing_data)
         elif analysis_type == "evaluation":
             quality_standards = kwargs.get("quality_standards", {})
-            return _analyze_evaluation(data, topic, quality_standards, context)
+            batched = kwargs.get("batched_evaluation", True)
+            return _analyze_evaluation(data, topic, quality_standards, context, batched, kwargs.get("memo_key"))
         else:
             return json.dumps({
                 "status": "error",
@@ -407,8 +566,16 @@ def _analyze_gaps(topic: str, existing_data: List[Dict], expected_aspects: List[
             "gap_analysis": {}
         }, ensure_ascii=False)
 
-def _analyze_evaluation(content: str, topic: str, quality_standards: Dict = None, context: str = "") -> str:
-    """分析内容质量并提供改进建议"""
+def _analyze_evaluation(content: str, topic: str, quality_standards: Dict = None, context: str = "",
+                        batched: bool = True, memo_key: Optional[str] = None) -> str:
+    """
+    分析内容质量并提供改进建议
+    
+    batched为True时通过一次结构化JSON的LLM调用获取全部五个维度的评分，
+    解析失败的维度退回到逐维度评估；评分按内容哈希缓存，相同内容不会重复评估。
+    调用方可以传入memo_key（如采样资料的哈希）代替内容哈希作为缓存键，
+    使评估文本中随轮次变化的说明文字不影响缓存命中。
+    """
     try:
         if not quality_standards:
             quality_standards = {
@@ -438,52 +605,15 @@ def _analyze_evaluation(content: str, topic: str, quality_standards: Dict = None
             text_content = str(content_data)
         
         # 质量评估维度
+        scores, scoring_mode = _score_evaluation_dimensions(text_content, topic, batched, memo_key)
         evaluation_results = {}
-        
-        # 1. 完整性评估 (Completeness)
-        completeness_score = _evaluate_completeness(text_content, topic)
-        evaluation_results["completeness"] = {
-            "score": completeness_score,
-            "weight": quality_standards["completeness"]["weight"],
-            "min_required": quality_standards["completeness"]["min_score"],
-            "passed": completeness_score >= quality_standards["completeness"]["min_score"]
-        }
-        
-        # 2. 准确性评估 (Accuracy) 
-        accuracy_score = _evaluate_accuracy(text_content, topic)
-        evaluation_results["accuracy"] = {
-            "score": accuracy_score,
-            "weight": quality_standards["accuracy"]["weight"],
-            "min_required": quality_standards["accuracy"]["min_score"],
-            "passed": accuracy_score >= quality_standards["accuracy"]["min_score"]
-        }
-        
-        # 3. 深度评估 (Depth)
-        depth_score = _evaluate_depth(text_content, topic)
-        evaluation_results["depth"] = {
-            "score": depth_score,
-            "weight": quality_standards["depth"]["weight"],
-            "min_required": quality_standards["depth"]["min_score"],
-            "passed": depth_score >= quality_standards["depth"]["min_score"]
-        }
-        
-        # 4. 相关性评估 (Relevance)
-        relevance_score = _evaluate_relevance(text_content, topic)
-        evaluation_results["relevance"] = {
-            "score": relevance_score,
-            "weight": quality_standards["relevance"]["weight"],
-            "min_required": quality_standards["relevance"]["min_score"],
-            "passed": relevance_score >= quality_standards["relevance"]["min_score"]
-        }
-        
-        # 5. 清晰度评估 (Clarity)
-        clarity_score = _evaluate_clarity(text_content)
-        evaluation_results["clarity"] = {
-            "score": clarity_score,
-            "weight": quality_standards["clarity"]["weight"],
-            "min_required": quality_standards["clarity"]["min_score"],
-            "passed": clarity_score >= quality_standards["clarity"]["min_score"]
-        }
+        for dimension in EVALUATION_DIMENSIONS:
+            evaluation_results[dimension] = {
+                "score": scores[dimension],
+                "weight": quality_standards[dimension]["weight"],
+                "min_required": quality_standards[dimension]["min_score"],
+                "passed": scores[dimension] >= quality_standards[dimension]["min_score"]
+            }
         
         # 计算加权总分
         total_score = sum([
@@ -515,6 +645,7 @@ def _analyze_evaluation(content: str, topic: str, quality_standards: Dict = None
                 "weak_areas": weak_areas,
                 "improvement_suggestions": improvement_suggestions,
                 "content_length": len(text_content),
+                "scoring_mode": scoring_mode,
                 "evaluation_timestamp": datetime.now().isoformat()
             }
         }
@@ -528,6 +659,111 @@ def _analyze_evaluation(content: str, topic: str, quality_standards: Dict = None
             "evaluation": {}
         }, ensure_ascii=False)
 
+# 质量评估的五个维度
+EVALUATION_DIMENSIONS = ["completeness", "accuracy", "depth", "relevance", "clarity"]
+
+# 评分缓存：内容哈希 -> 各维度评分，避免对未变化的内容重复评估
+_EVALUATION_CACHE_SIZE = 256
+_evaluation_score_cache: "OrderedDict[str, Dict[str, float]]" = OrderedDict()
+_evaluation_cache_lock = threading.Lock()
+
+def _evaluation_cache_key(text_content: str, topic: str, batched: bool, memo_key: Optional[str] = None) -> str:
+    mode = "batched" if batched else "per_dimension"
+    if memo_key:
+        return hashlib.sha256(f"{mode}\nmemo\n{memo_key}".encode("utf-8")).hexdigest()
+    return hashlib.sha256(f"{mode}\n{topic}\n{text_content}".encode("utf-8")).hexdigest()
+
+def _evaluation_sample_key(topic: str, sampled_results: List[Dict]) -> str:
+    """按主题和采样资料（标题+内容，空白归一化）计算评分缓存键，与评估文本中的轮次、总数等说明无关"""
+    normalize = lambda text: re.sub(r'\s+', ' ', str(text or '')).strip()
+    parts = [normalize(topic)]
+    for item in sampled_results:
+        parts.append(f"{normalize(item.get('title', ''))}\n{normalize(item.get('content', '')[:300])}")
+    return hashlib.sha256("\n\n".join(parts).encode("utf-8")).hexdigest()
+
+def _score_evaluation_dimensions(text_content: str, topic: str, batched: bool = True,
+                                 memo_key: Optional[str] = None) -> tuple:
+    """获取五个维度的评分，返回 (评分字典, 评分方式)"""
+    cache_key = _evaluation_cache_key(text_content, topic, batched, memo_key)
+    with _evaluation_cache_lock:
+        cached = _evaluation_score_cache.get(cache_key)
+        if cached is not None:
+            _evaluation_score_cache.move_to_end(cache_key)
+            print("♻️ 内容未变化，复用缓存的质量评分")
+            return dict(cached), "cached"
+    
+    scores = _evaluate_dimensions_batched(text_content, topic) if batched else {}
+    if len(scores) == len(EVALUATION_DIMENSIONS):
+        scoring_mode = "batched"
+    else:
+        scoring_mode = "batched_partial" if scores else "per_dimension"
+    
+    # 批量评估缺失的维度逐个评估
+    single_evaluators = {
+        "completeness": lambda: _evaluate_completeness(text_content, topic),
+        "accuracy": lambda: _evaluate_accuracy(text_content, topic),
+        "depth": lambda: _evaluate_depth(text_content, topic),
+        "relevance": lambda: _evaluate_relevance(text_content, topic),
+        "clarity": lambda: _evaluate_clarity(text_content)
+    }
+    for dimension in EVALUATION_DIMENSIONS:
+        if dimension not in scores:
+            scores[dimension] = single_evaluators[dimension]()
+    
+    with _evaluation_cache_lock:
+        _evaluation_score_cache[cache_key] = dict(scores)
+        _evaluation_score_cache.move_to_end(cache_key)
+        while len(_evaluation_score_cache) > _EVALUATION_CACHE_SIZE:
+            _evaluation_score_cache.popitem(last=False)
+    
+    return scores, scoring_mode
+
+def _evaluate_dimensions_batched(content: str, topic: str) -> Dict[str, float]:
+    """一次LLM调用获取全部五个维度的评分，返回成功解析的维度"""
+    if not content.strip():
+        return {dimension: 0.0 for dimension in EVALUATION_DIMENSIONS}
+    
+    try:
+        prompt = f"""请从以下5个维度评估关于"{topic}"的资料质量，每个维度给出1-10分的评分（一位小数）。
+
+评估维度：
+- completeness（完整性）：是否覆盖主题的主要方面，信息是否充分详细，资料数量是否足够
+- accuracy（准确性）：是否有可靠的数据来源和研究依据，是否存在猜测或不确定的表述
+- depth（深度）：是否深入分析原因、机制、影响和趋势，是否有具体数据和案例
+- relevance（相关性）：是否直接相关于主题，是否包含无关或偏离主题的内容
+- clarity（清晰度）：结构是否清晰，段落和表达是否易于理解
+
+资料内容：
+{content[:2000]}
+
+只输出JSON，不要输出其他内容，格式：
+{{"completeness": X.X, "accuracy": X.X, "depth": X.X, "relevance": X.X, "clarity": X.X}}"""
+        
+        response = get_llm_processor().call_llm_api(
+            prompt=prompt,
+            system_message="你是一个专业的内容质量评估专家，请客观公正地评估内容质量。",
+            temperature=0.1,
+            max_tokens=150
+        )
+        
+        json_match = re.search(r'\{[\s\S]*?\}', response)
+        if not json_match:
+            print("⚠️ 批量质量评估未返回JSON，退回逐维度评估")
+            return {}
+        
+        raw_scores = json.loads(json_match.group(0))
+        scores = {}
+        for dimension in EVALUATION_DIMENSIONS:
+            try:
+                scores[dimension] = min(max(float(raw_scores[dimension]), 0.0), 10.0)
+            except (KeyError, TypeError, ValueError):
+                print(f"⚠️ 批量质量评估缺少维度 {dimension}，将单独评估")
+        return scores
+        
+    except Exception as e:
+        print(f"⚠️ LLM批量质量评估失败: {e}")
+        return {}
+
 def _evaluate_completeness(content: str, topic: str) -> float:
     """评估内容完整性 - 使用LLM评估"""
     if not content.strip():
@@ -551,7 +787,7 @@ def _evaluate_completeness(content: str, topic: str) -> float:
 
 评分："""
         
-        response = llm_processor.call_llm_api(
+        response = get_llm_processor().call_llm_api(
             prompt=prompt,
             system_message="你是一个专业的内容质量评估专家，请客观公正地评估内容质量。",
             temperature=0.1,
@@ -653,7 +889,7 @@ def _evaluate_relevance(content: str, topic: str) -> float:
 
 评分："""
         
-        response = llm_processor.call_llm_api(
+        response = get_llm_processor().call_llm_api(
             prompt=prompt,
             system_message="你是一个专业的内容质量评估专家，请客观公正地评估内容质量。",
             temperature=0.1,
@@ -850,6 +1086,7 @@ def _generate_queries_with_llm(topic: str, sections: list, outline_structure: di
     """使用LLM为章节生成针对性搜索查询"""
     try:
         # 检查LLM可用性
+        llm_processor = _get_llm_processor()
         if not llm_processor:
             print("❌ LLM处理器不可用，使用回退策略")
             return _generate_fallback_queries(topic, sections)
@@ -1010,8 +1247,7 @@ def _generate_academic_queries(topic: str, context: str, kwargs: Dict) -> str:
     """生成学术研究查询 - 参考generate_research_report的方法"""
     try:
         # 尝试使用LLM生成精确的学术搜索关键词
-        from collectors.llm_processor import LLMProcessor
-        llm_processor = LLMProcessor()
+        llm_processor = get_llm_processor()
         
         prompt = f"""
         为了搜索有关"{topic}"的最新学术研究信息，请生成8个精确的中英文搜索关键词或短语。
@@ -1184,7 +1420,8 @@ def outline_writer_mcp(topic: str, report_type: str = "comprehensive", user_requ
 请生成详细的综合报告大纲："""
 
         # 使用LLM生成大纲
-        if not llm_available or llm_processor is None:
+        llm_processor = _get_llm_processor()
+        if llm_processor is None:
             print("⚠️ LLM处理器不可用，使用默认大纲结构")
             raise Exception("LLM处理器不可用")
         
@@ -1453,7 +1690,8 @@ def content_writer_mcp(section_title: str, content_data: List[Dict], overall_rep
         print(f"📖 生成内容: {section_title}")
         
         # 检查LLM可用性
-        if not llm_available or llm_processor is None:
+        llm_processor = _get_llm_processor()
+        if llm_processor is None:
             print("⚠️ LLM处理器不可用，使用模板内容")
             return _generate_fallback_content(section_title, content_data)
         
@@ -1579,6 +1817,9 @@ def content_writer_mcp(section_title: str, content_data: List[Dict], overall_rep
             return _generate_fallback_content(section_title, content_data)
         
     except Exception as e:
+        # 限流交给章节调度器退避重试，不用备用内容掩盖
+        if _is_rate_limit_error(e):
+            raise
         print(f"⚠️ 内容生成失败: {e}")
         return _generate_fallback_content(section_title, content_data)
 
@@ -1630,6 +1871,127 @@ def _generate_fallback_content(section_title: str, content_data: List[Dict]) ->
 @mcp.tool()
 def orchestrator_mcp(task: str, task_type: str = "auto", **kwargs) -> str:
     """主编排工具 - 调度各个MCP工具完成复杂任务"""
+    result = None
+    for event in orchestrator_mcp_events(task, task_type, **kwargs):
+        if event["event"] == "result":
+            result = event["result"]
+    return result
+
+@mcp.tool()
+def resume_orchestrator_mcp(run_id: str, **kwargs) -> str:
+    """从运行日志恢复中断的编排任务，跳过已完成的阶段和章节"""
+    try:
+        journal = RunJournal.load(run_id)
+    except (FileNotFoundError, ValueError) as e:
+        return json.dumps({"status": "error", "run_id": run_id, "error": str(e)}, ensure_ascii=False)
+    
+    run_kwargs = journal.kwargs
+    run_kwargs.update(kwargs)
+    run_kwargs['run_id'] = run_id
+    return orchestrator_mcp(journal.task, journal.task_type, **run_kwargs)
+
+@mcp.tool()
+def rerun_section_mcp(run_id: str, section_title: str, **kwargs) -> str:
+    """
+    基于运行日志中缓存的搜索语料重写单个章节，并在全部章节齐全时重新组装报告
+    
+    要求该运行已完成大纲、质量迭代（或搜索）和执行摘要阶段
+    """
+    try:
+        journal = RunJournal.load(run_id)
+        missing = [stage for stage in ("intent", "outline", "summary") if not journal.has(stage)]
+        if not journal.has("quality") and not journal.has("search"):
+            missing.append("search")
+        if missing:
+            raise ValueError(f"运行 {run_id} 缺少阶段: {', '.join(missing)}，请先使用resume_orchestrator_mcp完成")
+        
+        outline_stage = journal.load_stage("outline")
+        section_titles = [title for title in outline_stage["sections"] if title]
+        if section_title not in section_titles:
+            raise ValueError(f"章节不存在: {section_title}，可选章节: {section_titles}")
+        index = section_titles.index(section_title)
+        
+        run_kwargs = journal.kwargs
+        run_kwargs.update(kwargs)
+        intent_data = journal.load_stage("intent")
+        executive_summary = journal.load_stage("summary")
+        corpus = journal.load_stage("quality" if journal.has("quality") else "search")
+        topic = outline_stage["topic"]
+        
+        print(f"🔁 重写运行 {run_id} 的章节 '{section_title}'（缓存语料{len(corpus)}条）")
+        content, fallback_note = _write_orchestrated_section(
+            section_title,
+            _select_section_data(section_title, corpus),
+            _overall_report_context(topic, outline_stage["report_type"], intent_data, executive_summary),
+            outline_stage["outline_structure"],
+            run_kwargs.get('writing_style', 'professional'),
+            run_kwargs.get('target_audience', '专业人士'),
+            run_kwargs.get('depth_level', 'detailed')
+        )
+        if fallback_note:
+            # 备用内容不算完成，保留日志中原有的章节
+            print(f"⚠️ 章节 '{section_title}' {fallback_note}，不写入运行日志")
+        else:
+            journal.save_section(index, section_title, content)
+            journal.invalidate("result")
+        
+        finished_sections = journal.load_sections(section_titles)
+        if fallback_note or len(finished_sections) < len(section_titles):
+            return json.dumps({
+                "status": "partial",
+                "run_id": run_id,
+                "section_title": section_title,
+                "content": content,
+                "note": fallback_note,
+                "missing_sections": [title for i, title in enumerate(section_titles) if i not in finished_sections]
+            }, ensure_ascii=False, indent=2)
+        
+        final_report = _assemble_orchestrated_report(
+            topic=topic,
+            task_description=journal.task,
+            intent_analysis=intent_data.get('details', {}),
+            outline=outline_stage["outline_data"],
+            executive_summary=executive_summary,
+            section_contents={section_titles[i]: text for i, text in finished_sections.items()},
+            search_summary=f"收集到{len(corpus)}条搜索结果",
+            quality_score=8.0,
+            sections=outline_stage["sections"],
+            outline_structure=outline_stage["outline_structure"]
+        )
+        _journal_finish(journal, final_report)
+        return final_report
+        
+    except Exception as e:
+        return json.dumps({
+            "status": "error",
+            "run_id": run_id,
+            "section_title": section_title,
+            "error": str(e),
+            "timestamp": datetime.now().isoformat()
+        }, ensure_ascii=False)
+
+def _orchestrator_stage(stage: str, message: str) -> Dict[str, Any]:
+    """切换流水线阶段并生成对应的阶段事件"""
+    set_stage(stage)
+    return {"event": "stage", "stage": stage, "message": message}
+
+def orchestrator_mcp_events(task: str, task_type: str = "auto", **kwargs) -> Iterator[Dict[str, Any]]:
+    """
+    orchestrator_mcp的事件流版本 - 随执行进度逐步产出事件，供流式接口实时推送
+    
+    事件类型:
+        stage: 进入新的流水线阶段 {"stage", "message"}
+        outline: 大纲解析完成 {"outline", "sections", "outline_structure"}
+        summary: 执行摘要生成完成 {"content"}
+        section: 章节内容完成，严格按大纲顺序产出 {"index", "total", "title", "content"}
+        result: 最终结果，与orchestrator_mcp的返回值相同 {"result"}
+        run: 运行日志已创建或恢复 {"run_id"}
+    
+    传入run_id时恢复该运行：已完成的阶段和章节直接从运行日志读取，不再重复执行
+    """
+    journal = None
+    # 各阶段通过set_stage切换用量统计的阶段，结束（含客户端断开）时恢复调用方原来的阶段
+    caller_stage = get_current_stage()
     try:
         print(f"🎯 开始执行编排任务: {task}")
         print(f"📋 任务类型: {task_type}")
@@ -1639,7 +2001,9 @@ def orchestrator_mcp(task: str, task_type: str = "auto", **kwargs) -> str:
         
         if simple_mode:
             print("🚀 使用简化模式")
-            return _execute_simple_orchestration(task, **kwargs)
+            yield _orchestrator_stage("simple", "执行简化编排流程")
+            yield {"event": "result", "result": _execute_simple_orchestration(task, **kwargs)}
+            return
         
         # 提取主题 - 优先使用kwargs中的topic参数
         topic = kwargs.get('topic') or _extract_topic_from_task(task)
@@ -1652,26 +2016,37 @@ def orchestrator_mcp(task: str, task_type: str = "auto", **kwargs) -> str:
         writing_style = kwargs.get('writing_style', 'professional')
         max_iterations = kwargs.get('max_iterations', 3)
         min_quality_score = kwargs.get('min_quality_score', 7.0)
+        min_score_gain = kwargs.get('min_score_gain', 0.3)
         
         print(f"📋 深度级别: {depth_level}")
         print(f"📋 目标受众: {target_audience}")
         print(f"📋 写作风格: {writing_style}")
         
+        # 运行日志：每个阶段完成后持久化输出，失败后可以从中断处恢复
+        journal = _open_run_journal(task, task_type, kwargs)
+        if journal is not None:
+            yield {"event": "run", "run_id": journal.run_id}
+        
         # 步骤1: 分析用户意图
         print("\n🔍 [步骤1] 分析用户意图...")
+        yield _orchestrator_stage("intent", "分析用户意图")
         
-        intent_result = analysis_mcp(
-            analysis_type="intent",
-            data=task,
-            topic=topic,
-            context=f"任务类型: {task_type}, 深度: {depth_level}, 受众: {target_audience}"
-        )
-        
-        intent_data = json.loads(intent_result)
+        intent_data = _restore_stage(journal, "intent")
+        if intent_data is None:
+            intent_result = analysis_mcp(
+                analysis_type="intent",
+                data=task,
+                topic=topic,
+                context=f"任务类型: {task_type}, 深度: {depth_level}, 受众: {target_audience}"
+            )
+            
+            intent_data = json.loads(intent_result)
+            _journal_stage(journal, "intent", intent_data)
         print(f"✅ 意图识别完成: {intent_data.get('details', {}).get('primary_intent', '未识别')}")
         
         # 步骤2: 生成报告大纲
         print("\n📝 [步骤2] 生成报告大纲...")
+        yield _orchestrator_stage("outline", "生成报告大纲")
         
         # 根据意图确定报告类型
         print(f"🔍 [调试] task_type: {task_type}, task: {task}")
@@ -1693,212 +2068,179 @@ def orchestrator_mcp(task: str, task_type: str = "auto", **kwargs) -> str:
         # 学术研究报告使用专门的处理流程
         if report_type == "academic":
             print("📚 [学术报告] 使用专门的学术研究报告生成流程...")
-            return _generate_academic_research_report(topic, task, depth_level, target_audience)
+            yield _orchestrator_stage("academic", "生成学术研究报告")
+            final_report = _generate_academic_research_report(topic, task, depth_level, target_audience)
+            _journal_finish(journal, final_report)
+            yield {"event": "result", "result": final_report}
+            return
+        
+        outline_stage = _restore_stage(journal, "outline")
+        if outline_stage is None:
+            outline_result = outline_writer_mcp(
+                topic=topic,
+                report_type=report_type,
+                user_requirements=task,
+                depth_level=depth_level,
+                target_audience=target_audience
+            )
             
-        outline_result = outline_writer_mcp(
-            topic=topic,
-            report_type=report_type,
-            user_requirements=task,
-            depth_level=depth_level,
-            target_audience=target_audience
-        )
-        
-        outline_data = json.loads(outline_result)
-        
-        # 解析大纲内容，提取章节信息
-        # outline_data已经是解析后的JSON，检查实际的字段名
-        outline_content = outline_data.get('content', '') or outline_data.get('outline', '')
-        print(f"🔍 [调试] outline_data类型: {type(outline_data)}")
-        print(f"🔍 [调试] outline_data keys: {list(outline_data.keys()) if isinstance(outline_data, dict) else 'Not a dict'}")
-        
-        # 从大纲文本中提取完整结构（包括章节和子章节）
-        sections = []
-        outline_structure = {}  # 存储完整的大纲结构
-        
-        if outline_content:
-            print(f"🔍 [调试] 原始大纲内容前200字符: {repr(outline_content[:200])}")
-            print(f"🔍 [调试] 原始大纲内容完整: {repr(outline_content)}")
+            outline_data = json.loads(outline_result)
             
-            lines = outline_content.split('\n')
-            print(f"🔍 [调试] 分割后的行数: {len(lines)}")
-            print(f"🔍 [调试] 前10行内容: {lines[:10]}")
-            current_main_section = None
+            # 解析大纲内容，提取章节信息
+            # outline_data已经是解析后的JSON，检查实际的字段名
+            outline_content = outline_data.get('content', '') or outline_data.get('outline', '')
+            print(f"🔍 [调试] outline_data类型: {type(outline_data)}")
+            print(f"🔍 [调试] outline_data keys: {list(outline_data.keys()) if isinstance(outline_data, dict) else 'Not a dict'}")
             
-            for line in lines:
-                line = line.strip()
-                if line.startswith('## ') and not line.startswith('### '):
-                    # 主章节（## 开头的）
-                    section_title = line[3:].strip()  # 去掉"## "
-                    # 过滤掉标题行和无效章节
-                    if section_title and not any(keyword in section_title.lower() for keyword in ['大纲', 'outline', '报告', 'report']):
-                        sections.append(section_title)
-                        current_main_section = section_title
-                        outline_structure[section_title] = {
-                            'title': section_title,
-                            'subsections': []
-                        }
-                        print(f"🔍 [调试] ✅ 找到主章节: {section_title}")
-                        
-                elif line.startswith('### ') and current_main_section:
-                    # 子章节
-                    subsection_title = line[4:].strip()  # 去掉"### "
-                    if subsection_title:
-                        outline_structure[current_main_section]['subsections'].append(subsection_title)
-                        print(f"🔍 [调试] ✅ 找到子章节: {subsection_title}")
-        
-        print(f"🔍 [调试] 解析出的章节列表: {sections}")
-        print(f"🔍 [调试] 解析出的大纲结构: {len(outline_structure)}个主章节，总共{sum(len(v['subsections']) for v in outline_structure.values())}个子章节")
+            sections, outline_structure = _parse_outline_sections(outline_content)
+            _journal_stage(journal, "outline", {
+                "topic": topic,
+                "report_type": report_type,
+                "outline_data": outline_data,
+                "outline_content": outline_content,
+                "sections": sections,
+                "outline_structure": outline_structure
+            })
+        else:
+            outline_data = outline_stage["outline_data"]
+            outline_content = outline_stage["outline_content"]
+            sections = outline_stage["sections"]
+            outline_structure = outline_stage["outline_structure"]
         
         print(f"✅ 大纲生成完成: {len(outline_content)}字符")
         print(f"✅ 大纲生成完成: {len(sections)}个章节")
+        yield {
+            "event": "outline",
+            "outline": outline_content,
+            "sections": sections,
+            "outline_structure": outline_structure
+        }
         
         # 步骤3: 生成查询策略
         print("\n🔍 [步骤3] 生成查询策略...")
+        yield _orchestrator_stage("queries", "生成查询策略")
         
         # 根据报告类型选择查询策略
         if report_type == "academic":
             query_strategy = "academic"
         else:
             query_strategy = "outline_based"
-            
-        query_result = query_generation_mcp(
-            topic=topic,
-            strategy=query_strategy,
-            context=json.dumps({
-                "intent": intent_data.get('details', {}),
-                "outline": sections,
-                "outline_structure": outline_structure
-            }, ensure_ascii=False),
-            report_type=report_type,
-            max_queries=len(sections) * 2 if query_strategy == "outline_based" else 8
-        )
         
-        query_data = json.loads(query_result)
+        query_data = _restore_stage(journal, "queries")
+        if query_data is None:
+            query_result = query_generation_mcp(
+                topic=topic,
+                strategy=query_strategy,
+                context=json.dumps({
+                    "intent": intent_data.get('details', {}),
+                    "outline": sections,
+                    "outline_structure": outline_structure
+                }, ensure_ascii=False),
+                report_type=report_type,
+                max_queries=len(sections) * 2 if query_strategy == "outline_based" else 8
+            )
+            
+            query_data = json.loads(query_result)
+            _journal_stage(journal, "queries", query_data)
         print(f"✅ 查询策略生成完成: {len(query_data.get('queries', []))}个查询")
         
         # 步骤4: 执行搜索数据收集
         print("\n📊 [步骤4] 执行搜索数据收集...")
+        yield _orchestrator_stage("search", "执行搜索数据收集")
         
-        all_search_results = []
-        queries = query_data.get('queries', [])
-        
-        for query_obj in queries:
-            # 提取查询字符串
-            query_text = query_obj.get('query', '') if isinstance(query_obj, dict) else str(query_obj)
-            if query_text:
-                # 根据报告类型调整搜索结果数量
-                max_results = 10 if report_type == "industry" else 5
-                search_result = search(query=query_text, max_results=max_results)
-                search_data = json.loads(search_result)
-                
-                if search_data.get('status') == 'success':
-                    results = search_data.get('results', [])
-                    all_search_results.extend(results)
-                    print(f"✅ 搜索完成，找到 {len(results)} 条结果")
-                else:
-                    print(f"❌ 搜索失败: {search_data.get('message', '未知错误')}")
+        all_search_results = _restore_stage(journal, "search")
+        if all_search_results is None:
+            all_search_results = _collect_orchestrated_search(query_data.get('queries', []), report_type)
+            _journal_stage(journal, "search", all_search_results)
         
         print(f"✅ 搜索完成: 收集到{len(all_search_results)}条数据")
         
         # 步骤5: 质量评估迭代循环
         print("\n🔍 [步骤5] 质量评估迭代循环...")
+        yield _orchestrator_stage("quality", "质量评估迭代")
         
-        # 组装初步内容用于质量评估
-        preliminary_content = _assemble_content_for_quality_evaluation("", {}, topic)
-        
-        # 执行质量评估迭代
-        all_search_results = _quality_evaluation_iteration(
-            topic=topic,
-            initial_search_results=all_search_results,
-            max_iterations=max_iterations,
-            min_quality_score=min_quality_score
-        )
+        corpus = _restore_stage(journal, "quality")
+        if corpus is None:
+            # 组装初步内容用于质量评估
+            preliminary_content = _assemble_content_for_quality_evaluation("", {}, topic)
+            
+            # 执行质量评估迭代
+            corpus = _quality_evaluation_iteration(
+                topic=topic,
+                initial_search_results=all_search_results,
+                max_iterations=max_iterations,
+                min_quality_score=min_quality_score,
+                min_score_gain=min_score_gain
+            )
+            _journal_stage(journal, "quality", corpus)
+        all_search_results = corpus
         
         # 步骤6: 生成执行摘要
         print("\n📝 [步骤6] 生成执行摘要...")
+        yield _orchestrator_stage("summary", "生成执行摘要")
         
-        summary_result = summary_writer_mcp(
-            content_data=all_search_results,
-            length_constraint="300-500字",
-            format="executive_summary",
-            topic=topic,
-            target_audience=target_audience
-        )
-        
-        summary_data = json.loads(summary_result)
-        executive_summary = summary_data.get('summary', summary_data.get('content', '执行摘要生成中...'))
+        executive_summary = _restore_stage(journal, "summary")
+        if executive_summary is None:
+            summary_result = summary_writer_mcp(
+                content_data=all_search_results,
+                length_constraint="300-500字",
+                format="executive_summary",
+                topic=topic,
+                target_audience=target_audience
+            )
+            
+            summary_data = json.loads(summary_result)
+            executive_summary = summary_data.get('summary', summary_data.get('content', '执行摘要生成中...'))
+            _journal_stage(journal, "summary", executive_summary)
         print(f"✅ 执行摘要生成完成: {len(executive_summary)}字符")
+        yield {"event": "summary", "content": executive_summary}
         
         # 步骤7: 生成各章节内容
         print("\n📖 [步骤7] 生成各章节内容...")
+        yield _orchestrator_stage("sections", "生成各章节内容")
+        
+        overall_report_context = _overall_report_context(topic, report_type, intent_data, executive_summary)
+        section_titles = [title for title in sections if title]
+        
+        # 运行日志中已完成的章节不再重写
+        finished_sections = journal.load_sections(section_titles) if journal is not None else {}
+        if finished_sections:
+            print(f"♻️ 从运行日志恢复{len(finished_sections)}个已完成章节")
+        
+        # 一次性为全部章节筛选相关数据
+        sections_data = _select_sections_data(section_titles, all_search_results)
+        
+        # 各章节并发撰写，按大纲顺序输出；提前完成的章节由调度器缓存
+        from collectors.section_scheduler import SectionScheduler
+        scheduler = SectionScheduler(max_concurrency=kwargs.get('section_workers'))
+        section_tasks = []
+        for index, (section_title, section_data) in enumerate(zip(section_titles, sections_data)):
+            if index in finished_sections:
+                section_tasks.append(partial(finished_sections.get, index))
+                continue
+            write_section = partial(
+                _write_orchestrated_section,
+                section_title, section_data, overall_report_context,
+                outline_structure, writing_style, target_audience, depth_level
+            )
+            section_tasks.append(partial(_journal_section, journal, index, section_title, write_section))
         
         section_contents = {}
-        for section_title in sections:
-            if section_title:
-                # 为每个章节筛选相关数据 - 改进匹配逻辑
-                relevant_data = []
-                
-                # 首先尝试精确匹配章节关键词
-                section_keywords = section_title.replace('+', ' ').split()
-                for item in all_search_results:
-                    content = (item.get('content', '') + ' ' + item.get('title', '')).lower()
-                    title_lower = section_title.lower()
-                    
-                    # 计算相关性得分
-                    score = 0
-                    for keyword in section_keywords:
-                        if keyword.lower() in content:
-                            score += 1
-                    
-                    # 如果章节标题包含特定词汇，优先匹配相关内容
-                    if '技术' in title_lower and ('技术' in content or 'technology' in content):
-                        score += 2
-                    elif '市场' in title_lower and ('市场' in content or 'market' in content):
-                        score += 2
-                    elif '应用' in title_lower and ('应用' in content or 'application' in content):
-                        score += 2
-                    elif '教育' in title_lower and ('教育' in content or 'education' in content):
-                        score += 2
-                    elif '人工智能' in title_lower and ('人工智能' in content or 'ai' in content or 'artificial intelligence' in content):
-                        score += 2
-                    elif '行业' in title_lower and ('行业' in content or 'industry' in content):
-                        score += 2
-                    elif '动态' in title_lower and ('动态' in content or 'trend' in content or 'news' in content):
-                        score += 2
-                    
-                    # 降低匹配门槛，只要有轻微相关性就包含
-                    if score > 0 or len(relevant_data) < 3:
-                        relevant_data.append((item, score))
-                
-                # 按相关性得分排序，选择前8个（增加数量）
-                relevant_data.sort(key=lambda x: x[1], reverse=True)
-                relevant_data = [item[0] for item in relevant_data[:8]]
-                
-                # 如果还是没有相关数据，使用所有搜索结果的前8条
-                if not relevant_data:
-                    relevant_data = all_search_results[:8]
-                
-                content_result = content_writer_mcp(
-                    section_title=section_title,
-                    content_data=relevant_data,
-                    overall_report_context=json.dumps({
-                        "topic": topic,
-                        "report_type": report_type,
-                        "intent": intent_data.get('details', {}),
-                        "executive_summary": executive_summary
-                    }, ensure_ascii=False),
-                    outline_structure=outline_structure,
-                    writing_style=writing_style,
-                    target_audience=target_audience,
-                    depth_level=depth_level
-                )
-                
-                content_data = json.loads(content_result)
-                section_contents[section_title] = content_data.get('content', '')
-                print(f"  ✅ 章节 '{section_title}' 完成")
+        for index, content in scheduler.iter_ordered(section_tasks):
+            section_title = section_titles[index]
+            section_contents[section_title] = content
+            print(f"  ✅ 章节 '{section_title}' 完成")
+            yield {
+                "event": "section",
+                "index": index,
+                "total": len(section_titles),
+                "title": section_title,
+                "content": content
+            }
         
         # 步骤7: 组装最终报告
         print("\n🔧 [步骤7] 组装最终报告...")
+        yield _orchestrator_stage("assembly", "组装最终报告")
         
         final_report = _assemble_orchestrated_report(
             topic=topic,
@@ -1912,9 +2254,10 @@ def orchestrator_mcp(task: str, task_type: str = "auto", **kwargs) -> str:
             sections=sections,
             outline_structure=outline_structure
         )
+        _journal_finish(journal, final_report)
         
         print("✅ 报告生成完成!")
-        return final_report
+        yield {"event": "result", "result": final_report}
         
     except Exception as e:
         error_result = {
@@ -1924,22 +2267,202 @@ def orchestrator_mcp(task: str, task_type: str = "auto", **kwargs) -> str:
             "error": str(e),
             "timestamp": datetime.now().isoformat()
         }
-        return json.dumps(error_result, ensure_ascii=False)
-        
-        result = {
-            "status": "success",
-            "section_title": section_title,
-            "content": final_content,
-            "word_count": len(final_content),
-            "writing_style": writing_style,
-            "target_audience": target_audience,
-            "generation_timestamp": datetime.now().isoformat()
-        }
+        if journal is not None:
+            journal.finish("failed", str(e))
+            # 已完成的阶段保存在运行日志中，可用resume_orchestrator_mcp从中断处继续
+            error_result["run_id"] = journal.run_id
+            error_result["completed_stages"] = journal.meta.get("completed_stages", [])
+        yield {"event": "result", "result": json.dumps(error_result, ensure_ascii=False)}
+    finally:
+        set_stage(caller_stage)
+
+def _parse_outline_sections(outline_content: str) -> tuple:
+    """从大纲文本中提取完整结构（包括章节和子章节），返回 (章节标题列表, 大纲结构)"""
+    sections = []
+    outline_structure = {}  # 存储完整的大纲结构
+    
+    if outline_content:
+        print(f"🔍 [调试] 原始大纲内容前200字符: {repr(outline_content[:200])}")
+        print(f"🔍 [调试] 原始大纲内容完整: {repr(outline_content)}")
+        
+        lines = outline_content.split('\n')
+        print(f"🔍 [调试] 分割后的行数: {len(lines)}")
+        print(f"🔍 [调试] 前10行内容: {lines[:10]}")
+        current_main_section = None
         
-        return json.dumps(result, ensure_ascii=False, indent=2)
+        for line in lines:
+            line = line.strip()
+            if line.startswith('## ') and not line.startswith('### '):
+                # 主章节（## 开头的）
+                section_title = line[3:].strip()  # 去掉"## "
+                # 过滤掉标题行和无效章节
+                if section_title and not any(keyword in section_title.lower() for keyword in ['大纲', 'outline', '报告', 'report']):
+                    sections.append(section_title)
+                    current_main_section = section_title
+                    outline_structure[section_title] = {
+                        'title': section_title,
+                        'subsections': []
+                    }
+                    print(f"🔍 [调试] ✅ 找到主章节: {section_title}")
+                    
+            elif line.startswith('### ') and current_main_section:
+                # 子章节
+                subsection_title = line[4:].strip()  # 去掉"### "
+                if subsection_title:
+                    outline_structure[current_main_section]['subsections'].append(subsection_title)
+                    print(f"🔍 [调试] ✅ 找到子章节: {subsection_title}")
+    
+    print(f"🔍 [调试] 解析出的章节列表: {sections}")
+    print(f"🔍 [调试] 解析出的大纲结构: {len(outline_structure)}个主章节，总共{sum(len(v['subsections']) for v in outline_structure.values())}个子章节")
+    
+    return sections, outline_structure
+
+def _collect_orchestrated_search(queries: List[Any], report_type: str) -> List[Dict]:
+    """批量执行查询策略中的全部查询，返回去重后的搜索结果"""
+    all_search_results = []
+    
+    # 提取查询字符串
+    query_texts = [
+        query_obj.get('query', '') if isinstance(query_obj, dict) else str(query_obj)
+        for query_obj in queries
+    ]
+    query_texts = [query_text for query_text in query_texts if query_text]
+    
+    if query_texts:
+        # 根据报告类型调整搜索结果数量
+        max_results = 10 if report_type == "industry" else 5
+        # 所有查询一次性批量提交，整体耗时约为一轮搜索
+        search_result = _batch_search_sync(queries=query_texts, max_results=max_results)
+        search_data = json.loads(search_result)
         
-    except Exception as e:
-        return _generate_fallback_content(section_title, content_data)
+        if search_data.get('status') == 'success':
+            all_search_results.extend(search_data.get('results', []))
+        else:
+            print(f"❌ 搜索失败: {search_data.get('message', '未知错误')}")
+    
+    return all_search_results
+
+def _overall_report_context(topic: str, report_type: str, intent_data: Dict, executive_summary: str) -> str:
+    """章节撰写时共享的报告整体上下文"""
+    return json.dumps({
+        "topic": topic,
+        "report_type": report_type,
+        "intent": intent_data.get('details', {}),
+        "executive_summary": executive_summary
+    }, ensure_ascii=False)
+
+def _open_run_journal(task: str, task_type: str, kwargs: Dict) -> Optional[RunJournal]:
+    """打开运行日志：kwargs中有run_id且日志存在时恢复，否则新建；未启用时返回None"""
+    run_id = kwargs.get('run_id')
+    if not run_id and not RunJournal.enabled():
+        return None
+    try:
+        if run_id:
+            try:
+                journal = RunJournal.load(run_id)
+                print(f"♻️ 恢复运行 {run_id}，已完成阶段: {journal.meta.get('completed_stages', [])}")
+                return journal
+            except FileNotFoundError:
+                pass
+        journal_kwargs = {key: value for key, value in kwargs.items() if key != 'run_id'}
+        journal = RunJournal.create(task, task_type, journal_kwargs, run_id=run_id)
+        print(f"📒 运行日志: {journal.path}")
+        return journal
+    except OSError as e:
+        print(f"⚠️ 运行日志创建失败，本次运行不可恢复: {e}")
+        return None
+
+def _restore_stage(journal: Optional[RunJournal], stage: str) -> Any:
+    """读取运行日志中已完成阶段的输出，未完成时返回None"""
+    if journal is None or not journal.has(stage):
+        return None
+    try:
+        data = journal.load_stage(stage)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ 运行日志阶段 {stage} 读取失败，重新执行: {e}")
+        return None
+    print(f"♻️ 从运行日志恢复阶段: {stage}")
+    return data
+
+def _journal_stage(journal: Optional[RunJournal], stage: str, data: Any):
+    """把阶段输出写入运行日志（写入失败不影响本次运行）"""
+    if journal is None:
+        return
+    try:
+        journal.save_stage(stage, data)
+    except (OSError, TypeError, ValueError) as e:
+        print(f"⚠️ 运行日志阶段 {stage} 写入失败: {e}")
+
+def _journal_section(journal: Optional[RunJournal], index: int, section_title: str, write_section) -> str:
+    """撰写章节并在完成后立即写入运行日志；使用备用内容的章节不写入，恢复运行时会重写"""
+    content, fallback_note = write_section()
+    if fallback_note:
+        print(f"⚠️ 章节 '{section_title}' {fallback_note}，不写入运行日志")
+    elif journal is not None:
+        try:
+            journal.save_section(index, section_title, content)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"⚠️ 章节 '{section_title}' 写入运行日志失败: {e}")
+    return content
+
+def _journal_finish(journal: Optional[RunJournal], final_report: str):
+    """保存最终报告并标记运行完成"""
+    if journal is None:
+        return
+    _journal_stage(journal, "result", final_report)
+    journal.finish("completed")
+
+# 章节标题中的主题词及其英文对应词，扩充到检索查询中以匹配英文资料
+_SECTION_QUERY_EXPANSIONS = {
+    '技术': 'technology',
+    '市场': 'market',
+    '应用': 'application',
+    '教育': 'education',
+    '人工智能': 'ai artificial intelligence',
+    '行业': 'industry',
+    '动态': 'trend news',
+}
+
+def _section_query(section_title: str) -> str:
+    """章节标题转为检索查询：标题本身 + 主题词的英文对应词"""
+    expansions = [english for chinese, english in _SECTION_QUERY_EXPANSIONS.items() if chinese in section_title]
+    return ' '.join([section_title.replace('+', ' ')] + expansions)
+
+def _select_sections_data(section_titles: List[str], all_search_results: List[Dict],
+                          top_k: int = 8) -> List[List[Dict]]:
+    """为全部章节批量筛选相关的搜索数据（对搜索结果只建一次BM25矩阵），返回与章节一一对应的列表"""
+    if not all_search_results:
+        return [[] for _ in section_titles]
+    
+    from collectors.evidence_ranker import EvidenceRanker, rank_evidence
+    ranker = EvidenceRanker.from_results(all_search_results)
+    queries = [_section_query(title) for title in section_titles]
+    # 相关数据不足3条时按原顺序补足；完全不相关时使用前top_k条
+    return [
+        data or all_search_results[:top_k]
+        for data in rank_evidence(queries, all_search_results, k=top_k, min_results=3, ranker=ranker)
+    ]
+
+def _select_section_data(section_title: str, all_search_results: List[Dict]) -> List[Dict]:
+    """为单个章节筛选相关的搜索数据"""
+    return _select_sections_data([section_title], all_search_results)[0]
+
+def _write_orchestrated_section(section_title: str, section_data: List[Dict], overall_report_context: str,
+                                outline_structure: Dict, writing_style: str, target_audience: str,
+                                depth_level: str) -> Tuple[str, Optional[str]]:
+    """根据预先筛选的章节数据撰写单个章节，返回 (章节正文, 备用内容说明)，LLM正常生成时说明为None"""
+    content_result = content_writer_mcp(
+        section_title=section_title,
+        content_data=section_data,
+        overall_report_context=overall_report_context,
+        outline_structure=outline_structure,
+        writing_style=writing_style,
+        target_audience=target_audience,
+        depth_level=depth_level
+    )
+    
+    content_data = json.loads(content_result)
+    return content_data.get('content', ''), content_data.get('note')
 
 def _prepare_content_template_params(section_title, overall_report_context, reference_content, 
                                    writing_style, target_audience, tone, depth_level, 
@@ -2111,9 +2634,9 @@ def _generate_academic_research_report(topic: str, task: str, depth_level: str,
         
         # 步骤1: 使用LLM生成学术搜索关键词
         print("🔍 [步骤1] 生成学术搜索关键词...")
+        set_stage("academic_queries")
         
-        from collectors.llm_processor import LLMProcessor
-        llm_processor = LLMProcessor()
+        llm_processor = get_llm_processor()
         
         # 生成学术搜索关键词
         keyword_prompt = f"""
@@ -2146,7 +2669,7 @@ def _generate_academic_research_report(topic: str, task: str, depth_level: str,
         """
         
         try:
-            search_keywords_response = llm_processor.call_llm_api(keyword_prompt, max_tokens=500)
+            search_keywords_response = llm_processor.call_llm_api(keyword_prompt, max_tokens=500, cache=True)
             # 处理返回的关键词，移除数字前缀和额外空白
             import re
             search_keywords_response = re.sub(r'^\d+\.\s*', '', search_keywords_response, flags=re.MULTILINE)
@@ -2170,6 +2693,7 @@ def _generate_academic_research_report(topic: str, task: str, depth_level: str,
         
         # 步骤2: 执行学术搜索
         print("🔍 [步骤2] 执行学术文献搜索...")
+        set_stage("academic_search")
         
         all_search_results = []
         
@@ -2179,7 +2703,7 @@ def _generate_academic_research_report(topic: str, task: str, depth_level: str,
                 print(f"🔍 执行搜索查询 ({i+1}/10): {keyword}")
                 
                 # 调用search工具
-                search_result = search(
+                search_result = _search_sync(
                     query=keyword,
                     max_results=15,  # 大幅增加每个关键词的搜索结果到15条
                     search_type="academic"  # 指定学术搜索
@@ -2200,6 +2724,7 @@ def _generate_academic_research_report(topic: str, task: str, depth_level: str,
         
         # 步骤3: 分析和组织研究数据
         print("📊 [步骤3] 分析和组织研究数据...")
+        set_stage("academic_writing")
         
         # 即使搜索结果有限，也要执行分步骤生成以确保包含"主要研究论文分析"章节
         if not all_search_results:
@@ -2234,16 +2759,20 @@ def _generate_academic_research_report(topic: str, task: str, depth_level: str,
         要求：内容详实，逻辑清晰，使用专业术语，总字数控制在1600-2000字。
         """
         
-        try:
-            first_part = llm_processor.call_llm_api(
-                first_part_prompt, 
-                max_tokens=4000,
-                temperature=0.7
-            )
-            print(f"✅ 前半部分生成完成: {len(first_part)}字符")
-        except Exception as e:
-            print(f"❌ 前半部分生成失败: {e}")
-            first_part = f"# {topic}学术研究报告\n\n## 研究领域概述与主要方向\n\n{topic}领域发展迅速...\n\n## 关键技术与方法分析\n\n{topic}技术方法多样..."
+        def write_first_part() -> str:
+            try:
+                first_part = llm_processor.call_llm_api(
+                    first_part_prompt, 
+                    max_tokens=4000,
+                    temperature=0.7
+                )
+                print(f"✅ 前半部分生成完成: {len(first_part)}字符")
+            except Exception as e:
+                if _is_rate_limit_error(e):
+                    raise
+                print(f"❌ 前半部分生成失败: {e}")
+                first_part = f"# {topic}学术研究报告\n\n## 研究领域概述与主要方向\n\n{topic}领域发展迅速...\n\n## 关键技术与方法分析\n\n{topic}技术方法多样..."
+            return first_part
         
         # 第二步：专门生成"主要研究论文分析"章节
         print("📝 [步骤3.2] 专门生成主要研究论文分析章节...")
@@ -2251,7 +2780,7 @@ def _generate_academic_research_report(topic: str, task: str, depth_level: str,
         # 确保有足够的搜索资料
         if not all_search_results:
             print("⚠️ 没有搜索资料，跳过论文分析章节")
-            paper_analysis = f"## 主要研究论文分析\n\n由于搜索资料有限，无法进行详细的论文分析。"
+            paper_analysis_prompt = None
         else:
             # 选择最具代表性的论文（最多30篇）
             selected_papers = all_search_results[:30]
@@ -2335,7 +2864,10 @@ def _generate_academic_research_report(topic: str, task: str, depth_level: str,
             6. 这是整个报告的核心章节，请务必详细展开
             7. 只生成这一个章节，不要包含其他内容
             """
-            
+        
+        def write_paper_analysis() -> str:
+            if paper_analysis_prompt is None:
+                return f"## 主要研究论文分析\n\n由于搜索资料有限，无法进行详细的论文分析。"
             try:
                 paper_analysis = llm_processor.call_llm_api(
                     paper_analysis_prompt, 
@@ -2350,8 +2882,11 @@ def _generate_academic_research_report(topic: str, task: str, depth_level: str,
                     paper_analysis = f"## 主要研究论文分析\n\n{paper_analysis}"
                     
             except Exception as e:
+                if _is_rate_limit_error(e):
+                    raise
                 print(f"❌ 论文分析章节生成失败: {e}")
                 paper_analysis = f"## 主要研究论文分析\n\n基于收集的研究资料，以下是{topic}领域的主要论文分析...\n\n### 基础理论与方法创新类论文\n\n### 技术应用与实践类论文\n\n### 综述与前沿探索类论文"
+            return paper_analysis
         
         # 第三步：生成报告后半部分（趋势展望 + 结论）
         print("📝 [步骤3.3] 生成报告后半部分...")
@@ -2379,16 +2914,26 @@ def _generate_academic_research_report(topic: str, task: str, depth_level: str,
         要求：内容详实，逻辑清晰，使用专业术语，总字数控制在1400-1800字。
         """
         
-        try:
-            second_part = llm_processor.call_llm_api(
-                second_part_prompt, 
-                max_tokens=3000,
-                temperature=0.7
-            )
-            print(f"✅ 后半部分生成完成: {len(second_part)}字符")
-        except Exception as e:
-            print(f"❌ 后半部分生成失败: {e}")
-            second_part = f"## 发展趋势与未来展望\n\n{topic}领域未来发展...\n\n## 结论与建议\n\n基于以上分析..."
+        def write_second_part() -> str:
+            try:
+                second_part = llm_processor.call_llm_api(
+                    second_part_prompt, 
+                    max_tokens=3000,
+                    temperature=0.7
+                )
+                print(f"✅ 后半部分生成完成: {len(second_part)}字符")
+            except Exception as e:
+                if _is_rate_limit_error(e):
+                    raise
+                print(f"❌ 后半部分生成失败: {e}")
+                second_part = f"## 发展趋势与未来展望\n\n{topic}领域未来发展...\n\n## 结论与建议\n\n基于以上分析..."
+            return second_part
+        
+        # 三个部分互不依赖，交给章节调度器并发生成，结果按原顺序返回
+        from collectors.section_scheduler import SectionScheduler
+        first_part, paper_analysis, second_part = SectionScheduler().run([
+            write_first_part, write_paper_analysis, write_second_part
+        ])
         
         # 第四步：组装完整报告
         print("📝 [步骤3.4] 组装完整学术报告...")
@@ -2464,7 +3009,7 @@ def _execute_simple_orchestration(task: str, **kwargs) -> str:
         print(f"📋 识别主题: {topic}")
         
         # 执行搜索
-        search_result = search(topic, max_results=5)
+        search_result = _search_sync(topic, max_results=5)
         search_data = json.loads(search_result)
         
         # 生成摘要
@@ -2636,80 +3181,127 @@ def _identify_sections_to_improve(weak_areas: List[str], section_titles: List[st
         # 出错时改进所有章节
         return list(section_titles)
 
+# 质量评估迭代使用的评估标准
+QUALITY_ITERATION_STANDARDS = {
+    "completeness": {"weight": 0.3, "min_score": 7.0},
+    "accuracy": {"weight": 0.25, "min_score": 8.0},
+    "depth": {"weight": 0.2, "min_score": 6.0},
+    "relevance": {"weight": 0.15, "min_score": 7.0},
+    "clarity": {"weight": 0.1, "min_score": 6.0}
+}
+
+def _search_result_key(item: Dict) -> str:
+    """搜索结果的去重键：优先使用URL，没有URL时使用标题和内容开头的哈希"""
+    url = (item.get('url') or '').strip().rstrip('/').lower()
+    if url:
+        return url
+    text = f"{item.get('title', '')}\n{item.get('content', '')[:500]}"
+    return hashlib.sha256(text.strip().encode('utf-8')).hexdigest()
+
+def _merge_unique_results(results: List[Dict], seen_keys: set) -> List[Dict]:
+    """返回results中未出现过的条目，并把它们的键加入seen_keys"""
+    unique = []
+    for item in results:
+        key = _search_result_key(item)
+        if key not in seen_keys:
+            seen_keys.add(key)
+            unique.append(item)
+    return unique
+
+def _evaluate_new_results(topic: str, new_results: List[Dict], iteration: int,
+                          total_count: int) -> Optional[Dict[str, float]]:
+    """只评估本轮新增的资料，返回各维度评分；失败时返回None"""
+    # 为避免内容过长，均匀采样最多30条
+    sample_size = min(30, len(new_results))
+    step = max(1, len(new_results) // sample_size)
+    sampled_results = new_results[::step][:sample_size]
+    
+    search_content = ""
+    for i, item in enumerate(sampled_results):
+        content = item.get('content', '')[:300]  # 每条300字符
+        title = item.get('title', '')
+        search_content += f"资料{i+1}: {title}\n内容: {content}\n\n"
+    
+    full_content = f"""主题: {topic}
+            
+当前收集的资料总数: {total_count}条
+第{iteration}轮评估: 本轮新增{len(new_results)}条资料，采样评估{len(sampled_results)}条
+
+{search_content}
+
+请对以上资料的质量进行5个维度的评估：完整性、准确性、深度、相关性、清晰度。"""
+    
+    evaluation_result = analysis_mcp(
+        analysis_type="evaluation",
+        data=full_content,
+        topic=topic,
+        context=f"第{iteration}轮质量评估",
+        quality_standards=QUALITY_ITERATION_STANDARDS,
+        memo_key=_evaluation_sample_key(topic, sampled_results)
+    )
+    evaluation_data = json.loads(evaluation_result)
+    if evaluation_data.get('status') != 'success':
+        return None
+    
+    dimensions = evaluation_data.get('evaluation', {}).get('dimensions', {})
+    return {name: result.get('score', 0.0) for name, result in dimensions.items()}
+
 def _quality_evaluation_iteration(topic: str, initial_search_results: List[Dict], 
-                                max_iterations: int = 3, min_quality_score: float = 7.0) -> List[Dict]:
-    """质量评估迭代循环：评估数据质量，补充搜索，再评估"""
+                                max_iterations: int = 3, min_quality_score: float = 7.0,
+                                min_score_gain: float = 0.3) -> List[Dict]:
+    """
+    质量评估迭代循环：评估数据质量，补充搜索，再评估
+    
+    增量评估：每轮只评估新增（去重后）的资料，按资料数量把新评分并入各维度的累计评分；
+    累计总分的提升低于min_score_gain时提前停止补充搜索。
+    """
     try:
         print(f"🔍 [质量评估] 开始质量评估迭代，最大迭代次数: {max_iterations}")
         
-        current_search_results = initial_search_results.copy()
+        seen_keys = set()
+        current_search_results = _merge_unique_results(initial_search_results, seen_keys)
+        pending_results = list(current_search_results)
+        running_scores: Dict[str, float] = {}
+        evaluated_count = 0
+        previous_score = None
         iteration = 0
         
+        if len(current_search_results) < len(initial_search_results):
+            print(f"📊 [质量评估] 初始结果去重: {len(initial_search_results)} -> {len(current_search_results)}条")
+        
         while iteration < max_iterations:
             iteration += 1
             print(f"\n🔍 [质量评估] 第{iteration}轮评估...")
-            print(f"📊 [调试] 当前总搜索结果: {len(current_search_results)}条")
-            
-            # 组装当前搜索结果用于评估 - 每次迭代评估不同的内容切片
-            search_content = ""
-            
-            # 修复：每轮都评估所有搜索结果，确保评估的是整体质量
-            eval_results = current_search_results
-            eval_desc = f"全部搜索结果（第{iteration}轮迭代后）"
-            
-            print(f"📊 [调试] 第{iteration}轮评估范围: {eval_desc} ({len(eval_results)}条)")
-            
-            # 为避免内容过长，合理采样评估内容
-            sample_size = min(30, len(eval_results))  # 最多评估30条
-            if len(eval_results) > sample_size:
-                # 均匀采样
-                step = len(eval_results) // sample_size
-                sampled_results = eval_results[::step][:sample_size]
-            else:
-                sampled_results = eval_results
-            
-            for i, item in enumerate(sampled_results):
-                content = item.get('content', '')[:300]  # 每条300字符
-                title = item.get('title', '')
-                search_content += f"资料{i+1}: {title}\n内容: {content}\n\n"
-            
-            # 构建完整的评估内容
-            full_content = f"""主题: {topic}
-            
-当前收集的资料总数: {len(current_search_results)}条
-第{iteration}轮评估: 采样评估{len(sampled_results)}条代表性资料
-
-{search_content}
-
-请对以上资料的质量进行5个维度的评估：完整性、准确性、深度、相关性、清晰度。"""
-            
-            # 调用analysis_mcp进行质量评估
-            evaluation_result = analysis_mcp(
-                analysis_type="evaluation",
-                data=full_content,
-                topic=topic,
-                context=f"第{iteration}轮质量评估",
-                quality_standards={
-                    "completeness": {"weight": 0.3, "min_score": 7.0},
-                    "accuracy": {"weight": 0.25, "min_score": 8.0},
-                    "depth": {"weight": 0.2, "min_score": 6.0},
-                    "relevance": {"weight": 0.15, "min_score": 7.0},
-                    "clarity": {"weight": 0.1, "min_score": 6.0}
-                }
-            )
+            print(f"📊 [调试] 当前总搜索结果: {len(current_search_results)}条，本轮新增待评估: {len(pending_results)}条")
             
-            evaluation_data = json.loads(evaluation_result)
+            if not pending_results:
+                print(f"⚠️ [质量评估] 没有新增资料可评估，停止迭代")
+                break
             
-            if evaluation_data.get('status') != 'success':
+            batch_scores = _evaluate_new_results(topic, pending_results, iteration, len(current_search_results))
+            if batch_scores is None:
                 print(f"❌ 第{iteration}轮评估失败，跳出迭代")
                 break
             
-            evaluation = evaluation_data.get('evaluation', {})
-            total_score = evaluation.get('total_score', 0)
-            weak_areas = evaluation.get('weak_areas', [])
-            needs_iteration = evaluation.get('needs_iteration', False)
+            # 按资料数量加权，把本轮评分并入累计评分
+            batch_count = len(pending_results)
+            for dimension, score in batch_scores.items():
+                previous = running_scores.get(dimension, score)
+                running_scores[dimension] = (previous * evaluated_count + score * batch_count) / (evaluated_count + batch_count)
+            evaluated_count += batch_count
+            pending_results = []
             
-            print(f"📊 [质量评估] 第{iteration}轮评分: {total_score}/10.0")
+            total_score = round(sum(
+                running_scores.get(dimension, 0.0) * standard["weight"]
+                for dimension, standard in QUALITY_ITERATION_STANDARDS.items()
+            ), 2)
+            weak_areas = [
+                dimension for dimension, standard in QUALITY_ITERATION_STANDARDS.items()
+                if running_scores.get(dimension, 0.0) < standard["min_score"]
+            ]
+            needs_iteration = len(weak_areas) > 0 or total_score < 7.0
+            
+            print(f"📊 [质量评估] 第{iteration}轮累计评分: {total_score}/10.0（已评估{evaluated_count}条）")
             print(f"📊 [质量评估] 薄弱环节: {weak_areas}")
             print(f"📊 [质量评估] 需要迭代: {needs_iteration}")
             
@@ -2718,6 +3310,12 @@ def _quality_evaluation_iteration(topic: str, initial_search_results: List[Dict]
                 print(f"✅ [质量评估] 质量达标 ({total_score} >= {min_quality_score})，停止迭代")
                 break
             
+            # 补充资料带来的提升过小，继续搜索收益不大
+            if previous_score is not None and total_score - previous_score < min_score_gain:
+                print(f"⚠️ [质量评估] 本轮评分提升 {total_score - previous_score:+.2f} 低于阈值 {min_score_gain}，停止迭代")
+                break
+            previous_score = total_score
+            
             # 如果是最后一轮评估，仍然执行补充搜索，然后退出
             if iteration >= max_iterations:
                 print(f"🔍 [质量评估] 第{iteration}轮（最后一轮）评估完成，执行最后的补充搜索...")
@@ -2737,25 +3335,23 @@ def _quality_evaluation_iteration(topic: str, initial_search_results: List[Dict]
             print(f"📊 [质量评估] 执行{len(supplementary_queries)}个补充查询...")
             supplementary_results = []
             
-            for query in supplementary_queries:
-                try:
-                    # 增加每个查询的结果数量从3到5
-                    search_result = search(query=query, max_results=5)
-                    search_data = json.loads(search_result)
-                    
-                    if search_data.get('status') == 'success':
-                        results = search_data.get('results', [])
-                        supplementary_results.extend(results)
-                        print(f"✅ 补充搜索 '{query}': {len(results)}条结果")
-                    else:
-                        print(f"❌ 补充搜索 '{query}': {search_data.get('message', '失败')}")
-                except Exception as e:
-                    print(f"❌ 补充搜索异常 '{query}': {str(e)}")
+            # 补充查询批量提交，避免逐个串行搜索
+            search_result = _batch_search_sync(queries=supplementary_queries, max_results=5)
+            search_data = json.loads(search_result)
             
-            # 合并补充结果
-            if supplementary_results:
-                current_search_results.extend(supplementary_results)
-                print(f"✅ [质量评估] 第{iteration}轮补充了{len(supplementary_results)}条结果")
+            if search_data.get('status') == 'success':
+                supplementary_results = search_data.get('results', [])
+                for query, count in search_data.get('per_query', {}).items():
+                    print(f"✅ 补充搜索 '{query}': {count}条结果")
+            else:
+                print(f"❌ 补充搜索失败: {search_data.get('message', '失败')}")
+            
+            # 合并补充结果（按URL/内容去重）
+            pending_results = _merge_unique_results(supplementary_results, seen_keys)
+            if pending_results:
+                current_search_results.extend(pending_results)
+                print(f"✅ [质量评估] 第{iteration}轮补充了{len(pending_results)}条新结果"
+                      f"（去重前{len(supplementary_results)}条）")
             else:
                 print(f"⚠️ [质量评估] 第{iteration}轮未获得有效补充结果")
             
@@ -2810,7 +3406,7 @@ def _generate_quality_evaluation_queries(topic: str, weak_areas: List[str]) -> L
 请直接返回查询列表，每行一个查询："""
 
         try:
-            response = llm_processor.call_llm_api(
+            response = get_llm_processor().call_llm_api(
                 prompt=prompt,
                 system_message="你是一个专业的信息检索专家，擅长设计精准的搜索查询。",
                 temperature=0.3,
@@ -2897,21 +3493,9 @@ def _generate_fallback_queries(topic: str, weak_areas: List[str]) -> List[str]:
     print(f"🔍 [质量评估] 后备方案生成{len(unique_queries)}个补充查询: {unique_queries}")
     return unique_queries
 
-# 流式处理器初始化
-try:
-    from streaming_orchestrator import StreamingOrchestrator
-    streaming_orchestrator = StreamingOrchestrator()
-    streaming_available = True
-    print("✅ 流式处理器初始化成功")
-except Exception as e:
-    print(f"⚠️ 流式处理器初始化失败: {e}")
-    streaming_orchestrator = None
-    streaming_available = False
-
 # HTTP API 服务器
 from fastapi import FastAPI, HTTPException
 from fastapi.responses import StreamingResponse
-import uvicorn
 import asyncio
 import json
 
@@ -2938,7 +3522,10 @@ async def tools_call(request: dict):
         # 工具映射
         tool_functions = {
             "search": search,
+            "batch_search": batch_search,
             "orchestrator_mcp": orchestrator_mcp,
+            "resume_orchestrator_mcp": resume_orchestrator_mcp,
+            "rerun_section_mcp": rerun_section_mcp,
             "query_generation_mcp": query_generation_mcp,
             "outline_writer_mcp": outline_writer_mcp,
             "summary_writer_mcp": summary_writer_mcp,
@@ -2967,7 +3554,8 @@ async def tools_call(request: dict):
             return StreamingResponse(error_stream(), media_type="text/event-stream")
         
         # 对于orchestrator_mcp，使用流式处理
-        if tool_name == "orchestrator_mcp" and streaming_available:
+        streaming_orchestrator = _get_streaming_orchestrator() if tool_name == "orchestrator_mcp" else None
+        if streaming_orchestrator is not None:
             async def orchestrator_stream():
                 try:
                     # 发送开始消息
@@ -3002,8 +3590,12 @@ async def tools_call(request: dict):
         else:
             async def tool_stream():
                 try:
-                    # 执行工具
-                    result = await tool_functions[tool_name](**arguments)
+                    # 执行工具：异步工具直接await，同步工具放到线程中执行，避免阻塞事件循环
+                    tool_function = tool_functions[tool_name]
+                    if asyncio.iscoroutinefunction(tool_function):
+                        result = await tool_function(**arguments)
+                    else:
+                        result = await asyncio.to_thread(tool_function, **arguments)
                     
                     # 发送结果消息
                     result_msg = {
@@ -3065,17 +3657,25 @@ if __name__ == "__main__":
     print("📡 支持端点: /mcp/tools/call (HTTP API)")
     print("🔧 支持的MCP工具:")
     print("   - orchestrator_mcp: 主编排工具(支持质量评估迭代，包括洞察报告)")
+    print("   - resume_orchestrator_mcp: 从运行日志恢复中断的编排任务")
+    print("   - rerun_section_mcp: 基于缓存语料重写单个章节")
     print("   - analysis_mcp: 分析工具(支持evaluation质量评估)")
     print("   - search: 搜索工具")
+    print("   - batch_search: 批量搜索工具(多查询并行、全局去重)")
     print("   - outline_writer_mcp: 大纲生成工具")
     print("   - content_writer_mcp: 内容生成工具")
     print("   - summary_writer_mcp: 摘要生成工具")
     print("   - query_generation_mcp: 查询生成工具")
     print("   - user_interaction_mcp: 用户交互工具")
     
+    import config as app_config
+    if app_config.MCP_WARM_UP_ON_START:
+        warm_up()
+
     # 启动HTTP服务器
     import threading
     import time
+    import uvicorn
 
     def start_http_server():
         uvicorn.run(http_app, host="0.0.0.0", port=8001, log_level="info")
@@ -0,0 +1,211 @@
+"""
+报告生成工作进程池
+
+从任务存储中领取排队的报告任务并在独立进程中生成，API进程只负责接收请求和查询状态。
+每个工作进程同一时间只运行一个报告，进程数即本机的最大并发报告数；
+所有工作进程（包括其他主机上的）共享任务存储中的并发上限。
+
+用法:
+    python report_worker.py --workers 2
+    （在API进程内启动时设置 REPORT_WORKER_EMBEDDED=true，默认即为内嵌模式）
+"""
+
+import argparse
+import multiprocessing
+import os
+import threading
+import time
+import traceback
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import config
+from job_store import COMPLETED, FAILED, JobStore, create_job_store, make_worker_id
+
+
+def generate_report(store: JobStore, task_id: str, request_data: Dict[str, Any], worker_id: Optional[str] = None):
+    """
+    生成报告并把进度和结果写入任务存储
+
+    指定worker_id时只写入仍由该工作进程运行的任务，任务已被重新分配时丢弃本次结果
+    """
+    topic = request_data["topic"]
+    companies = request_data.get("companies")
+    days = request_data.get("days", 7)
+    output_filename = request_data.get("output_filename")
+
+    try:
+        store.progress(task_id, "🚀 初始化智能分析代理...", worker_id)
+
+        # 报告生成依赖较重，只在工作进程中导入
+        from generate_news_report_enhanced import IntelligentReportAgent
+
+        # 创建智能代理
+        agent = IntelligentReportAgent()
+
+        store.progress(task_id, "🧠 正在进行智能查询生成...", worker_id)
+
+        # 生成报告
+        report_data = agent.generate_comprehensive_report_with_thinking(topic, days, companies)
+
+        store.progress(task_id, "📝 正在生成最终报告文件...", worker_id)
+
+        # 保存报告文件
+        if not output_filename:
+            date_str = datetime.now().strftime('%Y%m%d_%H%M%S')
+            safe_topic = "".join([c if c.isalnum() or c in [' ', '_', '-'] else '_' for c in topic])
+            safe_topic = safe_topic.replace(' ', '_')
+            output_filename = f"{safe_topic}_智能分析报告_{date_str}.md"
+
+        # 确保reports目录存在
+        reports_dir = "reports"
+        os.makedirs(reports_dir, exist_ok=True)
+
+        file_path = os.path.join(reports_dir, output_filename)
+
+        # 保存文件
+        with open(file_path, "w", encoding="utf-8-sig") as f:
+            f.write(report_data["content"])
+
+        # 更新任务完成状态
+        result = {
+            "file_path": file_path,
+            "filename": output_filename,
+            "content_preview": report_data["content"][:500] + "..." if len(report_data["content"]) > 500 else report_data["content"],
+            "data_summary": {
+                "breaking_news": len(report_data["data"].get("breaking_news", [])),
+                "innovation_news": len(report_data["data"].get("innovation_news", [])),
+                "investment_news": len(report_data["data"].get("investment_news", [])),
+                "policy_news": len(report_data["data"].get("policy_news", [])),
+                "trend_news": len(report_data["data"].get("trend_news", [])),
+                "company_news": len(report_data["data"].get("company_news", []))
+            },
+            "report_date": report_data["date"]
+        }
+
+        if not store.update(task_id, COMPLETED, "✅ 报告生成完成", result, worker_id=worker_id):
+            print(f"⚠️ 任务 {task_id} 已被重新分配给其他工作进程，丢弃本次结果")
+
+    except Exception as e:
+        error_msg = f"报告生成失败: {str(e)}\n{traceback.format_exc()}"
+        print(f"❌ 任务 {task_id} 失败: {error_msg}")
+        store.update(task_id, FAILED, "❌ 报告生成失败", error=error_msg, worker_id=worker_id)
+
+
+def run_job(store: JobStore, job: Dict[str, Any], worker_id: str, heartbeat_interval: float = 10):
+    """运行一个已领取的任务，期间定期写入心跳"""
+    stop = threading.Event()
+
+    def beat():
+        while not stop.wait(heartbeat_interval):
+            try:
+                if not store.heartbeat(job["task_id"], worker_id):
+                    # 心跳超时后任务已被重新排队或领取，之后的进度和结果都不会再写入
+                    print(f"⚠️ 任务 {job['task_id']} 已不属于工作进程 {worker_id}，停止心跳")
+                    return
+            except Exception as e:
+                print(f"⚠️ 任务 {job['task_id']} 心跳写入失败: {e}")
+
+    heartbeat_thread = threading.Thread(target=beat, daemon=True)
+    heartbeat_thread.start()
+    try:
+        generate_report(store, job["task_id"], job.get("request_data") or {}, worker_id)
+    finally:
+        stop.set()
+        heartbeat_thread.join()
+
+
+def worker_loop(index: int = 0, stop_event=None, store: Optional[JobStore] = None, max_jobs: Optional[int] = None):
+    """
+    工作进程主循环：领取任务→生成报告，空闲时定期把心跳超时的任务重新排队
+
+    Args:
+        index: 工作进程序号
+        stop_event: 设置后在当前任务结束后退出
+        store: 任务存储，默认按config创建
+        max_jobs: 处理指定数量的任务后退出，None表示一直运行
+    """
+    store = store or create_job_store()
+    worker_id = make_worker_id(index)
+    poll_interval = getattr(config, 'JOB_POLL_INTERVAL', 1.0)
+    heartbeat_interval = getattr(config, 'JOB_HEARTBEAT_INTERVAL', 10)
+    processed = 0
+    last_requeue = 0.0
+
+    print(f"👷 报告工作进程 {worker_id} 已启动")
+    while not (stop_event is not None and stop_event.is_set()):
+        try:
+            if time.time() - last_requeue >= heartbeat_interval:
+                store.requeue_stale()
+                last_requeue = time.time()
+            job = store.claim_next(worker_id)
+        except Exception as e:
+            print(f"⚠️ 工作进程 {worker_id} 访问任务存储失败: {e}")
+            job = None
+
+        if job is None:
+            if stop_event is not None:
+                stop_event.wait(poll_interval)
+            else:
+                time.sleep(poll_interval)
+            continue
+
+        print(f"📋 工作进程 {worker_id} 开始任务 {job['task_id']}（第{job['attempts']}次执行）")
+        run_job(store, job, worker_id, heartbeat_interval)
+        processed += 1
+        if max_jobs is not None and processed >= max_jobs:
+            break
+    print(f"👋 报告工作进程 {worker_id} 已退出")
+
+
+class WorkerPool:
+    """报告工作进程池（每个进程一次运行一个报告）"""
+
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = workers or getattr(config, 'REPORT_MAX_CONCURRENT', 2)
+        # spawn避免在已有线程的API进程中fork
+        self._context = multiprocessing.get_context("spawn")
+        self._stop_event = self._context.Event()
+        self._processes: List[multiprocessing.Process] = []
+
+    def start(self):
+        # 上次运行中断的任务先重新排队
+        create_job_store().requeue_stale()
+        for index in range(self.workers):
+            process = self._context.Process(target=worker_loop, args=(index, self._stop_event), daemon=True,
+                                            name=f"report-worker-{index}")
+            process.start()
+            self._processes.append(process)
+        print(f"✅ 已启动 {self.workers} 个报告工作进程")
+
+    def stop(self, timeout: float = 5):
+        """通知工作进程退出；仍在生成报告的进程被终止，其任务在心跳超时后重新排队"""
+        self._stop_event.set()
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+
+    def is_alive(self) -> bool:
+        return any(process.is_alive() for process in self._processes)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="报告生成工作进程池")
+    arg_parser.add_argument("--workers", type=int, default=None, help="工作进程数（默认REPORT_MAX_CONCURRENT）")
+    args = arg_parser.parse_args()
+
+    pool = WorkerPool(args.workers)
+    pool.start()
+    try:
+        while pool.is_alive():
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print("🛑 正在停止报告工作进程...")
+    finally:
+        pool.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -202,6 +202,7 @@ async def health_check():
             "service": "Search HTTP API Server",
             "version": "0.1.0",
             "available_sources": sources,
+            "cache": search_orchestrator.get_cache_stats(),
             "timestamp": str(search_orchestrator.config.log_level)
         }
     except Exception as e:
@@ -229,7 +230,7 @@ async def parallel_search(request: ParallelSearchRequest):
     try:
         logger.info(f"🔧 并行搜索: {request.queries[:3]}{'...' if len(request.queries) > 3 else ''}")
         
-        documents = search_orchestrator.parallel_search(
+        documents = await search_orchestrator.async_parallel_search(
             queries=request.queries,
             sources=request.sources,
             max_results_per_query=request.max_results_per_query,
@@ -257,7 +258,7 @@ async def category_search(request: CategorySearchRequest):
         
         logger.info(f"🔧 {request.category}类别搜索: {request.queries[:3]}{'...' if len(request.queries) > 3 else ''}")
         
-        documents = search_orchestrator.search_by_category(
+        documents = await search_orchestrator.async_search_by_category(
             queries=request.queries,
             category=request.category,
             max_results_per_query=request.max_results_per_query,
@@ -284,7 +285,7 @@ async def fallback_search(request: FallbackSearchRequest):
     try:
         logger.info(f"🔧 降级搜索: {request.queries[:3]}{'...' if len(request.queries) > 3 else ''}")
         
-        documents = search_orchestrator.search_with_fallback(
+        documents = await search_orchestrator.async_search_with_fallback(
             queries=request.queries,
             preferred_sources=request.preferred_sources,
             fallback_sources=request.fallback_sources,
@@ -313,7 +314,7 @@ async def quick_search(
     try:
         logger.info(f"🔧 快速搜索: {q} (类别: {category})")
         
-        documents = search_orchestrator.search_by_category(
+        documents = await search_orchestrator.async_search_by_category(
             queries=[q],
             category=category,
             max_results_per_query=max_results
@@ -11,6 +11,8 @@ __email__ = "team@example.com"
 from .models import Document, SearchRequest, SearchResult
 from .generators import SearchGenerator
 from .config import SearchConfig
+from .cache import SearchCache
+from .dedup import NearDuplicateIndex, DocumentDeduplicator
 
 __all__ = [
     "Document",
@@ -18,4 +20,7 @@ __all__ = [
     "SearchResult",
     "SearchGenerator",
     "SearchConfig",
+    "SearchCache",
+    "NearDuplicateIndex",
+    "DocumentDeduplicator",
 ] 
\ No newline at end of file
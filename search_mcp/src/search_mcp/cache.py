@@ -0,0 +1,204 @@
+"""
+Search MCP 搜索结果缓存
+
+提供内存LRU + TTL缓存，以及可选的SQLite磁盘缓存层，
+使重复的 (query, source, days_back, max_results) 搜索无需再次请求付费API
+"""
+
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Tuple
+
+from .models import Document
+
+
+CacheKey = Tuple[str, str, int, int]
+
+
+def normalize_query(query: str) -> str:
+    """规范化查询字符串：去除首尾空白、合并连续空白并转为小写"""
+    return re.sub(r'\s+', ' ', (query or '').strip()).lower()
+
+
+def make_cache_key(query: str, source: str, days_back: int, max_results: int) -> CacheKey:
+    """根据搜索参数生成缓存键"""
+    return (normalize_query(query), source, int(days_back), int(max_results))
+
+
+def _serialize_key(key: CacheKey) -> str:
+    """将缓存键序列化为字符串，用于磁盘存储和日志"""
+    return json.dumps(list(key), ensure_ascii=False)
+
+
+class SearchCache:
+    """
+    搜索结果缓存
+
+    内存层使用 OrderedDict 实现 LRU 淘汰，条目超过 ttl 秒后失效；
+    如果提供 db_path，则额外写入 SQLite 磁盘层，服务重启后仍可命中。
+    """
+
+    def __init__(self, max_size: int = 1000, ttl: int = 3600, db_path: Optional[str] = None):
+        """
+        初始化搜索缓存
+
+        Args:
+            max_size: 内存层最多保存的条目数
+            ttl: 条目有效期（秒）
+            db_path: SQLite数据库路径，为None时不启用磁盘层
+        """
+        self.max_size = max(1, int(max_size))
+        self.ttl = int(ttl)
+        self.db_path = db_path
+        self._memory: "OrderedDict[CacheKey, Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+
+        if db_path:
+            self._init_disk(db_path)
+
+    @classmethod
+    def from_config(cls, config) -> Optional['SearchCache']:
+        """根据SearchConfig创建缓存，未启用缓存时返回None"""
+        if not getattr(config, 'enable_cache', False):
+            return None
+        return cls(
+            max_size=config.cache_size,
+            ttl=config.cache_ttl,
+            db_path=getattr(config, 'cache_db_path', None)
+        )
+
+    def _init_disk(self, db_path: str):
+        """初始化SQLite磁盘层"""
+        path = Path(db_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS search_cache ("
+            " cache_key TEXT PRIMARY KEY,"
+            " documents TEXT NOT NULL,"
+            " created_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_search_cache_created ON search_cache(created_at)"
+        )
+        self._conn.commit()
+
+    def _is_expired(self, created_at: float, now: float) -> bool:
+        return self.ttl > 0 and now - created_at > self.ttl
+
+    def get(self, key: CacheKey) -> Optional[List[Document]]:
+        """
+        读取缓存
+
+        Returns:
+            命中时返回新的Document列表，未命中或已过期时返回None
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                created_at, payload = entry
+                if not self._is_expired(created_at, now):
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return [Document.from_dict(dict(item)) for item in payload]
+                del self._memory[key]
+
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT documents, created_at FROM search_cache WHERE cache_key = ?",
+                    (_serialize_key(key),)
+                ).fetchone()
+                if row is not None:
+                    payload, created_at = json.loads(row[0]), row[1]
+                    if not self._is_expired(created_at, now):
+                        self._put_memory(key, created_at, payload)
+                        self.hits += 1
+                        self.disk_hits += 1
+                        return [Document.from_dict(dict(item)) for item in payload]
+                    self._conn.execute(
+                        "DELETE FROM search_cache WHERE cache_key = ?", (_serialize_key(key),)
+                    )
+                    self._conn.commit()
+
+            self.misses += 1
+            return None
+
+    def set(self, key: CacheKey, documents: List[Document]):
+        """写入缓存"""
+        payload = [doc.to_dict() for doc in documents]
+        created_at = time.time()
+        with self._lock:
+            self._put_memory(key, created_at, payload)
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO search_cache (cache_key, documents, created_at) VALUES (?, ?, ?)",
+                    (_serialize_key(key), json.dumps(payload, ensure_ascii=False), created_at)
+                )
+                self._conn.commit()
+
+    def _put_memory(self, key: CacheKey, created_at: float, payload: List[Dict[str, Any]]):
+        """写入内存层并按LRU淘汰（调用方需持有锁）"""
+        self._memory[key] = (created_at, payload)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_size:
+            self._memory.popitem(last=False)
+
+    def purge_expired(self) -> int:
+        """清理已过期的条目，返回清理数量"""
+        if self.ttl <= 0:
+            return 0
+        now = time.time()
+        removed = 0
+        with self._lock:
+            expired = [k for k, (created_at, _) in self._memory.items() if self._is_expired(created_at, now)]
+            for k in expired:
+                del self._memory[k]
+            removed += len(expired)
+            if self._conn is not None:
+                cursor = self._conn.execute(
+                    "DELETE FROM search_cache WHERE created_at < ?", (now - self.ttl,)
+                )
+                self._conn.commit()
+                removed += cursor.rowcount
+        return removed
+
+    def clear(self):
+        """清空缓存（包括磁盘层）"""
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM search_cache")
+                self._conn.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "disk_hits": self.disk_hits,
+                "hit_rate": self.hits / total if total else 0.0,
+                "memory_entries": len(self._memory),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "disk_enabled": self._conn is not None,
+            }
+
+    def close(self):
+        """关闭磁盘连接"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
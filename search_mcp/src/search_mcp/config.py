@@ -45,6 +45,7 @@ class SearchConfig:
     enable_cache: bool = True
     cache_ttl: int = 3600  # 1小时
     cache_size: int = 1000
+    cache_db_path: Optional[str] = None  # 设置后启用SQLite磁盘缓存，重启后仍可命中
     
     # 日志配置
     log_level: str = "INFO"
@@ -129,6 +130,12 @@ class SearchConfig:
         self.max_workers = int(os.getenv("SEARCH_MAX_WORKERS", self.max_workers))
         self.request_timeout = float(os.getenv("SEARCH_REQUEST_TIMEOUT", self.request_timeout))
         
+        # 缓存配置
+        self.enable_cache = os.getenv("SEARCH_ENABLE_CACHE", str(self.enable_cache)).lower() == "true"
+        self.cache_ttl = int(os.getenv("SEARCH_CACHE_TTL", self.cache_ttl))
+        self.cache_size = int(os.getenv("SEARCH_CACHE_SIZE", self.cache_size))
+        self.cache_db_path = os.getenv("SEARCH_CACHE_DB", self.cache_db_path)
+        
         # 日志配置
         self.log_level = os.getenv("SEARCH_LOG_LEVEL", self.log_level).upper()
         self.log_file_path = os.getenv("SEARCH_LOG_FILE", self.log_file_path)
@@ -148,6 +155,9 @@ class SearchConfig:
         if self.request_timeout <= 0:
             raise ValueError("request_timeout must be positive")
         
+        if self.cache_size <= 0:
+            raise ValueError("cache_size must be positive")
+        
         if self.log_level not in ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]:
             raise ValueError(f"Invalid log level: {self.log_level}")
     
@@ -159,6 +169,9 @@ class SearchConfig:
         if self.log_file_path:
             log_path = Path(self.log_file_path).parent
             log_path.mkdir(parents=True, exist_ok=True)
+        
+        if self.cache_db_path:
+            Path(self.cache_db_path).parent.mkdir(parents=True, exist_ok=True)
     
     def get_api_keys(self) -> Dict[str, Optional[str]]:
         """获取所有API密钥"""
@@ -215,6 +228,9 @@ class SearchConfig:
             "max_workers": self.max_workers,
             "request_timeout": self.request_timeout,
             "search_timeout": self.search_timeout,
+            "enable_cache": self.enable_cache,
+            "cache_ttl": self.cache_ttl,
+            "cache_size": self.cache_size,
             "log_level": self.log_level,
             "enabled_sources": self.enabled_sources,
             "output_dir": self.output_dir,
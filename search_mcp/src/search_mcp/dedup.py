@@ -0,0 +1,195 @@
+"""
+Search MCP 近似重复检测
+
+按空白切分的Jaccard相似度无法处理中文（整句是一个词），逐条两两比较在几百条
+新闻上又是O(n²)。这里提供：
+1. 中英文混合分词：英文/数字按单词切分，中文按相邻两字（bigram）切分
+2. 基于分词集合的Jaccard相似度
+3. MinHash + LSH分桶的近似重复索引，只对同桶候选做精确比较，查询代价与索引规模近似无关
+
+安装了NumPy时用向量化计算MinHash签名，否则退回纯Python实现（结果相同）。
+"""
+
+import random
+import sys
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Hashable, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# 分词器与证据排序共用，位于仓库根目录的collectors包（与generators导入收集器的方式相同）
+_REPO_ROOT = str(Path(__file__).parent.parent.parent.parent)
+if _REPO_ROOT not in sys.path:
+    sys.path.insert(0, _REPO_ROOT)
+
+from collectors.tokenizer import tokenize
+
+_HASH_MASK = (1 << 32) - 1  # 哈希值取低32位，可直接放入NumPy的uint32数组
+
+
+def shingle_set(text: str) -> FrozenSet[str]:
+    """文本的分词集合"""
+    return frozenset(tokenize(text))
+
+
+def jaccard_similarity(shingles1: FrozenSet[str], shingles2: FrozenSet[str]) -> float:
+    """两个分词集合的Jaccard相似度，两者都为空时视为相同"""
+    if not shingles1 and not shingles2:
+        return 1.0
+    if not shingles1 or not shingles2:
+        return 0.0
+    return len(shingles1 & shingles2) / len(shingles1 | shingles2)
+
+
+def text_similarity(text1: str, text2: str) -> float:
+    """两段文本的相似度（支持中文）"""
+    return jaccard_similarity(shingle_set(text1), shingle_set(text2))
+
+
+class NearDuplicateIndex:
+    """
+    MinHash + LSH 近似重复索引
+
+    每段文本计算 bands × rows 个MinHash值，按band分桶；同一band签名相同的文本互为候选，
+    候选再用精确的Jaccard相似度确认。默认20个band、每band 4行：
+    相似度0.8的文本对几乎必然进入候选，0.6的约94%，只共享模板用语（约0.2）的约3%。
+    阈值较低时应减少每band行数（如阈值0.4时用rows=2）。
+    """
+
+    def __init__(self, threshold: float = 0.8, bands: int = 20, rows: int = 4, seed: int = 1):
+        """
+        初始化索引
+
+        Args:
+            threshold: 判定为近似重复的Jaccard相似度阈值
+            bands: LSH分桶的band数
+            rows: 每个band包含的MinHash行数
+            seed: 生成MinHash掩码的随机种子
+        """
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = rows
+        rng = random.Random(seed)
+        self._masks = [rng.getrandbits(32) for _ in range(bands * rows)]
+        self._mask_array = np.array(self._masks, dtype=np.uint32) if np is not None else None
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], List[Hashable]] = {}
+        self._shingles: Dict[Hashable, FrozenSet[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._shingles)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._shingles
+
+    def _signature(self, shingles: FrozenSet[str]) -> List[int]:
+        hashes = [hash(token) & _HASH_MASK for token in shingles]
+        if self._mask_array is not None:
+            return (np.array(hashes, dtype=np.uint32)[:, None] ^ self._mask_array).min(axis=0).tolist()
+        return [min(map(mask.__xor__, hashes)) for mask in self._masks]
+
+    def _band_keys(self, shingles: FrozenSet[str]) -> List[Tuple[int, Tuple[int, ...]]]:
+        signature = self._signature(shingles)
+        return [
+            (band, tuple(signature[band * self.rows:(band + 1) * self.rows]))
+            for band in range(self.bands)
+        ]
+
+    def _add(self, key: Hashable, shingles: FrozenSet[str], band_keys: Optional[List] = None):
+        self._shingles[key] = shingles
+        if not shingles:
+            return
+        for band_key in band_keys if band_keys is not None else self._band_keys(shingles):
+            self._buckets.setdefault(band_key, []).append(key)
+
+    def _candidates(self, band_keys: List) -> List[Hashable]:
+        seen = {}
+        for band_key in band_keys:
+            for key in self._buckets.get(band_key, ()):
+                seen.setdefault(key, None)
+        return list(seen)
+
+    def _matches(self, shingles: FrozenSet[str], band_keys: List, threshold: float) -> List[Tuple[Hashable, float]]:
+        matches = []
+        for key in self._candidates(band_keys):
+            similarity = jaccard_similarity(shingles, self._shingles[key])
+            if similarity >= threshold:
+                matches.append((key, similarity))
+        matches.sort(key=lambda item: item[1], reverse=True)
+        return matches
+
+    def add(self, key: Hashable, text: Any):
+        """
+        把文本加入索引
+
+        Args:
+            key: 条目标识（如URL或序号），重复添加同一个key会被忽略
+            text: 文本，或已经算好的分词集合
+        """
+        if key in self._shingles:
+            return
+        self._add(key, text if isinstance(text, frozenset) else shingle_set(text))
+
+    def candidates(self, text: Any) -> List[Hashable]:
+        """返回与文本落入同一LSH桶的条目（未做精确比较），按加入顺序排列"""
+        shingles = text if isinstance(text, frozenset) else shingle_set(text)
+        if not shingles:
+            return []
+        return self._candidates(self._band_keys(shingles))
+
+    def query(self, text: Any, threshold: Optional[float] = None) -> List[Tuple[Hashable, float]]:
+        """返回相似度不低于阈值的条目及其相似度，按相似度从高到低排列"""
+        threshold = self.threshold if threshold is None else threshold
+        shingles = text if isinstance(text, frozenset) else shingle_set(text)
+        if not shingles:
+            return []
+        return self._matches(shingles, self._band_keys(shingles), threshold)
+
+    def find_duplicate(self, text: Any) -> Optional[Hashable]:
+        """返回与文本最相似的近似重复条目，没有时返回None"""
+        matches = self.query(text)
+        return matches[0][0] if matches else None
+
+    def add_if_unique(self, key: Hashable, text: Any) -> bool:
+        """文本不是已有条目的近似重复时加入索引并返回True，否则返回False"""
+        if key in self._shingles:
+            return False
+        shingles = text if isinstance(text, frozenset) else shingle_set(text)
+        if not shingles:
+            self._add(key, shingles)
+            return True
+        # 签名只计算一次，查询和写入共用
+        band_keys = self._band_keys(shingles)
+        if self._matches(shingles, band_keys, self.threshold):
+            return False
+        self._add(key, shingles, band_keys)
+        return True
+
+
+def _field(doc: Any, name: str) -> Any:
+    """读取Document属性或字典字段"""
+    if isinstance(doc, dict):
+        return doc.get(name)
+    return getattr(doc, name, None)
+
+
+class DocumentDeduplicator:
+    """文档去重：URL精确去重 + 标题近似去重，支持Document和字典"""
+
+    def __init__(self, title_threshold: float = 0.8):
+        self.seen_urls = set()
+        self.title_index = NearDuplicateIndex(threshold=title_threshold)
+
+    def add(self, doc: Any) -> bool:
+        """文档未出现过时记录并返回True，URL相同或标题近似重复时返回False"""
+        url = _field(doc, 'url')
+        if url and url in self.seen_urls:
+            return False
+        key = url or len(self.title_index)
+        if not self.title_index.add_if_unique(key, _field(doc, 'title') or ''):
+            return False
+        if url:
+            self.seen_urls.add(url)
+        return True
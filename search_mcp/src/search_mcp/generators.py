@@ -7,6 +7,7 @@ Search MCP 核心搜索生成器
 import asyncio
 import time
 import threading
+import weakref
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Union, Any, Tuple
@@ -18,6 +19,8 @@ import json
 from .config import SearchConfig
 from .models import Document, SearchResult, SearchMetrics, CollectorInfo
 from .logger import SearchLogger
+from .cache import SearchCache, make_cache_key, normalize_query
+from .dedup import DocumentDeduplicator
 
 # 添加父目录到路径以导入现有收集器
 parent_dir = Path(__file__).parent.parent.parent.parent
@@ -236,16 +239,25 @@ class CollectorInitializationAgent(BaseSearchAgent):
 class SearchExecutionAgent(BaseSearchAgent):
     """负责执行具体搜索操作的Agent"""
     
-    def __init__(self, config: SearchConfig, collectors: Dict):
+    def __init__(self, config: SearchConfig, collectors: Dict, cache: Optional[SearchCache] = None):
         super().__init__(config)
         self.collectors = collectors
+        self.cache = cache
     
     def execute_single_search(self, query: str, source: str, max_results: int, days_back: int) -> List[Document]:
-        """执行单个搜索任务"""
+        """执行单个搜索任务（优先读取缓存）"""
         collector = self.collectors.get(source)
         if not collector:
             return []
         
+        cache_key = make_cache_key(query, source, days_back, max_results)
+        if self.cache is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                self.logger.log_cache_hit(str(cache_key))
+                return cached
+            self.logger.log_cache_miss(str(cache_key))
+        
         try:
             # 根据不同的收集器调用相应的搜索方法
             raw_results = []
@@ -276,9 +288,13 @@ class SearchExecutionAgent(BaseSearchAgent):
                     raw_results = collector.search_news_api(query, days_back=days_back)
             
             # 标准化结果为Document格式
-            documents = self.standardize_results(raw_results, source)
+            documents = self.standardize_results(raw_results, source)[:max_results]  # 限制结果数量
+            
+            # 只缓存非空结果，避免把收集器内部吞掉的临时失败固化下来
+            if self.cache is not None and documents:
+                self.cache.set(cache_key, documents)
             
-            return documents[:max_results]  # 限制结果数量
+            return documents
             
         except Exception as e:
             self.logger.logger.error(f"搜索执行失败 {source}({query}): {str(e)}")
@@ -349,6 +365,61 @@ class ParallelSearchAgent(BaseSearchAgent):
         super().__init__(config)
         self.collectors = collectors
         self.execution_agent = execution_agent
+        
+        # 异步搜索路径使用的共享线程池和按事件循环区分的数据源信号量
+        self._async_executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self._source_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = weakref.WeakKeyDictionary()
+    
+    def _resolve_sources(self, sources: Optional[List[str]]) -> List[str]:
+        """解析数据源列表，只保留可用的数据源"""
+        if sources is None:
+            return list(self.collectors.keys())
+        return [s for s in sources if s in self.collectors]
+    
+    def _sort_results(self, all_results: List[Document]) -> List[Document]:
+        """按相关性和时间排序"""
+        all_results.sort(key=lambda doc: (
+            doc.score or 0,  # 相关性评分
+            self._parse_date(doc.publish_date) if doc.publish_date else datetime.min
+        ), reverse=True)
+        return all_results
+    
+    def _get_async_executor(self) -> ThreadPoolExecutor:
+        """
+        获取异步搜索共享的线程池
+        
+        收集器基于阻塞的requests实现，异步路径将其调度到这个长期存在的线程池中，
+        而不是每次调用都新建线程池。线程数按 数据源数 × max_concurrent_requests 设置，
+        真正的并发上限由每个数据源的信号量控制。
+        """
+        if self._async_executor is None:
+            with self._executor_lock:
+                if self._async_executor is None:
+                    workers = max(1, len(self.collectors)) * self.config.max_concurrent_requests
+                    self._async_executor = ThreadPoolExecutor(
+                        max_workers=workers,
+                        thread_name_prefix="search_async"
+                    )
+        return self._async_executor
+    
+    def _get_source_semaphore(self, source: str) -> asyncio.Semaphore:
+        """获取当前事件循环中指定数据源的信号量"""
+        loop = asyncio.get_running_loop()
+        semaphores = self._source_semaphores.get(loop)
+        if semaphores is None:
+            semaphores = {}
+            self._source_semaphores[loop] = semaphores
+        if source not in semaphores:
+            semaphores[source] = asyncio.Semaphore(self.config.max_concurrent_requests)
+        return semaphores[source]
+    
+    def shutdown(self):
+        """关闭异步搜索线程池"""
+        with self._executor_lock:
+            if self._async_executor is not None:
+                self._async_executor.shutdown(wait=False)
+                self._async_executor = None
     
     def parallel_search(self, 
                        queries: List[str], 
@@ -364,12 +435,8 @@ class ParallelSearchAgent(BaseSearchAgent):
         if not queries:
             return []
         
-        # 如果没有指定数据源，使用所有可用的
-        if sources is None:
-            sources = list(self.collectors.keys())
-        else:
-            # 过滤只保留可用的数据源
-            sources = [s for s in sources if s in self.collectors]
+        # 如果没有指定数据源，使用所有可用的；否则只保留可用的数据源
+        sources = self._resolve_sources(sources)
         
         if not sources:
             self.logger.logger.error("❌ 没有可用的数据源")
@@ -383,7 +450,7 @@ class ParallelSearchAgent(BaseSearchAgent):
         })
         
         all_results = []
-        seen_urls = set()
+        deduplicator = DocumentDeduplicator()
         
         # 使用线程池并行执行搜索
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
@@ -411,11 +478,10 @@ class ParallelSearchAgent(BaseSearchAgent):
                 try:
                     results = future.result()
                     
-                    # 去重并合并结果
+                    # 去重并合并结果（URL相同或标题近似重复）
                     new_count = 0
                     for doc in results:
-                        if doc.url not in seen_urls:
-                            seen_urls.add(doc.url)
+                        if deduplicator.add(doc):
                             all_results.append(doc)
                             new_count += 1
                     
@@ -430,10 +496,7 @@ class ParallelSearchAgent(BaseSearchAgent):
                     self.logger.logger.error(f"  ❌ [{completed_tasks}/{total_tasks}] {error_msg}")
         
         # 按相关性和时间排序
-        all_results.sort(key=lambda doc: (
-            doc.score or 0,  # 相关性评分
-            self._parse_date(doc.publish_date) if doc.publish_date else datetime.min
-        ), reverse=True)
+        self._sort_results(all_results)
         
         total_time = time.time() - start_time
         
@@ -442,15 +505,185 @@ class ParallelSearchAgent(BaseSearchAgent):
         
         return all_results
     
-    def search_by_category(self, 
-                          queries: List[str], 
-                          category: str = 'web',
-                          max_results_per_query: int = 5,
-                          days_back: int = 7,
-                          max_workers: int = 4) -> List[Document]:
+    def batch_search(self, 
+                     queries: List[str], 
+                     sources: List[str] = None, 
+                     max_results_per_query: int = 5,
+                     days_back: int = 7,
+                     max_workers: int = 8) -> Dict[str, List[Document]]:
         """
-        按类别搜索
+        批量搜索：一次性提交整个查询列表，按查询分组返回结果
+        
+        查询先按规范化形式去重，所有(查询, 数据源)组合在同一个有界线程池中执行；
+        文档按URL和标题近似重复全局去重，重复文档只保留在最先提交的查询下，结果与完成顺序无关。
+        """
+        start_time = time.time()
+        
+        unique_queries = []
+        seen_queries = set()
+        for query in queries or []:
+            normalized = normalize_query(query)
+            if normalized and normalized not in seen_queries:
+                seen_queries.add(normalized)
+                unique_queries.append(query.strip())
+        
+        if not unique_queries:
+            return {}
+        
+        sources = self._resolve_sources(sources)
+        
+        if not sources:
+            self.logger.logger.error("❌ 没有可用的数据源")
+            return {}
+        
+        self.logger.log_search_start(unique_queries, sources, {
+            'max_results_per_query': max_results_per_query,
+            'days_back': days_back,
+            'max_workers': max_workers,
+            'batch': True
+        })
+        
+        task_results: Dict[Tuple[str, str], List[Document]] = {}
+        errors = []
+        
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            future_to_info = {
+                executor.submit(
+                    self.execution_agent.execute_single_search,
+                    query, source, max_results_per_query, days_back
+                ): (query, source)
+                for query in unique_queries
+                for source in sources
+            }
+            
+            completed_tasks = 0
+            total_tasks = len(future_to_info)
+            
+            for future in as_completed(future_to_info):
+                query, source = future_to_info[future]
+                completed_tasks += 1
+                try:
+                    results = future.result()
+                    task_results[(query, source)] = results
+                    self.logger.log_source_result(source, query, len(results), True)
+                    self.logger.logger.info(f"  ✅ [{completed_tasks}/{total_tasks}] {source}({query}): {len(results)}条结果")
+                except Exception as e:
+                    error_msg = f"{source}({query}) 搜索失败: {str(e)}"
+                    errors.append(error_msg)
+                    self.logger.log_source_result(source, query, 0, False, str(e))
+                    self.logger.logger.error(f"  ❌ [{completed_tasks}/{total_tasks}] {error_msg}")
+        
+        # 按提交顺序全局去重，保证结果确定
+        grouped: Dict[str, List[Document]] = {}
+        deduplicator = DocumentDeduplicator()
+        for query in unique_queries:
+            query_results = []
+            for source in sources:
+                for doc in task_results.get((query, source), []):
+                    if deduplicator.add(doc):
+                        query_results.append(doc)
+            grouped[query] = self._sort_results(query_results)
+        
+        total_results = sum(len(docs) for docs in grouped.values())
+        self.logger.log_search_complete(total_results, time.time() - start_time, sources, errors)
+        
+        return grouped
+    
+    async def async_parallel_search(self, 
+                                    queries: List[str], 
+                                    sources: List[str] = None, 
+                                    max_results_per_query: int = 5,
+                                    days_back: int = 7,
+                                    max_workers: int = 6) -> List[Document]:
+        """
+        异步并行搜索多个查询和数据源
+        
+        与parallel_search结果一致，但不会阻塞事件循环：每个(查询, 数据源)任务在共享线程池中执行，
+        同一数据源的并发请求数受 config.max_concurrent_requests 限制，本次调用的总并发受 max_workers 限制。
         """
+        start_time = time.time()
+        
+        if not queries:
+            return []
+        
+        sources = self._resolve_sources(sources)
+        
+        if not sources:
+            self.logger.logger.error("❌ 没有可用的数据源")
+            return []
+        
+        self.logger.log_search_start(queries, sources, {
+            'max_results_per_query': max_results_per_query,
+            'days_back': days_back,
+            'max_workers': max_workers,
+            'mode': 'async'
+        })
+        
+        loop = asyncio.get_running_loop()
+        executor = self._get_async_executor()
+        call_semaphore = asyncio.Semaphore(max_workers)
+        
+        async def run_task(query: str, source: str) -> List[Document]:
+            async with call_semaphore, self._get_source_semaphore(source):
+                return await loop.run_in_executor(
+                    executor,
+                    self.execution_agent.execute_single_search,
+                    query, source, max_results_per_query, days_back
+                )
+        
+        task_info = {}
+        for query in queries:
+            for source in sources:
+                task = asyncio.ensure_future(run_task(query, source))
+                task_info[task] = (query, source)
+        
+        done, pending = await asyncio.wait(task_info.keys(), timeout=self.config.search_timeout)
+        
+        all_results = []
+        deduplicator = DocumentDeduplicator()
+        errors = []
+        total_tasks = len(task_info)
+        
+        for task in pending:
+            task.cancel()
+            query, source = task_info[task]
+            error_msg = f"{source}({query}) 搜索超时"
+            errors.append(error_msg)
+            self.logger.log_source_result(source, query, 0, False, "timeout")
+        
+        # 按提交顺序合并，保证去重结果与完成顺序无关
+        completed_tasks = 0
+        for task, (query, source) in task_info.items():
+            if task not in done:
+                continue
+            completed_tasks += 1
+            try:
+                results = task.result()
+                
+                new_count = 0
+                for doc in results:
+                    if deduplicator.add(doc):
+                        all_results.append(doc)
+                        new_count += 1
+                
+                self.logger.log_source_result(source, query, len(results), True)
+                self.logger.logger.info(f"  ✅ [{completed_tasks}/{total_tasks}] {source}({query}): {len(results)}条结果, {new_count}条新增")
+                
+            except Exception as e:
+                error_msg = f"{source}({query}) 搜索失败: {str(e)}"
+                errors.append(error_msg)
+                self.logger.log_source_result(source, query, 0, False, str(e))
+                self.logger.logger.error(f"  ❌ [{completed_tasks}/{total_tasks}] {error_msg}")
+        
+        self._sort_results(all_results)
+        
+        total_time = time.time() - start_time
+        self.logger.log_search_complete(len(all_results), total_time, sources, errors)
+        
+        return all_results
+    
+    def _category_sources(self, category: str) -> List[str]:
+        """获取指定类别下的可用数据源"""
         source_types = {
             'web': ['tavily', 'brave', 'google'],
             'academic': ['arxiv', 'academic', 'semantic_scholar', 'ieee', 'springer', 'core'],
@@ -460,8 +693,19 @@ class ParallelSearchAgent(BaseSearchAgent):
         if category not in source_types:
             raise ValueError(f"不支持的搜索类别: {category}")
         
+        return [s for s in source_types[category] if s in self.collectors]
+    
+    def search_by_category(self, 
+                          queries: List[str], 
+                          category: str = 'web',
+                          max_results_per_query: int = 5,
+                          days_back: int = 7,
+                          max_workers: int = 4) -> List[Document]:
+        """
+        按类别搜索
+        """
         # 获取该类别下的可用数据源
-        sources = [s for s in source_types[category] if s in self.collectors]
+        sources = self._category_sources(category)
         
         if not sources:
             self.logger.logger.error(f"❌ 类别 {category} 下没有可用的数据源")
@@ -475,6 +719,29 @@ class ParallelSearchAgent(BaseSearchAgent):
             max_workers=max_workers
         )
     
+    async def async_search_by_category(self, 
+                                       queries: List[str], 
+                                       category: str = 'web',
+                                       max_results_per_query: int = 5,
+                                       days_back: int = 7,
+                                       max_workers: int = 4) -> List[Document]:
+        """
+        异步按类别搜索
+        """
+        sources = self._category_sources(category)
+        
+        if not sources:
+            self.logger.logger.error(f"❌ 类别 {category} 下没有可用的数据源")
+            return []
+        
+        return await self.async_parallel_search(
+            queries=queries,
+            sources=sources,
+            max_results_per_query=max_results_per_query,
+            days_back=days_back,
+            max_workers=max_workers
+        )
+    
     def search_with_fallback(self, 
                            queries: List[str],
                            preferred_sources: List[str] = None,
@@ -510,14 +777,54 @@ class ParallelSearchAgent(BaseSearchAgent):
                 days_back=days_back
             )
             
-            # 合并结果并去重
-            seen_urls = {doc.url for doc in results}
-            for doc in fallback_results:
-                if doc.url not in seen_urls:
-                    results.append(doc)
-                    seen_urls.add(doc.url)
+            self._merge_fallback_results(results, fallback_results)
         
         return results
+    
+    async def async_search_with_fallback(self, 
+                                         queries: List[str],
+                                         preferred_sources: List[str] = None,
+                                         fallback_sources: List[str] = None,
+                                         max_results_per_query: int = 5,
+                                         days_back: int = 7) -> List[Document]:
+        """
+        异步带降级的搜索
+        """
+        if preferred_sources is None:
+            preferred_sources = ['tavily', 'brave']
+        
+        if fallback_sources is None:
+            fallback_sources = ['google', 'arxiv', 'academic']
+        
+        results = await self.async_parallel_search(
+            queries=queries,
+            sources=preferred_sources,
+            max_results_per_query=max_results_per_query,
+            days_back=days_back
+        )
+        
+        if len(results) < len(queries) * max_results_per_query // 2:
+            self.logger.logger.info("🔄 首选数据源结果不足，启用备选数据源...")
+            
+            fallback_results = await self.async_parallel_search(
+                queries=queries,
+                sources=fallback_sources,
+                max_results_per_query=max_results_per_query,
+                days_back=days_back
+            )
+            
+            self._merge_fallback_results(results, fallback_results)
+        
+        return results
+    
+    def _merge_fallback_results(self, results: List[Document], fallback_results: List[Document]):
+        """合并备选数据源结果并去重"""
+        deduplicator = DocumentDeduplicator()
+        for doc in results:
+            deduplicator.add(doc)
+        for doc in fallback_results:
+            if deduplicator.add(doc):
+                results.append(doc)
 
 
 class SearchOrchestrator:
@@ -536,9 +843,12 @@ class SearchOrchestrator:
         self.config = config
         self.logger = SearchLogger(config.to_dict())
         
+        # 搜索结果缓存（enable_cache=False时为None）
+        self.cache = SearchCache.from_config(config)
+        
         # 初始化各个Agent
         self.collector_agent = CollectorInitializationAgent(config)
-        self.execution_agent = SearchExecutionAgent(config, self.collector_agent.collectors)
+        self.execution_agent = SearchExecutionAgent(config, self.collector_agent.collectors, self.cache)
         self.parallel_agent = ParallelSearchAgent(config, self.collector_agent.collectors, self.execution_agent)
         
         self.logger.logger.info("🚀 SearchOrchestrator初始化完成")
@@ -560,6 +870,23 @@ class SearchOrchestrator:
             max_workers=max_workers
         )
     
+    def batch_search(self, 
+                     queries: List[str], 
+                     sources: List[str] = None, 
+                     max_results_per_query: int = 5,
+                     days_back: int = 7,
+                     max_workers: int = 8) -> Dict[str, List[Document]]:
+        """
+        批量搜索，按查询分组返回全局去重后的结果
+        """
+        return self.parallel_agent.batch_search(
+            queries=queries,
+            sources=sources,
+            max_results_per_query=max_results_per_query,
+            days_back=days_back,
+            max_workers=max_workers
+        )
+    
     def search_by_category(self, 
                           queries: List[str], 
                           category: str = 'web',
@@ -594,6 +921,57 @@ class SearchOrchestrator:
             days_back=days_back
         )
     
+    async def async_parallel_search(self, 
+                                    queries: List[str], 
+                                    sources: List[str] = None, 
+                                    max_results_per_query: int = 5,
+                                    days_back: int = 7,
+                                    max_workers: int = 6) -> List[Document]:
+        """
+        执行异步并行搜索，不阻塞调用方的事件循环
+        """
+        return await self.parallel_agent.async_parallel_search(
+            queries=queries,
+            sources=sources,
+            max_results_per_query=max_results_per_query,
+            days_back=days_back,
+            max_workers=max_workers
+        )
+    
+    async def async_search_by_category(self, 
+                                       queries: List[str], 
+                                       category: str = 'web',
+                                       max_results_per_query: int = 5,
+                                       days_back: int = 7,
+                                       max_workers: int = 4) -> List[Document]:
+        """
+        异步按类别搜索
+        """
+        return await self.parallel_agent.async_search_by_category(
+            queries=queries,
+            category=category,
+            max_results_per_query=max_results_per_query,
+            days_back=days_back,
+            max_workers=max_workers
+        )
+    
+    async def async_search_with_fallback(self, 
+                                         queries: List[str],
+                                         preferred_sources: List[str] = None,
+                                         fallback_sources: List[str] = None,
+                                         max_results_per_query: int = 5,
+                                         days_back: int = 7) -> List[Document]:
+        """
+        异步带降级的搜索
+        """
+        return await self.parallel_agent.async_search_with_fallback(
+            queries=queries,
+            preferred_sources=preferred_sources,
+            fallback_sources=fallback_sources,
+            max_results_per_query=max_results_per_query,
+            days_back=days_back
+        )
+    
     def get_available_sources(self) -> Dict[str, List[str]]:
         """获取所有可用的数据源"""
         return self.collector_agent.get_available_sources()
@@ -602,6 +980,20 @@ class SearchOrchestrator:
         """获取所有收集器的信息"""
         return self.collector_agent.get_collector_info()
     
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """获取搜索缓存的命中统计"""
+        stats = self.execution_agent.logger.get_cache_stats()
+        if self.cache is not None:
+            stats.update(self.cache.get_stats())
+        stats['enabled'] = self.cache is not None
+        return stats
+    
+    def clear_cache(self):
+        """清空搜索缓存"""
+        if self.cache is not None:
+            self.cache.clear()
+            self.logger.logger.info("🧹 搜索缓存已清除")
+    
     def get_search_metrics(self, search_results: List[Document], execution_time: float, 
                           queries: List[str], sources_used: List[str]) -> SearchMetrics:
         """生成搜索性能指标"""
@@ -108,6 +108,8 @@ class SearchLogger:
         self.config = config_dict
         self.logger = setup_mcp_logger(config_dict)
         self.search_logs = []  # 存储搜索日志
+        self.cache_hits = 0
+        self.cache_misses = 0
     
     def log_search_start(self, queries: list, sources: list, params: dict):
         """记录搜索开始"""
@@ -196,12 +198,23 @@ class SearchLogger:
     
     def log_cache_hit(self, cache_key: str):
         """记录缓存命中"""
+        self.cache_hits += 1
         self.logger.debug(f"💾 缓存命中: {cache_key}")
     
     def log_cache_miss(self, cache_key: str):
         """记录缓存未命中"""
+        self.cache_misses += 1
         self.logger.debug(f"💾 缓存未命中: {cache_key}")
     
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """获取缓存命中统计"""
+        total = self.cache_hits + self.cache_misses
+        return {
+            'hits': self.cache_hits,
+            'misses': self.cache_misses,
+            'hit_rate': self.cache_hits / total if total else 0.0
+        }
+    
     def get_search_logs(self, limit: int = 100) -> list:
         """获取搜索日志"""
         return self.search_logs[-limit:]
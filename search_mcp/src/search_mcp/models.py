@@ -10,6 +10,8 @@ from urllib.parse import urlparse
 from datetime import datetime
 from enum import Enum
 
+from .dedup import text_similarity
+
 
 class SourceType(Enum):
     """数据源类型枚举"""
@@ -65,24 +67,13 @@ class Document:
         if self.url == other.url:
             return True
         
-        # 简单的标题相似性检查（可以使用更复杂的算法）
+        # 标题相似性检查（中文按相邻两字分词）
         title_similarity = self._calculate_text_similarity(self.title, other.title)
         return title_similarity >= threshold
     
     def _calculate_text_similarity(self, text1: str, text2: str) -> float:
-        """计算两个文本的相似度（简化版本）"""
-        words1 = set(text1.lower().split())
-        words2 = set(text2.lower().split())
-        
-        if not words1 and not words2:
-            return 1.0
-        if not words1 or not words2:
-            return 0.0
-        
-        intersection = words1.intersection(words2)
-        union = words1.union(words2)
-        
-        return len(intersection) / len(union)
+        """计算两个文本的相似度（基于分词集合的Jaccard相似度，支持中文）"""
+        return text_similarity(text1, text2)
 
 
 @dataclass
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+近似重复检测微基准测试
+
+生成带有已知近似重复（转载改写）的中英文混合新闻集合，对比：
+1. 旧方式：逐条与已保留条目两两比较（O(n²)，按空白切分的Jaccard相似度）
+2. 新方式：NearDuplicateIndex（MinHash + LSH候选查找，中文按相邻两字分词）
+
+两两比较在10k条上耗时过长，默认只在前2000条上实测，再按n²外推。
+
+用法:
+    python tests/bench_near_duplicate.py --docs 10000 --dup-rate 0.2
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from search_mcp.dedup import NearDuplicateIndex
+
+
+SUBJECTS = ["英伟达", "苹果", "谷歌", "微软", "特斯拉", "华为", "OpenAI", "字节跳动", "阿里巴巴", "腾讯",
+            "百度", "Meta", "亚马逊", "小米", "比亚迪", "宁德时代", "三星", "英特尔", "AMD", "高通"]
+ACTIONS = ["发布", "推出", "宣布", "收购", "投资", "开源", "升级", "测试", "下调", "扩建"]
+OBJECTS = ["新一代AI芯片", "大语言模型", "自动驾驶系统", "数据中心", "智能手机", "云计算平台",
+           "机器人产品", "固态电池", "量子计算机", "AR眼镜", "推荐算法", "开发者工具"]
+DETAILS = ["性能提升一倍", "面向企业客户", "首批用户反馈积极", "价格低于市场预期", "将于下季度上市",
+           "引发行业关注", "股价随之上涨", "获得监管批准", "合作伙伴超过百家", "年营收目标上调"]
+
+
+def random_phrase(rng: random.Random) -> str:
+    """随机汉字短语，模拟人名、地名等每篇新闻特有的词"""
+    return "".join(chr(rng.randint(0x4E00, 0x9FA5)) for _ in range(rng.randint(3, 6)))
+
+
+def make_document(rng: random.Random, index: int) -> str:
+    words = [rng.choice(SUBJECTS) + rng.choice(ACTIONS) + rng.choice(OBJECTS), random_phrase(rng),
+             rng.choice(DETAILS), f"金额{rng.randint(1, 999)}亿元", random_phrase(rng),
+             rng.choice(DETAILS), random_phrase(rng), f"report {index} {rng.randint(1000, 9999)}"]
+    return "，".join(words)
+
+
+def rewrite(rng: random.Random, text: str) -> str:
+    """模拟转载：去掉或替换一个片段"""
+    parts = text.split("，")
+    position = rng.randrange(len(parts))
+    if rng.random() < 0.5:
+        parts.pop(position)
+    else:
+        parts[position] = parts[position] + "消息"
+    return "，".join(parts)
+
+
+def build_corpus(docs: int, dup_rate: float, seed: int):
+    rng = random.Random(seed)
+    corpus, duplicates = [], set()
+    for i in range(docs):
+        if corpus and rng.random() < dup_rate:
+            corpus.append(rewrite(rng, rng.choice(corpus)))
+            duplicates.add(i)
+        else:
+            corpus.append(make_document(rng, i))
+    return corpus, duplicates
+
+
+def whitespace_similarity(text1: str, text2: str) -> float:
+    """旧实现：按空白切分的Jaccard相似度"""
+    words1, words2 = set(text1.lower().split()), set(text2.lower().split())
+    if not words1 or not words2:
+        return 0.0
+    return len(words1 & words2) / len(words1 | words2)
+
+
+def pairwise_dedup(corpus, threshold: float):
+    kept, removed = [], set()
+    for i, text in enumerate(corpus):
+        if any(whitespace_similarity(text, corpus[j]) >= threshold for j in kept):
+            removed.add(i)
+        else:
+            kept.append(i)
+    return removed
+
+
+def index_dedup(corpus, threshold: float):
+    index = NearDuplicateIndex(threshold=threshold)
+    removed = set()
+    for i, text in enumerate(corpus):
+        if not index.add_if_unique(i, text):
+            removed.add(i)
+    return removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="近似重复检测微基准测试")
+    parser.add_argument("--docs", type=int, default=10000, help="文档数量")
+    parser.add_argument("--dup-rate", type=float, default=0.2, help="近似重复文档比例")
+    parser.add_argument("--threshold", type=float, default=0.6, help="判定重复的相似度阈值")
+    parser.add_argument("--pairwise-limit", type=int, default=2000, help="两两比较实测的文档数上限")
+    parser.add_argument("--seed", type=int, default=7, help="随机种子")
+    args = parser.parse_args()
+
+    corpus, duplicates = build_corpus(args.docs, args.dup_rate, args.seed)
+
+    start = time.perf_counter()
+    removed = index_dedup(corpus, args.threshold)
+    index_time = time.perf_counter() - start
+    recall = len(removed & duplicates) / len(duplicates) if duplicates else 1.0
+    precision = len(removed & duplicates) / len(removed) if removed else 1.0
+
+    limit = min(args.pairwise_limit, args.docs)
+    subset_duplicates = {i for i in duplicates if i < limit}
+    start = time.perf_counter()
+    pairwise_removed = pairwise_dedup(corpus[:limit], args.threshold)
+    pairwise_time = time.perf_counter() - start
+    pairwise_estimate = pairwise_time * (args.docs / limit) ** 2
+    pairwise_recall = len(pairwise_removed & subset_duplicates) / len(subset_duplicates) if subset_duplicates else 1.0
+
+    print(f"文档数: {args.docs}，其中近似重复: {len(duplicates)}")
+    print(f"\n{'方式':<16} {'耗时(秒)':>10} {'召回率':>8} {'精确率':>8}")
+    print(f"{'LSH索引':<16} {index_time:>10.2f} {recall:>8.1%} {precision:>8.1%}")
+    print(f"{'两两比较(实测)':<16} {pairwise_time:>10.2f} {pairwise_recall:>8.1%} {'-':>8}  ({limit}条)")
+    print(f"{'两两比较(外推)':<16} {pairwise_estimate:>10.2f}")
+    if index_time:
+        print(f"\n按外推耗时计算加速: {pairwise_estimate / index_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
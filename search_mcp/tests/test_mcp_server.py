@@ -17,8 +17,10 @@ sys.path.insert(0, str(src_path))
 
 from src.search_mcp.config import SearchConfig
 from src.search_mcp.models import Document, SearchRequest, SearchResult
-from src.search_mcp.generators import SearchGenerator
+from src.search_mcp.generators import SearchGenerator, SearchExecutionAgent, ParallelSearchAgent
 from src.search_mcp.logger import setup_logger, SearchLogger
+from src.search_mcp.cache import SearchCache, make_cache_key
+from src.search_mcp.dedup import NearDuplicateIndex, DocumentDeduplicator, tokenize, text_similarity
 
 
 class TestSearchConfig:
@@ -413,6 +415,221 @@ class TestSearchLogger:
         assert len(search_logger.search_logs) == 0
 
 
+class TestSearchCache:
+    """测试搜索结果缓存"""
+    
+    @pytest.fixture
+    def documents(self):
+        return [
+            Document("Title 1", "Content 1", "https://example.com/1", "tavily", "web"),
+            Document("Title 2", "Content 2", "https://example.com/2", "tavily", "web")
+        ]
+    
+    def test_cache_key_normalization(self):
+        """测试查询规范化后生成相同的缓存键"""
+        key1 = make_cache_key("  AI   Agent ", "tavily", 7, 5)
+        key2 = make_cache_key("ai agent", "tavily", 7, 5)
+        assert key1 == key2
+        assert key1 != make_cache_key("ai agent", "brave", 7, 5)
+    
+    def test_hit_and_miss(self, documents):
+        """测试命中与未命中计数"""
+        cache = SearchCache(max_size=10, ttl=60)
+        key = make_cache_key("ai", "tavily", 7, 5)
+        
+        assert cache.get(key) is None
+        cache.set(key, documents)
+        cached = cache.get(key)
+        
+        assert [doc.url for doc in cached] == [doc.url for doc in documents]
+        assert cached[0] is not documents[0]  # 返回副本
+        stats = cache.get_stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+    
+    def test_lru_eviction(self, documents):
+        """测试超出容量时淘汰最久未使用的条目"""
+        cache = SearchCache(max_size=2, ttl=60)
+        keys = [make_cache_key(f"q{i}", "tavily", 7, 5) for i in range(3)]
+        
+        cache.set(keys[0], documents)
+        cache.set(keys[1], documents)
+        cache.get(keys[0])  # keys[0] 变为最近使用
+        cache.set(keys[2], documents)
+        
+        assert cache.get(keys[1]) is None
+        assert cache.get(keys[0]) is not None
+        assert cache.get(keys[2]) is not None
+    
+    def test_ttl_expiry(self, documents):
+        """测试过期条目不再命中"""
+        cache = SearchCache(max_size=10, ttl=60)
+        key = make_cache_key("ai", "tavily", 7, 5)
+        
+        with patch('src.search_mcp.cache.time.time', return_value=1000.0):
+            cache.set(key, documents)
+        with patch('src.search_mcp.cache.time.time', return_value=1061.0):
+            assert cache.get(key) is None
+    
+    def test_disk_tier_survives_restart(self, documents, tmp_path):
+        """测试磁盘缓存在重建实例后仍可命中"""
+        db_path = str(tmp_path / "search_cache.db")
+        key = make_cache_key("ai", "tavily", 7, 5)
+        
+        cache = SearchCache(max_size=10, ttl=60, db_path=db_path)
+        cache.set(key, documents)
+        cache.close()
+        
+        restarted = SearchCache(max_size=10, ttl=60, db_path=db_path)
+        cached = restarted.get(key)
+        assert cached is not None
+        assert len(cached) == 2
+        assert restarted.get_stats()['disk_hits'] == 1
+        restarted.close()
+
+
+class TestAsyncParallelSearch:
+    """测试异步并行搜索路径"""
+    
+    class SlowCollector:
+        """记录最大并发数的模拟收集器"""
+        
+        def __init__(self):
+            import threading
+            self.lock = threading.Lock()
+            self.in_flight = 0
+            self.max_in_flight = 0
+        
+        def search(self, query, max_results=5):
+            import time
+            with self.lock:
+                self.in_flight += 1
+                self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            time.sleep(0.05)
+            with self.lock:
+                self.in_flight -= 1
+            return [{'title': query, 'content': 'c', 'url': f'https://example.com/{query}'}]
+    
+    @pytest.fixture
+    def agent_factory(self, tmp_path):
+        def build(collectors, **config_kwargs):
+            config = SearchConfig(output_dir=str(tmp_path), enable_cache=False, **config_kwargs)
+            execution_agent = SearchExecutionAgent(config, collectors)
+            return ParallelSearchAgent(config, collectors, execution_agent)
+        return build
+    
+    def test_matches_sync_results(self, agent_factory):
+        """测试异步结果与同步结果一致"""
+        agent = agent_factory({'tavily': self.SlowCollector()})
+        queries = ['a', 'b', 'a']
+        
+        sync_urls = sorted(doc.url for doc in agent.parallel_search(queries, sources=['tavily']))
+        async_docs = asyncio.run(agent.async_parallel_search(queries, sources=['tavily']))
+        
+        assert sorted(doc.url for doc in async_docs) == sync_urls
+        assert len(async_docs) == 2  # URL去重
+    
+    def test_per_source_concurrency_limit(self, agent_factory):
+        """测试同一数据源的并发数不超过max_concurrent_requests"""
+        collector = self.SlowCollector()
+        agent = agent_factory({'tavily': collector}, max_concurrent_requests=2)
+        
+        async def run_many():
+            await asyncio.gather(*[
+                agent.async_parallel_search([f'q{i}'], sources=['tavily'], max_workers=6)
+                for i in range(6)
+            ])
+        
+        asyncio.run(run_many())
+        assert collector.max_in_flight <= 2
+        agent.shutdown()
+
+
+class TestBatchSearch:
+    """测试批量搜索"""
+    
+    class OverlapCollector:
+        """每个查询返回一个独有URL和一个所有查询共享的URL"""
+        
+        def __init__(self):
+            import threading
+            self.lock = threading.Lock()
+            self.calls = []
+        
+        def search(self, query, max_results=5):
+            with self.lock:
+                self.calls.append(query)
+            return [
+                {'title': query, 'content': 'c', 'url': f'https://example.com/{query}'},
+                {'title': 'shared', 'content': 'c', 'url': 'https://example.com/shared'}
+            ]
+    
+    @pytest.fixture
+    def agent(self, tmp_path):
+        collector = self.OverlapCollector()
+        config = SearchConfig(output_dir=str(tmp_path), enable_cache=False)
+        collectors = {'tavily': collector}
+        execution_agent = SearchExecutionAgent(config, collectors)
+        return ParallelSearchAgent(config, collectors, execution_agent), collector
+    
+    def test_dedup_queries_and_urls(self, agent):
+        """测试查询去重和URL全局去重"""
+        search_agent, collector = agent
+        grouped = search_agent.batch_search(['a', ' A ', 'b', ''], sources=['tavily'], max_workers=4)
+        
+        assert list(grouped) == ['a', 'b']
+        assert sorted(collector.calls) == ['a', 'b']
+        # 共享URL只保留在最先提交的查询下
+        assert [doc.url for doc in grouped['a']].count('https://example.com/shared') == 1
+        assert [doc.url for doc in grouped['b']] == ['https://example.com/b']
+    
+    def test_empty_queries(self, agent):
+        """测试空查询列表"""
+        search_agent, collector = agent
+        assert search_agent.batch_search([], sources=['tavily']) == {}
+        assert collector.calls == []
+
+
+class TestNearDuplicateIndex:
+    """测试近似重复检测"""
+    
+    def test_tokenize_chinese(self):
+        """测试中英文混合分词"""
+        assert tokenize("OpenAI发布GPT-5模型") == ['openai', '发布', 'gpt', '5', '模型']
+        assert tokenize("人工智能") == ['人工', '工智', '智能']
+        assert tokenize("") == []
+    
+    def test_chinese_title_similarity(self):
+        """测试中文标题相似度（按空白切分时整句是一个词，相似度为0）"""
+        doc1 = Document(title="英伟达发布新一代AI芯片", content="", url="https://a.com/1",
+                        source="test", source_type="news")
+        doc2 = Document(title="英伟达发布新一代AI芯片！", content="", url="https://b.com/2",
+                        source="test", source_type="news")
+        assert text_similarity(doc1.title, "英伟达正式发布新一代AI芯片") > 0.6
+        assert doc1.is_similar_to(doc2)
+    
+    def test_index_finds_near_duplicates(self):
+        """测试索引只返回超过阈值的近似重复"""
+        index = NearDuplicateIndex(threshold=0.7)
+        index.add("a", "欧盟通过人工智能法案 对高风险系统提出严格要求")
+        index.add("b", "苹果发布新款MacBook Pro 搭载M4芯片")
+        
+        matches = index.query("欧盟正式通过人工智能法案 对高风险系统提出严格要求")
+        assert [key for key, _ in matches] == ["a"]
+        assert index.find_duplicate("谷歌推出新的搜索功能") is None
+        assert not index.add_if_unique("c", "苹果发布新款MacBook Pro，搭载M4芯片")
+        assert index.add_if_unique("d", "特斯拉第三季度交付量创新高")
+        assert len(index) == 3
+    
+    def test_document_deduplicator(self):
+        """测试URL和标题近似去重，支持字典"""
+        deduplicator = DocumentDeduplicator()
+        assert deduplicator.add({'url': 'https://a.com/1', 'title': '英伟达发布新一代AI芯片'})
+        assert not deduplicator.add({'url': 'https://a.com/1', 'title': '完全不同的标题'})
+        assert not deduplicator.add({'url': 'https://b.com/9', 'title': '英伟达发布新一代AI芯片'})
+        assert deduplicator.add({'url': '', 'title': '特斯拉第三季度交付量创新高'})
+
+
 @pytest.mark.integration
 class TestMCPIntegration:
     """集成测试"""
@@ -5,15 +5,19 @@
 """
 
 import json
+import uuid
 import asyncio
-from typing import Dict, Any, AsyncGenerator
+import threading
+from contextlib import aclosing
+from typing import Dict, Any, AsyncGenerator, Optional
 from datetime import datetime
 
 from main import (
     analysis_mcp, query_generation_mcp, outline_writer_mcp, 
     summary_writer_mcp, content_writer_mcp, search,
-    orchestrator_mcp, llm_processor
+    orchestrator_mcp, orchestrator_mcp_events
 )
+from collectors.usage_ledger import usage_ledger, usage_context
 
 class StreamingOrchestrator:
     """支持实时SSE推送的MCP调度器 - 基于MCP工具的纯净实现"""
@@ -56,10 +60,45 @@ class StreamingOrchestrator:
             })
             yield error_message
 
+    @staticmethod
+    def _run_in_usage_context(context_id: str, func, **kwargs):
+        """在指定用量上下文中执行同步工具，使其内部所有LLM调用都计入该上下文"""
+        with usage_context(context_id):
+            return func(**kwargs)
+
+    def _pop_ledger_usage(self, context_id: str) -> Optional[Dict[str, Any]]:
+        """从用量账本取出本次请求的汇总，没有记录到调用时返回None"""
+        summary = usage_ledger.pop(context_id)
+        if not summary["calls"]:
+            return None
+        models = summary["models"]
+        return {
+            "model_provider": models[0]["provider"] if len(models) == 1 else "mixed",
+            "model_name": ", ".join(m["model"] for m in models),
+            "input_tokens": summary["input_tokens"],
+            "output_tokens": summary["output_tokens"],
+            "total_tokens": summary["total_tokens"],
+            "calls": summary["calls"],
+            "latency": round(summary["latency"], 3),
+            "stages": {
+                name: {
+                    "calls": stage["calls"],
+                    "input_tokens": stage["input_tokens"],
+                    "output_tokens": stage["output_tokens"],
+                    "total_tokens": stage["total_tokens"],
+                    "latency": round(stage["latency"], 3),
+                    "avg_latency": round(stage["avg_latency"], 3),
+                }
+                for name, stage in summary["stages"].items()
+            },
+        }
+
     async def _call_content_writer_with_usage(self, **kwargs):
         """调用content_writer_mcp并返回内容和用量信息"""
+        context_id = uuid.uuid4().hex
         try:
-            result = await asyncio.to_thread(content_writer_mcp, **kwargs)
+            result = await asyncio.to_thread(self._run_in_usage_context, context_id, content_writer_mcp, **kwargs)
+            ledger_usage = self._pop_ledger_usage(context_id)
             print(f"🔍 [调试] content_writer_mcp返回结果: {str(result)[:200]}...")
             
             try:
@@ -74,7 +113,7 @@ class StreamingOrchestrator:
                     result_data = {"report_content": result, "status": "completed"}
                 
                 content = result_data.get('content', result)  # 提取纯文本内容
-                usage = result_data.get('usage', None)
+                usage = ledger_usage or result_data.get('usage', None)
                 print(f"🔍 [调试] 解析JSON成功，提取到{len(content)}字符的内容，usage: {usage}")
                 
                 # 格式化内容
@@ -87,20 +126,59 @@ class StreamingOrchestrator:
             except (json.JSONDecodeError, TypeError) as json_error:
                 print(f"⚠️ [调试] JSON解析失败: {json_error}，使用fallback方式")
                 # 如果JSON解析失败，直接返回原始结果
-                usage = None
-                if hasattr(llm_processor, 'last_usage') and llm_processor.last_usage:
-                    usage = llm_processor.last_usage
-                    print(f"🔍 [调试] 从llm_processor获取到的usage: {usage}")
+                usage = ledger_usage
+                print(f"🔍 [调试] 从用量账本获取到的usage: {usage}")
                 return result, usage
         except Exception as e:
+            usage_ledger.pop(context_id)
             print(f"❌ [调试] content_writer_mcp调用失败: {str(e)}")
             raise e
 
     # 删除了无用的委托方法，直接使用 stream_insight_report 等核心方法
 
+    async def _iterate_events_in_thread(self, context_id: str, event_source, **kwargs) -> AsyncGenerator[Dict[str, Any], None]:
+        """在工作线程中迭代同步事件生成器，事件一产生就转交给事件循环推送"""
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        finished = object()
+        cancelled = threading.Event()
+
+        def worker():
+            try:
+                with usage_context(context_id):
+                    events = event_source(**kwargs)
+                    try:
+                        for event in events:
+                            loop.call_soon_threadsafe(queue.put_nowait, event)
+                            if cancelled.is_set():
+                                break
+                    finally:
+                        events.close()
+            except Exception as e:
+                loop.call_soon_threadsafe(queue.put_nowait, {"event": "error", "error": str(e)})
+            finally:
+                if cancelled.is_set():
+                    # 客户端已断开，没有人再读取本次请求的用量，断开后记录的用量一并丢弃
+                    usage_ledger.pop(context_id)
+                loop.call_soon_threadsafe(queue.put_nowait, finished)
+
+        worker_task = asyncio.ensure_future(asyncio.to_thread(worker))
+        try:
+            while True:
+                event = await queue.get()
+                if event is finished:
+                    break
+                yield event
+            await worker_task
+        finally:
+            # 客户端断开时通知工作线程在下一个事件后停止
+            cancelled.set()
+
     async def stream_insight_report(self, **kwargs) -> AsyncGenerator[Dict[str, Any], None]:
-        """流式生成报告 - 根据类型选择不同的处理流程"""
+        """流式生成报告 - 随orchestrator_mcp的实际进度推送阶段、大纲和章节内容"""
         self.tool_name = "orchestrator_mcp"
+        # 每次请求使用独立的用量上下文，避免并发请求之间的用量互相覆盖
+        context_id = kwargs.pop("task_id", None) or uuid.uuid4().hex
         
         try:
             topic = kwargs.get("topic", "未指定主题")
@@ -120,52 +198,50 @@ class StreamingOrchestrator:
             
             # 发送开始消息
             yield self._create_progress_message("started", f"开始生成{report_name}", f"正在初始化{report_name}分析流程...")
-            await asyncio.sleep(0.1)
             
-            # 学术报告使用专门的处理流程，不走大纲生成
-            if task_type == "academic":
-                # 学术报告专门流程
-                yield self._create_progress_message("processing", "分析学术研究需求", f"正在分析{topic}的学术研究需求...")
-                await asyncio.sleep(0.1)
-                
-                yield self._create_progress_message("processing", "生成学术搜索关键词", f"正在为{topic}生成学术搜索关键词...")
-                await asyncio.sleep(0.1)
-                
-                yield self._create_progress_message("processing", "执行学术文献搜索", f"正在搜索{topic}相关的学术文献...")
-                await asyncio.sleep(0.1)
-                
-                yield self._create_progress_message("processing", "分析研究数据", f"正在分析和组织{topic}的研究数据...")
-                await asyncio.sleep(0.1)
-                
-                yield self._create_progress_message("processing", "论文分析与分类", f"正在对收集的25-30篇论文进行深入分析和分类...")
-                await asyncio.sleep(0.1)
-                
-                yield self._create_progress_message("processing", "生成学术研究报告", f"正在生成包含详细论文分析的{topic}学术研究报告...")
-                await asyncio.sleep(0.1)
-            else:
-                # 其他报告类型的常规流程
-                yield self._create_progress_message("processing", "分析主题需求", f"正在分析{topic}的{task_type}需求...")
-                await asyncio.sleep(0.1)
-                
-                yield self._create_progress_message("processing", "生成报告大纲", f"正在为{topic}生成详细的报告结构...")
-                await asyncio.sleep(0.1)
-                
-                yield self._create_progress_message("processing", "生成报告内容", f"正在基于大纲生成详细的{report_name}内容...")
-                await asyncio.sleep(0.1)
-            
-            # 清空上次用量，确保获取本次真实用量
-            if hasattr(llm_processor, 'last_usage'):
-                llm_processor.last_usage = None
-            
-            # 调用orchestrator_mcp生成报告
-            result = await asyncio.to_thread(
-                orchestrator_mcp,
+            # 逐个转发orchestrator_mcp产生的事件，期间的LLM调用都计入本次请求的用量上下文
+            result = None
+            step = 0
+            events = self._iterate_events_in_thread(
+                context_id,
+                orchestrator_mcp_events,
                 task=task,
                 task_type=task_type,
                 topic=topic,
                 depth_level=depth_level,
                 target_audience=target_audience
             )
+            async with aclosing(events):
+                async for event in events:
+                    event_type = event.get("event")
+                    if event_type == "stage":
+                        step += 1
+                        yield self._create_progress_message("processing", event["message"], "", details={
+                            "stage": event["stage"],
+                            "step": step,
+                            "content": f"正在{event['message']}..."
+                        })
+                    elif event_type == "run":
+                        # 客户端凭run_id调用resume_orchestrator_mcp从中断处继续
+                        yield self._create_content_message("run", {"run_id": event["run_id"]})
+                    elif event_type == "outline":
+                        yield self._create_content_message("outline", {
+                            "content": event["outline"],
+                            "sections": event["sections"]
+                        })
+                    elif event_type == "summary":
+                        yield self._create_content_message("executive_summary", {"content": event["content"]})
+                    elif event_type == "section":
+                        yield self._create_content_message("section", {
+                            "index": event["index"],
+                            "total": event["total"],
+                            "title": event["title"],
+                            "content": event["content"]
+                        })
+                    elif event_type == "result":
+                        result = event["result"]
+                    elif event_type == "error":
+                        raise RuntimeError(event["error"])
             
             # 处理返回结果 - orchestrator_mcp返回的是字符串，不是JSON
             if isinstance(result, str) and result.startswith('{'):
@@ -176,11 +252,12 @@ class StreamingOrchestrator:
             else:
                 result_data = {"report_content": result, "status": "completed"}
             
-            # 从result_data中提取usage信息并发送模型用量消息
-            if result_data and 'usage' in result_data:
-                usage_info = result_data['usage']
+            # 优先使用用量账本中本次请求的汇总（含各阶段明细），否则退回result_data中的usage
+            usage_info = self._pop_ledger_usage(context_id)
+            if usage_info is None and result_data:
+                usage_info = result_data.get('usage')
+            if usage_info:
                 yield self._create_model_usage_message(usage_data=usage_info)
-                await asyncio.sleep(0.1)
             
             # 检查是否有报告内容 - 处理不同报告类型的字段名
             report_content = None
@@ -199,7 +276,6 @@ class StreamingOrchestrator:
                 completion_message = f"{report_name}生成完成"
                 completion_detail = f"成功生成{report_name}"
                 yield self._create_progress_message("completed", completion_message, completion_detail)
-                await asyncio.sleep(0.1)
                 
                 # 发送最终结果
                 final_result = {
@@ -210,12 +286,6 @@ class StreamingOrchestrator:
                     }
                 }
                 
-                # 发送用量信息
-                if result_data and 'usage' in result_data:
-                    yield self._create_model_usage_message(usage_data=result_data['usage'])
-                elif hasattr(llm_processor, 'last_usage') and llm_processor.last_usage:
-                    yield self._create_model_usage_message(usage_data=llm_processor.last_usage)
-                
                 yield final_result
             else:
                 # 处理失败情况
@@ -225,6 +295,9 @@ class StreamingOrchestrator:
         except Exception as e:
             print(f"❌ 洞察报告生成过程中发生错误: {str(e)}")
             yield self._create_error_message(f"洞察报告生成过程中发生错误: {str(e)}")
+        finally:
+            # 出错或客户端断开时本次请求的用量不再推送，从账本中移除
+            usage_ledger.pop(context_id)
 
     def _create_progress_message(self, status: str, message: str, content: str, details: Dict = None) -> Dict[str, Any]:
         """创建符合MCP标准的进度消息"""
@@ -254,6 +327,23 @@ class StreamingOrchestrator:
             "jsonrpc": "2.0"
         }
 
+    def _create_content_message(self, content_type: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """创建符合MCP标准的内容推送消息（大纲、执行摘要、章节等阶段性产出）"""
+        return {
+            "jsonrpc": "2.0",
+            "method": "notifications/message",
+            "params": {
+                "level": "info",
+                "data": {
+                    "msg": {
+                        "type": content_type,
+                        "data": data
+                    },
+                    "extra": None
+                }
+            }
+        }
+
     def _create_model_usage_message(self, provider: str = None, model: str = None, input_tokens: int = None, output_tokens: int = None, total_tokens: int = None, usage_data: dict = None) -> Dict[str, Any]:
         """创建符合MCP标准的模型用量消息"""
         if usage_data:
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+测试main.py冷启动：用 python -X importtime 测量导入耗时并与预算比较，
+同时检查导入时没有加载搜索、LLM和流式处理等后端组件（首次使用时才初始化）
+
+用法:
+    python tests/api/test_import_time.py
+    MAIN_IMPORT_TIME_BUDGET_MS=2000 python -m pytest -q tests/api/test_import_time.py
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ROOT)
+
+import config
+
+# 这些模块只应在后端组件初始化或首次使用时导入（uvicorn由FastMCP导入，不在此列）
+LAZY_MODULES = [
+    "search_mcp.generators",
+    "collectors.llm_processor",
+    "collectors.arxiv_collector",
+    "collectors.news_collector",
+    "collectors.evidence_ranker",
+    "streaming_orchestrator",
+    "numpy",
+]
+
+
+def measure_import(module: str = "main") -> dict:
+    """在子进程中导入模块，返回 {模块名: 累计耗时(微秒)}"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, encoding="utf-8", timeout=120,
+    )
+    assert result.returncode == 0, f"导入{module}失败:\n{result.stderr[-2000:]}"
+
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue  # 表头
+        timings[fields[2].strip()] = int(fields[1])
+    return timings
+
+
+def test_main_import_within_budget():
+    timings = measure_import("main")
+    elapsed_ms = timings["main"] / 1000
+    budget_ms = config.MAIN_IMPORT_TIME_BUDGET_MS
+    slowest = sorted(timings.items(), key=lambda item: item[1], reverse=True)[:10]
+    print(f"⏱️ 导入main.py耗时 {elapsed_ms:.0f}ms（预算 {budget_ms}ms）")
+    assert elapsed_ms <= budget_ms, (
+        f"导入main.py耗时{elapsed_ms:.0f}ms，超出预算{budget_ms}ms，最慢的模块: "
+        f"{json.dumps(slowest, ensure_ascii=False)}"
+    )
+
+    loaded = [name for name in LAZY_MODULES if name in timings]
+    assert not loaded, f"导入main.py时不应加载后端组件: {loaded}"
+
+
+def test_backends_initialize_on_first_use():
+    import main
+    from collectors.service_registry import registry
+
+    class FakeOrchestrator:
+        def parallel_search(self, queries, **kwargs):
+            return [{"title": f"{queries[0]} 结果", "url": "https://a.example", "content": "内容"}]
+
+    registry.set("search_orchestrator", FakeOrchestrator())
+    try:
+        assert main.search_available
+        response = json.loads(main._search_sync("人工智能", max_results=3))
+        assert response["status"] == "success"
+        assert response["results"][0]["title"] == "人工智能 结果"
+    finally:
+        registry.reset("search_orchestrator")
+    assert not registry.is_initialized("search_orchestrator")
+
+
+def test_streaming_service_resolves_when_run_as_script():
+    # 以脚本方式运行时main.py不叫main，流式处理器的 `from main import ...` 会再执行一次main.py；
+    # 用 __mp_main__（multiprocessing子进程重跑主脚本时的模块名）执行，跳过启动服务器的 __main__ 分支
+    script = (
+        "import runpy\n"
+        "module = runpy.run_path('main.py', run_name='__mp_main__')\n"
+        "assert module['_get_streaming_orchestrator']() is not None\n"
+        "from collectors.service_registry import registry\n"
+        "assert registry.is_initialized('streaming_orchestrator')\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=ROOT, capture_output=True, text=True, encoding="utf-8", timeout=120,
+    )
+    output = result.stdout + result.stderr
+    assert result.returncode == 0, f"流式处理器未能初始化:\n{output[-2000:]}"
+    assert "服务已登记" not in output
+
+
+if __name__ == "__main__":
+    test_main_import_within_budget()
+    test_backends_initialize_on_first_use()
+    test_streaming_service_resolves_when_run_as_script()
+    print("✅ main.py冷启动测试通过")
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+测试报告任务存储与工作进程：准入控制、分页列表、心跳超时重新排队、工作进程领取执行
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import report_worker
+from job_store import COMPLETED, FAILED, PENDING, RUNNING, QueueFullError, SQLiteJobStore
+
+
+def _store(tmp, **kwargs):
+    return SQLiteJobStore(os.path.join(tmp, "data", "report_jobs.db"), **kwargs)
+
+
+def test_admission_control():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = _store(tmp, max_queue_depth=3, max_concurrent=1)
+        jobs = [store.create({"topic": f"主题{i}"}) for i in range(3)]
+        try:
+            store.create({"topic": "超出队列"})
+            assert False, "队列已满时应拒绝新任务"
+        except QueueFullError:
+            pass
+
+        # 按创建顺序领取，达到并发上限后不再领取
+        claimed = store.claim_next("worker-a")
+        assert claimed["task_id"] == jobs[0]["task_id"] and claimed["status"] == RUNNING
+        assert claimed["request_data"] == {"topic": "主题0"} and claimed["attempts"] == 1
+        assert store.claim_next("worker-b") is None
+
+        # 有空位后可以继续排队和领取
+        store.create({"topic": "主题3"})
+        store.update(claimed["task_id"], COMPLETED, "✅ 报告生成完成", {"filename": "a.md"})
+        assert store.get(claimed["task_id"])["result"] == {"filename": "a.md"}
+        assert store.claim_next("worker-b")["task_id"] == jobs[1]["task_id"]
+
+
+def test_listing_and_counts():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = _store(tmp, max_queue_depth=0)
+        ids = [store.create({"topic": str(i)})["task_id"] for i in range(5)]
+        store.update(ids[0], FAILED, "❌ 报告生成失败", error="boom")
+
+        page = store.list(limit=2, offset=1)
+        assert [job["task_id"] for job in page] == [ids[3], ids[2]]
+        assert [job["task_id"] for job in store.list(status=FAILED)] == [ids[0]]
+        assert store.count() == 5 and store.count(PENDING) == 4
+        assert store.counts_by_status() == {PENDING: 4, RUNNING: 0, COMPLETED: 0, FAILED: 1}
+
+        assert store.delete(ids[1]) and store.get(ids[1]) is None
+
+
+def test_requeue_stale_jobs():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = _store(tmp, stale_timeout=0.05, max_attempts=2, max_concurrent=0)
+        task_id = store.create({"topic": "重启恢复"})["task_id"]
+
+        store.claim_next("crashed-worker")
+        time.sleep(0.1)
+        assert store.requeue_stale() == {"requeued": 1, "failed": 0}
+        assert store.get(task_id)["status"] == PENDING
+
+        # 第二次执行仍中断，超过重试次数后标记失败
+        assert store.claim_next("another-worker")["attempts"] == 2
+        time.sleep(0.1)
+        assert store.requeue_stale() == {"requeued": 0, "failed": 1}
+        assert store.get(task_id)["status"] == FAILED
+
+
+def test_requeued_job_rejects_previous_owner():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = _store(tmp, stale_timeout=0.05, max_attempts=3, max_concurrent=0)
+        task_id = store.create({"topic": "重新分配"})["task_id"]
+
+        store.claim_next("slow-worker")
+        time.sleep(0.1)
+        store.requeue_stale()
+        store.claim_next("new-worker")
+
+        # 原工作进程的心跳、进度和结果都不能再写入
+        assert not store.heartbeat(task_id, "slow-worker")
+        assert not store.progress(task_id, "旧进度", "slow-worker")
+        assert not store.update(task_id, FAILED, "❌ 报告生成失败", error="超时", worker_id="slow-worker")
+        job = store.get(task_id)
+        assert job["status"] == RUNNING and job["worker_id"] == "new-worker" and job["error"] is None
+
+        assert store.update(task_id, COMPLETED, "✅ 报告生成完成", {"filename": "x.md"}, worker_id="new-worker")
+        assert store.get(task_id)["status"] == COMPLETED
+        # 已完成的任务不再接受工作进程的更新
+        assert not store.update(task_id, FAILED, "❌ 报告生成失败", worker_id="new-worker")
+
+
+def test_worker_loop_runs_job():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = _store(tmp)
+        task_id = store.create({"topic": "工作进程"})["task_id"]
+        calls = []
+
+        def fake_generate(store, task_id, request_data, worker_id=None):
+            calls.append(request_data["topic"])
+            assert store.update(task_id, COMPLETED, "✅ 报告生成完成", {"filename": "x.md"}, worker_id=worker_id)
+
+        original = report_worker.generate_report
+        report_worker.generate_report = fake_generate
+        try:
+            report_worker.worker_loop(store=store, max_jobs=1)
+        finally:
+            report_worker.generate_report = original
+
+        assert calls == ["工作进程"]
+        assert store.get(task_id)["status"] == COMPLETED
+
+
+if __name__ == "__main__":
+    test_admission_control()
+    test_listing_and_counts()
+    test_requeue_stale_jobs()
+    test_requeued_job_rejects_previous_owner()
+    test_worker_loop_runs_job()
+    print("✅ 报告任务存储测试通过")
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+测试质量评估：一次调用评分五个维度的JSON解析与截断、缺失维度退回逐维度评估、
+按采样资料缓存评分（轮次和总数变化不影响命中），以及增量评估迭代的跨轮去重、
+按资料数量加权的累计评分和评分提升过小时提前停止
+"""
+
+import io
+import json
+import os
+import re
+import sys
+import threading
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import main
+from collectors.service_registry import registry
+
+
+class StubLLMProcessor:
+    """批量评分请求返回指定的响应，逐维度请求返回固定评分"""
+
+    def __init__(self, batched_response):
+        self.batched_response = batched_response
+        self.prompts = []
+        self.lock = threading.Lock()
+
+    def call_llm_api(self, prompt, system_message=None, temperature=0.7, max_tokens=8192, **kwargs):
+        with self.lock:
+            self.prompts.append(prompt)
+        if "5个维度" in prompt:
+            return self.batched_response
+        return "6.5分"
+
+    @property
+    def batched_calls(self):
+        return sum("5个维度" in prompt for prompt in self.prompts)
+
+
+class stub_llm:
+    """把注册表中的LLM处理器替换为假对象，并清空评分缓存"""
+
+    def __init__(self, batched_response):
+        self.llm = StubLLMProcessor(batched_response)
+
+    def __enter__(self):
+        main._evaluation_score_cache.clear()
+        registry.set("llm_processor", self.llm)
+        return self.llm
+
+    def __exit__(self, *exc):
+        registry.reset("llm_processor")
+        main._evaluation_score_cache.clear()
+
+
+CONTENT = "人工智能市场规模持续增长。\n多家机构发布了新模型。\n监管政策逐步完善。"
+
+
+def test_batched_scores_are_parsed_and_clamped():
+    response = '评分如下：{"completeness": 8.2, "accuracy": 15, "depth": -3, "relevance": "7.5", "clarity": 6}'
+    with stub_llm(response) as llm:
+        scores, mode = main._score_evaluation_dimensions(CONTENT, "人工智能")
+
+    assert mode == "batched" and llm.batched_calls == 1 and len(llm.prompts) == 1
+    assert scores == {"completeness": 8.2, "accuracy": 10.0, "depth": 0.0, "relevance": 7.5, "clarity": 6.0}
+
+
+def test_missing_dimensions_fall_back_to_single_evaluators():
+    response = '{"completeness": 8.0, "accuracy": 7.0, "relevance": 9.0, "clarity": "清晰"}'
+    fallback_calls = []
+    originals = (main._evaluate_depth, main._evaluate_clarity)
+    main._evaluate_depth = lambda content, topic: fallback_calls.append("depth") or 4.0
+    main._evaluate_clarity = lambda content: fallback_calls.append("clarity") or 5.0
+    try:
+        with stub_llm(response):
+            scores, mode = main._score_evaluation_dimensions(CONTENT, "人工智能")
+    finally:
+        main._evaluate_depth, main._evaluate_clarity = originals
+
+    assert mode == "batched_partial"
+    assert sorted(fallback_calls) == ["clarity", "depth"]
+    assert scores == {"completeness": 8.0, "accuracy": 7.0, "depth": 4.0, "relevance": 9.0, "clarity": 5.0}
+
+    # 没有返回JSON时全部维度逐个评估，完整性和相关性仍通过LLM评分
+    with stub_llm("无法评估") as llm:
+        assert main._evaluate_dimensions_batched(CONTENT, "人工智能") == {}
+        scores, mode = main._score_evaluation_dimensions(CONTENT, "人工智能")
+    assert mode == "per_dimension"
+    assert scores["completeness"] == 6.5 and scores["relevance"] == 6.5
+    assert llm.batched_calls == 2 and len(llm.prompts) == 4
+
+
+def test_unchanged_sample_hits_memo_across_iterations():
+    response = '{"completeness": 8.0, "accuracy": 8.0, "depth": 8.0, "relevance": 8.0, "clarity": 8.0}'
+    items = [{"title": f"资料{i}", "content": f"人工智能  进展{i}\n", "url": f"https://a.example/{i}"} for i in range(5)]
+    with stub_llm(response) as llm:
+        first = main._evaluate_new_results("人工智能", items, iteration=1, total_count=5)
+        # 轮次、资料总数不同，空白不同，采样资料相同
+        reformatted = [{**item, "content": item["content"].replace("  ", " ")} for item in items]
+        second = main._evaluate_new_results("人工智能", reformatted, iteration=2, total_count=12)
+        assert llm.batched_calls == 1
+        assert first == second
+
+        # 采样资料变化后重新评分
+        main._evaluate_new_results("人工智能", items[:4], iteration=3, total_count=12)
+        assert llm.batched_calls == 2
+
+
+class QualityLoopStubs:
+    """替换质量迭代依赖的评估、查询生成和批量搜索，按轮次返回预设的评分和补充结果"""
+
+    def __init__(self, round_scores, supplementary_rounds):
+        self.round_scores = list(round_scores)
+        self.supplementary_rounds = list(supplementary_rounds)
+        self.evaluated_titles = []
+        self.search_calls = 0
+
+    def analysis_mcp(self, analysis_type, data, topic="", context="", **kwargs):
+        self.evaluated_titles.append(re.findall(r'资料\d+: (\S+)', data))
+        score = self.round_scores[len(self.evaluated_titles) - 1]
+        dimensions = {name: {"score": score} for name in main.EVALUATION_DIMENSIONS}
+        return json.dumps({"status": "success", "evaluation": {"dimensions": dimensions}}, ensure_ascii=False)
+
+    def batch_search(self, queries, max_results=5, **kwargs):
+        results = self.supplementary_rounds[self.search_calls]
+        self.search_calls += 1
+        return json.dumps({"status": "success", "results": results, "per_query": {}}, ensure_ascii=False)
+
+    def run(self, initial_results, **kwargs):
+        names = ("analysis_mcp", "_batch_search_sync", "_generate_quality_evaluation_queries")
+        originals = {name: getattr(main, name) for name in names}
+        main.analysis_mcp = self.analysis_mcp
+        main._batch_search_sync = self.batch_search
+        main._generate_quality_evaluation_queries = lambda topic, weak_areas: ["补充查询"]
+        output = io.StringIO()
+        try:
+            with redirect_stdout(output):
+                results = main._quality_evaluation_iteration("人工智能", initial_results, **kwargs)
+        finally:
+            for name, value in originals.items():
+                setattr(main, name, value)
+        return results, output.getvalue()
+
+
+def make_result(name, url=None):
+    return {"title": name, "content": f"{name}的内容", "url": url if url is not None else f"https://a.example/{name}"}
+
+
+def test_quality_loop_dedups_across_rounds_and_weights_by_count():
+    initial = [make_result("甲"), make_result("乙"), make_result("甲", "https://A.example/甲/"), make_result("丙")]
+    # 第2轮补充结果中甲、丙已评估过，只有丁是新增
+    stubs = QualityLoopStubs([5.0, 9.0], [[make_result("甲"), make_result("丙"), make_result("丁")], []])
+
+    results, output = stubs.run(initial, max_iterations=2, min_score_gain=0.0)
+
+    assert [item["title"] for item in results] == ["甲", "乙", "丙", "丁"]
+    assert stubs.evaluated_titles == [["甲", "乙", "丙"], ["丁"]]
+    # 累计评分按资料数量加权：(5.0*3 + 9.0*1) / 4 = 6.0
+    assert "第1轮累计评分: 5.0/10.0" in output
+    assert "第2轮累计评分: 6.0/10.0" in output
+
+
+def test_quality_loop_stops_when_score_gain_is_small():
+    initial = [make_result(name) for name in ("甲", "乙", "丙")]
+    supplementary = [[make_result(name) for name in ("丁", "戊", "己")], [make_result("庚")]]
+    stubs = QualityLoopStubs([5.0, 5.3, 9.0], supplementary)
+
+    results, output = stubs.run(initial, max_iterations=5, min_score_gain=0.3)
+
+    # 第2轮累计评分5.15，只比第1轮提升0.15，不再进行第二次补充搜索
+    assert len(stubs.evaluated_titles) == 2 and stubs.search_calls == 1
+    assert len(results) == 6
+    assert "低于阈值 0.3" in output
+
+
+if __name__ == "__main__":
+    test_batched_scores_are_parsed_and_clamped()
+    test_missing_dimensions_fall_back_to_single_evaluators()
+    test_unchanged_sample_hits_memo_across_iterations()
+    test_quality_loop_dedups_across_rounds_and_weights_by_count()
+    test_quality_loop_stops_when_score_gain_is_small()
+    print("✅ 质量评估测试通过")
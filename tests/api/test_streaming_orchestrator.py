@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+测试流式编排：orchestrator_mcp_events 经工作线程转成SSE消息的顺序、章节按大纲顺序输出、
+run/result/error事件的映射、客户端断开后用量账本的清理、编排结束后恢复调用方的用量阶段，
+以及使用备用内容的章节在恢复运行时重写
+"""
+
+import asyncio
+import contextvars
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ROOT)
+
+import config
+import main
+from collectors.run_journal import RunJournal
+import streaming_orchestrator
+from collectors.usage_ledger import get_current_stage, set_stage, usage_ledger
+from streaming_orchestrator import StreamingOrchestrator
+
+SECTIONS = ["技术发展", "市场格局", "未来趋势"]
+# 越靠前的章节写得越慢，完成顺序与大纲顺序相反
+SECTION_DELAYS = {"技术发展": 0.3, "市场格局": 0.15, "未来趋势": 0.0}
+
+
+def _intent(**kwargs):
+    return json.dumps({"details": {"primary_intent": "洞察"}}, ensure_ascii=False)
+
+
+def _outline(**kwargs):
+    return json.dumps({"content": "# 大纲"}, ensure_ascii=False)
+
+
+def _queries(**kwargs):
+    return json.dumps({"queries": ["人工智能 市场"]}, ensure_ascii=False)
+
+
+def _summary(**kwargs):
+    usage_ledger.record("stub", "stub-model", 10, 5, 15)
+    return json.dumps({"summary": "执行摘要"}, ensure_ascii=False)
+
+
+def _write_section(section_title, *args):
+    time.sleep(SECTION_DELAYS[section_title])
+    usage_ledger.record("stub", "stub-model", 10, 5, 15)
+    return f"## {section_title}\n内容", None
+
+
+def _assemble(**kwargs):
+    report = "\n".join(kwargs["section_contents"][title] for title in kwargs["sections"])
+    return json.dumps({"status": "success", "report": report}, ensure_ascii=False)
+
+
+STUB_STAGES = {
+    "analysis_mcp": _intent,
+    "outline_writer_mcp": _outline,
+    "_parse_outline_sections": lambda content: (list(SECTIONS), {}),
+    "query_generation_mcp": _queries,
+    "_collect_orchestrated_search": lambda queries, report_type: [{"title": "结果", "content": "内容", "url": "https://a.example"}],
+    "_quality_evaluation_iteration": lambda **kwargs: kwargs["initial_search_results"],
+    "summary_writer_mcp": _summary,
+    "_select_sections_data": lambda titles, results: [results for _ in titles],
+    "_write_orchestrated_section": _write_section,
+    "_assemble_orchestrated_report": _assemble,
+}
+
+
+@contextmanager
+def patched(module, **attrs):
+    originals = {name: getattr(module, name) for name in attrs}
+    for name, value in attrs.items():
+        setattr(module, name, value)
+    try:
+        yield
+    finally:
+        for name, value in originals.items():
+            setattr(module, name, value)
+
+
+@contextmanager
+def stubbed_pipeline(**overrides):
+    with tempfile.TemporaryDirectory() as tmp:
+        with patched(main, **{**STUB_STAGES, **overrides}), patched(config, RUN_JOURNAL_DIR=tmp):
+            yield
+
+
+def _message_type(message):
+    if "error" in message:
+        return "error"
+    if "result" in message:
+        return "result"
+    msg = message["params"]["data"]["msg"]
+    return msg.get("type") or msg["status"]
+
+
+async def _collect(context_id, stop_after=None):
+    messages = []
+    stream = StreamingOrchestrator().stream_insight_report(topic="人工智能", task_type="insights", task_id=context_id)
+    try:
+        async for message in stream:
+            messages.append(message)
+            if stop_after and _message_type(message) == stop_after:
+                break
+    finally:
+        await stream.aclose()
+    return messages
+
+
+def test_events_stream_in_pipeline_order():
+    with stubbed_pipeline():
+        messages = asyncio.run(_collect("stream-order"))
+
+    types = [_message_type(message) for message in messages]
+    assert types[:3] == ["started", "run", "processing"]
+    assert types[-3:] == ["model_usage", "completed", "result"]
+
+    content_types = [t for t in types if t in ("outline", "executive_summary", "section")]
+    assert content_types == ["outline", "executive_summary", "section", "section", "section"]
+    stages = [m["params"]["data"]["msg"]["details"]["stage"] for m, t in zip(messages, types) if t == "processing"]
+    assert stages == ["intent", "outline", "queries", "search", "quality", "summary", "sections", "assembly"]
+
+    # 章节完成顺序与大纲相反，推送时仍按大纲顺序
+    sections = [m["params"]["data"]["msg"]["data"] for m, t in zip(messages, types) if t == "section"]
+    assert [section["title"] for section in sections] == SECTIONS
+    assert [section["index"] for section in sections] == [0, 1, 2]
+
+    run_id = messages[1]["params"]["data"]["msg"]["data"]["run_id"]
+    assert run_id
+    usage = messages[types.index("model_usage")]["params"]["data"]["msg"]["data"]
+    assert usage["calls"] == 4 and usage["stages"]["sections"]["calls"] == 3
+    assert messages[-1]["result"]["content"].startswith("## 技术发展")
+    assert usage_ledger.get_summary("stream-order")["calls"] == 0
+
+
+def test_failures_map_to_error_messages():
+    def broken_outline(**kwargs):
+        raise RuntimeError("大纲服务不可用")
+
+    # 编排内部的异常以result事件返回，其中带有可用于恢复的run_id
+    with stubbed_pipeline(outline_writer_mcp=broken_outline):
+        messages = asyncio.run(_collect("stream-failed-result"))
+    assert _message_type(messages[-1]) == "error"
+    assert "大纲服务不可用" in messages[-1]["error"]["data"]["message"]
+
+    # 事件源本身抛出的异常以error事件返回
+    def broken_events(**kwargs):
+        yield {"event": "stage", "stage": "intent", "message": "分析用户意图"}
+        raise RuntimeError("工作线程异常")
+
+    with patched(streaming_orchestrator, orchestrator_mcp_events=broken_events):
+        messages = asyncio.run(_collect("stream-error-event"))
+    assert [_message_type(message) for message in messages] == ["started", "processing", "error"]
+    assert "工作线程异常" in messages[-1]["error"]["data"]["message"]
+
+
+def test_disconnect_clears_usage_ledger():
+    closed = threading.Event()
+
+    def tracked_events(**kwargs):
+        try:
+            yield from main.orchestrator_mcp_events(**kwargs)
+        finally:
+            closed.set()
+
+    with stubbed_pipeline(), patched(streaming_orchestrator, orchestrator_mcp_events=tracked_events):
+        messages = asyncio.run(_collect("stream-disconnect", stop_after="executive_summary"))
+        assert closed.wait(5), "客户端断开后工作线程应停止"
+
+    assert _message_type(messages[-1]) == "executive_summary"
+    deadline = time.time() + 2
+    while usage_ledger.get_summary("stream-disconnect")["calls"] and time.time() < deadline:
+        time.sleep(0.01)
+    assert usage_ledger.get_summary("stream-disconnect")["calls"] == 0
+
+
+def test_stage_is_restored_after_run():
+    def run():
+        set_stage("caller")
+        main.orchestrator_mcp("分析人工智能", "industry", topic="人工智能")
+        return get_current_stage()
+
+    with stubbed_pipeline():
+        assert contextvars.copy_context().run(run) == "caller"
+
+
+class FlakyContentWriter:
+    """指定章节返回备用内容（LLM失败），其余章节正常生成"""
+
+    def __init__(self, failing_titles=()):
+        self.failing_titles = set(failing_titles)
+        self.calls = []
+
+    def __call__(self, section_title, content_data, overall_report_context, outline_structure=None, **kwargs):
+        self.calls.append(section_title)
+        if section_title in self.failing_titles:
+            return main._generate_fallback_content(section_title, content_data)
+        return json.dumps({"status": "success", "content": f"## {section_title}\n正式内容"}, ensure_ascii=False)
+
+
+def test_resume_rewrites_fallback_sections():
+    real_writer = main._write_orchestrated_section
+    flaky = FlakyContentWriter(failing_titles={"市场格局"})
+    with stubbed_pipeline(_write_orchestrated_section=real_writer, content_writer_mcp=flaky):
+        first = main.orchestrator_mcp("分析人工智能", "industry", topic="人工智能")
+        run_id = RunJournal.list_runs()[0]["run_id"]
+        assert "## 市场格局\n正式内容" not in json.loads(first)["report"]
+        assert sorted(RunJournal.load(run_id).load_sections(SECTIONS)) == [0, 2]
+
+        flaky.failing_titles.clear()
+        flaky.calls.clear()
+        resumed = main.resume_orchestrator_mcp(run_id)
+
+    # 只有上次使用备用内容的章节被重写
+    assert flaky.calls == ["市场格局"]
+    assert "## 市场格局\n正式内容" in json.loads(resumed)["report"]
+
+
+if __name__ == "__main__":
+    test_events_stream_in_pipeline_order()
+    test_failures_map_to_error_messages()
+    test_disconnect_clears_usage_ledger()
+    test_stage_is_restored_after_run()
+    test_resume_rewrites_fallback_sections()
+    print("✅ 流式编排测试通过")
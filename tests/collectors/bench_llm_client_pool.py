@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+LLMProcessor 连接池微基准测试
+
+在本地启动一个兼容 OpenAI chat/completions 接口的桩服务器，对比：
+1. 旧方式：每次调用都新建 OpenAI 客户端（每次都重新建立连接）
+2. 新方式：LLMProcessor 共享的连接池客户端（保持长连接）
+
+用法:
+    python tests/collectors/bench_llm_client_pool.py --calls 200 --threads 8
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from collectors.llm_processor import LLMProcessor
+
+
+class StubCompletionHandler(BaseHTTPRequestHandler):
+    """返回固定内容的chat/completions桩接口"""
+    protocol_version = "HTTP/1.1"  # 支持keep-alive
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        body = json.dumps({
+            "id": "stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": "stub-model",
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "ok"},
+                "finish_reason": "stop"
+            }],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 1, "total_tokens": 11}
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubCompletionHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+def call_with_fresh_client(base_url: str):
+    """旧实现：每次调用新建客户端"""
+    from openai import OpenAI
+    client = OpenAI(api_key="stub", base_url=base_url, timeout=60.0, max_retries=3)
+    client.chat.completions.create(
+        model="stub-model",
+        messages=[{"role": "user", "content": "ping"}],
+        temperature=0.3,
+        max_tokens=16
+    )
+
+
+def make_pooled_call(base_url: str):
+    """新实现：多个LLMProcessor实例共享连接池"""
+    def call():
+        processor = LLMProcessor(api_key="stub")
+        processor.base_url = base_url
+        processor.call_llm_api("ping", max_tokens=16)
+    return call
+
+
+def run_benchmark(name: str, func, calls: int, threads: int) -> dict:
+    latencies = []
+    lock = threading.Lock()
+
+    def timed():
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed * 1000)
+
+    # 预热
+    func()
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        for future in [executor.submit(timed) for _ in range(calls)]:
+            future.result()
+    wall = time.perf_counter() - wall_start
+
+    latencies.sort()
+    return {
+        "name": name,
+        "calls": calls,
+        "mean_ms": statistics.mean(latencies),
+        "p50_ms": latencies[len(latencies) // 2],
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1],
+        "throughput": calls / wall,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LLMProcessor连接池微基准测试")
+    parser.add_argument("--calls", type=int, default=200, help="每种方式的调用次数")
+    parser.add_argument("--threads", type=int, default=8, help="并发线程数")
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server()
+    print(f"桩服务器地址: {base_url}")
+
+    try:
+        results = [
+            run_benchmark("每次新建客户端", lambda: call_with_fresh_client(base_url), args.calls, args.threads),
+            run_benchmark("共享连接池客户端", make_pooled_call(base_url), args.calls, args.threads),
+        ]
+    finally:
+        server.shutdown()
+        LLMProcessor.close_clients()
+
+    print(f"\n{'方式':<12} {'平均(ms)':>10} {'P50(ms)':>10} {'P95(ms)':>10} {'吞吐(次/秒)':>12}")
+    for r in results:
+        print(f"{r['name']:<12} {r['mean_ms']:>10.2f} {r['p50_ms']:>10.2f} {r['p95_ms']:>10.2f} {r['throughput']:>12.1f}")
+
+    speedup = results[0]["mean_ms"] / results[1]["mean_ms"] if results[1]["mean_ms"] else 0
+    print(f"\n平均单次调用延迟降低: {speedup:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
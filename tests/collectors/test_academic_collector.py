@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+测试AcademicCollector并发多来源获取：每个来源一个工作线程、按来源限速、DOI/URL增量去重、结果流式返回
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from collectors.academic_collector import AcademicCollector, PaperIndex
+from collectors.rate_limiter import RateLimiter
+
+
+def make_source(name, delay, calls):
+    def search(query, days_back=7):
+        calls.append((name, query))
+        time.sleep(delay)
+        return [
+            {'title': f"{name} {query}", 'url': f"https://{name}.example/{query}", 'doi': 'No DOI'},
+            {'title': 'shared', 'url': f"https://{name}.example/shared", 'doi': 'https://doi.org/10.1000/SHARED'},
+        ]
+    return search
+
+
+def make_collector(delays, calls):
+    collector = AcademicCollector.__new__(AcademicCollector)
+    collector.api_status = {}
+    collector.has_llm = False
+    collector._rate_limiters = {name: RateLimiter(0) for name in delays}
+    collector._rate_limiter_lock = threading.Lock()
+    collector._get_sources = lambda: [(name, make_source(name, delay, calls)) for name, delay in delays.items()]
+    return collector
+
+
+def test_paper_index_dedup():
+    index = PaperIndex()
+    assert index.add({'url': 'https://a.example/1/', 'doi': '10.1/ABC'})
+    assert not index.add({'url': 'https://b.example/2', 'doi': 'doi:10.1/abc'})
+    assert not index.add({'url': 'https://a.example/1', 'doi': 'No DOI'})
+    assert index.add({'url': '#', 'doi': '无DOI'})
+    assert index.add({'url': '#', 'doi': None})
+    assert len(index) == 3
+
+
+def test_concurrent_fetch_is_bounded_by_slowest_source():
+    delays = {'CORE': 0.05, 'CrossRef': 0.1, 'IEEE Xplore': 0.02, 'Semantic Scholar': 0.05, 'Springer': 0.03}
+    calls = []
+    collector = make_collector(delays, calls)
+    subtopics = ['vision', 'speech', 'robotics']
+
+    start = time.perf_counter()
+    papers = collector.get_papers_by_topic('machine learning', subtopics)
+    elapsed = time.perf_counter() - start
+
+    assert len(calls) == len(delays) * 4
+    assert elapsed < sum(delays.values()) * 4 / 2
+    assert elapsed >= max(delays.values()) * 4
+    # 每个来源每个查询1篇独有论文，另有1篇共享DOI的论文
+    assert len(papers) == len(delays) * 4 + 1
+
+
+def test_results_stream_as_sources_finish():
+    calls = []
+    collector = make_collector({'Fast': 0.0, 'Slow': 0.2}, calls)
+    first = next(collector.iter_papers_by_topic('ai'))
+    assert first[0] == 'Fast'
+
+
+def test_rate_limiter_spacing():
+    limiter = RateLimiter(20)
+    start = time.perf_counter()
+    for _ in range(5):
+        limiter.acquire()
+    assert time.perf_counter() - start >= 0.19
+
+
+if __name__ == "__main__":
+    test_paper_index_dedup()
+    test_concurrent_fetch_is_bounded_by_slowest_source()
+    test_results_stream_as_sources_finish()
+    test_rate_limiter_spacing()
+    print("✅ 学术来源并发获取测试全部通过")
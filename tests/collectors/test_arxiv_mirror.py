@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+测试arXiv元数据镜像：快照导入与分类筛选、BM25检索与时间/分类过滤、ArxivCollector只为最新几天请求API，
+以及按相关性排序时镜像结果占满名额也保留最新几天的论文
+"""
+
+import gzip
+import io
+import json
+import os
+import sys
+import tempfile
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import config
+from collectors.arxiv_mirror import ArxivMirror, build_match_query
+
+
+def _record(arxiv_id, title, abstract, categories, days_ago):
+    created = datetime.now(timezone.utc) - timedelta(days=days_ago)
+    return {
+        "id": arxiv_id,
+        "authors": "A. Author, B. Writer",
+        "title": title,
+        "abstract": abstract,
+        "categories": categories,
+        "versions": [{"version": "v1", "created": format_datetime(created)}],
+        "update_date": created.strftime("%Y-%m-%d"),
+        "authors_parsed": [["Author", "A.", ""], ["Writer", "B.", ""]],
+    }
+
+
+SNAPSHOT = [
+    _record("2401.00001", "Large Language Models for Code Generation",
+            "We study language models that generate programs.", "cs.CL cs.SE", 2),
+    _record("2401.00002", "Protein Folding with Graph Networks",
+            "Graph neural networks predict protein structure. Language models are not used.", "q-bio.BM cs.LG", 3),
+    _record("2401.00003", "A Survey of Reinforcement Learning",
+            "This survey covers policy optimization and language model alignment.", "cs.LG", 5),
+    _record("2301.00004", "Old Language Model Paper",
+            "An early language model.", "cs.CL", 400),
+    _record("math/0001", "Algebraic Curves", "On the genus of curves.", "math.AG", 2),
+]
+
+
+def _mirror(tmp, categories=None):
+    path = os.path.join(tmp, "snapshot.json.gz")
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        for record in SNAPSHOT:
+            f.write(json.dumps(record) + "\n")
+        f.write("not json\n")
+    mirror = ArxivMirror(os.path.join(tmp, "arxiv_mirror.db"), categories=categories)
+    stats = mirror.ingest_snapshot(path)
+    return mirror, stats
+
+
+def test_ingest_and_bm25_search():
+    with tempfile.TemporaryDirectory() as tmp:
+        output = io.StringIO()
+        with redirect_stdout(output):
+            mirror, stats = _mirror(tmp, categories=["cs", "q-bio"])
+        assert stats == {"read": 5, "ingested": 4, "skipped": 1}
+        assert "按分类筛选（cs,q-bio）跳过 1 条记录" in output.getvalue()
+        assert mirror.available()
+        # 重复导入未变化的记录不会重写
+        assert mirror.ingest(SNAPSHOT[:1])["ingested"] == 0
+
+        since = datetime.now() - timedelta(days=30)
+        results = mirror.search("language models", start_date=since, sort_by="relevance")
+        # 标题命中的论文排在只有摘要命中的论文前面，超出时间范围的论文不返回
+        assert [paper["url"] for paper in results] == [
+            "https://arxiv.org/abs/2401.00001",
+            "https://arxiv.org/abs/2401.00003",
+            "https://arxiv.org/abs/2401.00002",
+        ]
+        assert results[0]["authors"] == ["A. Author", "B. Writer"]
+        assert results[0]["categories"] == ["cs.CL", "cs.SE"] and results[0]["source"] == "arxiv"
+
+        by_category = mirror.search("language models", start_date=since, categories=["cs.CL"])
+        assert [paper["url"] for paper in by_category] == ["https://arxiv.org/abs/2401.00001"]
+
+        # 全部命中没有结果时放宽为任意命中；AND分组之间仍然都要命中
+        assert len(mirror.search("language transformers", start_date=since)) == 3
+        assert mirror.search("protein AND transformers", start_date=since) == []
+        assert mirror.get_stats()["papers"] == 4
+        mirror.close()
+
+
+def test_build_match_query():
+    assert build_match_query("Graph Neural Networks for the Web") == '("graph" AND "neural" AND "networks" AND "web")'
+    assert build_match_query("LLM AND code review", match_all=False) == '("llm") AND ("code" OR "review")'
+    assert build_match_query("of the") is None
+
+
+def test_collector_uses_live_api_only_for_newest_days():
+    from collectors.arxiv_collector import ArxivCollector
+
+    with tempfile.TemporaryDirectory() as tmp:
+        mirror, _ = _mirror(tmp)
+        collector = ArxivCollector(mirror=mirror)
+        assert collector.mirror is mirror
+
+        live_calls = []
+
+        def fake_live(english_query, start_date, end_date):
+            live_calls.append((start_date, end_date))
+            return [{"title": "Fresh", "url": "http://arxiv.org/abs/2401.00009v1", "published": "2099-01-01"},
+                    {"title": "Dup", "url": "http://arxiv.org/abs/2401.00001v2", "published": "2099-01-01"}]
+
+        collector._search_live = fake_live
+        results = collector.search("language models", days_back=30)
+
+        # 镜像最新的论文是2天前提交的，API只需覆盖最近2天
+        assert len(live_calls) == 1
+        live_start, live_end = live_calls[0]
+        assert timedelta(days=1.9) < live_end - live_start < timedelta(days=2.1)
+        # 按提交时间降序合并，与镜像重复的论文去掉
+        assert [paper["title"] for paper in results][:2] == ["Fresh", "Large Language Models for Code Generation"]
+        assert len(results) == 4
+
+        # 镜像数据库不存在时不创建空库，所有查询都请求API
+        empty = ArxivMirror(os.path.join(tmp, "missing.db"))
+        assert not empty.available() and not os.path.exists(os.path.join(tmp, "missing.db"))
+        assert ArxivCollector(mirror=empty).mirror is None
+        mirror.close()
+
+
+def test_relevance_merge_keeps_live_results():
+    from collectors.arxiv_collector import ArxivCollector
+
+    def paper(prefix, index):
+        return {"title": f"{prefix}{index}", "url": f"http://arxiv.org/abs/{prefix}.{index:05d}v1", "published": "2024-01-01"}
+
+    mirror_results = [paper("mirror", i) for i in range(4)]
+    live_results = [paper("mirror", 0), paper("live", 0), paper("live", 1)]
+    originals = (config.ARXIV_SORT_BY, config.ARXIV_MAX_RESULTS)
+    config.ARXIV_SORT_BY, config.ARXIV_MAX_RESULTS = "relevance", 4
+    try:
+        merged = ArxivCollector.__new__(ArxivCollector)._merge_results(mirror_results, live_results)
+    finally:
+        config.ARXIV_SORT_BY, config.ARXIV_MAX_RESULTS = originals
+
+    # 镜像结果已占满名额，最新几天的论文仍按各自的相关性顺序交替保留
+    assert [item["title"] for item in merged] == ["mirror0", "live0", "mirror1", "live1"]
+
+
+if __name__ == "__main__":
+    test_ingest_and_bm25_search()
+    test_build_match_query()
+    test_collector_uses_live_api_only_for_newest_days()
+    test_relevance_merge_keeps_live_results()
+    print("✅ arXiv元数据镜像测试通过")
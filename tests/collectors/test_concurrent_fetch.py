@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+测试并发分页获取：按任务顺序合并去重、结果数足够后停止提交、最后一页判断、Brave并发分页，
+以及综合研究嵌套并发时同时在途的请求数不超过收集器的并发上限
+"""
+
+import itertools
+import os
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from collectors.brave_search_collector import BraveSearchCollector
+from collectors.concurrent_fetch import fetch_concurrently
+from collectors.google_search_collector import GoogleSearchCollector
+from collectors.rate_limiter import RateLimiter
+
+
+def make_task(index, delay, urls, started):
+    def task():
+        started.append(index)
+        time.sleep(delay)
+        return [{'url': url, 'task': index} for url in urls]
+    return task
+
+
+def test_results_keep_task_order_and_dedup():
+    started = []
+    tasks = [
+        make_task(0, 0.15, ['a', 'b'], started),
+        make_task(1, 0.0, ['b', 'c'], started),
+        make_task(2, 0.05, ['d'], started),
+    ]
+    start = time.perf_counter()
+    results = fetch_concurrently(tasks, max_workers=3)
+    elapsed = time.perf_counter() - start
+
+    assert [item['url'] for item in results] == ['a', 'b', 'c', 'd']
+    assert results[1]['task'] == 0
+    assert elapsed < 0.2
+
+
+def test_stops_submitting_after_max_results():
+    started = []
+    tasks = (make_task(i, 0.02, [f"url{i}-{j}" for j in range(3)], started) for i in range(20))
+    results = fetch_concurrently(tasks, max_workers=2, max_results=5)
+    time.sleep(0.05)
+
+    assert [item['url'] for item in results] == ['url0-0', 'url0-1', 'url0-2', 'url1-0', 'url1-1']
+    assert len(started) <= 4
+
+
+def test_is_last_and_errors():
+    started = []
+
+    def broken():
+        raise RuntimeError("请求失败")
+
+    tasks = [make_task(0, 0, ['a', 'b'], started), broken, make_task(2, 0, ['c'], started)]
+    assert [item['url'] for item in fetch_concurrently(tasks, max_workers=1)] == ['a', 'b', 'c']
+
+    tasks = [make_task(0, 0, ['a', 'b'], started), make_task(1, 0, ['c'], started), make_task(2, 0, ['d'], started)]
+    results = fetch_concurrently(tasks, max_workers=1, is_last=lambda page: len(page) < 2)
+    assert [item['url'] for item in results] == ['a', 'b', 'c']
+
+
+def test_brave_pages_fetched_concurrently():
+    collector = BraveSearchCollector(api_key="stub")
+    collector.rate_limiter = RateLimiter(0)
+    lock = threading.Lock()
+    state = {"running": 0, "peak": 0, "offsets": []}
+
+    def fake_search(query, count=10, offset=0, **kwargs):
+        with lock:
+            state["running"] += 1
+            state["peak"] = max(state["peak"], state["running"])
+            state["offsets"].append(offset)
+        time.sleep(0.05)
+        with lock:
+            state["running"] -= 1
+        size = count if offset < 2 else 3
+        return [{'url': f"https://example.com/{offset}/{i}"} for i in range(size)]
+
+    collector.search = fake_search
+    results = collector.search_pages("ai", max_results=100, page_size=20)
+
+    assert len(results) == 43  # 第3页不足一页，之后的页不再合并
+    assert state["peak"] > 1
+    assert sorted(state["offsets"])[:3] == [0, 1, 2]
+
+
+class CountingSession:
+    """记录同时在途请求数的假会话，每次返回一整页不重复的结果"""
+
+    def __init__(self, page_size):
+        self.page_size = page_size
+        self.lock = threading.Lock()
+        self.running = 0
+        self.peak = 0
+        self.requests = 0
+        self.ids = itertools.count()
+
+    def get(self, url, **kwargs):
+        with self.lock:
+            self.running += 1
+            self.requests += 1
+            self.peak = max(self.peak, self.running)
+        time.sleep(0.02)
+        with self.lock:
+            self.running -= 1
+            ids = [next(self.ids) for _ in range(self.page_size)]
+        items = [{"title": f"结果{i}", "link": f"https://example.com/{i}", "description": "", "url": f"https://example.com/{i}"}
+                 for i in ids]
+        data = {"items": items, "web": {"results": items}}
+        return SimpleNamespace(raise_for_status=lambda: None, json=lambda: data)
+
+    def close(self):
+        pass
+
+
+def test_comprehensive_research_bounds_in_flight_requests():
+    for collector, page_size in ((GoogleSearchCollector(api_key="stub", cx="stub"), 10),
+                                 (BraveSearchCollector(api_key="stub"), 3)):
+        collector.has_api_key = True
+        collector.rate_limiter = RateLimiter(0)
+        collector.session = CountingSession(page_size)
+
+        collector.get_comprehensive_research("人工智能")
+
+        # 外层类别线程、批量查询和分页三层线程池嵌套，实际请求仍受实例并发上限约束
+        assert collector.session.requests > collector.max_workers
+        assert 1 < collector.session.peak <= collector.max_workers
+
+
+if __name__ == "__main__":
+    test_results_keep_task_order_and_dedup()
+    test_stops_submitting_after_max_results()
+    test_is_last_and_errors()
+    test_brave_pages_fetched_concurrently()
+    test_comprehensive_research_bounds_in_flight_requests()
+    print("✅ 并发分页获取测试全部通过")
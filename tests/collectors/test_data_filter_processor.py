@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+测试数据筛选处理器的回退相关性：批量计算后缓存，缓存键由数据源内容决定而不是对象id
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from collectors.data_filter_processor import DataFilterProcessor, DataSource
+
+
+def make_source(title, content, url):
+    return DataSource(content=content, url=url, title=title, source_type="web")
+
+
+def test_fallback_relevance_cache_is_keyed_by_content():
+    processor = DataFilterProcessor()
+    relevant = make_source("人工智能市场", "人工智能市场规模持续增长", "https://a.example/ai")
+    processor._prepare_relevance_fallback([relevant], "人工智能", "市场")
+    score = processor._evaluate_relevance_fallback(relevant, "人工智能", "市场")
+    assert score > 0.5
+
+    # 内容相同的新对象命中缓存
+    copy = make_source("人工智能市场", "人工智能市场规模持续增长", "https://a.example/ai")
+    assert processor._evaluate_relevance_fallback(copy, "人工智能", "市场") == score
+
+    # 原对象被回收后，新对象即使复用了同一个id也不会拿到旧得分
+    del relevant, copy
+    unrelated = make_source("天气预报", "明天多云转晴", "https://b.example/weather")
+    assert processor._evaluate_relevance_fallback(unrelated, "人工智能", "市场") == 0.0
+
+
+if __name__ == "__main__":
+    test_fallback_relevance_cache_is_keyed_by_content()
+    print("✅ 数据筛选处理器测试通过")
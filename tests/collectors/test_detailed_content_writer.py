@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+测试深度报告主体生成：要点并发生成但按大纲顺序组装、并发数受信号量限制、
+单个要点失败只影响该要点且不在外层重复重试；批量撰写章节遇到限流时交给调度器重试
+"""
+
+import asyncio
+import os
+import re
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import config
+from collectors.detailed_content_writer_mcp import DetailedContentWriterMcp
+
+
+class StubLLMProcessor:
+    """越靠前的要点返回越慢；指定的要点抛出异常"""
+
+    def __init__(self, delays, failing_points=()):
+        self.delays = delays
+        self.failing_points = set(failing_points)
+        self.calls = []
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.lock = threading.Lock()
+
+    def call_llm_api(self, prompt, system_message=None, temperature=0.3, max_tokens=8192, cache=None):
+        point = re.search(r'当前要点: "(.+?)"', prompt).group(1)
+        with self.lock:
+            self.calls.append(point)
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            time.sleep(self.delays[point])
+            if point in self.failing_points:
+                raise RuntimeError("上游服务不可用")
+            return f"{point}的分析"
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+
+OUTLINE = {
+    "body": [
+        {"title": "技术发展", "key_points": ["大模型", "芯片"]},
+        {"title": "市场格局", "key_points": ["云厂商", "初创公司", "开源社区"]},
+    ]
+}
+DELAYS = {"大模型": 0.25, "芯片": 0.2, "云厂商": 0.15, "初创公司": 0.1, "开源社区": 0.0}
+
+
+def test_points_keep_outline_order_and_failures_are_isolated():
+    llm = StubLLMProcessor(DELAYS, failing_points={"云厂商"})
+    writer = DetailedContentWriterMcp(llm_processor=llm)
+
+    body = asyncio.run(writer._generate_body("人工智能", OUTLINE, max_concurrency=2))
+
+    headings = re.findall(r'^#{2,3} (.+)$', body, flags=re.MULTILINE)
+    assert headings == ["2. 技术发展", "大模型", "芯片", "3. 市场格局", "云厂商", "初创公司", "开源社区"]
+    assert "大模型的分析" in body and "开源社区的分析" in body
+    assert body.count("该要点内容暂时无法生成") == 1
+    assert body.index("该要点内容暂时无法生成") < body.index("初创公司的分析")
+
+    # 失败的要点只调用一次（重试由call_llm_api负责），并发数不超过信号量上限
+    assert sorted(llm.calls) == sorted(DELAYS)
+    assert llm.peak_in_flight <= 2
+
+
+class RateLimitedOnce(Exception):
+    status_code = 429
+
+
+class FlakySectionLLM:
+    """每个章节第一次调用抛出429，之后正常返回"""
+
+    def __init__(self):
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def call_llm_api(self, prompt, system_message=None, temperature=0.3, max_tokens=8192, cache=None):
+        section = re.search(r'(市场格局|技术发展)', prompt).group(1)
+        with self.lock:
+            self.calls.append(section)
+            first_call = self.calls.count(section) == 1
+        if first_call and section == "市场格局":
+            raise RateLimitedOnce("Too Many Requests")
+        return f"{section}的详细分析"
+
+
+def test_rate_limited_section_is_retried_by_scheduler():
+    llm = FlakySectionLLM()
+    writer = DetailedContentWriterMcp(llm_processor=llm)
+    sections = [{"title": "技术发展", "content_data": []}, {"title": "市场格局", "content_data": []}]
+
+    original = config.SECTION_RATE_LIMIT_BACKOFF
+    config.SECTION_RATE_LIMIT_BACKOFF = 0
+    try:
+        results = writer.write_multiple_sections(sections, "人工智能行业报告", max_concurrency=2)
+    finally:
+        config.SECTION_RATE_LIMIT_BACKOFF = original
+
+    assert llm.calls.count("市场格局") == 2
+    assert "市场格局的详细分析" in results["市场格局"]
+    assert "生成失败" not in results["市场格局"]
+
+
+if __name__ == "__main__":
+    test_points_keep_outline_order_and_failures_are_isolated()
+    test_rate_limited_section_is_retried_by_scheduler()
+    print("✅ 深度报告主体生成测试通过")
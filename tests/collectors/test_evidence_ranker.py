@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+测试证据排序器：中文分词、批量BM25打分与章节top-k、查询词覆盖率
+"""
+
+import os
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ROOT)
+
+from collectors.evidence_ranker import EvidenceRanker, rank_evidence, tokenize
+
+
+RESULTS = [
+    {"title": "全球半导体市场规模预测", "content": "2025年半导体市场规模将达到6000亿美元，存储芯片需求回升。"},
+    {"title": "大模型推理技术进展", "content": "推理加速技术包括量化、投机解码和KV缓存压缩。"},
+    {"title": "AI在教育领域的应用", "content": "智能辅导系统和自动批改正在改变课堂教学。"},
+    {"title": "Semiconductor market outlook", "content": "The semiconductor market is expected to recover in 2025."},
+    {"title": "天气预报", "content": "明天多云转晴。"},
+]
+
+
+def test_tokenize_cjk_bigrams():
+    assert tokenize("半导体市场 AI芯片") == ["半导", "导体", "体市", "市场", "ai", "芯片"]
+    assert tokenize("云") == ["云"]
+
+    # 排序器和近似重复检测使用同一个分词器
+    search_mcp_path = os.path.join(ROOT, 'search_mcp', 'src')
+    if search_mcp_path not in sys.path:
+        sys.path.insert(0, search_mcp_path)
+    from search_mcp.dedup import tokenize as dedup_tokenize
+    assert tokenize is dedup_tokenize
+
+
+def test_import_does_not_load_search_mcp():
+    # 分词器只依赖标准库，导入排序器不会带出search_mcp包及其收集器
+    code = "import sys, collectors.evidence_ranker; print(any(name.startswith('search_mcp') for name in sys.modules))"
+    output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    assert output.strip() == "False"
+
+
+def test_batched_scores_match_per_query():
+    ranker = EvidenceRanker.from_results(RESULTS)
+    queries = ["半导体市场", "推理技术", "教育应用"]
+    batched = ranker.score(queries)
+    assert batched.shape == (3, len(RESULTS))
+    for row, query in zip(batched, queries):
+        assert (abs(row - ranker.score([query])[0]) < 1e-9).all()
+
+
+def test_top_k_per_section():
+    sections = rank_evidence(["半导体市场 market", "推理技术", "教育应用"], RESULTS, k=2, min_results=0)
+    assert sections[0][0] is RESULTS[0]
+    assert RESULTS[3] in sections[0]
+    assert sections[1] == [RESULTS[1]]
+    assert sections[2] == [RESULTS[2]]
+
+
+def test_min_results_padding():
+    hits = EvidenceRanker.from_results(RESULTS).top_k(["量子计算"], k=8, min_results=3)[0]
+    assert hits == [(0, 0.0), (1, 0.0), (2, 0.0)]
+
+
+def test_coverage():
+    ranker = EvidenceRanker(["半导体市场规模", "半导体", "天气"])
+    coverage = ranker.coverage("半导体市场")
+    assert abs(coverage[0] - 1.0) < 1e-9
+    assert 0 < coverage[1] < 1
+    assert coverage[2] == 0
+
+
+if __name__ == "__main__":
+    test_tokenize_cjk_bigrams()
+    test_import_does_not_load_search_mcp()
+    test_batched_scores_match_per_query()
+    test_top_k_per_section()
+    test_min_results_padding()
+    test_coverage()
+    print("✅ 证据排序器测试全部通过")
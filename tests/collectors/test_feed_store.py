@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+测试RSS源本地存储：条件请求与刷新间隔、条目去重、本地检索评分与时间过滤
+"""
+
+import os
+import sys
+import tempfile
+import time
+from email.utils import formatdate
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from collectors.feed_store import FeedStore
+
+
+def _rss(items):
+    body = "".join(
+        f"<item><title>{title}</title><link>{link}</link><description>{summary}</description>"
+        f"<pubDate>{formatdate(time.time() - hours * 3600)}</pubDate></item>"
+        for title, link, summary, hours in items
+    )
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>测试源</title>{body}</channel></rss>'.encode('utf-8')
+
+
+class FakeResponse:
+    def __init__(self, status_code, content=b"", headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+
+class FakeSession:
+    """按ETag返回304的假会话，记录每次请求头"""
+
+    def __init__(self, feeds):
+        self.feeds = feeds
+        self.requests = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.requests.append((url, dict(headers or {})))
+        if url not in self.feeds:
+            return FakeResponse(500)
+        etag = f'"{hash(self.feeds[url])}"'
+        if (headers or {}).get('If-None-Match') == etag:
+            return FakeResponse(304)
+        return FakeResponse(200, self.feeds[url], {'ETag': etag})
+
+
+FEEDS = {
+    "https://a.example/rss": _rss([
+        ("人工智能芯片发布", "https://a.example/1", "新一代AI芯片", 2),
+        ("Quantum computing breakthrough", "https://a.example/2", "IBM quantum chips", 30),
+        ("旧闻：人工智能", "https://a.example/3", "很久以前", 24 * 20),
+    ]),
+    "https://b.example/rss": _rss([
+        ("AI chip startups raise funding", "https://b.example/1", "Funding for AI hardware", 10),
+    ]),
+}
+
+
+def test_conditional_refresh():
+    store = FeedStore(refresh_interval=3600)
+    store.session = FakeSession(FEEDS)
+    feeds = list(FEEDS) + ["https://broken.example/rss"]
+
+    stats = store.refresh(feeds)
+    assert stats['fetched'] == 2 and stats['failed'] == 1 and stats['entries'] == 4
+
+    # 刷新间隔内不再请求
+    stats = store.refresh(feeds)
+    assert stats['skipped'] == 2 and len(store.session.requests) == 4
+
+    # 强制刷新时带ETag发出条件请求，未更新的源返回304
+    stats = store.refresh(list(FEEDS), force=True)
+    assert stats['not_modified'] == 2 and stats['entries'] == 0
+    assert all('If-None-Match' in headers for _, headers in store.session.requests[-2:])
+    assert store.get_stats()['entries'] == 4
+
+
+def test_local_search_scoring():
+    store = FeedStore()
+    store.session = FakeSession(FEEDS)
+    store.refresh(FEEDS)
+
+    results = store.search("人工智能 芯片", days_back=7)
+    assert [r['url'] for r in results] == ["https://a.example/1"]
+    assert results[0]['time_score'] == 1.0 and results[0]['relevance_score'] == 1.0
+    assert results[0]['source'] == "测试源"
+
+    # 30天内能找到旧闻；按源过滤
+    assert len(store.search("人工智能", days_back=30)) == 2
+    assert store.search("人工智能", days_back=30, feeds=["https://b.example/rss"]) == []
+
+    # 英文查询不区分大小写，按综合分数（时效性0.6 + 相关性0.4）排序
+    results = store.search("AI Chip", days_back=7)
+    assert [r['url'] for r in results] == ["https://b.example/1", "https://a.example/1", "https://a.example/2"]
+    assert [round(r['final_score'], 2) for r in results] == [0.94, 0.8, 0.62]
+    assert store.search("", days_back=7) == []
+
+
+def test_persistent_store():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "data", "rss_feeds.db")
+        store = FeedStore(path=path)
+        store.session = FakeSession(FEEDS)
+        store.refresh(FEEDS)
+        store.close()
+
+        reopened = FeedStore(path=path)
+        reopened.session = FakeSession(FEEDS)
+        assert reopened.refresh(FEEDS)['skipped'] == 2
+        assert len(reopened.search("quantum", days_back=7)) == 1
+        reopened.close()
+
+
+if __name__ == "__main__":
+    test_conditional_refresh()
+    test_local_search_scoring()
+    test_persistent_store()
+    print("✅ RSS源本地存储测试通过")
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+测试LLM响应缓存：低温度调用命中缓存、bypass标志、磁盘层持久化、TTL和条目数淘汰
+"""
+
+import os
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import collectors.llm_processor as llm_processor_module
+from collectors.llm_cache import LLMResponseCache, make_llm_cache_key
+from collectors.llm_processor import LLMProcessor
+
+
+class StubCompletions:
+    """返回递增内容的chat.completions桩"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def create(self, **kwargs):
+        self.calls += 1
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=f"回答{self.calls}"))],
+            usage=SimpleNamespace(prompt_tokens=30, completion_tokens=10, total_tokens=40)
+        )
+
+
+def make_processor():
+    completions = StubCompletions()
+    processor = LLMProcessor(api_key="stub")
+    processor.get_client = lambda: SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return processor, completions
+
+
+def with_cache(cache, func):
+    original = llm_processor_module.llm_cache
+    llm_processor_module.llm_cache = cache
+    try:
+        func()
+    finally:
+        llm_processor_module.llm_cache = original
+
+
+def test_low_temperature_calls_hit_cache():
+    cache = LLMResponseCache(max_size=10)
+
+    def run():
+        processor, completions = make_processor()
+        assert processor.call_llm_api("翻译：人工智能", "系统", temperature=0.1) == "回答1"
+        assert processor.call_llm_api("翻译：人工智能", "系统", temperature=0.1) == "回答1"
+        assert completions.calls == 1
+
+        # 默认温度0.3不缓存，除非显式要求
+        processor.call_llm_api("写一段介绍")
+        processor.call_llm_api("写一段介绍")
+        assert completions.calls == 3
+        processor.call_llm_api("写一段介绍", cache=True)
+        processor.call_llm_api("写一段介绍", cache=True)
+        assert completions.calls == 4
+
+        # cache=False跳过缓存
+        assert processor.call_llm_api("翻译：人工智能", "系统", temperature=0.1, cache=False) == "回答5"
+
+    with_cache(cache, run)
+    stats = cache.get_stats()
+    assert stats["hits"] == 2
+    assert stats["saved_tokens"] == 80
+
+
+def test_key_covers_all_parameters():
+    base = make_llm_cache_key("m", "s", "p", 0.1, 100)
+    assert base == make_llm_cache_key("m", "s", "p", 0.1, 100)
+    assert base != make_llm_cache_key("m2", "s", "p", 0.1, 100)
+    assert base != make_llm_cache_key("m", None, "p", 0.1, 100)
+    assert base != make_llm_cache_key("m", "s", "p", 0.0, 100)
+    assert base != make_llm_cache_key("m", "s", "p", 0.1, 200)
+
+
+def test_disk_tier_survives_restart_and_evicts():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "llm_cache.sqlite")
+        cache = LLMResponseCache(max_size=10, db_path=db_path, max_disk_entries=2)
+        for i in range(3):
+            cache.set(f"k{i}", f"v{i}", tokens=5)
+            time.sleep(0.01)
+        cache.close()
+
+        restarted = LLMResponseCache(max_size=10, db_path=db_path)
+        assert restarted.get("k0") is None  # 超出磁盘条目上限，最早的条目被淘汰
+        assert restarted.get("k2") == "v2"
+        assert restarted.get_stats()["disk_hits"] == 1
+        restarted.close()
+
+
+def test_ttl_expiry():
+    cache = LLMResponseCache(max_size=10, ttl=1)
+    cache.set("k", "v")
+    assert cache.get("k") == "v"
+    cache._memory["k"] = (time.time() - 5, "v", 0)
+    assert cache.get("k") is None
+
+
+if __name__ == "__main__":
+    test_low_temperature_calls_hit_cache()
+    test_key_covers_all_parameters()
+    test_disk_tier_survives_restart_and_evicts()
+    test_ttl_expiry()
+    print("✅ LLM响应缓存测试全部通过")
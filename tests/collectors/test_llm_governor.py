@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+测试进程级LLM调控器：全局并发上限、交互式调用优先、RPM令牌桶限速、排队指标
+"""
+
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from collectors.llm_governor import (
+    LLMGovernor, BATCH, INTERACTIVE, llm_priority, batch_priority, get_priority
+)
+from collectors.usage_ledger import submit_in_context
+
+
+def test_global_concurrency_cap():
+    governor = LLMGovernor(max_concurrency=2, requests_per_minute=0, tokens_per_minute=0)
+    lock = threading.Lock()
+    state = {"running": 0, "peak": 0}
+
+    def call():
+        with governor.slot(10):
+            with lock:
+                state["running"] += 1
+                state["peak"] = max(state["peak"], state["running"])
+            time.sleep(0.03)
+            with lock:
+                state["running"] -= 1
+
+    # 模拟嵌套线程池：外层3个线程，每个内层再开4个线程
+    def outer():
+        with ThreadPoolExecutor(max_workers=4) as inner:
+            for future in [inner.submit(call) for _ in range(4)]:
+                future.result()
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        for future in [executor.submit(outer) for _ in range(3)]:
+            future.result()
+
+    stats = governor.get_stats()
+    assert state["peak"] <= 2
+    assert stats["peak_in_flight"] <= 2
+    assert stats["in_flight"] == 0
+    assert stats["lanes"][INTERACTIVE]["requests"] == 12
+
+
+def test_interactive_lane_goes_first():
+    governor = LLMGovernor(max_concurrency=1, requests_per_minute=0, tokens_per_minute=0)
+    order = []
+    blocker = governor.acquire()
+
+    def call(lane, name):
+        with governor.slot(lane=lane):
+            order.append(name)
+
+    threads = [threading.Thread(target=call, args=(BATCH, f"batch{i}")) for i in range(3)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    interactive = threading.Thread(target=call, args=(INTERACTIVE, "interactive"))
+    interactive.start()
+    time.sleep(0.05)
+
+    governor.release(blocker)
+    for thread in threads + [interactive]:
+        thread.join()
+
+    assert order[0] == "interactive"
+    assert governor.get_stats()["lanes"][BATCH]["max_wait"] > 0
+
+
+def test_request_bucket_throttles():
+    # 每分钟600次 = 每秒10次，桶满后第11次需要等待约0.1秒
+    governor = LLMGovernor(max_concurrency=4, requests_per_minute=600, tokens_per_minute=0)
+    for _ in range(600):
+        governor.release(governor.acquire())
+    start = time.perf_counter()
+    for _ in range(2):
+        governor.release(governor.acquire())
+    assert time.perf_counter() - start >= 0.15
+    assert governor.get_stats()["throttled"] >= 1
+
+
+def test_batch_priority_propagates_to_worker_threads():
+    @batch_priority
+    def analyze():
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            return submit_in_context(executor, get_priority).result()
+
+    assert analyze() == BATCH
+    with llm_priority(BATCH):
+        assert get_priority() == BATCH
+    assert get_priority() == INTERACTIVE
+
+
+if __name__ == "__main__":
+    test_global_concurrency_cap()
+    test_interactive_lane_goes_first()
+    test_request_bucket_throttles()
+    test_batch_priority_propagates_to_worker_threads()
+    print("✅ LLM调控器测试全部通过")
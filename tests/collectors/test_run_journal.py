@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+测试编排运行日志：阶段保存与恢复、章节按大纲校验、重写后失效、运行列表
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from collectors.run_journal import RunJournal
+
+
+def test_stages_survive_reload():
+    with tempfile.TemporaryDirectory() as tmp:
+        journal = RunJournal.create("分析人工智能行业", "industry",
+                                    {"topic": "人工智能", "callback": object()}, root=tmp)
+        journal.save_stage("outline", {"sections": ["技术发展", "市场格局"]})
+        journal.save_stage("quality", [{"title": "结果", "url": "https://a.example"}])
+
+        restored = RunJournal.load(journal.run_id, root=tmp)
+        assert restored.task == "分析人工智能行业" and restored.task_type == "industry"
+        # 不能序列化的参数不会写入日志
+        assert restored.kwargs == {"topic": "人工智能"}
+        assert restored.has("outline") and restored.has("quality") and not restored.has("summary")
+        assert restored.load_stage("quality")[0]["url"] == "https://a.example"
+
+        restored.invalidate("quality")
+        assert not RunJournal.load(journal.run_id, root=tmp).has("quality")
+
+
+def test_sections_match_outline():
+    with tempfile.TemporaryDirectory() as tmp:
+        journal = RunJournal.create("任务", "auto", {}, run_id="run-1", root=tmp)
+        journal.save_section(0, "技术发展", "## 技术发展\n内容")
+        journal.save_section(2, "未来趋势", "## 未来趋势\n内容")
+
+        assert journal.load_sections(["技术发展", "市场格局", "未来趋势"]) == {
+            0: "## 技术发展\n内容",
+            2: "## 未来趋势\n内容",
+        }
+        # 大纲变化后标题不一致的章节不再复用
+        assert journal.load_sections(["技术发展", "未来趋势"]) == {0: "## 技术发展\n内容"}
+
+
+def test_list_and_missing_runs():
+    with tempfile.TemporaryDirectory() as tmp:
+        RunJournal.create("任务一", "auto", {}, run_id="a", root=tmp)
+        second = RunJournal.create("任务二", "auto", {}, run_id="b", root=tmp)
+        second.finish("failed", "timeout")
+
+        runs = {meta["run_id"]: meta for meta in RunJournal.list_runs(root=tmp)}
+        assert set(runs) == {"a", "b"}
+        assert runs["b"]["status"] == "failed" and runs["b"]["error"] == "timeout"
+
+        try:
+            RunJournal.load("missing", root=tmp)
+            assert False, "不存在的运行应抛出FileNotFoundError"
+        except FileNotFoundError:
+            pass
+
+
+def test_rejects_unsafe_run_ids():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.join(tmp, "runs")
+        for run_id in ["../../x", "..", "a/b", "a\\b", "x" * 65, "运行"]:
+            try:
+                RunJournal.create("任务", "auto", {}, run_id=run_id, root=root)
+                assert False, f"不合法的run_id应被拒绝: {run_id!r}"
+            except ValueError:
+                pass
+            try:
+                RunJournal.load(run_id, root=root)
+                assert False, f"不合法的run_id应被拒绝: {run_id!r}"
+            except ValueError:
+                pass
+        # 根目录之外没有创建任何文件
+        assert os.listdir(tmp) == []
+        assert RunJournal.create("任务", "auto", {}, run_id="20260101_120000_ab-cd", root=root).path.is_dir()
+
+
+if __name__ == "__main__":
+    test_stages_survive_reload()
+    test_sections_match_outline()
+    test_list_and_missing_runs()
+    test_rejects_unsafe_run_ids()
+    print("✅ 编排运行日志测试通过")
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+测试章节并发调度器：按提交顺序输出、并发上限、限流后降低并发并重试
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from collectors.section_scheduler import SectionScheduler
+
+
+class RateLimitError(Exception):
+    """模拟openai.RateLimitError"""
+
+
+def test_results_keep_submission_order():
+    delays = [0.3, 0.05, 0.2, 0.1]
+    finished = []
+
+    def make_task(index):
+        def task():
+            time.sleep(delays[index])
+            finished.append(index)
+            return f"章节{index}"
+        return task
+
+    scheduler = SectionScheduler(max_concurrency=4)
+    start = time.perf_counter()
+    results = list(scheduler.iter_ordered([make_task(i) for i in range(4)]))
+    elapsed = time.perf_counter() - start
+
+    assert [index for index, _ in results] == [0, 1, 2, 3]
+    assert [content for _, content in results] == ["章节0", "章节1", "章节2", "章节3"]
+    assert finished != [0, 1, 2, 3]  # 实际完成顺序被打乱，输出顺序仍然正确
+    assert elapsed < sum(delays)
+
+
+def test_concurrency_cap():
+    lock = threading.Lock()
+    state = {"running": 0, "peak": 0}
+
+    def task():
+        with lock:
+            state["running"] += 1
+            state["peak"] = max(state["peak"], state["running"])
+        time.sleep(0.05)
+        with lock:
+            state["running"] -= 1
+
+    SectionScheduler(max_concurrency=2).run([task] * 8)
+    assert state["peak"] <= 2
+
+
+def test_rate_limit_halves_concurrency_and_retries():
+    attempts = {"count": 0}
+    lock = threading.Lock()
+
+    def flaky():
+        with lock:
+            attempts["count"] += 1
+            first = attempts["count"] == 1
+        if first:
+            raise RateLimitError("Error code: 429 - rate limit exceeded")
+        return "ok"
+
+    scheduler = SectionScheduler(max_concurrency=4, backoff=0.01)
+    assert scheduler.run([flaky]) == ["ok"]
+    assert attempts["count"] == 2
+    assert scheduler.throttle_events == 1
+
+
+def test_non_rate_limit_error_propagates():
+    def broken():
+        raise ValueError("boom")
+
+    scheduler = SectionScheduler(max_concurrency=2, backoff=0.01)
+    try:
+        scheduler.run([lambda: "ok", broken])
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("非限流异常应当抛出")
+
+
+if __name__ == "__main__":
+    test_results_keep_submission_order()
+    test_concurrency_cap()
+    test_rate_limit_halves_concurrency_and_retries()
+    test_non_rate_limit_error_propagates()
+    print("✅ 章节调度器测试全部通过")
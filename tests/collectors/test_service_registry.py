@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+测试共享服务注册表：惰性构造、并发只构造一次、构造失败可重试、各组件共享同一个LLMProcessor
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from collectors.service_registry import ServiceRegistry, get_llm_processor, registry
+
+
+def test_lazy_singleton_under_concurrency():
+    services = ServiceRegistry()
+    built = []
+
+    def factory():
+        built.append(1)
+        time.sleep(0.05)
+        return object()
+
+    services.register("slow", factory)
+    assert not services.is_initialized("slow") and built == []
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(services.get("slow"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(built) == 1
+    assert all(result is results[0] for result in results)
+
+
+def test_failed_construction_is_retried():
+    services = ServiceRegistry()
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("首次构造失败")
+        return "ok"
+
+    services.register("flaky", flaky)
+    try:
+        services.get("flaky")
+        assert False, "构造失败时应抛出异常"
+    except RuntimeError:
+        pass
+    assert services.get("flaky") == "ok" and len(attempts) == 2
+
+    services.set("flaky", "stub")
+    assert services.get("flaky") == "stub"
+    services.reset("flaky")
+    assert services.get("flaky") == "ok"
+
+    try:
+        services.get("missing")
+        assert False, "未登记的服务应抛出KeyError"
+    except KeyError:
+        pass
+    try:
+        services.register("flaky", flaky)
+        assert False, "重复登记应抛出ValueError"
+    except ValueError:
+        pass
+
+
+def test_components_share_one_llm_client():
+    from collectors.query_generation_mcp import QueryGenerationMcp
+    from collectors.outline_writer_mcp import OutlineWriterMcp
+
+    shared = get_llm_processor()
+    assert registry.get("llm_processor") is shared
+    assert QueryGenerationMcp().llm_processor is shared
+    assert OutlineWriterMcp().llm_processor is shared
+    assert registry.get("query_generation_mcp") is registry.get("query_generation_mcp")
+    assert {"tavily_collector", "arxiv_collector", "academic_collector", "search_mcp"} <= set(registry.names())
+
+
+if __name__ == "__main__":
+    test_lazy_singleton_under_concurrency()
+    test_failed_construction_is_retried()
+    test_components_share_one_llm_client()
+    print("✅ 共享服务注册表测试通过")
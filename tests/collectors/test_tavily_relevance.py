@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+测试TavilyCollector批量相关性评分：按批次打包调用、编号校验、缺失条目回退启发式评分、保留权重
+"""
+
+import os
+import re
+import sys
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from collectors.tavily_collector import TavilyCollector
+
+
+class StubLLMProcessor:
+    """按提示词中的编号返回评分，可指定漏掉或写错的编号"""
+
+    def __init__(self, skip_ids=(), fail=False):
+        self.skip_ids = set(skip_ids)
+        self.fail = fail
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def call_llm_api_json(self, prompt, system_message=None, temperature=0.2, max_tokens=8192, cache=None):
+        with self.lock:
+            self.calls += 1
+        if self.fail:
+            raise ValueError("无法解析JSON")
+        items = []
+        for index in map(int, re.findall(r'\[编号 (\d+)\]', prompt)):
+            if index in self.skip_ids:
+                continue
+            items.append({"编号": index, "主题相关性": index % 10 + 1, "时效性": 5, "信息质量": 5, "来源可靠性": 5})
+        items.append({"编号": 999, "主题相关性": 10, "时效性": 10, "信息质量": 10, "来源可靠性": 10})
+        items.append({"编号": 0, "主题相关性": "高"})
+        return {"items": items}
+
+
+def make_items(count):
+    return [{"title": f"人工智能新闻{i}", "content": "人工智能" * i} for i in range(count)]
+
+
+def test_items_are_batched():
+    llm = StubLLMProcessor()
+    items = make_items(23)
+    scored = TavilyCollector(api_key="stub").evaluate_content_relevance(
+        items, "人工智能", llm_processor=llm, batch_size=10, max_workers=3
+    )
+    assert llm.calls == 3
+    assert len(scored) == 23
+    scores = [item["relevance_score"] for item in scored]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_weighted_criteria_preserved():
+    criteria = {"主题相关性": 1.0}
+    items = make_items(3)
+    TavilyCollector(api_key="stub").evaluate_content_relevance(
+        items, "人工智能", criteria=criteria, llm_processor=StubLLMProcessor()
+    )
+    for index, item in enumerate(items):
+        assert item["relevance_score"] == index % 10 + 1
+        assert item["detailed_scores"]["总分"] == item["relevance_score"]
+
+
+def test_missing_items_fall_back_to_heuristic():
+    collector = TavilyCollector(api_key="stub")
+    items = make_items(5)
+    collector.evaluate_content_relevance(items, "人工智能", llm_processor=StubLLMProcessor(skip_ids={2}))
+    expected = collector._heuristic_relevance_scores(
+        {"title": "人工智能新闻2", "content": "人工智能" * 2}, "人工智能",
+        {"主题相关性": 0.35, "时效性": 0.4, "信息质量": 0.15, "来源可靠性": 0.1}
+    )[0]
+    assert items[2]["relevance_score"] == expected
+    assert items[1]["detailed_scores"]["主题相关性"] == 2
+
+
+def test_failed_batch_falls_back_to_heuristic():
+    items = make_items(4)
+    scored = TavilyCollector(api_key="stub").evaluate_content_relevance(
+        items, "人工智能", llm_processor=StubLLMProcessor(fail=True)
+    )
+    assert len(scored) == 4
+    assert all("relevance_score" in item for item in scored)
+
+
+if __name__ == "__main__":
+    test_items_are_batched()
+    test_weighted_criteria_preserved()
+    test_missing_items_fall_back_to_heuristic()
+    test_failed_batch_falls_back_to_heuristic()
+    print("✅ 批量相关性评分测试全部通过")
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+测试共享术语库：种子术语双向查询、学习并持久化、并发翻译同一文本只调用一次、失败不记录、
+长文本LRU容量有限、延迟合并写入文件
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from collectors.term_store import CHINESE, ENGLISH, TermStore
+
+
+def test_seed_terms_are_bilingual():
+    store = TermStore()
+    assert store.lookup("人工智能", "English") == "artificial intelligence"
+    assert store.lookup("Artificial Intelligence", "中文") == "人工智能"
+    assert store.lookup("量子通信", ENGLISH) is None
+    assert store.replace_known_terms("深度学习与芯片") == "deep learning与chip technology"
+
+
+def test_learned_terms_persist():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "terms", "term_translations.json")
+        store = TermStore(path=path)
+        assert store.translate("量子通信", "English", lambda text: "quantum communication") == "quantum communication"
+        store.translate("x" * 200, CHINESE, lambda text: "很长的译文")
+        store.flush()
+
+        reloaded = TermStore(path=path)
+        assert reloaded.lookup("量子通信", ENGLISH) == "quantum communication"
+        assert reloaded.lookup("quantum communication", CHINESE) == "量子通信"
+        assert reloaded.lookup("x" * 200, CHINESE) is None  # 长文本只在进程内记住
+        assert reloaded.get_stats()["persisted"] == 1
+
+
+def test_concurrent_translation_runs_once():
+    store = TermStore()
+    calls = []
+
+    def translator(text):
+        calls.append(text)
+        time.sleep(0.1)
+        return "space computing"
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(store.translate("太空计算", "English", translator)))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calls == ["太空计算"]
+    assert results == ["space computing"] * 8
+    assert store.get_stats()["misses"] == 1
+
+
+def test_failed_translation_not_learned():
+    store = TermStore()
+
+    def broken(text):
+        raise RuntimeError("LLM不可用")
+
+    try:
+        store.translate("量子通信", "English", broken)
+    except RuntimeError:
+        pass
+    else:
+        raise AssertionError("翻译失败应当抛出")
+    assert store.lookup("量子通信", ENGLISH) is None
+    assert store.translate("量子通信", "English", lambda text: "quantum communication") == "quantum communication"
+
+
+def test_long_texts_are_bounded():
+    store = TermStore(max_term_length=20, max_long_texts=3)
+    for i in range(5):
+        store.learn(f"第{i}段" + "很长的摘要内容" * 5, f"paragraph {i}", ENGLISH)
+
+    # 只保留最近的3段长文本，且不进入术语表
+    assert store.lookup("第0段" + "很长的摘要内容" * 5, ENGLISH) is None
+    assert store.lookup("第4段" + "很长的摘要内容" * 5, ENGLISH) == "paragraph 4"
+    stats = store.get_stats()
+    assert stats["long_texts"] == 3
+    assert stats["terms"] == TermStore(max_term_length=20).get_stats()["terms"]
+
+    # 命中的长文本移到最近使用，淘汰时保留下来
+    assert store.lookup("第2段" + "很长的摘要内容" * 5, ENGLISH) == "paragraph 2"
+    store.learn("第5段" + "很长的摘要内容" * 5, "paragraph 5", ENGLISH)
+    assert store.lookup("第2段" + "很长的摘要内容" * 5, ENGLISH) == "paragraph 2"
+    assert store.lookup("第3段" + "很长的摘要内容" * 5, ENGLISH) is None
+
+
+def test_saves_are_debounced():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "term_translations.json")
+        store = TermStore(path=path, save_delay=0.2)
+        for i in range(5):
+            store.learn(f"术语{i}", f"term {i}", ENGLISH)
+        assert not os.path.exists(path)
+
+        time.sleep(0.5)
+        assert TermStore(path=path).get_stats()["persisted"] == 5
+
+        store.learn("术语5", "term 5", ENGLISH)
+        store.flush()
+        assert TermStore(path=path).lookup("术语5", ENGLISH) == "term 5"
+
+
+if __name__ == "__main__":
+    test_seed_terms_are_bilingual()
+    test_learned_terms_persist()
+    test_concurrent_translation_runs_once()
+    test_failed_translation_not_learned()
+    test_long_texts_are_bounded()
+    test_saves_are_debounced()
+    print("✅ 术语库测试全部通过")
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+测试LLM用量账本：并发共享同一个LLMProcessor时，各请求上下文的用量互不干扰
+"""
+
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from collectors.llm_processor import LLMProcessor
+from collectors.usage_ledger import (
+    usage_ledger, usage_context, usage_stage, set_stage, submit_in_context
+)
+
+
+def run_report(processor: LLMProcessor, context_id: str, calls: int):
+    """模拟一次报告生成：两个阶段，阶段内的调用在线程池中并发执行"""
+    with usage_context(context_id):
+        set_stage("outline")
+        processor._record_usage(100, 10, 110, latency=0.5)
+
+        set_stage("sections")
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [
+                submit_in_context(executor, processor._record_usage, 200, 50, 250, 0.25)
+                for _ in range(calls)
+            ]
+            for future in futures:
+                future.result()
+
+
+def test_concurrent_contexts_are_isolated():
+    usage_ledger.reset()
+    processor = LLMProcessor(api_key="stub")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [
+            executor.submit(run_report, processor, "report-a", 8),
+            executor.submit(run_report, processor, "report-b", 3),
+        ]
+        for future in futures:
+            future.result()
+
+    summary_a = usage_ledger.pop("report-a")
+    summary_b = usage_ledger.pop("report-b")
+
+    assert summary_a["calls"] == 9
+    assert summary_a["input_tokens"] == 100 + 8 * 200
+    assert summary_a["stages"]["sections"]["output_tokens"] == 8 * 50
+    assert summary_a["stages"]["outline"]["avg_latency"] == 0.5
+
+    assert summary_b["calls"] == 4
+    assert summary_b["total_tokens"] == 110 + 3 * 250
+    assert summary_b["stages"]["sections"]["avg_latency"] == 0.25
+
+    # 取出后账本中不再保留
+    assert usage_ledger.get_summary("report-a")["calls"] == 0
+
+
+def test_no_context_is_not_recorded():
+    usage_ledger.reset()
+    processor = LLMProcessor(api_key="stub")
+    processor._record_usage(10, 1, 11)
+
+    # 不在上下文中的调用只更新last_usage，不写入账本
+    assert processor.last_usage["total_tokens"] == 11
+    assert usage_ledger.get_summary("missing")["calls"] == 0
+
+
+def test_usage_stage_restores_previous_stage():
+    usage_ledger.reset()
+    with usage_context("report-c", stage="search"):
+        with usage_stage("quality"):
+            usage_ledger.record("openai", "m", 1, 1, 2)
+        usage_ledger.record("openai", "m", 1, 1, 2)
+
+    summary = usage_ledger.pop("report-c")
+    assert set(summary["stages"]) == {"search", "quality"}
+
+
+if __name__ == "__main__":
+    test_concurrent_contexts_are_isolated()
+    test_no_context_is_not_recorded()
+    test_usage_stage_restores_previous_stage()
+    print("✅ 用量账本测试全部通过")
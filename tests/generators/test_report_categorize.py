@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+测试ReportGenerator批量分类：关键词预分类阈值、批量响应的编号校验、
+缺失编号和失败批次逐篇回退，以及LLM调用（含术语库翻译）经过调控器并计入用量账本
+"""
+
+import os
+import re
+import sys
+import threading
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import config
+from collectors.llm_governor import llm_governor
+from collectors.usage_ledger import usage_context, usage_ledger
+from generators.report_generator import ReportGenerator
+
+CATEGORIES = ["政策法规", "市场动态", "技术进展"]
+
+
+class StubReportGenerator(ReportGenerator):
+    """按提示词中的编号或标题返回分类结果，不调用真实API"""
+
+    def __init__(self, expected, broken_ids=(), skipped_ids=()):
+        super().__init__(api_key="stub")
+        self.expected = expected
+        self.broken_ids = set(broken_ids)
+        self.skipped_ids = set(skipped_ids)
+        self.batch_calls = 0
+        self.single_calls = 0
+        self.lock = threading.Lock()
+
+    def call_openai_with_fallback(self, messages, max_tokens=None, temperature=None, purpose="chat"):
+        prompt = messages[-1]["content"]
+        ids = [int(index) for index in re.findall(r'\[编号 (\d+)\]', prompt)]
+        if not ids:
+            with self.lock:
+                self.single_calls += 1
+            index = int(re.search(r'文章标题：文章(\d+)', prompt).group(1))
+            return self.expected[index]
+
+        with self.lock:
+            self.batch_calls += 1
+        if self.broken_ids & set(ids):
+            return "抱歉，我无法完成分类"
+        mapping = {str(index): self.expected[index] for index in ids if index not in self.skipped_ids}
+        mapping.update({"999": CATEGORIES[0], "编号": CATEGORIES[0]})
+        return f"分类结果如下：{mapping}".replace("'", '"')
+
+
+def make_articles(count):
+    return [{"title": f"文章{i}", "summary": "本周要闻汇总"} for i in range(count)]
+
+
+def test_batch_result_keeps_only_valid_ids_and_categories():
+    generator = StubReportGenerator({0: "技术进展", 1: "不存在的类别", 2: "市场动态"})
+    articles = make_articles(3)
+    result = generator._categorize_batch([(0, articles[0]), (1, articles[1]), (2, articles[2])], CATEGORIES)
+    assert result == {0: "技术进展", 2: "市场动态"}
+
+    generator.broken_ids = {0}
+    try:
+        generator._categorize_batch([(0, articles[0])], CATEGORIES)
+        assert False, "无法解析的响应应抛出异常"
+    except ValueError:
+        pass
+
+
+def test_preclassifier_threshold():
+    generator = StubReportGenerator({})
+    articles = [
+        {"title": "央行发布政策法规新规", "summary": "政策法规调整"},
+        {"title": "芯片技术进展", "summary": "技术进展显著"},
+        {"title": "政策法规与市场动态", "summary": "技术进展"},
+        {"title": "本周要闻", "summary": "行业速览"},
+    ]
+    assert generator._preclassify_articles(articles, CATEGORIES) == {0: "政策法规", 1: "技术进展"}
+
+    original = config.CATEGORIZE_MIN_COVERAGE
+    config.CATEGORIZE_MIN_COVERAGE = 1.01
+    try:
+        assert generator._preclassify_articles(articles, CATEGORIES) == {}
+    finally:
+        config.CATEGORIZE_MIN_COVERAGE = original
+
+
+def test_missing_ids_and_failed_batches_fall_back_per_article():
+    # 期望类别都不是第一个类别，失败批次若被整体归入第一个类别会被发现
+    expected = {i: CATEGORIES[1 + i % 2] for i in range(8)}
+    generator = StubReportGenerator(expected, broken_ids={0}, skipped_ids={4})
+    articles = make_articles(8)
+
+    categorized = generator.categorize_content(articles, CATEGORIES, batch_size=3, max_workers=2)
+
+    assert categorized[CATEGORIES[0]] == []
+    for category in CATEGORIES[1:]:
+        assert [article["title"] for article in categorized[category]] == [
+            f"文章{i}" for i in range(8) if expected[i] == category
+        ]
+    # 批次 [0,1,2] 解析失败、批次 [3,4,5] 漏掉编号4，这4篇逐篇分类
+    assert generator.batch_calls == 3 and generator.single_calls == 4
+    assert generator.categorization_stats["llm_calls"] == 7
+
+
+def stub_generator(content):
+    generator = ReportGenerator(api_key="stub")
+    response = SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=f" {content} "))],
+        usage=SimpleNamespace(prompt_tokens=12, completion_tokens=3, total_tokens=15),
+    )
+    generator.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=lambda **kwargs: response)))
+    return generator
+
+
+def governor_requests():
+    return sum(lane["requests"] for lane in llm_governor.get_stats()["lanes"].values())
+
+
+def test_calls_go_through_governor_and_ledger():
+    generator = stub_generator("技术进展")
+    requests_before = governor_requests()
+    with usage_context("categorize-test"):
+        assert generator.call_openai_with_fallback([{"role": "user", "content": "分类"}]) == "技术进展"
+
+    assert governor_requests() == requests_before + 1
+    summary = usage_ledger.pop("categorize-test")
+    assert summary["calls"] == 1 and summary["total_tokens"] == 15
+
+    # 术语库翻译同样经过调控器并计入用量
+    generator = stub_generator("人工智能")
+    with usage_context("translate-test"):
+        assert generator._translate_with_models("artificial intelligence") == "人工智能"
+
+    assert governor_requests() == requests_before + 2
+    assert usage_ledger.pop("translate-test")["calls"] == 1
+
+
+if __name__ == "__main__":
+    test_batch_result_keeps_only_valid_ids_and_categories()
+    test_preclassifier_threshold()
+    test_missing_ids_and_failed_batches_fall_back_per_article()
+    test_calls_go_through_governor_and_ledger()
+    print("✅ 批量分类测试通过")